@@ -12,6 +12,8 @@ from chainer import dataset  # NOQA
 from chainer import datasets  # NOQA
 from chainer import function  # NOQA
 from chainer import functions  # NOQA
+from chainer import gradient_pool  # NOQA
+from chainer import graph_optimizations  # NOQA
 from chainer import initializer  # NOQA
 from chainer import initializers  # NOQA
 from chainer import iterators  # NOQA
@@ -22,6 +24,7 @@ from chainer import optimizers  # NOQA
 from chainer import reporter  # NOQA
 from chainer import serializer  # NOQA
 from chainer import serializers  # NOQA
+from chainer import sparse_grad  # NOQA
 from chainer import training  # NOQA
 from chainer import variable  # NOQA
 
@@ -51,6 +54,7 @@ from chainer.reporter import Summary  # NOQA
 from chainer.serializer import AbstractSerializer  # NOQA
 from chainer.serializer import Deserializer  # NOQA
 from chainer.serializer import Serializer  # NOQA
+from chainer.sparse_grad import SparseGrad  # NOQA
 from chainer.variable import Variable  # NOQA
 
 
@@ -78,12 +82,21 @@ def get_function_hooks():
     return thread_local.function_hooks
 
 
+global_config.cpu_conv_algorithm = os.environ.get(
+    'CHAINER_CPU_CONV_ALGORITHM', 'im2col')
 global_config.debug = bool(int(os.environ.get('CHAINER_DEBUG', '0')))
 global_config.enable_backprop = True
+global_config.image_layout = os.environ.get('CHAINER_IMAGE_LAYOUT', 'NCHW')
 global_config.train = True
 global_config.type_check = bool(int(os.environ.get('CHAINER_TYPE_CHECK', '1')))
 global_config.use_cudnn = os.environ.get('CHAINER_USE_CUDNN', 'auto')
+global_config.use_gradient_pool = bool(
+    int(os.environ.get('CHAINER_USE_GRADIENT_POOL', '1')))
 global_config.use_mkldnn = os.environ.get('CHAINER_USE_MKLDNN', 'auto')
+global_config.use_static_graph = bool(
+    int(os.environ.get('CHAINER_USE_STATIC_GRAPH', '1')))
+global_config.mkldnn_batch_stream = bool(
+    int(os.environ.get('CHAINER_MKLDNN_BATCH_STREAM', '0')))
 # export CHAINER_ENABLE_COSIM=0
 global_config.cosim = bool(int(os.environ.get('CHAINER_ENABLE_COSIM', '0')))
 # export CHAINER_ENABLE_COSIM_CONTINUE=0
@@ -6,6 +6,7 @@ from chainer.dataset import iterator  # NOQA
 
 # import class and function
 from chainer.dataset.convert import concat_examples  # NOQA
+from chainer.dataset.convert import ConcatWithBuffers  # NOQA
 from chainer.dataset.convert import to_device  # NOQA
 from chainer.dataset.dataset_mixin import DatasetMixin  # NOQA
 from chainer.dataset.download import cache_or_load_file  # NOQA
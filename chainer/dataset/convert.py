@@ -73,6 +73,11 @@ def concat_examples(batch, device=None, padding=None):
             created, and elements outside of the examples are padded by this
             value.
 
+    If the batch already holds its examples concatenated in the
+    ``concatenated`` attribute, as the batches of
+    :class:`~chainer.iterators.MultiprocessIterator` may, those arrays are
+    returned without copying them.
+
     Returns:
         Array, a tuple of arrays, or a dictionary of arrays. The type depends
         on the type of each example in the batch.
@@ -81,6 +86,10 @@ def concat_examples(batch, device=None, padding=None):
     if len(batch) == 0:
         raise ValueError('batch is empty')
 
+    concatenated = getattr(batch, 'concatenated', None)
+    if concatenated is not None:
+        return _concatenated_to_device(device, concatenated)
+
     first_elem = batch[0]
 
     if isinstance(first_elem, tuple):
@@ -109,6 +118,17 @@ def concat_examples(batch, device=None, padding=None):
         return to_device(device, _concat_arrays(batch, padding))
 
 
+def _concatenated_to_device(device, concatenated):
+    # The examples have the same shapes, so no padding is needed.
+    if isinstance(concatenated, tuple):
+        return tuple([to_device(device, x) for x in concatenated])
+    elif isinstance(concatenated, dict):
+        return {key: to_device(device, x)
+                for key, x in six.iteritems(concatenated)}
+    else:
+        return to_device(device, concatenated)
+
+
 def _concat_arrays(arrays, padding):
     # Convert `arrays` to numpy.ndarray if `arrays` consists of the built-in
     # types such as int or float.
@@ -139,3 +159,98 @@ def _concat_arrays_with_padding(arrays, padding):
             result[(i,) + slices] = src
 
     return result
+
+
+class ConcatWithBuffers(object):
+
+    """Converter that concatenates examples into reused arrays.
+
+    It works like :func:`~chainer.dataset.concat_examples`, but concatenates
+    the examples on CPU into arrays allocated once and reused by later calls,
+    cycling through ``n_buffers`` sets of arrays. The arrays returned by a
+    call are therefore overwritten by the ``n_buffers``-th call after it, and
+    must not be used by then. A set of arrays is reallocated when the shape or
+    the dtype of the batch changes, e.g. for the last batch of an epoch.
+
+    Examples given as CuPy arrays or built-in scalars are concatenated by
+    :func:`~chainer.dataset.concat_examples` as usual, and batches that
+    already hold their examples concatenated are returned without copying.
+
+    Args:
+        n_buffers (int): Number of sets of arrays to cycle through.
+
+    """
+
+    def __init__(self, n_buffers=2):
+        if n_buffers < 1:
+            raise ValueError('n_buffers must be positive')
+        self.n_buffers = n_buffers
+        self._buffers = [{} for _ in six.moves.range(n_buffers)]
+        self._index = 0
+
+    def __call__(self, batch, device=None, padding=None):
+        if len(batch) == 0:
+            raise ValueError('batch is empty')
+
+        concatenated = getattr(batch, 'concatenated', None)
+        if concatenated is not None:
+            return _concatenated_to_device(device, concatenated)
+
+        buffers = self._buffers[self._index]
+        self._index = (self._index + 1) % self.n_buffers
+        first_elem = batch[0]
+
+        if isinstance(first_elem, tuple):
+            if not isinstance(padding, tuple):
+                padding = [padding] * len(first_elem)
+            return tuple([
+                to_device(device, _concat_arrays_into(
+                    buffers, i, [example[i] for example in batch],
+                    padding[i]))
+                for i in six.moves.range(len(first_elem))])
+
+        elif isinstance(first_elem, dict):
+            if not isinstance(padding, dict):
+                padding = {key: padding for key in first_elem}
+            return {key: to_device(device, _concat_arrays_into(
+                buffers, key, [example[key] for example in batch],
+                padding[key]))
+                for key in first_elem}
+
+        else:
+            return to_device(
+                device, _concat_arrays_into(buffers, None, batch, padding))
+
+
+def _concat_arrays_into(buffers, key, arrays, padding):
+    if not isinstance(arrays[0], numpy.ndarray):
+        return _concat_arrays(arrays, padding)
+
+    shape = arrays[0].shape
+    if padding is None:
+        for array in arrays[1:]:
+            if array.shape != shape:
+                raise ValueError(
+                    'all the input array dimensions must match exactly: '
+                    '{} and {}'.format(shape, array.shape))
+        dtype = numpy.result_type(*arrays)
+    else:
+        shape = numpy.array(shape, dtype=int)
+        for array in arrays[1:]:
+            numpy.maximum(shape, array.shape, shape)
+        shape = tuple(shape)
+        dtype = arrays[0].dtype
+    shape = (len(arrays),) + shape
+
+    result = buffers.get(key)
+    if result is None or result.shape != shape or result.dtype != dtype:
+        result = numpy.empty(shape, dtype=dtype)
+        buffers[key] = result
+    if padding is None:
+        for i, array in enumerate(arrays):
+            result[i] = array
+    else:
+        result.fill(padding)
+        for i, array in enumerate(arrays):
+            result[(i,) + tuple(slice(dim) for dim in array.shape)] = array
+    return result
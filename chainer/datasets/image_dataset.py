@@ -10,6 +10,7 @@ except ImportError as e:
 import six
 
 from chainer.dataset import dataset_mixin
+from chainer.utils import conv
 
 
 def _read_image_as_array(path, dtype):
@@ -23,6 +24,15 @@ def _read_image_as_array(path, dtype):
     return image
 
 
+def _to_image_layout(image):
+    if image.ndim == 2:
+        # image is greyscale
+        image = image[:, :, numpy.newaxis]
+    if conv.channels_last():
+        return image
+    return image.transpose(2, 0, 1)
+
+
 class ImageDataset(dataset_mixin.DatasetMixin):
 
     """Dataset of images built from a list of paths to image files.
@@ -35,7 +45,8 @@ class ImageDataset(dataset_mixin.DatasetMixin):
     Each image is automatically converted to arrays of shape
     ``channels, height, width``, where ``channels`` represents the number of
     channels in each pixel (e.g., 1 for grey-scale images, and 3 for RGB-color
-    images).
+    images). If ``chainer.config.image_layout`` is ``'NHWC'``, the arrays are
+    of shape ``height, width, channels`` as read from the files.
 
     .. note::
        **This dataset requires the Pillow package being installed.** In order
@@ -70,11 +81,7 @@ class ImageDataset(dataset_mixin.DatasetMixin):
     def get_example(self, i):
         path = os.path.join(self._root, self._paths[i])
         image = _read_image_as_array(path, self._dtype)
-
-        if image.ndim == 2:
-            # image is greyscale
-            image = image[:, :, numpy.newaxis]
-        return image.transpose(2, 0, 1)
+        return _to_image_layout(image)
 
 
 class LabeledImageDataset(dataset_mixin.DatasetMixin):
@@ -134,12 +141,8 @@ class LabeledImageDataset(dataset_mixin.DatasetMixin):
         path, int_label = self._pairs[i]
         full_path = os.path.join(self._root, path)
         image = _read_image_as_array(full_path, self._dtype)
-
-        if image.ndim == 2:
-            # image is greyscale
-            image = image[:, :, numpy.newaxis]
         label = numpy.array(int_label, dtype=self._label_dtype)
-        return image.transpose(2, 0, 1), label
+        return _to_image_layout(image), label
 
 
 def _check_pillow_availability():
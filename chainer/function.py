@@ -192,6 +192,8 @@ class Function(object):
         if self._n_local_function_hooks != 0:
             hooks = collections.OrderedDict(hooks)
             hooks.update(self.local_function_hooks)
+        if chainer.mkld.available:
+            chainer.mkld.prepare_function(self, in_data, hooks)
         for hook in six.itervalues(hooks):
             hook.forward_preprocess(self, in_data)
 
@@ -210,6 +212,7 @@ class Function(object):
             outputs = self.forward(in_data)
             assert type(outputs) == tuple
         for hook in six.itervalues(hooks):
+            hook.forward_outputs(self, in_data, outputs)
             hook.forward_postprocess(self, in_data)
 
         if chainer.is_debug():
@@ -738,6 +741,22 @@ class FunctionHook(object):
         """
         pass
 
+    def forward_outputs(self, function, in_data, out_data):
+        """Callback function invoked with the results of forward propagation.
+
+        It is invoked just before
+        :meth:`~chainer.function.FunctionHook.forward_postprocess`.
+
+        Args:
+            function(~chainer.Function): Function object to which
+                the function hook is registered.
+            in_data(tuple of numpy.ndarray or tuple of cupy.ndarray):
+                Input data of forward propagation.
+            out_data(tuple of numpy.ndarray or tuple of cupy.ndarray):
+                Output data of forward propagation.
+        """
+        pass
+
     # backward
     def backward_preprocess(self, function, in_data, out_grad):
         """Callback function invoked before backward propagation.
@@ -764,3 +783,22 @@ class FunctionHook(object):
                 Gradient data of backward propagation.
         """
         pass
+
+    def backward_outputs(self, function, in_data, out_grad, in_grad):
+        """Callback function invoked with the results of backward propagation.
+
+        It is invoked just before
+        :meth:`~chainer.function.FunctionHook.backward_postprocess`.
+
+        Args:
+            function(~chainer.Function): Function object to which
+                the function hook is registered.
+            in_data(tuple of numpy.ndarray or tuple of cupy.ndarray):
+                Input of forward propagation.
+            out_grad(tuple of numpy.ndarray or tuple of cupy.ndarray):
+                Gradient data of backward propagation.
+            in_grad(tuple): Gradients w.r.t. the inputs computed by
+                backward propagation. Each element is an array, a
+                :class:`~chainer.sparse_grad.SparseGrad` or ``None``.
+        """
+        pass
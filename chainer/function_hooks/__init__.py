@@ -1,7 +1,9 @@
 from chainer.function_hooks import debug_print  # NOQA
+from chainer.function_hooks import profile  # NOQA
 from chainer.function_hooks import timer  # NOQA
 
 
 # import class and function
 from chainer.function_hooks.debug_print import PrintHook  # NOQA
+from chainer.function_hooks.profile import ProfileHook  # NOQA
 from chainer.function_hooks.timer import TimerHook  # NOQA
@@ -0,0 +1,306 @@
+from __future__ import print_function
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import function
+from chainer.functions.connection import convolution_2d
+from chainer.functions.connection import deconvolution_2d
+from chainer.functions.connection import dilated_convolution_2d
+from chainer.functions.connection import linear
+from chainer.functions.math import matmul
+from chainer import sparse_grad
+
+
+_skipped_dirs = (os.path.dirname(chainer.functions.__file__) + os.sep,)
+_skipped_files = (function.__file__.rstrip('c'), __file__.rstrip('c'))
+
+
+def _call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not (filename.startswith(_skipped_dirs) or
+                filename in _skipped_files):
+            return '{}:{} ({})'.format(
+                filename, frame.f_lineno, frame.f_code.co_name)
+        frame = frame.f_back
+    return '(unknown)'
+
+
+def _arrays(data):
+    for x in data:
+        if isinstance(x, sparse_grad.SparseGrad):
+            x = x.values
+        if x is not None:
+            yield x
+
+
+def _nbytes(data):
+    return sum(x.size * numpy.dtype(x.dtype).itemsize
+               for x in _arrays(data))
+
+
+def _backend(data):
+    arrays = list(_arrays(data))
+    if any(isinstance(x, chainer.mkld.mdarray) for x in arrays):
+        return 'mkldnn'
+    if arrays and cuda.get_array_module(*arrays) is not numpy:
+        return 'cupy'
+    return 'numpy'
+
+
+def _estimate_flops(func, in_data, out_data):
+    # Multiply-adds of the forward computation, counted as two operations.
+    if isinstance(func, (convolution_2d.Convolution2DFunction,
+                         dilated_convolution_2d.DilatedConvolution2DFunction)):
+        W = in_data[1]
+        return 2 * out_data[0].size * (W.size // W.shape[0])
+    if isinstance(func, deconvolution_2d.Deconvolution2DFunction):
+        x, W = in_data[:2]
+        return 2 * x.size * (W.size // W.shape[0])
+    if isinstance(func, linear.LinearFunction):
+        return 2 * out_data[0].size * in_data[1].shape[1]
+    if isinstance(func, (matmul.MatMul, matmul.BatchMatMul)):
+        a = in_data[0]
+        if func.transa and a.ndim > 1:
+            k = a.shape[-2]
+        else:
+            k = a.shape[-1]
+        return 2 * out_data[0].size * k
+    return 0
+
+
+class ProfileHook(function.FunctionHook):
+    """Function hook that profiles functions on CPU.
+
+    It aggregates the calls of functions per function label and direction
+    (``'forward'`` or ``'backward'``), and per call site, i.e. the innermost
+    frame of the stack outside of :mod:`chainer.functions` that called the
+    function. Backward calls are attributed to the call site of the forward
+    call. The following quantities are recorded for each call:
+
+    - the elapsed time,
+    - the bytes of the outputs (of the gradients w.r.t. the inputs on
+      backward),
+    - the estimated floating point operations of convolutions, linear
+      functions and matrix products,
+    - the backend that computed the results (``'mkldnn'``, ``'numpy'`` or
+      ``'cupy'``), and
+    - the number of memory format conversions made by mkldnn, i.e. reorders
+      between layers and conversions of blocked arrays to plain ones.
+      They are only counted while the hook is used in the ``with`` statement
+      and mkldnn is available.
+
+    Only one of ``sampling_interval`` calls of each function label and
+    direction is profiled, which keeps the overhead low enough to leave the
+    hook on during training. As the calls are counted per function, the
+    functions called at fixed positions in every iteration are all
+    profiled::
+
+        with chainer.function_hooks.ProfileHook(sampling_interval=10) as h:
+            trainer.run()
+        h.print_report()
+        h.export_chrome_trace('trace.json')
+
+    The elapsed time of functions on GPU is that of their launch, as the
+    hook does not synchronize the device.
+
+    Args:
+        sampling_interval (int): Interval of calls of each function label
+            and direction to profile.
+        max_trace_events (int): Number of the latest profiled calls kept for
+            :meth:`export_chrome_trace`.
+
+    """
+
+    name = 'ProfileHook'
+
+    def __init__(self, sampling_interval=1, max_trace_events=100000):
+        if sampling_interval < 1:
+            raise ValueError('sampling_interval must be positive')
+        self.sampling_interval = sampling_interval
+        self._counts = {}
+        self._stack = []
+        self._stats = collections.OrderedDict()
+        self._site_stats = collections.OrderedDict()
+        self._sites = weakref.WeakKeyDictionary()
+        self._events = collections.deque(maxlen=max_trace_events)
+        self._layout_scope = None
+        self._layout_counter = None
+
+    def __enter__(self):
+        super(ProfileHook, self).__enter__()
+        if chainer.mkld.available:
+            self._layout_scope = chainer.mkld.count_layouts()
+            self._layout_counter = self._layout_scope.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        if self._layout_scope is not None:
+            self._layout_scope.__exit__(*args)
+            self._layout_scope = None
+            self._layout_counter = None
+        super(ProfileHook, self).__exit__(*args)
+
+    def _preprocess(self, func, direction):
+        key = func.label, direction
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.sampling_interval != 0:
+            self._stack.append(None)
+            return
+        if direction == 'forward':
+            site = _call_site()
+            self._sites[func] = site
+        else:
+            site = self._sites.get(func, '(unknown)')
+        # site, bytes, flops, backend, start
+        self._stack.append([site, 0, 0, None, time.time()])
+
+    def _outputs(self, func, in_data, out_data, outputs, direction):
+        record = self._stack[-1]
+        if record is None:
+            return
+        record[1] = _nbytes(outputs)
+        if all(y is not None for y in out_data):
+            flops = _estimate_flops(func, in_data, out_data)
+            record[2] = flops if direction == 'forward' else 2 * flops
+        record[3] = _backend(outputs)
+
+    def _postprocess(self, func, direction):
+        stop = time.time()
+        record = self._stack.pop()
+        reorders = 0
+        counter = self._layout_counter
+        if counter is not None:
+            # Conversions made since the last call are attributed to this
+            # one, including those of its inputs made before the hook runs.
+            reorders = counter.reorders + counter.conversions
+            counter.clear()
+        if record is None:
+            return
+        site, nbytes, flops, backend, start = record
+        elapsed = stop - start
+        label = func.label
+        for stats, key in ((self._stats, (label, direction)),
+                           (self._site_stats, (site, label, direction))):
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0.0, 0, 0, 0, set()]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += nbytes
+            entry[3] += flops
+            entry[4] += reorders
+            entry[5].add(backend)
+        self._events.append({
+            'name': label, 'cat': direction, 'ph': 'X',
+            'ts': start * 1e6, 'dur': elapsed * 1e6,
+            'pid': os.getpid(), 'tid': threading.current_thread().ident,
+            'args': {'site': site, 'backend': backend, 'bytes': nbytes,
+                     'flops': flops, 'reorders': reorders}})
+
+    def forward_preprocess(self, function, in_data):
+        self._preprocess(function, 'forward')
+
+    def forward_outputs(self, function, in_data, out_data):
+        self._outputs(function, in_data, out_data, out_data, 'forward')
+
+    def forward_postprocess(self, function, in_data):
+        self._postprocess(function, 'forward')
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        self._preprocess(function, 'backward')
+
+    def backward_outputs(self, function, in_data, out_grad, in_grad):
+        self._outputs(function, in_data, out_grad, in_grad, 'backward')
+
+    def backward_postprocess(self, function, in_data, out_grad):
+        self._postprocess(function, 'backward')
+
+    def stats(self, by='function'):
+        """Returns the aggregated results of the profiled calls.
+
+        Args:
+            by (str): ``'function'`` to aggregate per ``(label, direction)``
+                pair, or ``'site'`` to aggregate per
+                ``(call site, label, direction)`` tuple.
+
+        Returns:
+            dict: Maps the keys to dicts with ``calls``, ``time`` (in
+            seconds), ``bytes``, ``flops``, ``reorders`` and ``backend``.
+            Backends of entries computed by several ones are joined by
+            ``'/'``.
+
+        """
+        if by == 'function':
+            stats = self._stats
+        elif by == 'site':
+            stats = self._site_stats
+        else:
+            raise ValueError('by must be either \'function\' or \'site\'')
+        return dict(
+            (key, {'calls': e[0], 'time': e[1], 'bytes': e[2],
+                   'flops': e[3], 'reorders': e[4],
+                   'backend': '/'.join(sorted(e[5]))})
+            for key, e in stats.items())
+
+    def total_time(self):
+        """Returns total elapsed time of the profiled calls in seconds."""
+        return sum(e[1] for e in self._stats.values())
+
+    def clear(self):
+        """Drops the results profiled so far."""
+        self._stats.clear()
+        self._site_stats.clear()
+        self._events.clear()
+
+    def print_report(self, by='function', file=sys.stdout):
+        """Prints the results, most time consuming first.
+
+        Args:
+            by (str): ``'function'`` or ``'site'``. See :meth:`stats`.
+            file: Output file-like object.
+
+        """
+        stats = self.stats(by)
+        total = self.total_time() or 1.0
+        header = '{:<32}{:<10}{:>8}{:>12}{:>8}{:>12}{:>10}{:>10}{:>10}'
+        row = '{:<32}{:<10}{:>8}{:>12.3f}{:>8.1f}{:>12.3f}{:>10.2f}' \
+            '{:>10}{:>10}'
+        columns = ('function', 'direction', 'calls', 'time (ms)', '%',
+                   'MiB', 'GFLOP/s', 'backend', 'reorders')
+        if by == 'site':
+            header = '{:<48}' + header
+            row = '{:<48}' + row
+            columns = ('site',) + columns
+        print(header.format(*columns), file=file)
+        for key, e in sorted(stats.items(), key=lambda item: -item[1]['time']):
+            gflops = e['flops'] / e['time'] / 1e9 if e['time'] > 0 else 0.0
+            print(row.format(*key + (
+                e['calls'], e['time'] * 1e3, 100.0 * e['time'] / total,
+                e['bytes'] / 2.0 ** 20, gflops, e['backend'],
+                e['reorders'])), file=file)
+
+    def export_chrome_trace(self, path):
+        """Writes the profiled calls in the Chrome trace event format.
+
+        The file can be opened with ``chrome://tracing``. Only the latest
+        ``max_trace_events`` calls are written.
+
+        Args:
+            path (str): Path of the output JSON file.
+
+        """
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': list(self._events),
+                       'displayTimeUnit': 'ms'}, f)
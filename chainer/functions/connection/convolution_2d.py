@@ -5,6 +5,7 @@ from chainer import cuda
 from chainer import mkld
 from chainer import function
 from chainer.utils import conv
+from chainer.utils import conv_algorithm
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -40,6 +41,7 @@ class Convolution2DFunction(function.Function):
         self.ph, self.pw = _pair(pad)
         self.cover_all = cover_all
         self.deterministic = deterministic
+        self.channels_last = conv.channels_last()
 
     def check_type_forward(self, in_types):
         n_in = in_types.size()
@@ -52,7 +54,7 @@ class Convolution2DFunction(function.Function):
             w_type.dtype.kind == 'f',
             x_type.ndim == 4,
             w_type.ndim == 4,
-            x_type.shape[1] == w_type.shape[1],
+            x_type.shape[3 if self.channels_last else 1] == w_type.shape[1],
         )
 
         if type_check.eval(n_in) == 3:
@@ -63,19 +65,112 @@ class Convolution2DFunction(function.Function):
                 b_type.shape[0] == w_type.shape[0],
             )
 
+    def forward(self, inputs):
+        if self.channels_last and isinstance(inputs[0], cuda.ndarray):
+            # cuDNN and the kernels run in NCHW.
+            y, = self.forward_gpu((conv.to_nchw(inputs[0]),) + inputs[1:])
+            return conv.to_nhwc(y),
+        return super(Convolution2DFunction, self).forward(inputs)
+
+    def backward(self, inputs, grad_outputs):
+        if self.channels_last and isinstance(inputs[0], cuda.ndarray):
+            grads = self.backward_gpu(
+                (conv.to_nchw(inputs[0]),) + inputs[1:],
+                (conv.to_nchw(grad_outputs[0]),))
+            return (conv.to_nhwc(grads[0]),) + grads[1:]
+        return super(Convolution2DFunction, self).backward(
+            inputs, grad_outputs)
+
     def forward_cpu(self, inputs):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
         kh, kw = W.shape[2:]
-        self.col = conv.im2col_cpu(
-            x, kh, kw, self.sy, self.sx, self.ph, self.pw,
-            cover_all=self.cover_all)
+        if self.channels_last:
+            x = conv.to_nchw(x)
+        self.algorithm = conv_algorithm.select(
+            x, W, (self.sy, self.sx), (self.ph, self.pw))
+        if self.algorithm != 'im2col':
+            y = conv_algorithm.forward(
+                self.algorithm, x, W, (self.ph, self.pw))
+            if b is not None:
+                y += b[:, None, None]
+            if self.channels_last:
+                y = conv.to_nhwc(y)
+            return y,
+        if self.channels_last:
+            return self._forward_nhwc_cpu(conv.to_nhwc(x), W, b),
+
+        if chainer.config.enable_backprop:
+            col = self.col = conv.im2col_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all)
+        else:
+            # The patches are not kept for the backward computation.
+            n, c, h, w = x.shape
+            out_h = conv.get_conv_outsize(h, kh, self.sy, self.ph,
+                                          cover_all=self.cover_all)
+            out_w = conv.get_conv_outsize(w, kw, self.sx, self.pw,
+                                          cover_all=self.cover_all)
+            col = conv.im2col_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all, out=conv.get_workspace(
+                    (n, c, kh, kw, out_h, out_w), x.dtype))
         y = numpy.tensordot(
-            self.col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype, copy=False)
+            col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype, copy=False)
         if b is not None:
             y += b
         return numpy.rollaxis(y, 3, 1),
 
+    def _forward_nhwc_cpu(self, x, W, b):
+        # The patches of shape (n, out_h, out_w, kh, kw, c) are multiplied
+        # by the filters transposed to (out_c, kh, kw, c), which gives the
+        # output in NHWC.
+        out_c, _, kh, kw = W.shape
+        if kh == kw == 1 and self.ph == self.pw == 0 and not self.cover_all:
+            # The patches of 1x1 filters are the pixels themselves.
+            col = self.col = x[:, ::self.sy, ::self.sx, None, None]
+        elif chainer.config.enable_backprop:
+            col = self.col = conv.im2col_nhwc_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all)
+        else:
+            n, h, w, c = x.shape
+            out_h = conv.get_conv_outsize(h, kh, self.sy, self.ph,
+                                          cover_all=self.cover_all)
+            out_w = conv.get_conv_outsize(w, kw, self.sx, self.pw,
+                                          cover_all=self.cover_all)
+            col = conv.im2col_nhwc_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all, out=conv.get_workspace(
+                    (n, out_h, out_w, kh, kw, c), x.dtype))
+        W_mat = W.transpose(0, 2, 3, 1).reshape(out_c, -1)
+        y = numpy.dot(col.reshape(-1, W_mat.shape[1]), W_mat.T).astype(
+            x.dtype, copy=False)
+        if b is not None:
+            y += b
+        return y.reshape(col.shape[:3] + (out_c,))
+
+    def _backward_nhwc_cpu(self, x, W, gy):
+        out_c, c, kh, kw = W.shape
+        h, w = x.shape[1:3]
+        col = self.col
+        gy_mat = gy.reshape(-1, out_c)
+        gW = numpy.dot(gy_mat.T, col.reshape(len(gy_mat), -1))
+        gW = numpy.ascontiguousarray(
+            gW.reshape(out_c, kh, kw, c).transpose(0, 3, 1, 2),
+            dtype=W.dtype)
+
+        W_mat = W.transpose(0, 2, 3, 1).reshape(out_c, -1)
+        if numpy.result_type(gy, W) == x.dtype:
+            gcol = conv.get_workspace(col.shape, x.dtype)
+            numpy.dot(gy_mat, W_mat, out=gcol.reshape(len(gy_mat), -1))
+        else:
+            gcol = numpy.dot(gy_mat, W_mat).astype(
+                x.dtype, copy=False).reshape(col.shape)
+        gx = conv.col2im_nhwc_cpu(
+            gcol, self.sy, self.sx, self.ph, self.pw, h, w)
+        return gx, gW
+
     def forward_gpu(self, inputs):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
@@ -149,18 +244,35 @@ class Convolution2DFunction(function.Function):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
         gy = grad_outputs[0]
-        h, w = x.shape[2:]
 
-        gW = numpy.tensordot(
-            gy, self.col, ((0, 2, 3), (0, 4, 5))).astype(W.dtype, copy=False)
-        gcol = numpy.tensordot(W, gy, (0, 1)).astype(x.dtype, copy=False)
-        gcol = numpy.rollaxis(gcol, 3)
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
+        if self.algorithm != 'im2col':
+            if self.channels_last:
+                x, gy = conv.to_nchw(x), conv.to_nchw(gy)
+            h, w = x.shape[2:]
+            pad = self.ph, self.pw
+            gW = conv_algorithm.backward_filter(
+                self.algorithm, x, gy, W.shape[2:], pad).astype(
+                    W.dtype, copy=False)
+            gx = conv_algorithm.backward_data(
+                self.algorithm, gy, W, (h, w), pad).astype(
+                    x.dtype, copy=False)
+            if self.channels_last:
+                gx, gy = conv.to_nhwc(gx), conv.to_nhwc(gy)
+        elif self.channels_last:
+            gx, gW = self._backward_nhwc_cpu(x, W, gy)
+        else:
+            h, w = x.shape[2:]
+            gW = numpy.tensordot(
+                gy, self.col, ((0, 2, 3), (0, 4, 5))).astype(
+                    W.dtype, copy=False)
+            gcol = conv.tensordot_col_cpu(W, gy)
+            gx = conv.col2im_cpu(
+                gcol, self.sy, self.sx, self.ph, self.pw, h, w)
 
         if b is None:
             return gx, gW
         else:
-            gb = gy.sum(axis=(0, 2, 3))
+            gb = gy.sum(axis=(0, 1, 2) if self.channels_last else (0, 2, 3))
             return gx, gW, gb
 
     def backward_gpu(self, inputs, grad_outputs):
@@ -274,7 +386,9 @@ def convolution_2d(x, W, b=None, stride=1, pad=0,
       respectively.
 
     Args:
-        x (~chainer.Variable): Input variable of shape :math:`(n, c_I, h, w)`.
+        x (~chainer.Variable): Input variable of shape :math:`(n, c_I, h, w)`,
+            or :math:`(n, h, w, c_I)` if ``chainer.config.image_layout`` is
+            ``'NHWC'``. The output is in the same layout.
         W (~chainer.Variable): Weight variable of shape
             :math:`(c_O, c_I, k_H, k_W)`.
         b (~chainer.Variable): Bias variable of length :math:`c_O` (optional).
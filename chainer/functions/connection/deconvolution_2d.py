@@ -6,6 +6,7 @@ from chainer import mkld
 from chainer import function
 from chainer.functions.connection import convolution_2d
 from chainer.utils import conv
+from chainer.utils import conv_algorithm
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -78,18 +79,28 @@ class Deconvolution2DFunction(function.Function):
         b = inputs[2] if len(inputs) == 3 else None
         kh, kw = W.shape[2:]
         _, _, h, w = x.shape
-        gcol = numpy.tensordot(W, x, (0, 1)).astype(x.dtype, copy=False)
-        # - k, m, n: shape of out_channel
-        # - b: number of inputs
-        # - h, w: height and width of kernels
-        # k, m, n, b, h, w -> b, k, m, n, h, w
-        gcol = numpy.rollaxis(gcol, 3)
         if self.outh is None:
             self.outh = conv.get_deconv_outsize(h, kh, self.sy, self.ph)
             assert self.outh > 0, 'Height in the output should be positive.'
         if self.outw is None:
             self.outw = conv.get_deconv_outsize(w, kw, self.sx, self.pw)
             assert self.outw > 0, 'Width in the output should be positive.'
+
+        self.algorithm = conv_algorithm.select(
+            x, W, (self.sy, self.sx), (self.ph, self.pw), transposed=True)
+        if self.algorithm != 'im2col':
+            y = conv_algorithm.backward_data(
+                self.algorithm, x, W, (self.outh, self.outw),
+                (self.ph, self.pw))
+            if b is not None:
+                y += b[:, None, None]
+            return y,
+
+        # - k, m, n: shape of out_channel
+        # - b: number of inputs
+        # - h, w: height and width of kernels
+        # k, m, n, b, h, w -> b, k, m, n, h, w
+        gcol = conv.tensordot_col_cpu(W, x)
         y = conv.col2im_cpu(
             gcol, self.sy, self.sx, self.ph, self.pw, self.outh, self.outw)
         # b, k, h, w
@@ -178,13 +189,24 @@ class Deconvolution2DFunction(function.Function):
         b = inputs[2] if len(inputs) == 3 else None
         gy = grad_outputs[0]
         kh, kw = W.shape[2:]
-        col = conv.im2col_cpu(
-            gy, kh, kw, self.sy, self.sx, self.ph, self.pw)
-        gW = numpy.tensordot(
-            x, col, ([0, 2, 3], [0, 4, 5])).astype(W.dtype, copy=False)
-        gx = numpy.tensordot(
-            col, W, ([1, 2, 3], [1, 2, 3])).astype(x.dtype, copy=False)
-        gx = numpy.rollaxis(gx, 3, 1)
+        if self.algorithm != 'im2col':
+            pad = self.ph, self.pw
+            gW = conv_algorithm.backward_filter(
+                self.algorithm, gy, x, (kh, kw), pad).astype(
+                    W.dtype, copy=False)
+            gx = conv_algorithm.forward(self.algorithm, gy, W, pad).astype(
+                x.dtype, copy=False)
+        else:
+            # The patches of gy have the spatial shape of x.
+            col = conv.im2col_cpu(
+                gy, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                out=conv.get_workspace(
+                    gy.shape[:2] + (kh, kw) + x.shape[2:], gy.dtype))
+            gW = numpy.tensordot(
+                x, col, ([0, 2, 3], [0, 4, 5])).astype(W.dtype, copy=False)
+            gx = numpy.tensordot(
+                col, W, ([1, 2, 3], [1, 2, 3])).astype(x.dtype, copy=False)
+            gx = numpy.rollaxis(gx, 3, 1)
 
         if b is None:
             return gx, gW
@@ -5,6 +5,7 @@ import chainer
 from chainer import cuda
 from chainer import function
 from chainer.utils import conv
+from chainer.utils import conv_algorithm
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -64,11 +65,33 @@ class DilatedConvolution2DFunction(function.Function):
         x, W = inputs[:2]
         b = inputs[2] if len(inputs) == 3 else None
         kh, kw = W.shape[2:]
-        self.col = conv.im2col_cpu(
-            x, kh, kw, self.sy, self.sx, self.ph, self.pw,
-            cover_all=self.cover_all, dy=self.dy, dx=self.dx)
+        self.algorithm = conv_algorithm.select(
+            x, W, (self.sy, self.sx), (self.ph, self.pw), (self.dy, self.dx))
+        if self.algorithm != 'im2col':
+            y = conv_algorithm.forward(
+                self.algorithm, x, W, (self.ph, self.pw), (self.dy, self.dx))
+            if b is not None:
+                y += b[:, None, None]
+            return y,
+
+        if chainer.config.enable_backprop:
+            col = self.col = conv.im2col_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all, dy=self.dy, dx=self.dx)
+        else:
+            # The patches are not kept for the backward computation.
+            n, c, h, w = x.shape
+            out_h = conv.get_conv_outsize(h, kh, self.sy, self.ph,
+                                          cover_all=self.cover_all, d=self.dy)
+            out_w = conv.get_conv_outsize(w, kw, self.sx, self.pw,
+                                          cover_all=self.cover_all, d=self.dx)
+            col = conv.im2col_cpu(
+                x, kh, kw, self.sy, self.sx, self.ph, self.pw,
+                cover_all=self.cover_all, dy=self.dy, dx=self.dx,
+                out=conv.get_workspace(
+                    (n, c, kh, kw, out_h, out_w), x.dtype))
         y = numpy.tensordot(
-            self.col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype, copy=False)
+            col, W, ((1, 2, 3), (1, 2, 3))).astype(x.dtype, copy=False)
         if b is not None:
             y += b
         return numpy.rollaxis(y, 3, 1),
@@ -159,12 +182,23 @@ class DilatedConvolution2DFunction(function.Function):
         gy = grad_outputs[0]
         h, w = x.shape[2:]
 
-        gW = numpy.tensordot(
-            gy, self.col, ((0, 2, 3), (0, 4, 5))).astype(W.dtype, copy=False)
-        gcol = numpy.tensordot(W, gy, (0, 1)).astype(x.dtype, copy=False)
-        gcol = numpy.rollaxis(gcol, 3)
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx,
-                             self.ph, self.pw, h, w, dy=self.dy, dx=self.dx)
+        if self.algorithm != 'im2col':
+            pad = self.ph, self.pw
+            dilate = self.dy, self.dx
+            gW = conv_algorithm.backward_filter(
+                self.algorithm, x, gy, W.shape[2:], pad, dilate).astype(
+                    W.dtype, copy=False)
+            gx = conv_algorithm.backward_data(
+                self.algorithm, gy, W, (h, w), pad, dilate).astype(
+                    x.dtype, copy=False)
+        else:
+            gW = numpy.tensordot(
+                gy, self.col, ((0, 2, 3), (0, 4, 5))).astype(
+                    W.dtype, copy=False)
+            gcol = conv.tensordot_col_cpu(W, gy)
+            gx = conv.col2im_cpu(
+                gcol, self.sy, self.sx, self.ph, self.pw, h, w,
+                dy=self.dy, dx=self.dx)
 
         if b is None:
             return gx, gW
@@ -1,16 +1,18 @@
 import numpy
-import six
 
 import chainer
 from chainer import cuda
 from chainer import function
+from chainer import sparse_grad
+from chainer.utils import array
 from chainer.utils import type_check
 
 
 class EmbedIDFunction(function.Function):
 
-    def __init__(self, ignore_label=None):
+    def __init__(self, ignore_label=None, sparse_grad=False):
         self.ignore_label = ignore_label
+        self.sparse_grad = sparse_grad
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 2)
@@ -47,17 +49,21 @@ class EmbedIDFunction(function.Function):
         xp = cuda.get_array_module(*inputs)
         x, W = inputs
         gy = grad_outputs[0]
-        gW = xp.zeros_like(W)
 
         if xp is numpy:
-            # It is equivalent to `numpy.add.at(gW, x, gy)` but ufunc.at is
-            # too slow.
-            for ix, igy in six.moves.zip(x.ravel(),
-                                         gy.reshape(x.size, -1)):
-                if ix == self.ignore_label:
-                    continue
-                gW[ix] += igy
+            x = x.ravel()
+            gy = gy.reshape(x.size, -1)
+            if self.ignore_label is not None:
+                mask = x != self.ignore_label
+                x = x[mask]
+                gy = gy[mask]
+            if self.sparse_grad:
+                indices, values = array.sum_by_index(x, gy)
+                return None, sparse_grad.SparseGrad(indices, values, W.shape)
+            gW = numpy.zeros_like(W)
+            array.scatter_add(gW, x, gy)
         else:
+            gW = xp.zeros_like(W)
             if self.ignore_label is None:
                 cuda.elementwise(
                     'T gy, int32 x, int32 n_out', 'raw T gW',
@@ -79,7 +85,7 @@ class EmbedIDFunction(function.Function):
         return None, gW
 
 
-def embed_id(x, W, ignore_label=None):
+def embed_id(x, W, ignore_label=None, sparse_grad=False):
     """Efficient linear function for one-hot input.
 
     This function implements so called *word embedding*. It takes two
@@ -96,6 +102,10 @@ def embed_id(x, W, ignore_label=None):
             word embeddings).
         ignore_label (int or None): If ``ignore_label`` is an int value,
             ``i``-th column of return value is filled with ``0``.
+        sparse_grad (bool): If ``True``, the gradient of ``W`` is computed as
+            a :class:`~chainer.SparseGrad` holding only the rows of the IDs in
+            ``x``. It is only supported on CPU; the gradient is a dense array
+            on GPU.
 
     Returns:
         ~chainer.Variable: Output variable.
@@ -103,4 +113,5 @@ def embed_id(x, W, ignore_label=None):
     .. seealso:: :class:`~chainer.links.EmbedID`
 
     """
-    return EmbedIDFunction(ignore_label=ignore_label)(x, W)
+    return EmbedIDFunction(ignore_label=ignore_label,
+                           sparse_grad=sparse_grad)(x, W)
@@ -66,6 +66,8 @@ class LinearFunction(function.Function):
 
 class LinearFunctionMKLDNN(LinearFunction):
 
+    mkldnn_deferrable = True
+
     def check_type_forward(self, in_types):
         n_in = in_types.size()
         type_check.expect(2 <= n_in, n_in <= 3)
@@ -355,6 +355,166 @@ class NStepLSTM(function.Function):
         return tuple([dhx, dcx] + dws + dbs + dx_list)
 
 
+def _sigmoid_inplace(x):
+    half = x.dtype.type(0.5)
+    x *= half
+    numpy.tanh(x, out=x)
+    x *= half
+    x += half
+
+
+# Gates are laid out as [i, f, o, a] so that one sigmoid covers the first
+# three. The indices map them to the weights W_0, ..., W_3 (and W_4, ...,
+# W_7 for the recurrent ones) of the cuDNN order [i, f, a, o].
+_gate_order = (0, 1, 3, 2)
+
+
+class NStepLSTMCPU(NStepLSTM):
+
+    """Stacked LSTM on CPU computed one layer at a time.
+
+    Since a layer does not depend on its own outputs through the input
+    weights, the input projections of all the time steps are computed with
+    one matrix product per layer, and so are the gradients of the weights.
+    Only the products with the recurrent weights are done step by step. The
+    four gate nonlinearities are applied in place to the preactivations.
+
+    Dropout is applied to the input of each layer.
+
+    """
+
+    def __init__(self, n_layers, dropout_ratio):
+        self.n_layers = n_layers
+        self.dropout_ratio = dropout_ratio
+
+    def forward(self, inputs):
+        (hx, cx), inputs = _split(inputs, 2)
+        ws, inputs = _split(inputs, self.n_layers * 8)
+        bs, inputs = _split(inputs, self.n_layers * 8)
+        x_list = inputs
+
+        n_units = hx.shape[2]
+        batches = [len(x) for x in x_list]
+        offsets = numpy.concatenate([[0], numpy.cumsum(batches)])
+        dtype = hx.dtype
+        use_dropout = configuration.config.train and self.dropout_ratio > 0
+
+        x = numpy.concatenate(x_list, axis=0)
+        hy = numpy.array(hx)
+        cy = numpy.array(cx)
+        self.layers = []
+        for layer in six.moves.range(self.n_layers):
+            w = ws[layer * 8:layer * 8 + 8]
+            b = bs[layer * 8:layer * 8 + 8]
+            w_x = numpy.concatenate([w[j] for j in _gate_order])
+            w_h = numpy.concatenate([w[4 + j] for j in _gate_order])
+            bias = numpy.concatenate([b[j] + b[4 + j] for j in _gate_order])
+
+            mask = None
+            if use_dropout:
+                scale = dtype.type(1. / (1 - self.dropout_ratio))
+                mask = scale * (
+                    numpy.random.rand(*x.shape) >= self.dropout_ratio
+                ).astype(dtype)
+                x = mask * x
+
+            # Preactivations of all the time steps, then gates in place.
+            gates = x.dot(w_x.T)
+            gates += bias
+            cs = numpy.empty((len(x), n_units), dtype)
+            ys = numpy.empty((len(x), n_units), dtype)
+            h = hy[layer]
+            c = cy[layer]
+            for t, batch in enumerate(batches):
+                g = gates[offsets[t]:offsets[t + 1]]
+                g += h[:batch].dot(w_h.T)
+                _sigmoid_inplace(g[:, :3 * n_units])
+                numpy.tanh(g[:, 3 * n_units:], out=g[:, 3 * n_units:])
+                i, f, o, a = numpy.split(g, 4, axis=1)
+
+                c_t = cs[offsets[t]:offsets[t + 1]]
+                numpy.multiply(f, c[:batch], out=c_t)
+                c_t += i * a
+                c[:batch] = c_t
+                y_t = ys[offsets[t]:offsets[t + 1]]
+                numpy.tanh(c_t, out=y_t)
+                y_t *= o
+                h[:batch] = y_t
+
+            self.layers.append((x, mask, w_x, w_h, gates, cs, ys))
+            x = ys
+
+        self.batches = batches
+        self.offsets = offsets
+        return tuple([hy, cy] + numpy.split(x, offsets[1:-1]))
+
+    def backward(self, inputs, grads):
+        hx, cx = inputs[:2]
+        batches = self.batches
+        offsets = self.offsets
+        n_units = hx.shape[2]
+        dtype = hx.dtype
+
+        dhy, dcy = grads[:2]
+        dy = numpy.zeros((offsets[-1], n_units), dtype)
+        for t, g in enumerate(grads[2:]):
+            if g is not None:
+                dy[offsets[t]:offsets[t + 1]] = g
+        dhx = numpy.zeros_like(hx) if dhy is None else numpy.array(dhy)
+        dcx = numpy.zeros_like(cx) if dcy is None else numpy.array(dcy)
+
+        dws = [None] * (self.n_layers * 8)
+        dbs = [None] * (self.n_layers * 8)
+        for layer in reversed(six.moves.range(self.n_layers)):
+            x, mask, w_x, w_h, gates, cs, ys = self.layers[layer]
+            dh = dhx[layer]
+            dc = dcx[layer]
+
+            # Hidden and cell states each time step starts from.
+            h_prev = numpy.empty_like(ys)
+            c_prev = numpy.empty_like(cs)
+            h_prev[:batches[0]] = hx[layer, :batches[0]]
+            c_prev[:batches[0]] = cx[layer, :batches[0]]
+            for t in six.moves.range(1, len(batches)):
+                h_prev[offsets[t]:offsets[t + 1]] = \
+                    ys[offsets[t - 1]:offsets[t - 1] + batches[t]]
+                c_prev[offsets[t]:offsets[t + 1]] = \
+                    cs[offsets[t - 1]:offsets[t - 1] + batches[t]]
+
+            dgates = numpy.empty_like(gates)
+            for t in reversed(six.moves.range(len(batches))):
+                batch = batches[t]
+                rows = slice(offsets[t], offsets[t + 1])
+                i, f, o, a = numpy.split(gates[rows], 4, axis=1)
+                di, df, do, da = numpy.split(dgates[rows], 4, axis=1)
+                tanh_c = numpy.tanh(cs[rows])
+
+                dh_t = dh[:batch] + dy[rows]
+                dc_t = dc[:batch] + dh_t * o * (1 - tanh_c * tanh_c)
+                numpy.multiply(dh_t * tanh_c, o * (1 - o), out=do)
+                numpy.multiply(dc_t * a, i * (1 - i), out=di)
+                numpy.multiply(dc_t * c_prev[rows], f * (1 - f), out=df)
+                numpy.multiply(dc_t * i, 1 - a * a, out=da)
+                dc[:batch] = dc_t * f
+                dh[:batch] = dgates[rows].dot(w_h)
+
+            dw_x = dgates.T.dot(x)
+            dw_h = dgates.T.dot(h_prev)
+            db = dgates.sum(axis=0)
+            for k, j in enumerate(_gate_order):
+                ind = layer * 8 + j
+                dws[ind] = dw_x[k * n_units:(k + 1) * n_units]
+                dws[ind + 4] = dw_h[k * n_units:(k + 1) * n_units]
+                dbs[ind] = db[k * n_units:(k + 1) * n_units]
+                dbs[ind + 4] = dbs[ind].copy()
+            dy = dgates.dot(w_x)
+            if mask is not None:
+                dy *= mask
+
+        return tuple([dhx, dcx] + dws + dbs +
+                     numpy.split(dy, offsets[1:-1]))
+
+
 def _stack_weight(ws):
     # TODO(unno): Input of the current LSTM implementaiton is shuffled
     w = stack.stack(ws, axis=1)
@@ -392,6 +552,9 @@ def n_step_lstm(
     Note that all input variables except first layer may have different shape
     from the first layer.
 
+    On CPU, it is computed by :class:`NStepLSTMCPU`, which applies dropout to
+    the input of each layer.
+
     Args:
         n_layers(int): Number of layers.
         dropout_ratio(float): Dropout ratio.
@@ -446,7 +609,16 @@ def n_step_lstm(
 
     xp = cuda.get_array_module(hx, hx.data)
 
-    if xp is not numpy and chainer.should_use_cudnn('>=auto', 5000):
+    if xp is numpy:
+        inputs = tuple(itertools.chain(
+            (hx, cx),
+            itertools.chain.from_iterable(ws),
+            itertools.chain.from_iterable(bs),
+            xs))
+        ret = NStepLSTMCPU(n_layers, dropout_ratio)(*inputs)
+        return ret[0], ret[1], ret[2:]
+
+    elif chainer.should_use_cudnn('>=auto', 5000):
         states = get_random_state().create_dropout_states(dropout_ratio)
         # flatten all input variables
         inputs = tuple(itertools.chain(
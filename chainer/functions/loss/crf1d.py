@@ -1,12 +1,218 @@
-from chainer.functions.array import broadcast
-from chainer.functions.array import concat
-from chainer.functions.array import reshape
-from chainer.functions.array import select_item
-from chainer.functions.array import split_axis
-from chainer.functions.connection import embed_id
-from chainer.functions.math import logsumexp
-from chainer.functions.math import minmax
-from chainer.functions.math import sum as _sum
+import numpy
+import six
+
+from chainer import cuda
+from chainer import function
+from chainer import utils
+from chainer.utils import type_check
+
+
+def _logsumexp(xp, a, axis):
+    m = a.max(axis=axis, keepdims=True)
+    y = xp.log(xp.exp(a - m).sum(axis=axis, keepdims=True))
+    y += m
+    return y.squeeze(axis)
+
+
+def _check_sequences(xs_type, cost_type):
+    for i, x_type in enumerate(xs_type):
+        type_check.expect(
+            x_type.dtype == cost_type.dtype,
+            x_type.ndim == 2,
+            x_type.shape[1] == cost_type.shape[0],
+        )
+        if i > 0:
+            type_check.expect(x_type.shape[0] <= xs_type[i - 1].shape[0])
+
+
+class CRF1d(function.Function):
+
+    """Negative log-likelihood of linear-chain CRF.
+
+    The inputs are the transition cost matrix followed by the sequence of
+    costs and the sequence of labels. The forward algorithm runs over all the
+    sequences of the mini-batch at once, and the gradients are computed from
+    the marginal probabilities given by the forward and backward algorithms.
+
+    """
+
+    def check_type_forward(self, in_types):
+        n_in = type_check.eval(in_types.size())
+        type_check.expect(in_types.size() >= 3, in_types.size() % 2 == 1)
+        n = n_in // 2
+        cost_type = in_types[0]
+        xs_type = in_types[1:n + 1]
+        ys_type = in_types[n + 1:]
+        type_check.expect(
+            cost_type.dtype.kind == 'f',
+            cost_type.ndim == 2,
+            cost_type.shape[0] == cost_type.shape[1],
+        )
+        _check_sequences(xs_type, cost_type)
+        for x_type, y_type in six.moves.zip(xs_type, ys_type):
+            type_check.expect(
+                y_type.dtype == numpy.int32,
+                y_type.ndim == 1,
+                y_type.shape[0] == x_type.shape[0],
+            )
+
+    def forward(self, inputs):
+        xp = cuda.get_array_module(*inputs)
+        n = len(inputs) // 2
+        cost = inputs[0]
+        xs = inputs[1:n + 1]
+        ys = inputs[n + 1:]
+        batches = [x.shape[0] for x in xs]
+        n_batch, n_label = xs[0].shape
+
+        # alpha[t, i] is only defined for the sequences i < batches[t].
+        alpha = xp.empty((n, n_batch, n_label), dtype=cost.dtype)
+        alpha[0] = xs[0]
+        score = xs[0][xp.arange(n_batch), ys[0]]
+        for t in six.moves.range(1, n):
+            b = batches[t]
+            alpha[t, :b] = _logsumexp(
+                xp, alpha[t - 1, :b, :, None] + cost, axis=1)
+            alpha[t, :b] += xs[t]
+            score[:b] += xs[t][xp.arange(b), ys[t]]
+            score[:b] += cost[ys[t - 1][:b], ys[t]]
+
+        lengths = (numpy.array(batches)[:, None] >
+                   numpy.arange(n_batch)).sum(axis=0)
+        last = alpha[xp.asarray(lengths - 1), xp.arange(n_batch)]
+        logz = _logsumexp(xp, last, axis=1)
+
+        self.alpha = alpha
+        self.logz = logz
+        return utils.force_array(
+            (logz - score).sum() / n_batch, dtype=cost.dtype),
+
+    def backward(self, inputs, grad_outputs):
+        xp = cuda.get_array_module(*inputs)
+        n = len(inputs) // 2
+        cost = inputs[0]
+        xs = inputs[1:n + 1]
+        ys = inputs[n + 1:]
+        batches = [x.shape[0] for x in xs]
+        n_batch, n_label = xs[0].shape
+        alpha = self.alpha
+        logz = self.logz
+        g = grad_outputs[0] / n_batch
+
+        # beta[t, i] is zero for the sequences ending at t.
+        beta = xp.zeros_like(alpha)
+        for t in six.moves.range(n - 2, -1, -1):
+            b = batches[t + 1]
+            beta[t, :b] = _logsumexp(
+                xp, cost + (xs[t + 1] + beta[t + 1, :b])[:, None, :], axis=2)
+
+        gxs = []
+        for t in six.moves.range(n):
+            b = batches[t]
+            gx = xp.exp(alpha[t, :b] + beta[t, :b] - logz[:b, None])
+            gx[xp.arange(b), ys[t]] -= 1
+            gx *= g
+            gxs.append(gx)
+
+        gcost = None
+        if n > 1:
+            gcost = xp.zeros_like(cost)
+            for t in six.moves.range(1, n):
+                b = batches[t]
+                gcost += xp.exp(
+                    alpha[t - 1, :b, :, None] + cost +
+                    (xs[t] + beta[t, :b])[:, None, :] -
+                    logz[:b, None, None]).sum(axis=0)
+            transitions = xp.concatenate(
+                [ys[t - 1][:batches[t]] * n_label + ys[t]
+                 for t in six.moves.range(1, n)])
+            gcost -= xp.bincount(
+                transitions, minlength=n_label * n_label).reshape(
+                    n_label, n_label).astype(cost.dtype)
+            gcost *= g
+
+        self.alpha = None
+        self.logz = None
+        return (gcost,) + tuple(gxs) + (None,) * n
+
+
+class ArgmaxCRF1d(function.Function):
+
+    """Score of the best label sequences of linear-chain CRF.
+
+    The inputs are the transition cost matrix followed by the sequence of
+    costs. The Viterbi algorithm runs over all the sequences of the
+    mini-batch at once. The best label sequences are kept in :attr:`path`.
+
+    """
+
+    def check_type_forward(self, in_types):
+        type_check.expect(in_types.size() >= 2)
+        cost_type = in_types[0]
+        type_check.expect(
+            cost_type.dtype.kind == 'f',
+            cost_type.ndim == 2,
+            cost_type.shape[0] == cost_type.shape[1],
+        )
+        _check_sequences(in_types[1:], cost_type)
+
+    def forward(self, inputs):
+        self.retain_inputs(())
+        xp = cuda.get_array_module(*inputs)
+        cost = inputs[0]
+        xs = inputs[1:]
+        batches = [x.shape[0] for x in xs]
+        n_batch, n_label = xs[0].shape
+
+        # Scores of the best paths of the sequences ending at each step.
+        last = xp.empty((n_batch, n_label), dtype=cost.dtype)
+        alpha = xs[0]
+        max_inds = []
+        for t in six.moves.range(1, len(xs)):
+            b = batches[t]
+            last[b:batches[t - 1]] = alpha[b:]
+            scores = alpha[:b, :, None] + cost
+            max_inds.append(scores.argmax(axis=1))
+            alpha = scores.max(axis=1) + xs[t]
+        last[:batches[-1]] = alpha
+
+        inds = last.argmax(axis=1).astype(numpy.int32)
+        path = [inds[:batches[-1]].copy()]
+        for t in six.moves.range(len(xs) - 1, 0, -1):
+            b = batches[t]
+            inds[:b] = max_inds[t - 1][xp.arange(b), inds[:b]]
+            path.append(inds[:batches[t - 1]].copy())
+        path.reverse()
+
+        self.path = path
+        self._shapes = (cost.shape, [x.shape for x in xs])
+        return last.max(axis=1),
+
+    def backward(self, inputs, grad_outputs):
+        xp = cuda.get_array_module(*grad_outputs)
+        gy = grad_outputs[0]
+        cost_shape, x_shapes = self._shapes
+        n_label = cost_shape[0]
+        path = self.path
+
+        gxs = []
+        for p, shape in six.moves.zip(path, x_shapes):
+            gx = xp.zeros(shape, dtype=gy.dtype)
+            gx[xp.arange(shape[0]), p] = gy[:shape[0]]
+            gxs.append(gx)
+
+        gcost = None
+        if len(path) > 1:
+            transitions = xp.concatenate(
+                [path[t - 1][:len(path[t])] * n_label + path[t]
+                 for t in six.moves.range(1, len(path))])
+            weights = xp.concatenate(
+                [gy[:len(p)] for p in path[1:]])
+            gcost = xp.bincount(
+                transitions, weights=weights,
+                minlength=n_label * n_label).reshape(cost_shape).astype(
+                    gy.dtype)
+        return (gcost,) + tuple(gxs)
 
 
 def crf1d(cost, xs, ys):
@@ -93,44 +299,7 @@ def crf1d(cost, xs, ys):
 
     """
     assert xs[0].shape[1] == cost.shape[0]
-
-    n_label = cost.shape[0]
-    n_batch = xs[0].shape[0]
-
-    alpha = xs[0]
-    alphas = []
-    for x in xs[1:]:
-        batch = x.shape[0]
-        if alpha.shape[0] > batch:
-            alpha, alpha_rest = split_axis.split_axis(alpha, [batch], axis=0)
-            alphas.append(alpha_rest)
-        b_alpha, b_cost = broadcast.broadcast(alpha[..., None], cost)
-        alpha = logsumexp.logsumexp(b_alpha + b_cost, axis=1) + x
-
-    if len(alphas) > 0:
-        alphas.append(alpha)
-        alpha = concat.concat(alphas[::-1], axis=0)
-
-    logz = logsumexp.logsumexp(alpha, axis=1)
-
-    cost = reshape.reshape(cost, (cost.size, 1))
-    score = select_item.select_item(xs[0], ys[0])
-    scores = []
-    for x, y, y_prev in zip(xs[1:], ys[1:], ys[:-1]):
-        batch = x.shape[0]
-        if score.shape[0] > batch:
-            y_prev, _ = split_axis.split_axis(y_prev, [batch], axis=0)
-            score, score_rest = split_axis.split_axis(score, [batch], axis=0)
-            scores.append(score_rest)
-        score += (select_item.select_item(x, y)
-                  + reshape.reshape(
-                      embed_id.embed_id(y_prev * n_label + y, cost), (batch,)))
-
-    if len(scores) > 0:
-        scores.append(score)
-        score = concat.concat(scores[::-1], axis=0)
-
-    return _sum.sum(logz - score) / n_batch
+    return CRF1d()(cost, *(list(xs) + list(ys)))
 
 
 def argmax_crf1d(cost, xs):
@@ -161,35 +330,6 @@ def argmax_crf1d(cost, xs):
             the mini-batch size of the corresponding ``xs[i]``. That means,
             ``ps[i].shape == xs[i].shape[0:1]``.
     """
-    alpha = xs[0]
-    alphas = []
-    max_inds = []
-    for x in xs[1:]:
-        batch = x.shape[0]
-        if alpha.shape[0] > batch:
-            alpha, alpha_rest = split_axis.split_axis(alpha, [batch], axis=0)
-            alphas.append(alpha_rest)
-        else:
-            alphas.append(None)
-        b_alpha, b_cost = broadcast.broadcast(alpha[..., None], cost)
-        scores = b_alpha + b_cost
-        max_ind = minmax.argmax(scores, axis=1)
-        max_inds.append(max_ind)
-        alpha = minmax.max(scores, axis=1) + x
-
-    inds = minmax.argmax(alpha, axis=1)
-    path = [inds.data]
-    for m, a in zip(max_inds[::-1], alphas[::-1]):
-        inds = select_item.select_item(m, inds)
-        if a is not None:
-            inds = concat.concat([inds, minmax.argmax(a, axis=1)], axis=0)
-        path.append(inds.data)
-    path.reverse()
-
-    score = minmax.max(alpha, axis=1)
-    for a in alphas[::-1]:
-        if a is None:
-            continue
-        score = concat.concat([score, minmax.max(a, axis=1)], axis=0)
-
-    return score, path
+    func = ArgmaxCRF1d()
+    score = func(cost, *xs)
+    return score, func.path
@@ -33,6 +33,16 @@ def _log_dot(prob, rr, xp):
     return _logsumexp(prob + xp.swapaxes(rr, 1, 2), xp, axis=2)
 
 
+def _shift(a, n, fill):
+    # Shifts the states of ``a`` by ``n`` (to the left if negative).
+    ret = numpy.full_like(a, fill)
+    if n > 0:
+        ret[..., n:] = a[..., :-n]
+    else:
+        ret[..., :n] = a[..., -n:]
+    return ret
+
+
 def _move_label_to_back(path, path_length, xp):
     s1 = path.shape[1]  # TODO(okuta): Change name
     index = (xp.arange(0, path.size, s1, dtype=numpy.int32)[:, None] +
@@ -87,16 +97,21 @@ class ConnectionistTemporalClassification(function.Function):
             res = create_recurrence_relation(x, self.zero_padding)
         return res.astype(numpy.float32)
 
-    def recurrence_relation(self, path_length, max_length, dtype, xp):
+    def recurrence_relation(self, path, path_length, max_length, dtype, xp):
         """Transition in forword and backword algorithms is represented as matrix.
 
         See also
         https://blog.wtf.sg/2014/10/06/connectionist-temporal-classification-ctc-with-theano/
         """
+        # A label can be reached from the previous one skipping a blank
+        # unless they are the same.
+        skip = xp.zeros(path.shape, dtype=dtype)
+        skip[:, 2:] = path[:, 2:] != path[:, :-2]
         rr = (xp.eye(max_length, dtype=dtype) +
               xp.eye(max_length, k=1, dtype=dtype) +
               xp.eye(max_length, k=2, dtype=dtype) *
-              (xp.arange(max_length, dtype=dtype) % dtype(2)))
+              (xp.arange(max_length, dtype=dtype) % dtype(2)) *
+              skip[:, None, :])
         return self.log_matrix(
             rr * (path_length[:, None] > xp.arange(max_length))[..., None], xp)
 
@@ -108,41 +123,32 @@ class ConnectionistTemporalClassification(function.Function):
         ret = xp.empty(
             (len(multiply_seq),) + labels_prob.shape, dtype=labels_prob.dtype)
         ret[...] = labels_prob
-        if xp == numpy:
-            for b in six.moves.range(len(path)):
-                target_path = path[b][0:path_length[b]]
-                chars = {c for c in target_path}
-                for c in chars:
-                    ret[:, b, c] = _logsumexp(
-                        multiply_seq[:, b, 0:path_length[b]]
-                        [:, target_path == c], numpy, axis=1)
-        else:
-            for i, multiply in enumerate(multiply_seq):
-                # TODO(okuta): remove loop
-                cuda.cupy.ElementwiseKernel(
-                    'raw T x, raw I y, raw I l, I b_max, I c_max',
-                    'T z',
-                    '''
-                    T value = z;
-                    I c = i % b_max, b = i / b_max;
-                    int ind[2] = {b, -1};
-                    for (int index = 0; index < c_max; ++index) {
-                        ind[1] = index;
-                        if (ind[1] < l[ind[0]] && y[ind] == c) {
-                            T xvalue = x[ind];
-                            T at = xvalue, bt = value;
-                            if (value > xvalue) {
-                                at = value;
-                                bt = xvalue;
-                            }
-                            value = at + log(1 + exp(bt - at));
+        for i, multiply in enumerate(multiply_seq):
+            # TODO(okuta): remove loop
+            cuda.cupy.ElementwiseKernel(
+                'raw T x, raw I y, raw I l, I b_max, I c_max',
+                'T z',
+                '''
+                T value = z;
+                I c = i % b_max, b = i / b_max;
+                int ind[2] = {b, -1};
+                for (int index = 0; index < c_max; ++index) {
+                    ind[1] = index;
+                    if (ind[1] < l[ind[0]] && y[ind] == c) {
+                        T xvalue = x[ind];
+                        T at = xvalue, bt = value;
+                        if (value > xvalue) {
+                            at = value;
+                            bt = xvalue;
                         }
+                        value = at + log(1 + exp(bt - at));
                     }
-                    z = value;
-                    ''',
-                    'reduce_probability')(multiply, path, path_length,
-                                          labels_prob.shape[1],
-                                          path.shape[1], ret[i])
+                }
+                z = value;
+                ''',
+                'reduce_probability')(multiply, path, path_length,
+                                      labels_prob.shape[1],
+                                      path.shape[1], ret[i])
         return ret
 
     def calc_trans(self, path, yseq, xp):
@@ -155,7 +161,7 @@ class ConnectionistTemporalClassification(function.Function):
         # prob[i] := forward[i] + backward[-i-1]
         index = offset + path
         frr = self.recurrence_relation(
-            self.path_length, path.shape[1], numpy.float32, xp)
+            path, self.path_length, path.shape[1], numpy.float32, xp)
         prob = xp.empty(
             (len(yseq),) + index.shape, dtype=forward_prob.dtype)
         # forward computation.
@@ -164,12 +170,13 @@ class ConnectionistTemporalClassification(function.Function):
             forward_prob = xp.take(y, index) + _log_dot(
                 forward_prob[:, None, :], frr, xp)
             prob[i] = forward_prob
-        r_index = offset + _move_label_to_back(path, self.path_length, xp)
+        r_path = _move_label_to_back(path, self.path_length, xp)
+        r_index = offset + r_path
 
         # rotate yseq with path_length
         yseq_inv = _move_inputs(yseq, self.input_length, xp)[::-1]
         brr = self.recurrence_relation(
-            self.path_length, path.shape[1], numpy.float32, xp)
+            r_path, self.path_length, path.shape[1], numpy.float32, xp)
 
         # move to back.
         prob = _move_inputs(prob, self.input_length, xp)
@@ -189,22 +196,68 @@ class ConnectionistTemporalClassification(function.Function):
         # move to front.
         return _move_inputs(prob, -self.input_length, xp)
 
-    def forward(self, inputs):
-        xp = cuda.get_array_module(inputs[0])
+    def _check_lengths(self, input_length, label_length, t, xs, xp):
+        # Batch size check.
+        assert len(xs[0]) == len(t)
+        assert len(xs[0]) == len(input_length)
+        assert len(xs[0]) == len(label_length)
+
+        # Length check.
+        assert len(xs) >= xp.max(input_length)
+        assert len(t[0]) >= xp.max(label_length)
+
+    def forward_cpu(self, inputs):
+        input_length, label_length, t = inputs[:3]
+        xs = inputs[3:]
+        if chainer.is_debug():
+            self._check_lengths(input_length, label_length, t, xs, numpy)
+
+        batch_size = len(t)
+        x = numpy.vstack(xs).reshape((len(xs),) + xs[0].shape)
+        log_yseq = x - _logsumexp(x, numpy, axis=2)[..., None]
+        self.yseq = numpy.exp(log_yseq)
+        path = _label_to_path(t, self.blank_symbol, numpy)
+        path_length = 2 * label_length + 1
+        fill = self.zero_padding
+
+        # Log probabilities of the states of the paths at each time.
+        emit = log_yseq[:, numpy.arange(batch_size)[:, None], path]
+        # A label can be reached from the previous one skipping a blank
+        # unless they are the same.
+        skip = numpy.zeros(path.shape, dtype=bool)
+        skip[:, 2:] = ((path[:, 2:] != self.blank_symbol) &
+                       (path[:, 2:] != path[:, :-2]))
+
+        alpha = numpy.full(emit.shape, fill, dtype=emit.dtype)
+        alpha[0, :, :2] = emit[0, :, :2]
+        for i in six.moves.range(1, len(emit)):
+            a = numpy.logaddexp(alpha[i - 1], _shift(alpha[i - 1], 1, fill))
+            a = numpy.logaddexp(
+                a, numpy.where(skip, _shift(alpha[i - 1], 2, fill), fill))
+            alpha[i] = a + emit[i]
+
+        end = alpha[input_length - 1, numpy.arange(batch_size)]
+        last = numpy.arange(path.shape[1]) >= (path_length - 2)[:, None]
+        last &= numpy.arange(path.shape[1]) < path_length[:, None]
+        logz = _logsumexp(numpy.where(last, end, fill), numpy, axis=1)
+
+        self.emit = emit
+        self.skip = skip
+        self.alpha = alpha
+        self.logz = logz
+        loss = utils.force_array(-logz.sum(), dtype=numpy.float32)
+        loss /= batch_size
+        return loss,
+
+    def forward_gpu(self, inputs):
+        xp = cuda.cupy
         self.input_length = inputs[0]
         label_length = inputs[1]
         t = inputs[2]
         xs = inputs[3:]
 
         if chainer.is_debug():
-            # Batch size check.
-            assert len(xs[0]) == len(t)
-            assert len(xs[0]) == len(self.input_length)
-            assert len(xs[0]) == len(label_length)
-
-            # Length check.
-            assert len(xs) >= xp.max(self.input_length)
-            assert len(t[0]) >= xp.max(label_length)
+            self._check_lengths(self.input_length, label_length, t, xs, xp)
 
         self.path_length = 2 * label_length + 1
 
@@ -220,8 +273,49 @@ class ConnectionistTemporalClassification(function.Function):
         loss /= -batch_size
         return loss,
 
-    def backward(self, inputs, grad_output):
-        xp = cuda.get_array_module(inputs[0])
+    def backward_cpu(self, inputs, grad_output):
+        input_length, label_length, t = inputs[:3]
+        batch_size = len(t)
+        path = _label_to_path(t, self.blank_symbol, numpy)
+        path_length = 2 * label_length + 1
+        emit = self.emit
+        skip_back = _shift(self.skip, -2, False)
+        fill = self.zero_padding
+        batch = numpy.arange(batch_size)
+
+        # beta[i] is the log probability of the rest of the paths from each
+        # state at time i, excluding the emission at i.
+        end = input_length - 1
+        last = numpy.full(path.shape, fill, dtype=emit.dtype)
+        last[batch, path_length - 1] = 0
+        last[batch, numpy.maximum(path_length - 2, 0)] = 0
+        beta = numpy.empty_like(emit)
+        beta[-1] = numpy.where((end == len(emit) - 1)[:, None], last, fill)
+        for i in six.moves.range(len(emit) - 2, -1, -1):
+            c = beta[i + 1] + emit[i + 1]
+            b = numpy.logaddexp(c, _shift(c, -1, fill))
+            b = numpy.logaddexp(
+                b, numpy.where(skip_back, _shift(c, -2, fill), fill))
+            b[end == i] = last[end == i]
+            b[end < i] = fill
+            beta[i] = b
+
+        gamma = self.alpha
+        gamma += beta
+        gamma -= self.logz[:, None]
+        numpy.exp(gamma, out=gamma)
+        label_prob = numpy.zeros_like(self.yseq)
+        numpy.add.at(label_prob, (slice(None), batch[:, None], path), gamma)
+
+        gx = self.yseq
+        gx -= label_prob
+        gx *= grad_output[0] / batch_size
+        gx *= (numpy.arange(len(gx))[:, None] < input_length)[..., None]
+        self.emit = self.skip = self.alpha = self.yseq = None
+        return (None, None, None) + tuple([y for y in gx])
+
+    def backward_gpu(self, inputs, grad_output):
+        xp = cuda.cupy
         batch_size = len(inputs[2])
 
         total_probability = _logsumexp(self.prob_trans[0], xp, axis=1)
@@ -1,8 +1,8 @@
 import numpy
-import six
 
 from chainer import cuda
 from chainer import function
+from chainer.utils import array
 from chainer.utils import type_check
 
 
@@ -43,13 +43,13 @@ class NegativeSamplingFunction(function.Function):
         self.ignore_mask = (t != self.ignore_label)
         self._make_samples(t)
 
-        loss = numpy.float32(0.0)
-        for ix, k in six.moves.zip(x[self.ignore_mask],
-                                   self.samples[self.ignore_mask]):
-            w = W[k]
-            f = w.dot(ix)
-            f[0] *= -1  # positive sample
-            loss += numpy.sum(numpy.logaddexp(f, 0))
+        # Scores of the positive and the negative samples of all the
+        # examples by one gather and one batched product.
+        k = self.samples[self.ignore_mask]
+        f = numpy.matmul(W[k], x[self.ignore_mask][:, :, None])[:, :, 0]
+        f[:, 0] *= -1  # positive sample
+        self.wx = f
+        loss = numpy.logaddexp(f, 0).sum(dtype=numpy.float32)
         return numpy.array(loss, numpy.float32),
 
     def forward_gpu(self, inputs):
@@ -100,21 +100,19 @@ class NegativeSamplingFunction(function.Function):
         x, t, W = inputs
         gloss, = grads
 
+        k = self.samples[self.ignore_mask]
+        ix = x[self.ignore_mask]
+
+        # g == -y * gloss / (1 + exp(yf))
+        g = gloss / (1 + numpy.exp(-self.wx))
+        g[:, 0] *= -1
+
         gx = numpy.zeros_like(x)
+        gx[self.ignore_mask] = numpy.matmul(g[:, None, :], W[k])[:, 0]
         gW = numpy.zeros_like(W)
-        for i, (ix, k) in enumerate(six.moves.zip(
-                x[self.ignore_mask], self.samples[self.ignore_mask])):
-            w = W[k]
-            f = w.dot(ix)
-
-            # g == -y * gloss / (1 + exp(yf))
-            f[0] *= -1
-            g = gloss / (1 + numpy.exp(-f))
-            g[0] *= -1
-
-            gx[i] = g.dot(w)
-            for ik, ig in six.moves.zip(k, g):
-                gW[ik] += ig * ix
+        array.scatter_add(
+            gW, k.ravel(), (g[:, :, None] * ix[:, None, :]).reshape(
+                -1, x.shape[1]))
         return gx, None, gW
 
     def backward_gpu(self, inputs, grads):
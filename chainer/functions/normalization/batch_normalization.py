@@ -5,6 +5,7 @@ from chainer import configuration
 from chainer import cuda
 from chainer import mkld
 from chainer import function
+from chainer.utils import conv
 from chainer.utils import type_check
 
 if cuda.cudnn_enabled:
@@ -48,6 +49,12 @@ class BatchNormalizationFunction(function.Function):
                 raise RuntimeError(msg)
         self.mean_cache = None
         self.decay = decay
+        self.channels_last = conv.channels_last()
+
+    def _is_nhwc(self, x, gamma):
+        # The NHWC images are normalized as the batch of the vectors of the
+        # channels, i.e. reshaped to (n * h * w, c).
+        return self.channels_last and x.ndim == 4 and gamma.ndim == 1
 
     def check_type_forward(self, in_types):
         n_in = type_check.eval(in_types.size())
@@ -57,10 +64,14 @@ class BatchNormalizationFunction(function.Function):
                 '%s == %s' % (in_types.size(), n_in))
         x_type, gamma_type, beta_type = in_types[:3]
         M = type_check.eval(gamma_type.ndim)
+        head = 1
+        if self.channels_last and type_check.eval(x_type.ndim) == 4 and \
+                M == 1:
+            head = 3
         type_check.expect(
             x_type.dtype.kind == 'f',
             x_type.ndim >= gamma_type.ndim + 1,
-            x_type.shape[1:1 + M] == gamma_type.shape,
+            x_type.shape[head:head + M] == gamma_type.shape,
             # TODO(beam2d): Check shape
             gamma_type.dtype == x_type.dtype,
             beta_type.dtype == x_type.dtype,
@@ -78,6 +89,9 @@ class BatchNormalizationFunction(function.Function):
     def forward(self, inputs):
         xp = cuda.get_array_module(*inputs)
         x, gamma, beta = inputs[:3]
+        x_shape = x.shape
+        if self._is_nhwc(x, gamma):
+            x = x.reshape(-1, x_shape[3])
         if configuration.config.train:
             if self.running_mean is None:
                 self.running_mean = xp.zeros_like(gamma)
@@ -207,11 +221,15 @@ class BatchNormalizationFunction(function.Function):
             temp_ar *= (1 - self.decay) * adjust
             self.running_var += temp_ar
             del temp_ar
-        return y,
+        return y.reshape(x_shape),
 
     def backward(self, inputs, grad_outputs):
         x, gamma = inputs[:2]
         gy = grad_outputs[0]
+        x_shape = x.shape
+        if self._is_nhwc(x, gamma):
+            x = x.reshape(-1, x_shape[3])
+            gy = gy.reshape(x.shape)
         head_ndim = gamma.ndim + 1
         expander = (None, Ellipsis) + (None,) * (x.ndim - head_ndim)
         m = gamma.dtype.type(x.size // gamma.size)
@@ -230,7 +248,7 @@ class BatchNormalizationFunction(function.Function):
             gmean = -gs * gbeta
             gvar = -0.5 * gamma / var * ggamma
             gx = gs[expander] * gy
-            return gx, ggamma, gbeta, gmean, gvar
+            return gx.reshape(x_shape), ggamma, gbeta, gmean, gvar
 
         # Note: If length of inputs is not 5, we must be in train mode.
         assert configuration.config.train
@@ -280,11 +298,13 @@ class BatchNormalizationFunction(function.Function):
                     'bn_bwd')(gy, self.x_hat, gamma[expander],
                               self.std[expander], ggamma[expander],
                               gbeta[expander], inv_m)
-        return gx, ggamma, gbeta
+        return gx.reshape(x_shape), ggamma, gbeta
 
 
 class BnMKLDNN(BatchNormalizationFunction):
 
+    mkldnn_native = True
+
     def __init__(self, *args, **kwargs):
         super(BnMKLDNN, self).__init__(*args, **kwargs)
 
@@ -359,6 +379,8 @@ def batch_normalization(x, gamma, beta, eps=2e-5, running_mean=None,
     dimensions, which are considered as a part of the batch size. That is,
     the total batch size will be considered to be the product of all
     dimensions except the second dimension.
+    If ``chainer.config.image_layout`` is ``'NHWC'``, the channels of
+    four-dimensional inputs are the last dimension instead.
 
     Note: If this function is called, it will not be possible to access the
     updated running mean and variance statistics, because they are members
@@ -1,10 +1,9 @@
-import numpy
-
 import chainer
 from chainer import cuda
 from chainer import mkld
 from chainer.functions.pooling import pooling_2d
 from chainer.utils import conv
+from chainer.utils import conv_nd
 
 if cuda.cudnn_enabled:
     cudnn = cuda.cudnn
@@ -20,9 +19,8 @@ class AveragePooling2D(pooling_2d.Pooling2D):
     # TODO(beam2d): Support cover_all mode.
 
     def forward_cpu(self, x):
-        col = conv.im2col_cpu(x[0], self.kh, self.kw, self.sy, self.sx,
-                              self.ph, self.pw)
-        y = col.mean(axis=(2, 3))
+        y = conv_nd.average_pooling_nd_cpu(
+            x[0], (self.kh, self.kw), (self.sy, self.sx), (self.ph, self.pw))
         return y,
 
     def forward_gpu(self, x):
@@ -62,11 +60,9 @@ class AveragePooling2D(pooling_2d.Pooling2D):
         return y,
 
     def backward_cpu(self, x, gy):
-        h, w = x[0].shape[2:]
-        gcol = numpy.tile(gy[0][:, :, None, None],
-                          (1, 1, self.kh, self.kw, 1, 1))
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
-        gx /= self.kh * self.kw
+        gx = conv_nd.average_pooling_nd_grad_cpu(
+            gy[0], x[0].shape[2:], (self.kh, self.kw), (self.sy, self.sx),
+            (self.ph, self.pw))
         return gx,
 
     def backward_gpu(self, x, gy):
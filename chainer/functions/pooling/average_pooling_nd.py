@@ -1,5 +1,3 @@
-import numpy
-
 import functools
 import operator
 import six
@@ -33,12 +31,8 @@ class AveragePoolingND(pooling_nd._PoolingND):
             ndim, ksize, stride=stride, pad=pad, cover_all=cover_all)
 
     def forward_cpu(self, x):
-        col = conv_nd.im2col_nd_cpu(
+        y = conv_nd.average_pooling_nd_cpu(
             x[0], self.ksize, self.stride, self.pad, cover_all=self.cover_all)
-
-        # mean along (_, _, k_1, k_2, ..., k_N, _, ..., _)
-        y_axis = tuple(six.moves.range(2, 2 + len(self.ksize)))
-        y = col.mean(axis=y_axis)
         return y,
 
     def forward_gpu(self, x):
@@ -74,14 +68,8 @@ class AveragePoolingND(pooling_nd._PoolingND):
         return y,
 
     def backward_cpu(self, x, gy):
-        dims = x[0].shape[2:]
-        outs = gy[0].shape[2:]
-        colon = slice(None, None, None)
-        gy_index = (colon, colon) + (None,) * len(dims)
-        gcol_reps = (1, 1) + self.ksize + (1,) * len(outs)
-        gcol = numpy.tile(gy[0][gy_index], gcol_reps)
-        gx = conv_nd.col2im_nd_cpu(gcol, self.stride, self.pad, dims)
-        gx /= functools.reduce(operator.mul, self.ksize)
+        gx = conv_nd.average_pooling_nd_grad_cpu(
+            gy[0], x[0].shape[2:], self.ksize, self.stride, self.pad)
         return gx,
 
     def backward_gpu(self, x, gy):
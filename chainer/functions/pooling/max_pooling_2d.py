@@ -5,6 +5,7 @@ from chainer import cuda
 from chainer import mkld
 from chainer.functions.pooling import pooling_2d
 from chainer.utils import conv
+from chainer.utils import conv_nd
 
 if cuda.cudnn_enabled:
     cudnn = cuda.cudnn
@@ -19,16 +20,9 @@ class MaxPooling2D(pooling_2d.Pooling2D):
     """Max pooling over a set of 2d planes."""
 
     def forward_cpu(self, x):
-        col = conv.im2col_cpu(
-            x[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
-            pval=-float('inf'), cover_all=self.cover_all)
-        n, c, kh, kw, out_h, out_w = col.shape
-        col = col.reshape(n, c, kh * kw, out_h, out_w)
-
-        # We select maximum twice, since the implementation using numpy.choose
-        # hits its bug when kh * kw >= 32.
-        self.indexes = col.argmax(axis=2)
-        y = col.max(axis=2)
+        y, self.indexes = conv_nd.max_pooling_nd_cpu(
+            x[0], (self.kh, self.kw), (self.sy, self.sx), (self.ph, self.pw),
+            cover_all=self.cover_all)
         return y,
 
     def forward_gpu(self, x):
@@ -83,22 +77,9 @@ class MaxPooling2D(pooling_2d.Pooling2D):
         return y,
 
     def backward_cpu(self, x, gy):
-        n, c, out_h, out_w = gy[0].shape
-        h, w = x[0].shape[2:]
-        kh, kw = self.kh, self.kw
-
-        gcol = numpy.zeros(
-            (n * c * out_h * out_w * kh * kw), dtype=x[0].dtype)
-
-        indexes = self.indexes.flatten()
-        indexes += numpy.arange(0, indexes.size * kh * kw, kh * kw)
-
-        gcol[indexes] = gy[0].ravel()
-        gcol = gcol.reshape(n, c, out_h, out_w, kh, kw)
-        gcol = numpy.swapaxes(gcol, 2, 4)
-        gcol = numpy.swapaxes(gcol, 3, 5)
-
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
+        gx = conv_nd.max_pooling_nd_grad_cpu(
+            gy[0], self.indexes, x[0].shape[2:], (self.kh, self.kw),
+            (self.sy, self.sx), (self.ph, self.pw))
         return gx,
 
     def backward_gpu(self, x, gy):
@@ -1,7 +1,4 @@
 import numpy
-
-import functools
-from operator import mul
 import six
 
 import chainer
@@ -28,21 +25,8 @@ class MaxPoolingND(pooling_nd._PoolingND):
             ndim, ksize, stride=stride, pad=pad, cover_all=cover_all)
 
     def forward_cpu(self, x):
-        col = conv_nd.im2col_nd_cpu(
-            x[0], self.ksize, self.stride, self.pad, pval=-float('inf'),
-            cover_all=self.cover_all)
-        n, c = col.shape[:2]
-        mid = (len(col.shape) - 2) // 2 + 2
-        ksize = col.shape[2:mid]
-        outs = col.shape[mid:]
-        # (n, c, k_1 * k_2 * ... * k_N, out_1, out_2, ..., out_N)
-        col_shape = (n, c) + (functools.reduce(mul, ksize),) + outs
-        col = col.reshape(col_shape)
-
-        # We select maximum twice, since the implementation using numpy.choose
-        # hits its bug when kh * kw >= 32.
-        self.indexes = col.argmax(axis=2)
-        y = col.max(axis=2)
+        y, self.indexes = conv_nd.max_pooling_nd_cpu(
+            x[0], self.ksize, self.stride, self.pad, cover_all=self.cover_all)
         return y,
 
     def forward_gpu(self, x):
@@ -77,25 +61,9 @@ class MaxPoolingND(pooling_nd._PoolingND):
         return y,
 
     def backward_cpu(self, x, gy):
-        ndim = self.ndim
-        n, c = gy[0].shape[:2]
-        outs = gy[0].shape[2:]
-        dims = x[0].shape[2:]
-        prod_outs = functools.reduce(mul, outs)
-        prod_ksize = functools.reduce(mul, self.ksize)
-
-        gcol = numpy.zeros(n * c * prod_outs * prod_ksize, dtype=x[0].dtype)
-
-        indexes = self.indexes.flatten()
-        indexes += numpy.arange(0, indexes.size * prod_ksize, prod_ksize)
-
-        gcol[indexes] = gy[0].ravel()
-        gcol_shape = (n, c) + outs + self.ksize
-        gcol = gcol.reshape(gcol_shape)
-        for i in six.moves.range(ndim):
-            gcol = numpy.swapaxes(gcol, 2 + i, ndim + 2 + i)
-
-        gx = conv_nd.col2im_nd_cpu(gcol, self.stride, self.pad, dims)
+        gx = conv_nd.max_pooling_nd_grad_cpu(
+            gy[0], self.indexes, x[0].shape[2:], self.ksize, self.stride,
+            self.pad)
         return gx,
 
     def backward_gpu(self, x, gy):
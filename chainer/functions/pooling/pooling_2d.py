@@ -38,6 +38,7 @@ class Pooling2D(function.Function):
 
         self.cover_all = cover_all
         self._used_cudnn = False
+        self.channels_last = conv.channels_last()
 
     def check_type_forward(self, in_types):
         type_check.expect(
@@ -46,6 +47,22 @@ class Pooling2D(function.Function):
             in_types[0].ndim == 4
         )
 
+    def forward(self, inputs):
+        if not self.channels_last:
+            return super(Pooling2D, self).forward(inputs)
+        # The NHWC images are pooled as the NCHW views of them. The arrays
+        # given by the NumPy implementations are in the memory order of the
+        # views, i.e. NHWC.
+        y, = super(Pooling2D, self).forward((conv.to_nchw(inputs[0]),))
+        return conv.to_nhwc(y),
+
+    def backward(self, inputs, grad_outputs):
+        if not self.channels_last:
+            return super(Pooling2D, self).backward(inputs, grad_outputs)
+        gx, = super(Pooling2D, self).backward(
+            (conv.to_nchw(inputs[0]),), (conv.to_nchw(grad_outputs[0]),))
+        return conv.to_nhwc(gx),
+
     def forward_gpu(self, x):
         self._used_cudnn = True
 
@@ -36,6 +36,8 @@ class SpatialPyramidPooling2D(pooling_2d.Pooling2D):
             if pooling_class is max_pooling_2d.MaxPooling2D:
                 pooler = pooling_class(ksize=ksize, stride=None, pad=pad,
                                        cover_all=True)
+                # The pyramid is built in NCHW regardless of image_layout.
+                pooler.channels_last = False
                 self.poolers.append(pooler)
             else:
                 raise NotImplementedError()
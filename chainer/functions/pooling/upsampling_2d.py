@@ -14,6 +14,8 @@ class Upsampling2D(pooling_2d.Pooling2D):
     def __init__(self, indexes, ksize, stride=None, pad=0, outsize=None,
                  cover_all=True):
         super(Upsampling2D, self).__init__(ksize, stride, pad, cover_all)
+        # The indexes of MaxPooling2D are given in NCHW.
+        self.channels_last = False
         self.indexes = indexes
         self.outh, self.outw = (None, None) if outsize is None else outsize
 
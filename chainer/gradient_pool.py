@@ -0,0 +1,239 @@
+import collections
+import os
+import sys
+
+import numpy
+
+
+def _ceil_class(nbytes):
+    return 1 << max(nbytes - 1, 0).bit_length()
+
+
+def _floor_class(nbytes):
+    return 1 << (nbytes.bit_length() - 1)
+
+
+def _owns_buffer(a):
+    # True if no other array shares the memory of ``a``. ``a`` is either an
+    # array owning its memory or a view of a pooled buffer, whose only
+    # referrers are then ``a.base``, the local variable and the argument of
+    # getrefcount.
+    base = a.base
+    if base is None:
+        return True
+    return (isinstance(base, numpy.ndarray) and base.base is None and
+            sys.getrefcount(base) <= 3)
+
+
+class GradientPool(object):
+
+    """Pool of CPU buffers for gradient arrays.
+
+    :meth:`Variable.backward` uses the pool in two ways:
+
+    - Gradients summed over the fan-out of a variable are accumulated in
+      place if no other object refers to the gradient array. Otherwise a
+      buffer is taken from the pool for the sum instead of allocating a new
+      array.
+    - Intermediate gradients dropped during the backward computation are
+      returned to the pool if no other object refers to them.
+
+    Buffers are grouped by their size rounded up to a power of two, and each
+    group keeps at most as many free buffers as were requested in one
+    backward computation, so that the pool does not hold more memory than
+    the following step reuses.
+
+    The pool also records the number of bytes of gradient arrays held by the
+    variable nodes of the graph during the last backward computation. Only
+    numpy arrays are pooled and counted; gradients on GPU are left to CuPy's
+    memory pool, and mdarray gradients are summed by the mkldnn sum
+    primitive.
+
+    Args:
+        capacity (int): Maximum number of bytes kept in free buffers. ``0``
+            disables pooling; in-place accumulation and memory statistics
+            are still available.
+
+    Attributes:
+        hits (int): Number of buffers served from the pool.
+        misses (int): Number of buffers newly allocated.
+        in_place (int): Number of accumulations done in place.
+        peak_bytes (int): Largest number of bytes of gradients held at once
+            during the last backward computation.
+        steady_bytes (int): Number of bytes of gradients still held when the
+            last backward computation finished, i.e. the gradients of the
+            leaf variables and retained gradients.
+
+    """
+
+    def __init__(self, capacity=1 << 28):
+        self.capacity = capacity
+        self._free = collections.defaultdict(list)
+        self._free_bytes = 0
+        self._wanted = collections.defaultdict(int)
+        self._requested = collections.defaultdict(int)
+        self._live = {}
+        self._live_bytes = 0
+        self._depth = 0
+        self.hits = 0
+        self.misses = 0
+        self.in_place = 0
+        self.peak_bytes = 0
+        self.steady_bytes = 0
+
+    @property
+    def free_bytes(self):
+        """Number of bytes kept in free buffers."""
+        return self._free_bytes
+
+    def begin_step(self):
+        """Resets the per-step statistics. Called by :meth:`Variable.backward`.
+
+        A backward computation run inside another one, e.g. by
+        :func:`~chainer.functions.forget`, belongs to the step of the outer
+        one.
+
+        """
+        self._depth += 1
+        if self._depth > 1:
+            return
+        self._requested.clear()
+        self._live.clear()
+        self._live_bytes = 0
+        self.peak_bytes = 0
+
+    def end_step(self):
+        """Records the steady-state gradient memory of the step."""
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        self.steady_bytes = self._live_bytes
+        self._live.clear()
+
+    def track(self, node, grad):
+        """Records that ``node`` now holds ``grad`` (or nothing if ``None``).
+
+        """
+        key = id(node)
+        self._live_bytes -= self._live.pop(key, 0)
+        if isinstance(grad, numpy.ndarray):
+            self._live[key] = grad.nbytes
+            self._live_bytes += grad.nbytes
+            if self._live_bytes > self.peak_bytes:
+                self.peak_bytes = self._live_bytes
+
+    def acquire(self, shape, dtype):
+        """Returns an uninitialized array from the pool.
+
+        Args:
+            shape (tuple of ints): Shape of the array.
+            dtype: Data type of the array.
+
+        Returns:
+            numpy.ndarray: An array that may be a view of a pooled buffer.
+
+        """
+        dtype = numpy.dtype(dtype)
+        nbytes = int(numpy.prod(shape, dtype=numpy.int64)) * dtype.itemsize
+        if nbytes == 0 or self.capacity == 0:
+            return numpy.empty(shape, dtype=dtype)
+        cls = _ceil_class(nbytes)
+        self._requested[cls] += 1
+        if self._requested[cls] > self._wanted[cls]:
+            self._wanted[cls] = self._requested[cls]
+        free = self._free[cls]
+        if free:
+            buf = free.pop()
+            self._free_bytes -= buf.nbytes
+            self.hits += 1
+        else:
+            buf = numpy.empty(cls, dtype=numpy.uint8)
+            self.misses += 1
+        return buf[:nbytes].view(dtype).reshape(shape)
+
+    def release(self, arrays):
+        """Returns arrays no longer referenced elsewhere to the pool.
+
+        Args:
+            arrays (list): Arrays to release. The list is emptied, so that the
+                caller does not hold references to the arrays anymore.
+
+        """
+        while arrays:
+            a = arrays.pop()
+            # References counted: ``a`` and the argument of getrefcount.
+            if not isinstance(a, numpy.ndarray) or \
+                    sys.getrefcount(a) > 2 or not _owns_buffer(a) or \
+                    not a.flags.c_contiguous or not a.flags.writeable or \
+                    a.nbytes == 0:
+                continue
+            buf = a if a.base is None else a.base
+            del a
+            if buf.ndim != 1 or buf.dtype != numpy.uint8:
+                buf = buf.reshape(-1).view(numpy.uint8)
+            cls = _floor_class(buf.nbytes)
+            free = self._free[cls]
+            if len(free) >= self._wanted[cls] or \
+                    self._free_bytes + buf.nbytes > self.capacity:
+                continue
+            free.append(buf)
+            self._free_bytes += buf.nbytes
+
+    def accumulate(self, node, gx):
+        """Adds ``gx`` to the gradient of a variable node.
+
+        The gradient array of the node is updated in place if nothing else
+        refers to it. Otherwise the sum is written to a pooled buffer.
+
+        Args:
+            node (~chainer.variable.VariableNode): Node whose gradient is
+                updated.
+            gx (numpy.ndarray): Gradient to add.
+
+        Returns:
+            bool: ``True`` if the gradient of the node has been updated.
+            ``False`` if the arrays are not supported, in which case the
+            caller must sum them.
+
+        """
+        g = node._grad
+        if not isinstance(g, numpy.ndarray) or \
+                not isinstance(gx, numpy.ndarray) or \
+                g.shape != gx.shape or g.dtype != gx.dtype:
+            return False
+        # References counted: the node, ``g`` and the argument of
+        # getrefcount.
+        if sys.getrefcount(g) <= 3 and g.flags.writeable and \
+                _owns_buffer(g):
+            g += gx
+            self.in_place += 1
+            return True
+        y = self.acquire(g.shape, g.dtype)
+        numpy.add(g, gx, out=y)
+        node._grad = y
+        return True
+
+    def free_all_blocks(self):
+        """Releases all free buffers."""
+        self._free.clear()
+        self._free_bytes = 0
+
+    def stats(self):
+        """Returns the statistics of the pool as a dict."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_place': self.in_place,
+            'free_bytes': self._free_bytes,
+            'peak_bytes': self.peak_bytes,
+            'steady_bytes': self.steady_bytes,
+        }
+
+
+_default_pool = GradientPool(
+    int(os.environ.get('CHAINER_GRADIENT_POOL_CAPACITY', str(1 << 28))))
+
+
+def get_default_pool():
+    """Returns the gradient pool used by :meth:`Variable.backward`."""
+    return _default_pool
@@ -0,0 +1,16 @@
+from chainer.graph_optimizations import checkpointing  # NOQA
+from chainer.graph_optimizations import inference_graph  # NOQA
+from chainer.graph_optimizations import schedule  # NOQA
+
+
+# import class and function
+from chainer.graph_optimizations.checkpointing import checkpoint  # NOQA
+from chainer.graph_optimizations.checkpointing import Checkpoint  # NOQA
+from chainer.graph_optimizations.checkpointing import checkpoint_sequence  # NOQA
+from chainer.graph_optimizations.checkpointing import Checkpointed  # NOQA
+from chainer.graph_optimizations.checkpointing import plan_checkpoints  # NOQA
+from chainer.graph_optimizations.checkpointing import Sequence  # NOQA
+from chainer.graph_optimizations.inference_graph import FusedConvolution2DFunction  # NOQA
+from chainer.graph_optimizations.inference_graph import InferenceGraph  # NOQA
+from chainer.graph_optimizations.static_graph import static_graph  # NOQA
+from chainer.graph_optimizations.static_graph import StaticGraphFunction  # NOQA
@@ -0,0 +1,331 @@
+import numpy
+import six
+
+from chainer import configuration
+from chainer import cuda
+from chainer import function
+from chainer.functions.util import forget
+from chainer import link
+from chainer import variable
+
+
+def _links_of(func):
+    if isinstance(func, link.Link):
+        return list(func.links())
+    if isinstance(func, Sequence):
+        return [child for f in func.funcs for child in _links_of(f)]
+    if isinstance(func, Checkpointed):
+        return _links_of(func.func)
+    owner = getattr(func, '__self__', None)
+    if isinstance(owner, link.Link):
+        return list(owner.links())
+    return []
+
+
+def _save_persistents(links):
+    saved = []
+    for child in links:
+        for name in child._persistent:
+            value = child.__dict__[name]
+            if isinstance(value, (numpy.ndarray, cuda.ndarray)):
+                value = value.copy()
+            saved.append((child, name, value))
+    return saved
+
+
+def _restore_persistents(saved):
+    for child, name, value in saved:
+        current = child.__dict__[name]
+        if isinstance(current, (numpy.ndarray, cuda.ndarray)) and \
+                isinstance(value, type(current)):
+            # Functions may refer to the array, so it is updated in place.
+            current[...] = value
+        else:
+            setattr(child, name, value)
+
+
+def _get_random_state(xp):
+    if xp is numpy:
+        return numpy.random.get_state()
+    return None
+
+
+def _set_random_state(xp, state):
+    if xp is numpy and state is not None:
+        numpy.random.set_state(state)
+
+
+class Checkpoint(forget.Forget):
+
+    """Function that recomputes a segment of a model on backward.
+
+    Unlike :class:`~chainer.functions.Forget`, the recomputation sees the same
+    state as the first call: the persistent values of the links of the
+    segment (e.g. the running statistics of batch normalization) are restored
+    after the recomputation, and the random state of NumPy is reset to the
+    one of the first call so that functions like
+    :func:`~chainer.functions.dropout` draw the same values on CPU.
+
+    Args:
+        func (callable): Segment to call. If it is a :class:`~chainer.Link`,
+            a bound method of a link or a :class:`Sequence`, the persistent
+            values of the links are restored after the recomputation.
+
+    """
+
+    def __init__(self, func):
+        super(Checkpoint, self).__init__(func)
+        self.random_state = None
+
+    @property
+    def label(self):
+        return 'Checkpoint'
+
+    def forward(self, inputs):
+        xp = cuda.get_array_module(*inputs)
+        self.random_state = _get_random_state(xp)
+        return super(Checkpoint, self).forward(inputs)
+
+    def backward(self, inputs, grads):
+        xp = cuda.get_array_module(*inputs)
+        random_state = _get_random_state(xp)
+        saved = _save_persistents(_links_of(self.func))
+        _set_random_state(xp, self.random_state)
+        try:
+            return super(Checkpoint, self).backward(inputs, grads)
+        finally:
+            _restore_persistents(saved)
+            _set_random_state(xp, random_state)
+
+
+def checkpoint(func, *xs):
+    """Calls a segment of a model without storing its internal results.
+
+    It works like :func:`~chainer.functions.forget`, but is meant for whole
+    segments of a model such as a :class:`~chainer.Chain`. Only the inputs
+    and the outputs of the segment are kept for backward computation; the
+    activations inside the segment are recomputed when the gradients reach
+    the segment. See :class:`Checkpoint` for the state restored for the
+    recomputation.
+
+    Args:
+        func (callable): Segment to call. It is called with
+            :class:`~chainer.Variable` objects and must return a
+            :class:`~chainer.Variable` or a tuple of them.
+        xs (~chainer.Variable): Arguments of the segment.
+
+    Returns:
+        ~chainer.Variable: Outputs of the segment. If it returns a tuple, the
+        function returns a tuple too.
+
+    """
+    if not configuration.config.enable_backprop:
+        return func(*xs)
+    return Checkpoint(func)(*xs)
+
+
+class Checkpointed(object):
+
+    """Callable that applies :func:`checkpoint` to every call of a segment.
+
+    It can replace a link wherever the link is called through a reference,
+    e.g. the lists of layers of :class:`~chainer.links.ResNet50Layers`. The
+    link stays registered in its parent, so its parameters and serialized
+    names do not change.
+
+    .. admonition:: Example
+
+        >>> model = L.ResNet50Layers(pretrained_model=None)
+        >>> for block in (model.res2, model.res3, model.res4, model.res5):
+        ...     block.forward = [
+        ...         (name, chainer.graph_optimizations.Checkpointed(f))
+        ...         for name, f in block.forward]
+
+    Args:
+        func (callable): Segment to call.
+
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *xs):
+        return checkpoint(self.func, *xs)
+
+
+class Sequence(object):
+
+    """Callable that applies callables one after another.
+
+    Args:
+        funcs (list of callables): Callables to apply. Each one takes the
+            output of the previous one.
+
+    """
+
+    def __init__(self, funcs):
+        self.funcs = list(funcs)
+
+    def __call__(self, x):
+        for f in self.funcs:
+            x = f(x)
+        return x
+
+
+class _MemoryHook(function.FunctionHook):
+
+    name = 'CheckpointMemory'
+
+    def __init__(self, params):
+        self.params = params
+        self.nbytes = 0
+
+    def forward_preprocess(self, func, in_data):
+        # The inputs other than parameters are what a function keeps for its
+        # backward computation at most.
+        self.nbytes += sum(x.nbytes for x in in_data
+                           if x is not None and id(x) not in self.params)
+
+
+def _estimate_peak(a, o, segments):
+    """Estimates the memory of activations kept for backward computation.
+
+    The outputs of checkpointed segments and all activations of the other
+    segments are kept until backward computation, which then recomputes the
+    checkpointed segments one at a time.
+
+    """
+    kept = 0
+    recomputed = 0
+    for start, stop, checkpointed in segments:
+        if checkpointed:
+            kept += o[stop - 1]
+            recomputed = max(recomputed, sum(a[start:stop]))
+        else:
+            kept += sum(a[start:stop])
+    return kept + recomputed
+
+
+def _partition(a, limit):
+    segments = []
+    start = 0
+    total = 0
+    for i, nbytes in enumerate(a):
+        if i > start and total + nbytes > limit:
+            segments.append([start, i, True])
+            start = i
+            total = 0
+        total += nbytes
+    segments.append([start, len(a), True])
+    return segments
+
+
+def plan_checkpoints(funcs, x, budget):
+    """Chooses the segments of a sequential model to checkpoint.
+
+    It calls the model once on ``x`` to measure the activations each callable
+    keeps for backward computation and the size of its output. Then it
+    searches for consecutive segments such that the activations kept for
+    backward computation fit ``budget``, recomputing as little as possible.
+    The persistent values of the links and the random state of NumPy are
+    restored after the measurement.
+
+    Args:
+        funcs (list of callables): Layers of the model. Each one takes the
+            output of the previous one.
+        x: Input array or :class:`~chainer.Variable` of the model, e.g. a
+            minibatch of the size used in training.
+        budget (int): Number of bytes available for activations.
+
+    Returns:
+        list: ``(start, stop, checkpointed)`` tuples of the segments, which
+        cover ``funcs[start:stop]``. If no plan fits ``budget``, the one with
+        the least memory is returned.
+
+    """
+    links = [child for f in funcs for child in _links_of(f)]
+    params = set(id(p.data) for child in links for p in child.params())
+    saved = _save_persistents(links)
+    xp = cuda.get_array_module(x)
+    random_state = _get_random_state(xp)
+    a = []
+    o = []
+    h = x
+    try:
+        with configuration.using_config('enable_backprop', True):
+            for f in funcs:
+                hook = _MemoryHook(params)
+                with hook:
+                    h = f(h)
+                a.append(hook.nbytes)
+                o.append(h.data.nbytes if isinstance(h, variable.Variable)
+                         else h.nbytes)
+    finally:
+        del h
+        _restore_persistents(saved)
+        _set_random_state(xp, random_state)
+
+    def sort_key(segments):
+        # Feasible plans are compared by the recomputation, the others by
+        # the memory.
+        peak = _estimate_peak(a, o, segments)
+        recomputed = sum(sum(a[s:t]) for s, t, c in segments if c)
+        if peak > budget:
+            return True, peak, recomputed
+        return False, recomputed, peak
+
+    n = len(funcs)
+    best = [[0, n, False]]
+    best_key = sort_key(best)
+    if not best_key[0]:
+        return [tuple(s) for s in best]
+
+    limits = set(sum(a[i:j]) for i in six.moves.range(n)
+                 for j in six.moves.range(i + 1, n + 1))
+    for limit in sorted(limits):
+        segments = _partition(a, limit)
+        # Keep the segments that save the least memory if the budget allows.
+        order = sorted(six.moves.range(len(segments)),
+                       key=lambda k: sum(a[segments[k][0]:segments[k][1]]) -
+                       o[segments[k][1] - 1])
+        for k in order:
+            segments[k][2] = False
+            if _estimate_peak(a, o, segments) > budget:
+                segments[k][2] = True
+        key = sort_key(segments)
+        if key < best_key:
+            best, best_key = segments, key
+    return [tuple(s) for s in best]
+
+
+def checkpoint_sequence(funcs, x, budget):
+    """Returns a sequential model that checkpoints its segments.
+
+    The segments are chosen by :func:`plan_checkpoints`.
+
+    .. admonition:: Example
+
+        >>> layers = [L.Linear(10, 10) for _ in range(8)]
+        >>> x = np.zeros((32, 10), 'f')
+        >>> forward = chainer.graph_optimizations.checkpoint_sequence(
+        ...     layers, x, 4096)
+        >>> y = forward(x)
+
+    Args:
+        funcs (list of callables): Layers of the model. Each one takes the
+            output of the previous one.
+        x: Input of the model used to measure the memory of the layers.
+        budget (int): Number of bytes available for activations.
+
+    Returns:
+        Sequence: Callable that applies the layers with the chosen segments
+        checkpointed.
+
+    """
+    segments = []
+    for start, stop, checkpointed in plan_checkpoints(funcs, x, budget):
+        if checkpointed:
+            segments.append(Checkpointed(Sequence(funcs[start:stop])))
+        else:
+            segments.extend(funcs[start:stop])
+    return Sequence(segments)
@@ -0,0 +1,229 @@
+import collections
+
+import numpy
+
+import chainer
+from chainer import configuration
+from chainer import cuda
+from chainer import function
+from chainer.functions.activation import relu
+from chainer.functions.connection import convolution_2d
+from chainer.functions.normalization import batch_normalization
+from chainer.graph_optimizations import schedule as schedule_module
+from chainer import mkld
+from chainer import variable
+
+
+SLOT = schedule_module.SLOT
+CONST = schedule_module.CONST
+
+
+def _conv_types():
+    types = (convolution_2d.Convolution2DFunction,)
+    if mkld.available:
+        types += (mkld.convolution_2d.Convolution2DFunctionMKLDNN,)
+    return types
+
+
+def _relu_types():
+    types = (relu.ReLU,)
+    if mkld.available:
+        types += (mkld.relu.ReLUMKLDNN,)
+    return types
+
+
+class FusedConvolution2DFunction(function.Function):
+
+    """Convolution followed by ReLU, run as a single inference step.
+
+    The batch normalization that originally followed the convolution is
+    already folded into the weight and bias given to this function, so it only
+    adds a ReLU on top of the wrapped convolution. On numpy arrays, ReLU is
+    applied in place on the convolution output; on mkldnn arrays the eltwise
+    primitive works in place on the buffer the convolution has just written.
+
+    This function does not support backpropagation.
+
+    Args:
+        conv (~chainer.Function): Convolution function to run.
+        relu (~chainer.Function): ReLU function that followed the convolution,
+            or ``None`` to return the convolution output as is.
+
+    """
+
+    def __init__(self, conv, relu=None):
+        self.conv = conv
+        self.relu = relu
+
+    @property
+    def mkldnn_deferrable(self):
+        return getattr(self.conv, 'mkldnn_deferrable', False)
+
+    @property
+    def label(self):
+        if self.relu is None:
+            return 'FusedConvolution2D'
+        return 'FusedConvolution2DReLU'
+
+    def forward(self, inputs):
+        y, = self.conv.forward(inputs)
+        # The im2col buffer is only needed for backward.
+        self.conv.col = None
+        if self.relu is None:
+            return y,
+        if isinstance(y, numpy.ndarray):
+            numpy.maximum(y, 0, out=y)
+            return y,
+        if isinstance(y, cuda.ndarray):
+            cuda.cupy.maximum(y, 0, out=y)
+            return y,
+        return self.relu.forward((y,))
+
+
+def _fuse_conv_bn_relu(schedule):
+    steps = schedule.steps
+    conv_types = _conv_types()
+    bn_type = batch_normalization.BatchNormalizationFunction
+    relu_types = _relu_types()
+    readers = collections.defaultdict(list)
+    for j, step in enumerate(steps):
+        for kind, value in step.inputs:
+            if kind == SLOT:
+                readers[value].append(j)
+
+    def fixed(step):
+        return all(schedule.constant(source) is not None
+                   for source in step.inputs[1:])
+
+    def value(source):
+        x, = mkld.to_plain_array((schedule.constant(source),))
+        return x
+
+    def follower(i, types):
+        # Returns the index of the only step reading the output of step
+        # ``i``, provided that it reads it as the first input, that its other
+        # inputs are fixed and that its function is an instance of ``types``.
+        slot = steps[i].outputs[0]
+        if slot is None or slot in schedule.outputs or \
+                len(readers[slot]) != 1:
+            return None
+        j = readers[slot][0]
+        step = steps[j]
+        if step.inputs[0] != (SLOT, slot) or not fixed(step) or \
+                not isinstance(step.func, types):
+            return None
+        return j
+
+    for i, step in enumerate(steps):
+        if step is None or not isinstance(step.func, conv_types) or \
+                not fixed(step):
+            continue
+        W = value(step.inputs[1])
+        dtype = W.dtype
+        if len(step.inputs) == 3:
+            b = value(step.inputs[2])
+        else:
+            b = numpy.zeros(W.shape[0], dtype=dtype)
+        last = i
+        removed = []
+
+        j = follower(last, bn_type)
+        if j is not None and len(steps[j].inputs) == 5:
+            gamma, beta, mean, var = [value(s) for s in steps[j].inputs[1:]]
+            scale = gamma / numpy.sqrt(var + steps[j].func.eps)
+            W = W * scale[:, None, None, None]
+            b = (b - mean) * scale + beta
+            last = j
+            removed.append(j)
+
+        relu_func = None
+        j = follower(last, relu_types)
+        if j is not None:
+            relu_func = steps[j].func
+            last = j
+            removed.append(j)
+
+        if not removed:
+            continue
+        steps[i] = schedule_module.Step(
+            FusedConvolution2DFunction(step.func, relu_func),
+            [step.inputs[0],
+             (CONST, W.astype(dtype, copy=False)),
+             (CONST, b.astype(dtype, copy=False))],
+            steps[last].outputs)
+        for j in removed:
+            steps[j] = None
+    schedule.steps = [step for step in steps if step is not None]
+
+
+class InferenceGraph(object):
+
+    """Inference-only replay of a model with convolution layers fused.
+
+    The model is traced once in test mode (``chainer.config.train`` set to
+    ``False``) for each distinct shape of the inputs. The recorded graph is
+    then optimized as follows, and replayed without building the
+    computational graph on later calls.
+
+    - A 2D convolution whose output is only read by a batch normalization
+      with fixed statistics gets the statistics folded into its weight and
+      bias, so that the normalization is removed from the graph.
+    - A ReLU that only reads the output of such a convolution, or of any 2D
+      convolution, is applied by the convolution step in place.
+
+    The folded weights are computed from the parameters at trace time. Call
+    :meth:`clear` after updating the parameters of the model.
+
+    If ``chainer.config.train`` is ``True`` when the graph is called, the model
+    is called as is instead.
+
+    Args:
+        model (~chainer.Link): Model to run. It is called with the positional
+            arguments given to the graph and the keyword arguments given here.
+        fuse (bool): If ``False``, the traced graph is replayed without
+            fusion.
+        kwargs: Keyword arguments passed to the model, e.g. ``layers`` of
+            :class:`~chainer.links.ResNet50Layers`.
+
+    .. admonition:: Example
+
+        >>> model = L.Linear(3, 2)
+        >>> graph = chainer.graph_optimizations.InferenceGraph(model)
+        >>> x = np.ones((1, 3), 'f')
+        >>> with chainer.using_config('train', False):
+        ...     y = graph(x)
+        >>> y.shape
+        (1, 2)
+
+    """
+
+    def __init__(self, model, fuse=True, **kwargs):
+        self.model = model
+        self.fuse = fuse
+        self.kwargs = kwargs
+        self._schedules = {}
+
+    def clear(self):
+        """Discards the traced graphs."""
+        self._schedules.clear()
+
+    def __call__(self, *args):
+        if configuration.config.train:
+            return self.model(*args, **self.kwargs)
+
+        args = [x.data if isinstance(x, variable.Variable) else x
+                for x in args]
+        key = tuple((x.shape, numpy.dtype(x.dtype).str) for x in args)
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            schedule = schedule_module.Schedule()
+            schedule.trace(self.model, self.model, args, self.kwargs)
+            if self.fuse:
+                _fuse_conv_bn_relu(schedule)
+            schedule.prune()
+            self._schedules[key] = schedule
+        inputs = args + [p.data for p in schedule.params]
+        with chainer.no_backprop_mode(), cuda.get_device(*args):
+            ys = schedule.forward(inputs)
+        return schedule_module.unflatten_outputs(
+            schedule.template, [variable.Variable(y) for y in ys])
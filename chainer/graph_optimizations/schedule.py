@@ -0,0 +1,338 @@
+import copy
+
+import six
+
+from chainer import configuration
+from chainer import cuda
+from chainer import function
+from chainer import mkld
+from chainer import utils
+from chainer import variable
+
+
+SLOT = 0
+CONST = 1
+
+
+class _TraceHook(function.FunctionHook):
+
+    name = 'ScheduleTrace'
+
+    def __init__(self):
+        self.calls = []
+
+    def forward_preprocess(self, func, in_data):
+        # The copy is taken before the forward computation so that it does
+        # not hold the arrays the function keeps for backward.
+        self.calls.append((func, copy.copy(func), in_data))
+
+
+class Step(object):
+
+    """One function call recorded in a :class:`Schedule`.
+
+    Attributes:
+        func (~chainer.Function): Copy of the function called at trace time,
+            taken before its forward computation.
+        inputs (list): ``(SLOT, index)`` or ``(CONST, array)`` for each input.
+        outputs (list): Slot index of each output, or ``None`` if the output
+            is never read.
+        release (tuple): Slots that are no longer read after this step.
+        persistents (list): ``(attribute, link, name)`` for each attribute of
+            the function holding a persistent value of a link that the
+            function updates, e.g. the running statistics of batch
+            normalization.
+
+    """
+
+    def __init__(self, func, inputs, outputs):
+        self.func = func
+        self.inputs = inputs
+        self.outputs = outputs
+        self.release = ()
+        self.persistents = []
+
+
+def flatten_outputs(out):
+    if isinstance(out, variable.Variable):
+        return None, [out]
+    if isinstance(out, dict):
+        keys = list(out.keys())
+        return keys, [out[k] for k in keys]
+    if isinstance(out, (tuple, list)):
+        return type(out), list(out)
+    raise TypeError(
+        'unsupported output type of the model: {}'.format(type(out)))
+
+
+def unflatten_outputs(template, ys):
+    if template is None:
+        return ys[0]
+    if isinstance(template, list):
+        return dict(zip(template, ys))
+    return template(ys)
+
+
+class Schedule(object):
+
+    """Sequence of function calls recorded from one call of a model.
+
+    :meth:`trace` calls the model once while a function hook records every
+    function applied. Each array flowing between the functions gets a *slot*.
+    The first slots hold the arguments followed by the
+    parameters of the model that are read by the recorded functions; the
+    other slots hold the outputs of the functions. Arrays that are neither
+    computed by the recorded functions, given as arguments nor parameters
+    (e.g. the running statistics of batch normalization in test mode) are
+    recorded as constants. The running statistics updated by batch
+    normalization in training mode are read from the link before each replay
+    of the function and written back to it in place afterwards, as
+    :class:`~chainer.links.BatchNormalization` does.
+
+    The model must compute its outputs only from its arguments, its
+    parameters and arrays that do not change between calls. Variables
+    computed outside of the model must be passed as arguments.
+
+    Attributes:
+        params (list of ~chainer.Variable): Parameters read by the functions,
+            in the order of their slots.
+        n_inputs (int): Number of argument and parameter slots.
+        steps (list of Step): Recorded function calls in execution order.
+
+    """
+
+    def __init__(self):
+        self.template = None
+        self.params = []
+        self.n_inputs = 0
+        self.n_slots = 0
+        self.steps = []
+        self.outputs = []
+
+    def trace(self, link, method, args, kwargs=None):
+        """Records the functions applied by a call of a model.
+
+        Args:
+            link (~chainer.Link): Link owning the parameters.
+            method: Callable to trace, e.g. ``link`` itself.
+            args: Positional arguments; each must be an array or a
+                :class:`~chainer.Variable`.
+            kwargs (dict): Keyword arguments passed to ``method``.
+
+        Returns:
+            The outputs of the call, which can be backpropagated as usual.
+
+        """
+        xs = [x if isinstance(x, variable.Variable) else variable.Variable(x)
+              for x in args]
+        hook = _TraceHook()
+        with configuration.using_config('enable_backprop', True), hook:
+            out = method(*xs, **(kwargs or {}))
+        self.template, out_vars = flatten_outputs(out)
+
+        slots = {}
+        for i, x in enumerate(xs):
+            # An argument given twice is read from its first slot.
+            slots.setdefault(id(x.node), i)
+        all_params = dict((id(p.node), p) for p in link.params())
+        for func, _, _ in hook.calls:
+            for node in func.inputs:
+                key = id(node)
+                if key in all_params and key not in slots:
+                    slots[key] = len(xs) + len(self.params)
+                    self.params.append(all_params[key])
+        self.n_inputs = len(xs) + len(self.params)
+        self.n_slots = self.n_inputs
+        persistents = {}
+        for child in link.links():
+            for name in child._persistent:
+                persistents[id(getattr(child, name))] = child, name
+
+        for func, template, in_data in hook.calls:
+            template.rank = func.rank
+            if hasattr(func, 'fanout'):
+                template.fanout = func.fanout
+            inputs = []
+            for node, data in six.moves.zip(func.inputs, in_data):
+                key = id(node)
+                if key in slots:
+                    inputs.append((SLOT, slots[key]))
+                elif node.creator is not None:
+                    raise ValueError(
+                        '{} reads a variable computed outside of the model; '
+                        'pass it as an argument instead'.format(func.label))
+                else:
+                    inputs.append((CONST, data))
+            outputs = []
+            for y in func.outputs:
+                y = y()
+                if y is None:
+                    outputs.append(None)
+                else:
+                    slots[id(y)] = self.n_slots
+                    outputs.append(self.n_slots)
+                    self.n_slots += 1
+            step = Step(template, inputs, outputs)
+            if configuration.config.train:
+                for attr in ('running_mean', 'running_var'):
+                    value = getattr(template, attr, None)
+                    owner = persistents.get(id(value))
+                    if value is not None and owner is not None:
+                        step.persistents.append((attr,) + owner)
+            self.steps.append(step)
+
+        for v in out_vars:
+            if id(v.node) not in slots:
+                raise ValueError(
+                    'the model output is not computed from its inputs')
+            self.outputs.append(slots[id(v.node)])
+        return out
+
+    def constant(self, source):
+        """Returns the array of a source that is fixed between calls.
+
+        Args:
+            source (tuple): Entry of :attr:`Step.inputs`.
+
+        Returns:
+            The array of a constant or of a parameter slot, or ``None`` if the
+            source is an argument or computed by a function.
+
+        """
+        kind, value = source
+        if kind == CONST:
+            return value
+        n_args = self.n_inputs - len(self.params)
+        if n_args <= value < self.n_inputs:
+            return self.params[value - n_args].data
+        return None
+
+    def prune(self):
+        """Drops unused steps and computes the slots each step releases."""
+        needed = set(self.outputs)
+        kept = []
+        for step in reversed(self.steps):
+            if not any(i in needed for i in step.outputs if i is not None):
+                continue
+            step.outputs = [i if i in needed else None for i in step.outputs]
+            needed.update(v for kind, v in step.inputs if kind == SLOT)
+            kept.append(step)
+        kept.reverse()
+
+        released = set(self.outputs)
+        released.update(six.moves.range(self.n_inputs))
+        for step in reversed(kept):
+            release = set(v for kind, v in step.inputs
+                          if kind == SLOT and v not in released)
+            released.update(release)
+            step.release = tuple(release)
+        self.steps = kept
+
+    def copy_functions(self):
+        """Returns shallow copies of the recorded functions.
+
+        A function keeps the state needed by its backward computation, so a
+        schedule replayed again before the backward computation of an earlier
+        call must run on copies.
+
+        """
+        return [copy.copy(step.func) for step in self.steps]
+
+    def forward(self, inputs, funcs=None, saved=None):
+        """Runs the recorded functions.
+
+        Args:
+            inputs: Arrays of the argument and parameter slots.
+            funcs (list): Functions to run for each step. The recorded ones
+                are used if omitted.
+            saved (list): If given, the input arrays retained by each
+                function for backward computation are appended to it.
+
+        Returns:
+            list: Output arrays of the model.
+
+        """
+        buf = [None] * self.n_slots
+        buf[:self.n_inputs] = inputs
+        for i, step in enumerate(self.steps):
+            func = step.func if funcs is None else funcs[i]
+            in_data = tuple([buf[v] if kind == SLOT else v
+                             for kind, v in step.inputs])
+            if mkld.available:
+                mkld.prepare_function(func, in_data, {})
+            func._input_indexes_to_retain = None
+            func._output_indexes_to_retain = None
+            for attr, owner, name in step.persistents:
+                setattr(func, attr, getattr(owner, name))
+            ys = func.forward(in_data)
+            for attr, owner, name in step.persistents:
+                getattr(owner, name)[:] = getattr(func, attr)
+            if saved is not None:
+                retain = func._input_indexes_to_retain
+                if retain is not None:
+                    in_data = tuple([x if j in retain else None
+                                     for j, x in enumerate(in_data)])
+                saved.append(in_data)
+                retain = func._output_indexes_to_retain
+                func.output_data = tuple([
+                    y if retain is not None and j in retain else None
+                    for j, y in enumerate(ys)])
+            for j, y in six.moves.zip(step.outputs, ys):
+                if j is not None:
+                    buf[j] = y
+            for j in step.release:
+                buf[j] = None
+        return [buf[i] for i in self.outputs]
+
+    def backward(self, grad_outputs, funcs, saved):
+        """Runs the backward computation of the recorded functions.
+
+        Gradients of a slot read by several functions are summed as in
+        :meth:`Variable.backward`: the second contribution allocates a new
+        array, to which later ones are added in place.
+
+        Args:
+            grad_outputs: Gradients of the model outputs.
+            funcs (list): Functions used by :meth:`forward`.
+            saved (list): Input arrays saved by :meth:`forward`.
+
+        Returns:
+            list: Gradients of the argument and parameter slots.
+
+        """
+        grads = [None] * self.n_slots
+        owned = [False] * self.n_slots
+
+        def accumulate(i, g):
+            if grads[i] is None:
+                grads[i] = g
+            elif owned[i]:
+                grads[i] += g
+            else:
+                with cuda.get_device(g):
+                    grads[i] = utils.force_array(grads[i] + g)
+                owned[i] = True
+
+        for i, g in six.moves.zip(self.outputs, grad_outputs):
+            if g is not None:
+                accumulate(i, g)
+
+        for i in six.moves.range(len(self.steps) - 1, -1, -1):
+            step = self.steps[i]
+            out_grad = tuple([None if j is None else grads[j]
+                              for j in step.outputs])
+            if all(g is None for g in out_grad):
+                continue
+            func = funcs[i]
+            in_data = saved[i]
+            if mkld.available:
+                mkld.prepare_function(
+                    func, in_data + out_grad, {}, 'backward')
+            gxs = func.backward(in_data, out_grad)
+            for j in step.outputs:
+                if j is not None:
+                    grads[j] = None
+            for (kind, j), gx in six.moves.zip(step.inputs, gxs):
+                if kind == SLOT and gx is not None:
+                    accumulate(j, gx)
+        return grads[:self.n_inputs]
@@ -0,0 +1,115 @@
+import functools
+
+import numpy
+
+import chainer
+from chainer import configuration
+from chainer import function
+from chainer.graph_optimizations import schedule as schedule_module
+
+
+class StaticGraphFunction(function.Function):
+
+    """Function that replays a recorded schedule as a single graph node.
+
+    The functions of the schedule run without type checking, function hooks
+    or building :class:`~chainer.Variable` objects for the intermediate
+    arrays, and the backward computation walks the schedule in reverse order
+    instead of sorting the graph. Function hooks see this function only.
+
+    Args:
+        schedule (~chainer.graph_optimizations.schedule.Schedule): Schedule
+            to replay. The inputs of this function are the arguments and the
+            parameters of the schedule in the order of their slots.
+
+    """
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.funcs = schedule.copy_functions()
+        self.saved = None
+
+    @property
+    def label(self):
+        return 'StaticGraph'
+
+    def forward(self, inputs):
+        if configuration.config.enable_backprop:
+            self.saved = []
+        return tuple(self.schedule.forward(inputs, self.funcs, self.saved))
+
+    def backward(self, inputs, grad_outputs):
+        return tuple(
+            self.schedule.backward(grad_outputs, self.funcs, self.saved))
+
+
+def static_graph(method):
+    """Decorator that records a method of a link once and replays it.
+
+    The first call of the decorated method for each combination of input
+    shapes, dtypes and ``chainer.config.train`` runs the method as usual
+    while recording the functions it applies. Later calls with the same
+    combination replay the recording as a :class:`StaticGraphFunction`. This
+    removes the per-function overhead of :meth:`Function.__call__` and of the
+    graph traversal in :meth:`Variable.backward`, which dominates the step
+    time of small models. Calls with new input shapes are run and recorded
+    dynamically, so such models keep working without replay.
+
+    The method must compute its outputs only from its positional arguments,
+    which must be arrays or :class:`~chainer.Variable` objects, and from the
+    parameters of the link; it must apply the same functions on every call
+    with the same input shapes. Keep the state of recurrent networks out of
+    the link, e.g. use :class:`~chainer.links.StatelessLSTM` and pass the
+    state as arguments. Calls with keyword arguments, in debug mode or with
+    ``chainer.config.use_static_graph`` set to ``False`` always run the
+    method as is.
+
+    .. admonition:: Example
+
+        >>> class MLP(chainer.Chain):
+        ...     def __init__(self):
+        ...         super(MLP, self).__init__(l1=L.Linear(3, 4))
+        ...
+        ...     @chainer.graph_optimizations.static_graph
+        ...     def __call__(self, x):
+        ...         return F.relu(self.l1(x))
+        ...
+        >>> model = MLP()
+        >>> x = np.ones((2, 3), 'f')
+        >>> y1 = model(x)  # recorded
+        >>> y2 = model(x)  # replayed
+        >>> y2.creator.label
+        'StaticGraph'
+
+    """
+    key_name = '_static_graph_' + method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if kwargs or chainer.is_debug() or \
+                not configuration.config.use_static_graph:
+            return method(self, *args, **kwargs)
+
+        schedules = self.__dict__.get(key_name)
+        if schedules is None:
+            schedules = self.__dict__[key_name] = {}
+        ids = [id(x) for x in args]
+        # The recorded graph depends on which arguments are the same object.
+        key = (tuple([
+            (x.shape, numpy.dtype(x.dtype).str, ids.index(id(x)))
+            for x in args]), configuration.config.train)
+        schedule = schedules.get(key)
+        if schedule is None:
+            schedule = schedule_module.Schedule()
+            out = schedule.trace(
+                self, functools.partial(method, self), args)
+            schedule.prune()
+            schedules[key] = schedule
+            return out
+
+        ys = StaticGraphFunction(schedule)(*(args + tuple(schedule.params)))
+        if not isinstance(ys, tuple):
+            ys = ys,
+        return schedule_module.unflatten_outputs(schedule.template, list(ys))
+
+    return wrapper
@@ -1,4 +1,6 @@
 from __future__ import division
+import collections
+import ctypes
 import multiprocessing
 from multiprocessing import sharedctypes
 import threading
@@ -36,6 +38,17 @@ class MultiprocessIterator(iterator.Iterator):
         shared_mem (int): The size of using shared memory per data.
             If ``None``, size is adjusted automatically.
 
+    If ``shared_mem`` is ``None`` and every example of the first batch is an
+    array, or a tuple or a dictionary of arrays, of the same shapes and
+    dtypes, the workers write the examples directly into a ring of shared
+    memory buffers, each of which holds a whole batch already concatenated.
+    The batch is then returned without copying it: the examples are views of
+    the buffer, and its ``concatenated`` attribute holds the concatenated
+    arrays, which :func:`~chainer.dataset.concat_examples` returns as they
+    are. A buffer is reused after all the arrays viewing it are released. A
+    batch is transferred in the usual way if no buffer is free, and an
+    example that does not fit the layout of the first batch is sent as is.
+
     """
 
     _last_signal = object()
@@ -59,6 +72,7 @@ class MultiprocessIterator(iterator.Iterator):
         self.n_processes = n_processes or multiprocessing.cpu_count()
         self.n_prefetch = max(n_prefetch, 1)
         self._shared_mem_size = shared_mem
+        self._layout = None  # layout of a batch in a slot of shared memory
 
         self._finalized = None
 
@@ -114,6 +128,9 @@ class MultiprocessIterator(iterator.Iterator):
         self._ordered_data_queue = six.moves.queue.Queue()
         self._unused_mem_queue = six.moves.queue.Queue()
         self._mem_list = []
+        self._slots = []
+        self._free_slots = collections.deque()
+        self._batch_slots = collections.deque()
         self._cnt = 0
 
         self._workers = []
@@ -139,8 +156,20 @@ class MultiprocessIterator(iterator.Iterator):
             self._mem_list.append(sharedctypes.RawArray('b', mem_size))
             self._unused_mem_queue.put(i)
 
+        if self._layout is not None:
+            # Batches being loaded, the batch just returned and the previous
+            # one, which the caller may still hold, e.g. in the graph.
+            n_slots = self.n_prefetch + 2
+            for i in six.moves.range(n_slots):
+                self._slots.append(
+                    sharedctypes.RawArray('b', self._layout.nbytes))
+                self._free_slots.append(i)
+            self._slot_buffer_type = _slot_buffer_type(
+                self._layout.nbytes, self._free_slots)
+
         for worker_id in range(self.n_processes):
-            args = (self.dataset, self._index_queue, self._data_queue, self._mem_list, worker_id)
+            args = (self.dataset, self._index_queue, self._data_queue,
+                    self._mem_list, worker_id, self._layout, self._slots)
             worker = multiprocessing.Process(target=_worker, args=args)
             worker.daemon = True
             self._workers.append(worker)
@@ -155,7 +184,9 @@ class MultiprocessIterator(iterator.Iterator):
         order = self._order
         measure_mode = len(self._workers) == 0
         max_size = 0
-        for _ in six.moves.range(self.batch_size):
+        examples = []
+        slot = None
+        for row in six.moves.range(self.batch_size):
             if i >= n:
                 if not self._repeat:
                     break
@@ -172,17 +203,30 @@ class MultiprocessIterator(iterator.Iterator):
                 data = self.dataset[index]
                 max_size = max(max_size, _measure(data))
                 self._data_queue.put((self._cnt, None, data))
+                examples.append(data)
                 del data
             else:
-                self._index_queue.put(
-                    (self._cnt, self._unused_mem_queue.get(), index))
+                if row == 0 and self._layout is not None:
+                    try:
+                        slot = self._free_slots.popleft()
+                    except IndexError:
+                        pass
+                if slot is None:
+                    mem_index = self._unused_mem_queue.get()
+                else:
+                    mem_index = slot, row
+                self._index_queue.put((self._cnt, mem_index, index))
             self._cnt += 1
             i += 1
 
         self._prefetch_order = order  # Temporarily store the shuffled order.
         self._pushed_position = i
+        self._batch_slots.append(slot)
 
         if measure_mode:
+            if examples:
+                self._layout = _BatchLayout.create(examples, self.batch_size)
+            del examples
             self._shared_mem_size = max_size
             self._init_process()
 
@@ -206,8 +250,159 @@ class MultiprocessIterator(iterator.Iterator):
         self.current_position = i
         # Eventually overwrite the (possibly shuffled) order.
         self._order = self._prefetch_order
+
+        slot = self._batch_slots.popleft()
+        if slot is not None:
+            batch = self._assemble(batch, slot)
         return batch
 
+    def _assemble(self, batch, slot):
+        # The buffer returns the slot to the free list when it is released,
+        # i.e. when no array views it any more.
+        buf = self._slot_buffer_type.from_buffer(self._slots[slot])
+        buf.slot = slot
+        layout = self._layout
+        arrays = layout.arrays(buf)
+        del buf
+        batch = _Batch(batch)
+        in_slot = True
+        for row, data in enumerate(batch):
+            if data is _in_slot:
+                batch[row] = layout.example(arrays, row)
+            else:
+                in_slot = False
+        if in_slot and batch:
+            batch.concatenated = layout.concatenated(arrays, len(batch))
+        return batch
+
+
+class _Batch(list):
+
+    """List of examples that may also hold them concatenated."""
+
+    concatenated = None
+
+
+# Placeholder of an example written into a slot of shared memory.
+_in_slot = object()
+
+
+def _slot_buffer_type(nbytes, free_slots):
+    class SlotBuffer(ctypes.c_char * nbytes):
+
+        def __del__(self):
+            # deque.append is atomic, so this is safe from any thread.
+            free_slots.append(self.slot)
+
+    return SlotBuffer
+
+
+class _BatchLayout(object):
+
+    """Layout of a batch of fixed-size examples in a slot of shared memory.
+
+    Each field of the examples, i.e. the example itself, an element of a
+    tuple or a value of a dictionary, is stored as a concatenated array of
+    ``batch_size`` rows, aligned to a cache line.
+
+    """
+
+    _alignment = 64
+
+    def __init__(self, kind, keys, fields, batch_size):
+        self.kind = kind
+        self.keys = keys
+        self.fields = fields
+        self.batch_size = batch_size
+        self.offsets = []
+        offset = 0
+        for shape, dtype, _ in fields:
+            self.offsets.append(offset)
+            nbytes = batch_size * int(numpy.prod(shape)) * dtype.itemsize
+            offset += -(-nbytes // self._alignment) * self._alignment
+        self.nbytes = max(offset, 1)
+
+    @classmethod
+    def create(cls, examples, batch_size):
+        first = examples[0]
+        t = type(first)
+        if t is tuple:
+            kind, keys, values = 'tuple', None, first
+        elif t is dict:
+            kind, keys = 'dict', list(first)
+            values = [first[key] for key in keys]
+        else:
+            kind, keys, values = 'array', None, (first,)
+
+        fields = []
+        for v in values:
+            if not isinstance(v, (numpy.ndarray, numpy.generic)) or \
+               v.dtype.hasobject:
+                return None
+            fields.append((v.shape, v.dtype, isinstance(v, numpy.ndarray)))
+        layout = cls(kind, keys, fields, batch_size)
+        if not all(layout.matches(example) for example in examples):
+            return None
+        return layout
+
+    def _values(self, example):
+        t = type(example)
+        if self.kind == 'tuple':
+            if t is tuple and len(example) == len(self.fields):
+                return example
+        elif self.kind == 'dict':
+            if t is dict and len(example) == len(self.keys) and \
+               all(key in example for key in self.keys):
+                return [example[key] for key in self.keys]
+        else:
+            return example,
+        return None
+
+    def matches(self, example):
+        values = self._values(example)
+        if values is None:
+            return False
+        for v, (shape, dtype, is_array) in six.moves.zip(values, self.fields):
+            if isinstance(v, numpy.ndarray) != is_array or \
+               not isinstance(v, (numpy.ndarray, numpy.generic)) or \
+               v.shape != shape or v.dtype != dtype:
+                return False
+        return True
+
+    def arrays(self, buf):
+        arrays = []
+        for (shape, dtype, _), offset in six.moves.zip(
+                self.fields, self.offsets):
+            size = self.batch_size * int(numpy.prod(shape))
+            array = numpy.frombuffer(buf, dtype, size, offset)
+            arrays.append(array.reshape((self.batch_size,) + shape))
+        return arrays
+
+    def write(self, arrays, row, example):
+        if not self.matches(example):
+            return False
+        for array, v in six.moves.zip(arrays, self._values(example)):
+            array[row] = v
+        return True
+
+    def _wrap(self, values):
+        if self.kind == 'tuple':
+            return tuple(values)
+        elif self.kind == 'dict':
+            return dict(six.moves.zip(self.keys, values))
+        else:
+            return values[0]
+
+    def example(self, arrays, row):
+        # Array fields are returned as views, scalar fields as scalars.
+        return self._wrap([
+            array[row, ...] if is_array else array[row]
+            for array, (_, _, is_array) in six.moves.zip(
+                arrays, self.fields)])
+
+    def concatenated(self, arrays, n):
+        return self._wrap([array[:n] for array in arrays])
+
 
 def _get_data_loop(data_queue, ordered_data_queue, mem_list,
                    unused_mem_queue, finalized, last_signal):
@@ -223,7 +418,9 @@ def _get_data_loop(data_queue, ordered_data_queue, mem_list,
                 continue
             if c < 0:
                 break
-            if mem_index is not None:
+            if type(mem_index) is tuple:
+                data = _in_slot
+            elif mem_index is not None:
                 data = _unpack(data, mem_list[mem_index])
                 unused_mem_queue.put(mem_index)
             if c != cnt:
@@ -327,12 +524,28 @@ def _unpack(data, mem):
     return data
 
 
-def _worker(dataset, in_queue, out_queue, mem_list, worker_id):
+def _worker(dataset, in_queue, out_queue, mem_list, worker_id, layout=None,
+            slots=()):
     os.system("taskset -p -c %d %d" % (worker_id % multiprocessing.cpu_count(), os.getpid()))
+    slot_arrays = {}
     while True:
         cnt, mem_index, index = in_queue.get()
         if cnt < 0:
             break
+        if type(mem_index) is tuple:
+            slot, row = mem_index
+            arrays = slot_arrays.get(slot)
+            if arrays is None:
+                arrays = layout.arrays(slots[slot])
+                slot_arrays[slot] = arrays
+            data = dataset[index]
+            if layout.write(arrays, row, data):
+                out_queue.put((cnt, mem_index, None))
+            else:
+                # The example does not fit the layout; send it as is.
+                out_queue.put((cnt, None, data))
+            del data
+            continue
         mem = mem_list[mem_index]
         data = _pack(dataset[index], mem)
         out_queue.put((cnt, mem_index, data))
@@ -467,13 +467,23 @@ class Link(object):
         for name in self._params:
             param = d[name]
             data = serializer(name, param.data)
-            if param.data is None and data is not None:
+            if data is None or data is param.data:
+                continue
+            if param.data is None:
                 # Initialize the variable here
                 param.initialize(data.shape)
-                if isinstance(param.data, numpy.ndarray):
-                    numpy.copyto(param.data, data)
-                else:
-                    param.data.set(numpy.asarray(data))
+            elif not isinstance(data, numpy.memmap):
+                # The deserializer has filled the array in place
+                continue
+            if (isinstance(data, numpy.memmap) and
+                    isinstance(param.data, numpy.ndarray) and
+                    data.dtype == param.data.dtype):
+                # Share the array mapped from the file (see load_mapped)
+                param.data = data
+            elif isinstance(param.data, numpy.ndarray):
+                numpy.copyto(param.data, data)
+            else:
+                param.data.set(numpy.asarray(data))
         for name in self._persistent:
             d[name] = serializer(name, d[name])
 
@@ -3,6 +3,7 @@ import numpy
 from chainer.functions.connection import convolution_2d
 from chainer import initializers
 from chainer import link
+from chainer.utils import conv
 
 
 class Convolution2D(link.Link):
@@ -90,7 +91,8 @@ class Convolution2D(link.Link):
 
         """
         if self.W.data is None:
-            self._initialize_params(x.shape[1])
+            self._initialize_params(
+                x.shape[3] if conv.channels_last() else x.shape[1])
         return convolution_2d.convolution_2d(
             x, self.W, self.b, self.stride, self.pad,
             deterministic=self.deterministic)
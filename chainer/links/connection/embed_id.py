@@ -20,6 +20,11 @@ class EmbedID(link.Link):
             ``cupy.ndarray`` and edits its value.
         ignore_label (int or None): If ``ignore_label`` is an int value,
             ``i``-th column of return value is filled with ``0``.
+        sparse_grad (bool): If ``True``, the gradient of ``W`` is a
+            :class:`~chainer.SparseGrad` holding only the rows of the given
+            IDs on CPU. :class:`~chainer.optimizers.MomentumSGD`,
+            :class:`~chainer.optimizers.Adam` and
+            :class:`~chainer.optimizers.AdaGrad` then update only these rows.
 
     .. seealso:: :func:`chainer.functions.embed_id`
 
@@ -29,13 +34,16 @@ class EmbedID(link.Link):
     """
 
     ignore_label = None
+    sparse_grad = False
 
-    def __init__(self, in_size, out_size, initialW=None, ignore_label=None):
+    def __init__(self, in_size, out_size, initialW=None, ignore_label=None,
+                 sparse_grad=False):
         super(EmbedID, self).__init__()
         if initialW is None:
             initialW = initializers.Normal(1.0)
         self.add_param('W', (in_size, out_size), initializer=initialW)
         self.ignore_label = ignore_label
+        self.sparse_grad = sparse_grad
 
     def __call__(self, x):
         """Extracts the word embedding of given IDs.
@@ -47,4 +55,5 @@ class EmbedID(link.Link):
             ~chainer.Variable: Batch of corresponding embeddings.
 
         """
-        return embed_id.embed_id(x, self.W, ignore_label=self.ignore_label)
+        return embed_id.embed_id(x, self.W, ignore_label=self.ignore_label,
+                                 sparse_grad=self.sparse_grad)
@@ -6,6 +6,7 @@ import six
 from chainer import cuda
 from chainer import function
 from chainer import link
+from chainer.utils import array
 from chainer.utils import type_check
 
 
@@ -122,45 +123,42 @@ class BinaryHierarchicalSoftmaxFunction(function.Function):
         self.codes = cuda.to_cpu(self.codes)
         self.begins = cuda.to_cpu(self.begins)
 
+    def _gather_paths(self, t):
+        # Pads the paths of the examples to the longest one. Padded nodes
+        # have zero codes, so that they have no gradients.
+        begins = self.begins[t]
+        lengths = self.begins[t + 1] - begins
+        steps = numpy.arange(lengths.max() if len(t) else 0)
+        mask = steps < lengths[:, None]
+        positions = numpy.where(mask, begins[:, None] + steps, 0)
+        nodes = self.paths[positions]
+        codes = numpy.where(mask, self.codes[positions], 0)
+        return nodes, codes, mask
+
     def forward_cpu(self, inputs):
         x, t, W = inputs
 
-        loss = numpy.float32(0.0)
-        for ix, it in six.moves.zip(x, t):
-            loss += self._forward_cpu_one(ix, it, W)
-        return numpy.array(loss),
-
-    def _forward_cpu_one(self, x, t, W):
-        begin = self.begins[t]
-        end = self.begins[t + 1]
-
-        w = W[self.paths[begin:end]]
-        wxy = w.dot(x) * self.codes[begin:end]
+        nodes, codes, mask = self._gather_paths(t)
+        wxy = numpy.matmul(W[nodes], x[:, :, None])[:, :, 0]
+        wxy *= codes
         loss = numpy.logaddexp(0.0, -wxy)  # == log(1 + exp(-wxy))
-        return numpy.sum(loss)
+        self.wxy = wxy
+        return numpy.array(loss[mask].sum(dtype=numpy.float32)),
 
     def backward_cpu(self, inputs, grad_outputs):
         x, t, W = inputs
         gloss, = grad_outputs
-        gx = numpy.empty_like(x)
+
+        nodes, codes, mask = self._gather_paths(t)
+        g = -gloss * codes / (1.0 + numpy.exp(self.wxy))
+        g = g.astype(numpy.float32, copy=False)
+        gx = numpy.matmul(g[:, None, :], W[nodes])[:, 0]
+        rows, steps = numpy.nonzero(mask)
         gW = numpy.zeros_like(W)
-        for i, (ix, it) in enumerate(six.moves.zip(x, t)):
-            gx[i] = self._backward_cpu_one(ix, it, W, gloss, gW)
+        array.scatter_add(
+            gW, nodes[rows, steps], g[rows, steps, None] * x[rows])
         return gx, None, gW
 
-    def _backward_cpu_one(self, x, t, W, gloss, gW):
-        begin = self.begins[t]
-        end = self.begins[t + 1]
-
-        path = self.paths[begin:end]
-        w = W[path]
-        wxy = w.dot(x) * self.codes[begin:end]
-        g = -gloss * self.codes[begin:end] / (1.0 + numpy.exp(wxy))
-        gx = g.dot(w)
-        gw = g.reshape((g.shape[0], 1)).dot(x.reshape(1, x.shape[0]))
-        gW[path] += gw
-        return gx
-
     def forward_gpu(self, inputs):
         x, t, W = inputs
         max_length = cuda.reduce(
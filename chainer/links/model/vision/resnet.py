@@ -26,6 +26,7 @@ from chainer.links.connection.convolution_2d import Convolution2D
 from chainer.links.connection.linear import Linear
 from chainer.links.normalization.batch_normalization import BatchNormalization
 from chainer.serializers import npz
+from chainer.utils import conv
 from chainer.utils import imgproc
 from chainer.variable import Variable
 
@@ -232,7 +233,9 @@ def prepare(image, size=(224, 224)):
             If ``None``, the given image is not resized.
 
     Returns:
-        numpy.ndarray: The converted output array.
+        numpy.ndarray: The converted output array, of shape
+        ``(channels, height, width)``, or ``(height, width, channels)`` if
+        ``chainer.config.image_layout`` is ``'NHWC'``.
 
     """
 
@@ -258,7 +261,8 @@ def prepare(image, size=(224, 224)):
     #       value used in ResNet is slightly different from that of VGG16.
     image -= numpy.array(
         [103.063,  115.903,  123.152], dtype=numpy.float32)
-    image = image.transpose((2, 0, 1))
+    if not conv.channels_last():
+        image = image.transpose((2, 0, 1))
     return image
 
 
@@ -372,7 +376,10 @@ class BottleneckB(link.Chain):
 
 
 def _global_average_pooling_2d(x):
-    n, channel, rows, cols = x.data.shape
+    if conv.channels_last():
+        n, rows, cols, channel = x.data.shape
+    else:
+        n, channel, rows, cols = x.data.shape
     h = average_pooling_2d(x, (rows, cols), stride=1)
     h = reshape(h, (n, channel))
     return h
@@ -16,6 +16,7 @@ from chainer import function
 from chainer.functions.activation.relu import relu
 from chainer.functions.activation.softmax import softmax
 from chainer.functions.array.reshape import reshape
+from chainer.functions.array.transpose import transpose
 from chainer.functions.math.sum import sum
 from chainer.functions.noise.dropout import dropout
 from chainer.functions.pooling.max_pooling_2d import max_pooling_2d
@@ -25,6 +26,7 @@ from chainer import link
 from chainer.links.connection.convolution_2d import Convolution2D
 from chainer.links.connection.linear import Linear
 from chainer.serializers import npz
+from chainer.utils import conv
 from chainer.utils import imgproc
 from chainer.variable import Variable
 
@@ -129,7 +131,7 @@ class VGG16Layers(link.Chain):
             ('conv5_2', [self.conv5_2, relu]),
             ('conv5_3', [self.conv5_3, relu]),
             ('pool5', [_max_pooling_2d]),
-            ('fc6', [self.fc6, relu, dropout]),
+            ('fc6', [_to_nchw, self.fc6, relu, dropout]),
             ('fc7', [self.fc7, relu, dropout]),
             ('fc8', [self.fc8]),
             ('prob', [softmax]),
@@ -259,7 +261,9 @@ def prepare(image, size=(224, 224)):
             If ``None``, the given image is not resized.
 
     Returns:
-        numpy.ndarray: The converted output array.
+        numpy.ndarray: The converted output array, of shape
+        ``(channels, height, width)``, or ``(height, width, channels)`` if
+        ``chainer.config.image_layout`` is ``'NHWC'``.
 
     """
 
@@ -281,7 +285,8 @@ def prepare(image, size=(224, 224)):
     image = image[:, :, ::-1]
     image -= numpy.array(
         [103.939, 116.779, 123.68], dtype=numpy.float32)
-    image = image.transpose((2, 0, 1))
+    if not conv.channels_last():
+        image = image.transpose((2, 0, 1))
     return image
 
 
@@ -289,6 +294,13 @@ def _max_pooling_2d(x):
     return max_pooling_2d(x, ksize=2)
 
 
+def _to_nchw(x):
+    # fc6 is trained on the features of pool5 flattened in NCHW.
+    if conv.channels_last():
+        x = transpose(x, (0, 3, 1, 2))
+    return x
+
+
 def _make_npz(path_npz, url, model):
     path_caffemodel = download.cached_download(url)
     print('Now loading caffemodel (usually it may take few minutes)')
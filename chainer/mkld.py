@@ -1,3 +1,5 @@
+import contextlib
+
 import numpy
 
 import chainer
@@ -11,6 +13,7 @@ try:
     from mkldnn.mdarray import mdarray
     from mkldnn.chainer import basic_math
     from mkldnn.chainer import fanout
+    from mkldnn.chainer import layout
     from mkldnn.chainer import runtime
     from mkldnn.chainer import sum
     # Modules listed depend on chainer.
@@ -34,6 +37,165 @@ except Exception as ex:
         pass
 
 
+@contextlib.contextmanager
+def _null_scope():
+    yield
+
+
+def primitive_cache_scope(scope):
+    """Tags mkldnn primitives created in this context with ``scope``.
+
+    Use one scope per model when several models run in the same process, so
+    that their primitives do not evict each other and can be released with
+    :func:`clear_primitive_cache`.
+
+    Args:
+        scope: Any object identifying the model, e.g. the
+            :class:`~chainer.Chain` itself or a string.
+
+    """
+    if not available:
+        return _null_scope()
+    return mkldnn.compute_complex.cache_scope(scope)
+
+
+def clear_primitive_cache(scope=None):
+    """Drops cached mkldnn primitives.
+
+    Args:
+        scope: If given, only the primitives created under
+            :func:`primitive_cache_scope` with this scope are dropped.
+            Otherwise the whole cache is cleared.
+
+    """
+    if not available:
+        return
+    if scope is None:
+        mkldnn.compute_complex.clear_cache()
+    else:
+        mkldnn.compute_complex.clear_cache(scope)
+
+
+def set_primitive_cache_capacity(capacity):
+    """Sets the number of primitives kept per forward/backward cache.
+
+    The default is taken from the ``CHAINER_MKLDNN_CACHE_CAPACITY``
+    environment variable (1024 if unset). A non-positive value disables
+    eviction.
+    """
+    if available:
+        mkldnn.compute_complex.set_cache_capacity(capacity)
+
+
+def primitive_cache_stats():
+    """Returns hit/miss/eviction counters of the mkldnn primitive caches.
+
+    Returns:
+        dict: Maps each cache type (``'f'``, ``'bd'``, ``'bw'``) to a dict
+        with ``hits``, ``misses``, ``evictions``, ``size`` and ``capacity``.
+
+    """
+    if not available:
+        return {}
+    return mkldnn.compute_complex.cache_stats()
+
+
+def batched_stream():
+    """Shares one mkldnn stream among the mkldnn ops run in this context.
+
+    Primitives of consecutive mkldnn functions are queued and executed with a
+    single wait, when a non-mkldnn function needs their results or when the
+    context exits. :meth:`Variable.backward` uses this automatically when
+    ``chainer.config.mkldnn_batch_stream`` is ``True``; wrap the forward
+    computation of a model to batch it as well::
+
+        with chainer.mkld.batched_stream():
+            loss = model(x, t)
+
+    Results of mkldnn functions must not be read outside of functions (e.g.
+    by ``numpy.asarray(y.data)``) before the context exits or
+    :func:`flush_stream` is called.
+    """
+    if not available:
+        return _null_scope()
+    return runtime.batched_stream()
+
+
+def flush_stream():
+    """Executes the mkldnn primitives queued by :func:`batched_stream`."""
+    if available:
+        runtime.flush_stream()
+
+
+def prepare_function(func, arrays, hooks, direction='forward'):
+    """Prepares the mkldnn runtime before ``func`` runs.
+
+    It decides whether ``func`` may queue its primitives on the stream batch
+    of :func:`batched_stream`, and attributes memory format conversions to it
+    while :func:`count_layouts` is active.
+
+    Functions declaring ``mkldnn_deferrable = True`` only feed mkldnn
+    primitives with their inputs. Any other function (or any function observed
+    by hooks) may read its input arrays, so pending primitives are flushed
+    before it runs. Blocked-format inputs of functions that are neither
+    deferrable nor declare ``mkldnn_native = True`` are counted as
+    conversions to plain arrays.
+
+    Args:
+        func (~chainer.Function): Function about to run.
+        arrays: Arrays read by the function (inputs, and output gradients on
+            backward).
+        hooks: Function hooks applied to the call.
+        direction (str): ``'forward'`` or ``'backward'``.
+
+    """
+    counter = layout.current_counter()
+    if counter is not None:
+        layout.observe_function(counter, func, arrays, direction)
+
+    batch = runtime.current_batch()
+    if batch is None:
+        return
+    deferrable = (not hooks and not chainer.is_debug() and
+                  getattr(func, 'mkldnn_deferrable', False))
+    batch.deferring = deferrable
+    if not deferrable:
+        batch.flush()
+
+
+def memory_format(x):
+    """Returns the memory format of an array as a string.
+
+    Numpy arrays are reported as ``'plain'``, :class:`mdarray` objects by
+    their mkldnn format name such as ``'nChw8c'``.
+    """
+    if not available or not isinstance(x, mdarray):
+        return 'plain'
+    return layout.memory_format(x)
+
+
+def count_layouts():
+    """Counts memory format conversions made in this context.
+
+    Both reorders between mkldnn layers and conversions of blocked
+    :class:`mdarray` inputs read by numpy functions are counted, together
+    with the bytes they copy, per function and direction::
+
+        with chainer.mkld.count_layouts() as counter:
+            loss = model(x, t)
+            loss.backward()
+        counter.report()
+
+    Returns:
+        A context manager yielding a ``LayoutCounter``, or ``None`` if mkldnn
+        is not available.
+
+    """
+    if not available:
+        return _null_scope()
+    return layout.count_layouts()
+
+
 def all_ready(inputs, check_with_ndim):
     # Check whether mkldnn installed
     if not available:
@@ -54,6 +216,10 @@ def all_ready(inputs, check_with_ndim):
                                  chainer.should_use_mkldnn('>=auto')
         if not _should_use_mkldnn:
             return False
+        # mkldnn reads the images in NCHW
+        if _inputs[0].ndim == 4 and \
+                chainer.config.image_layout != 'NCHW':
+            return False
     # cuda.ndarray
     else:
         return False
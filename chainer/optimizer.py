@@ -9,11 +9,14 @@ import chainer
 from chainer import cuda
 import chainer.link as link_module
 import chainer.serializer as serializer_module
+from chainer import sparse_grad
 
 
 def _sum_sqnorm(arr):
     sq_sum = collections.defaultdict(float)
     for x in arr:
+        if isinstance(x, sparse_grad.SparseGrad):
+            x = x.coalesce().values
         with cuda.get_device(x) as dev:
             x = x.ravel()
             s = x.dot(x)
@@ -98,7 +101,9 @@ class UpdateRule(object):
 
     An implementation of update rule should override :meth:`update_core` or
     its device-dependent variants (i.e., :meth:`update_core_cpu` and
-    :meth:`update_core_gpu`).
+    :meth:`update_core_gpu`). An update rule that can update only the rows
+    given by a :class:`~chainer.SparseGrad` gradient should also override
+    :meth:`update_core_cpu_sparse`.
 
     The state (e.g. a moving average of the gradient) of the update rule is
     stored into the state dictionary. An implementation of update rule using
@@ -194,9 +199,15 @@ class UpdateRule(object):
 
         """
         with cuda.get_device(param.data) as dev:
+            sparse = isinstance(param.grad, sparse_grad.SparseGrad)
             if int(dev) == -1:
-                self.update_core_cpu(param)
+                if sparse:
+                    self.update_core_cpu_sparse(param)
+                else:
+                    self.update_core_cpu(param)
             else:
+                if sparse:
+                    param.grad = cuda.to_gpu(param.grad.to_dense())
                 self.update_core_gpu(param)
 
     def update_core_cpu(self, param):
@@ -221,6 +232,24 @@ class UpdateRule(object):
         """
         raise NotImplementedError
 
+    def update_core_cpu_sparse(self, param):
+        """Updates the parameter on CPU by a sparse gradient.
+
+        It is called instead of :meth:`update_core_cpu` if the gradient of the
+        parameter is a :class:`~chainer.SparseGrad`. The default
+        implementation replaces the gradient with the dense array and calls
+        :meth:`update_core_cpu`. An implementation can override it to update
+        only the rows of the gradient, i.e. to apply the update lazily: the
+        rows not used in the minibatch keep both their values and their
+        states.
+
+        Args:
+            param (~chainer.Variable): Variable to be updated.
+
+        """
+        param.grad = param.grad.to_dense()
+        self.update_core_cpu(param)
+
     def init_state(self, param):
         """Initializes the state.
 
@@ -443,6 +472,134 @@ class Optimizer(object):
                 rule.serialize(serializer[name])
 
 
+class _FusedParams(object):
+
+    # Parameters of the target link packed into flat arrays by dtype for the
+    # fused update of GradientMethod. The data, the gradient and the state of
+    # each packed parameter are replaced with views of the flat arrays of its
+    # group, and the hooks and one update rule run on each flat array at once.
+    # The other parameters (e.g. with their own hooks or hyperparameters, or
+    # on GPU) are updated one by one as usual.
+
+    def __init__(self, opt):
+        self.groups = []
+        self.others = []
+        rule_type = type(opt.create_update_rule())
+        by_dtype = collections.OrderedDict()
+        for param in opt.target.params():
+            rule = param.update_rule
+            if type(param.data) is numpy.ndarray and \
+                    type(rule) is rule_type and rule.enabled and \
+                    not rule._hooks and \
+                    rule.hyperparam._parent is opt.hyperparam and \
+                    len(rule.hyperparam.__dict__) == 1:
+                by_dtype.setdefault(param.dtype, []).append(param)
+            else:
+                self.others.append(param)
+        self.uninitialized = [p for p in self.others if p.data is None]
+
+        for params in six.itervalues(by_dtype):
+            group = _FusedGroup(params, opt.create_update_rule())
+            if group.pack():
+                self.groups.append(group)
+            else:
+                self.others += params
+
+    def gather(self):
+        # Copies the gradients into the flat arrays. Returns False if the
+        # parameters have been changed since they were packed.
+        if any(p.data is not None for p in self.uninitialized):
+            return False
+        for group in self.groups:
+            if not group.gather():
+                return False
+        return True
+
+    def grads(self):
+        return [g.var.grad for g in self.groups] + \
+            [p.grad for p in self.others if p.data is not None]
+
+
+class _FusedGroup(object):
+
+    def __init__(self, params, rule):
+        self.params = params
+        self.rules = [param.update_rule for param in params]
+        self.rule = rule
+        self.rule.t = max(r.t for r in self.rules)
+
+        size = sum(param.size for param in params)
+        dtype = params[0].dtype
+        self.var = chainer.Variable(numpy.empty(size, dtype),
+                                    grad=numpy.zeros(size, dtype))
+        self.data = self._views(self.var.data)
+        self.grad = self._views(self.var.grad)
+
+    def _views(self, flat):
+        views = []
+        offset = 0
+        for param in self.params:
+            views.append(
+                flat[offset:offset + param.size].reshape(param.shape))
+            offset += param.size
+        return views
+
+    def pack(self):
+        rule = self.rule
+        rule._state = {}
+        rule.init_state(self.var)
+        size = self.var.size
+        for value in six.itervalues(rule.state):
+            if not isinstance(value, numpy.ndarray) or \
+                    value.shape != (size,):
+                return False
+
+        states = [self._views(value) for value in six.itervalues(rule.state)]
+        for i, (param, r) in enumerate(six.moves.zip(self.params,
+                                                     self.rules)):
+            numpy.copyto(self.data[i], param.data)
+            param.data = self.data[i]
+            state = {}
+            for key, views in six.moves.zip(rule.state, states):
+                if r.state is not None and key in r.state:
+                    numpy.copyto(views[i], cuda.to_cpu(r.state[key]))
+                state[key] = views[i]
+            r._state = state
+        self.state = dict(rule.state)
+        return True
+
+    def gather(self):
+        for param, rule, data, grad in six.moves.zip(
+                self.params, self.rules, self.data, self.grad):
+            if param.data is not data or param.update_rule is not rule or \
+                    not rule.enabled or rule._hooks:
+                return False
+            g = param.grad
+            if g is grad:
+                continue
+            if g is None:
+                grad.fill(0)
+            else:
+                if isinstance(g, sparse_grad.SparseGrad):
+                    g = g.to_dense()
+                numpy.copyto(grad, g)
+            param.grad = grad
+        return True
+
+    def update(self):
+        for rule in self.rules:
+            rule.t += 1
+        self.rule.t += 1
+        self.rule.update_core(self.var)
+        # Some update rules replace the state arrays instead of updating them
+        # in place. The new values are copied back to keep the views valid.
+        state = self.rule.state
+        for key, value in six.iteritems(self.state):
+            if state[key] is not value:
+                numpy.copyto(value, state[key])
+                state[key] = value
+
+
 class GradientMethod(Optimizer):
     """Base class of all single gradient-based optimizers.
 
@@ -462,6 +619,8 @@ class GradientMethod(Optimizer):
     provide such an alias to each attribute. It can be done by only adding one
     line for each attribute using :class:`HyperparameterProxy`.
 
+    The update can be fused over the parameters by :meth:`use_fused_update`.
+
     Attributes:
         hyperparam (Hyperparameter): The hyperparameter of the gradient
             method. It is used as the default configuration of each update
@@ -473,9 +632,12 @@ class GradientMethod(Optimizer):
     def __init__(self):
         super(GradientMethod, self).__init__()
         self.hyperparam = Hyperparameter()
+        self._use_fused_update = False
+        self._fused = None
 
     def setup(self, link):
         super(GradientMethod, self).setup(link)
+        self._fused = None
         for param in link.params():
             param.update_rule = self.create_update_rule()
 
@@ -504,6 +666,10 @@ class GradientMethod(Optimizer):
             loss.backward()
             del loss
 
+        if getattr(self, '_use_fused_update', False):
+            self._update_fused()
+            return
+
         # TODO(unno): Some optimizers can skip this process if they does not
         # affect to a parameter when its gradient is zero.
         for name, param in self.target.namedparams(False):
@@ -518,6 +684,62 @@ class GradientMethod(Optimizer):
         for param in self.target.params():
             param.update()
 
+    def _update_fused(self):
+        fused = self._fused
+        if fused is None or not fused.gather():
+            fused = self._fused = _FusedParams(self)
+            fused.gather()
+        for param in fused.others:
+            if param.data is not None and param.grad is None:
+                with cuda.get_device(param.data):
+                    xp = cuda.get_array_module(param.data)
+                    param.grad = xp.zeros_like(param.data)
+
+        self.call_hooks()
+
+        self.t += 1
+        for group in fused.groups:
+            group.update()
+        for param in fused.others:
+            param.update()
+
+    def _call_hook(self, hook):
+        fused = self._fused
+        if fused is None or not getattr(hook, 'call_for_each_param', False):
+            super(GradientMethod, self)._call_hook(hook)
+            return
+        for group in fused.groups:
+            hook(group.rule, group.var)
+        for param in fused.others:
+            hook(param.update_rule, param)
+
+    def use_fused_update(self, use=True):
+        """Enables or disables the fused update of the parameters on CPU.
+
+        In the fused update, the parameters of the target link are packed
+        into one contiguous array for each dtype on the first :meth:`update`.
+        Their gradients and the states of their update rules (e.g. the
+        moments of Adam) are packed likewise, and each parameter, its
+        gradient and its state become views of the packed arrays. Each
+        update then copies the gradients into the packed array and runs the
+        hook functions and the update rule once on the packed arrays instead
+        of once for each parameter, which saves the overhead of many small
+        parameters.
+
+        Parameters on GPU and the ones whose update rules have their own hook
+        functions or hyperparameters are updated separately as usual.
+        :class:`~chainer.SparseGrad` gradients are made dense. The packed
+        arrays are rebuilt if a parameter is replaced or the update rule is
+        changed. The states are still serialized for each parameter, so that
+        a snapshot can be loaded regardless of this mode.
+
+        Args:
+            use (bool): If ``True``, the fused update is enabled.
+
+        """
+        self._use_fused_update = use
+        self._fused = None
+
     def use_cleargrads(self, use=True):
         """Enables or disables use of :func:`~chainer.Link.cleargrads` in `update`.
 
@@ -584,7 +806,8 @@ class WeightDecay(object):
     """Optimizer/UpdateRule hook function for weight decay regularization.
 
     This hook function adds a scaled parameter to the corresponding gradient.
-    It can be used as a regularization.
+    It can be used as a regularization. For a :class:`~chainer.SparseGrad`
+    gradient, only the rows of the gradient are decayed.
 
     Args:
         rate (float): Coefficient for the weight decay.
@@ -601,6 +824,10 @@ class WeightDecay(object):
 
     def __call__(self, rule, param):
         p, g = param.data, param.grad
+        if isinstance(g, sparse_grad.SparseGrad):
+            g = g.coalesce()
+            g.values += self.rate * p[g.indices]
+            return
         with cuda.get_device(p) as dev:
             if int(dev) == -1:
                 g += self.rate * p
@@ -614,7 +841,8 @@ class Lasso(object):
     """Optimizer/UpdateRule hook function for Lasso regularization.
 
     This hook function adds a scaled parameter to the sign of each weight.
-    It can be used as a regularization.
+    It can be used as a regularization. For a :class:`~chainer.SparseGrad`
+    gradient, only the rows of the gradient are regularized.
 
     Args:
         rate (float): Coefficient for the weight decay.
@@ -632,6 +860,10 @@ class Lasso(object):
     def __call__(self, rule, param):
         p, g = param.data, param.grad
         xp = cuda.get_array_module(p)
+        if isinstance(g, sparse_grad.SparseGrad):
+            g = g.coalesce()
+            g.values += self.rate * xp.sign(p[g.indices])
+            return
         with cuda.get_device(p) as dev:
             sign = xp.sign(p)
             if int(dev) == -1:
@@ -646,7 +878,8 @@ class GradientClipping(object):
     """Optimizer hook function for gradient clipping.
 
     This hook function scales all gradient arrays to fit to the defined L2 norm
-    threshold.
+    threshold. The norm of a :class:`~chainer.SparseGrad` gradient is the norm
+    of its rows after summing up duplicate indices.
 
     Args:
         threshold (float): L2 norm threshold.
@@ -661,12 +894,15 @@ class GradientClipping(object):
         self.threshold = threshold
 
     def __call__(self, opt):
-        norm = numpy.sqrt(_sum_sqnorm(
-            [p.grad for p in opt.target.params(False)]))
+        fused = getattr(opt, '_fused', None)
+        if fused is None:
+            grads = [p.grad for p in opt.target.params(False)]
+        else:
+            grads = fused.grads()
+        norm = numpy.sqrt(_sum_sqnorm(grads))
         rate = self.threshold / norm
         if rate < 1:
-            for param in opt.target.params(False):
-                grad = param.grad
+            for grad in grads:
                 with cuda.get_device(grad):
                     grad *= rate
 
@@ -708,6 +944,9 @@ class GradientNoise(object):
 
     def __call__(self, rule, param):
         g = param.grad
+        if isinstance(g, sparse_grad.SparseGrad):
+            # The noise is added to every element.
+            g = param.grad = g.to_dense()
         xp = cuda.get_array_module(g)
         with cuda.get_device(g) as dev:
             noise = self.noise_func(xp, g.shape, g.dtype, self, rule)
@@ -744,6 +983,8 @@ class GradientHardClipping(object):
 
     def __call__(self, rule, param):
         grad = param.grad
+        if isinstance(grad, sparse_grad.SparseGrad):
+            grad = grad.coalesce().values
         xp = cuda.get_array_module(grad)
         with cuda.get_device(grad):
             xp.clip(grad, self.lower_bound, self.upper_bound, out=grad)
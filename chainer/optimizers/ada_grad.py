@@ -46,8 +46,24 @@ class AdaGradRule(optimizer.UpdateRule):
         eps = self.hyperparam.eps
         h = self.state['h']
 
-        h += grad * grad
-        param.data -= lr * grad / (numpy.sqrt(h) + eps)
+        tmp = numpy.empty_like(h)
+        numpy.multiply(grad, grad, out=tmp)
+        h += tmp
+        numpy.sqrt(h, out=tmp)
+        tmp += eps
+        numpy.divide(grad, tmp, out=tmp)
+        tmp *= lr
+        param.data -= tmp
+
+    def update_core_cpu_sparse(self, param):
+        grad = param.grad.coalesce()
+        rows, g = grad.indices, grad.values
+        h = self.state['h'][rows]
+
+        h += g * g
+        self.state['h'][rows] = h
+        param.data[rows] -= self.hyperparam.lr * g / (
+            numpy.sqrt(h) + self.hyperparam.eps)
 
     def update_core_gpu(self, param):
         grad = param.grad
@@ -68,6 +84,10 @@ class AdaGrad(optimizer.GradientMethod):
 
     See: http://jmlr.org/papers/v12/duchi11a.html
 
+    A parameter with a :class:`~chainer.SparseGrad` gradient is updated only
+    on the rows of the gradient on CPU, which gives the same result as the
+    dense update.
+
     Args:
         lr (float): Learning rate.
         eps (float): Small value for the numerical stability.
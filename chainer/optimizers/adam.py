@@ -56,9 +56,32 @@ class AdamRule(optimizer.UpdateRule):
         hp = self.hyperparam
         m, v = self.state['m'], self.state['v']
 
-        m += (1 - hp.beta1) * (grad - m)
-        v += (1 - hp.beta2) * (grad * grad - v)
-        param.data -= self.lr * m / (numpy.sqrt(v) + hp.eps)
+        # One temporary array is reused through the update.
+        tmp = numpy.empty_like(m)
+        numpy.subtract(grad, m, out=tmp)
+        tmp *= 1 - hp.beta1
+        m += tmp
+        numpy.multiply(grad, grad, out=tmp)
+        tmp -= v
+        tmp *= 1 - hp.beta2
+        v += tmp
+        numpy.sqrt(v, out=tmp)
+        tmp += hp.eps
+        numpy.divide(m, tmp, out=tmp)
+        tmp *= self.lr
+        param.data -= tmp
+
+    def update_core_cpu_sparse(self, param):
+        grad = param.grad.coalesce()
+        hp = self.hyperparam
+        rows = grad.indices
+        m, v = self.state['m'][rows], self.state['v'][rows]
+
+        m += (1 - hp.beta1) * (grad.values - m)
+        v += (1 - hp.beta2) * (grad.values * grad.values - v)
+        self.state['m'][rows] = m
+        self.state['v'][rows] = v
+        param.data[rows] -= self.lr * m / (numpy.sqrt(v) + hp.eps)
 
     def update_core_gpu(self, param):
         grad = param.grad
@@ -87,6 +110,10 @@ class Adam(optimizer.GradientMethod):
 
     See: http://arxiv.org/abs/1412.6980v8
 
+    A parameter with a :class:`~chainer.SparseGrad` gradient is updated
+    lazily on CPU: only the rows of the gradient and their moments are
+    updated. The bias correction still depends on the number of all updates.
+
     Args:
         alpha (float): Step size.
         beta1 (float): Exponential decay rate of the first order moment.
@@ -44,6 +44,15 @@ class MomentumSGDRule(optimizer.UpdateRule):
         v -= self.hyperparam.lr * grad
         param.data += v
 
+    def update_core_cpu_sparse(self, param):
+        grad = param.grad.coalesce()
+        rows = grad.indices
+        v = self.state['v'][rows]
+        v *= self.hyperparam.momentum
+        v -= self.hyperparam.lr * grad.values
+        self.state['v'][rows] = v
+        param.data[rows] += v
+
     def update_core_gpu(self, param):
         grad = param.grad
         if grad is None:
@@ -62,6 +71,10 @@ class MomentumSGD(optimizer.GradientMethod):
 
     """Momentum SGD optimizer.
 
+    A parameter with a :class:`~chainer.SparseGrad` gradient is updated
+    lazily on CPU: only the rows of the gradient are updated, and the momentum
+    of the other rows is kept as is instead of being decayed.
+
     Args:
         lr (float): Learning rate.
         momentum (float): Exponential decay rate of the first order moment.
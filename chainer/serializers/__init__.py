@@ -1,4 +1,5 @@
 from chainer.serializers import hdf5  # NOQA
+from chainer.serializers import mapped  # NOQA
 from chainer.serializers import npz  # NOQA
 
 
@@ -6,6 +7,11 @@ from chainer.serializers.hdf5 import HDF5Deserializer  # NOQA
 from chainer.serializers.hdf5 import HDF5Serializer  # NOQA
 from chainer.serializers.hdf5 import load_hdf5  # NOQA
 from chainer.serializers.hdf5 import save_hdf5  # NOQA
+from chainer.serializers.mapped import load_mapped  # NOQA
+from chainer.serializers.mapped import MappedDeserializer  # NOQA
+from chainer.serializers.mapped import MappedFile  # NOQA
+from chainer.serializers.mapped import MappedSerializer  # NOQA
+from chainer.serializers.mapped import save_mapped  # NOQA
 from chainer.serializers.npz import DictionarySerializer  # NOQA
 from chainer.serializers.npz import load_npz  # NOQA
 from chainer.serializers.npz import NpzDeserializer  # NOQA
@@ -0,0 +1,261 @@
+import collections
+import json
+import struct
+
+import numpy
+
+from chainer import cuda
+from chainer import serializer
+
+
+_MAGIC = b'\x93CHAINER'
+_VERSION = 1
+# magic, version, alignment, offset and length of the index
+_HEADER = struct.Struct('<8sIIQQ')
+_ALIGNMENT = 64
+
+
+class MappedSerializer(serializer.Serializer):
+
+    """Serializer for the memory-mappable format.
+
+    It writes each array to the file as soon as it is serialized, so that no
+    copy of the whole object is built in memory, unlike
+    :class:`DictionarySerializer`. The arrays are stored uncompressed and
+    aligned to 64 bytes, followed by an index of their keys, dtypes, shapes
+    and offsets. The fixed-size header at the beginning of the file locates
+    the index. The file can be read by :class:`MappedFile`.
+
+    :meth:`finalize` must be called after all the objects are serialized to
+    write the index.
+
+    Args:
+        file: File object opened in binary mode for writing. It must be
+            seekable.
+        path (str): The base path in the hierarchy that this serializer
+            indicates.
+        index (dict): The index shared with the parent serializer. If it is
+            ``None``, the header is written to ``file`` and a new index is
+            created.
+
+    """
+
+    def __init__(self, file, path='', index=None):
+        self.file = file
+        self.path = path
+        if index is None:
+            index = collections.OrderedDict()
+            file.write(_HEADER.pack(_MAGIC, _VERSION, _ALIGNMENT, 0, 0))
+        self.index = index
+
+    def __getitem__(self, key):
+        key = key.strip('/')
+        return MappedSerializer(self.file, self.path + key + '/', self.index)
+
+    def __call__(self, key, value):
+        key = key.lstrip('/')
+        ret = value
+        if isinstance(value, cuda.ndarray):
+            value = value.get()
+        arr = numpy.asarray(value)
+        if arr.dtype.hasobject or arr.dtype.fields is not None:
+            raise ValueError(
+                'cannot serialize an array of dtype {} to {}'.format(
+                    arr.dtype, self.path + key))
+        offset = self._align()
+        self.file.write(numpy.ascontiguousarray(arr).data)
+        self.index[self.path + key] = {
+            'dtype': arr.dtype.str, 'shape': arr.shape, 'offset': offset}
+        return ret
+
+    def _align(self):
+        position = self.file.tell()
+        padding = -position % _ALIGNMENT
+        self.file.write(b'\0' * padding)
+        return position + padding
+
+    def finalize(self):
+        """Writes the index and the header."""
+        offset = self._align()
+        index = json.dumps(self.index).encode('utf-8')
+        self.file.write(index)
+        self.file.seek(0)
+        self.file.write(_HEADER.pack(
+            _MAGIC, _VERSION, _ALIGNMENT, offset, len(index)))
+        self.file.seek(0, 2)
+
+
+def save_mapped(filename, obj):
+    """Saves an object to the file in the memory-mappable format.
+
+    This is a short-cut function to save only one object into a file that
+    can be loaded by :func:`load_mapped`. The arrays are not compressed.
+
+    Args:
+        filename (str): Target file name.
+        obj: Object to be serialized. It must support serialization protocol.
+
+    """
+    with open(filename, 'wb') as f:
+        s = MappedSerializer(f)
+        s.save(obj)
+        s.finalize()
+
+
+class MappedFile(object):
+
+    """Mapping of the arrays in a file of the memory-mappable format.
+
+    Only the header and the index are read on construction. The file is
+    mapped to the memory by :class:`numpy.memmap` on the first access to an
+    array, and each array is returned as a view of the mapping. Its content
+    is read from the file by the operating system when it is accessed for the
+    first time. As the pages of the file are shared by all the processes that
+    map it, processes loading the same file do not hold copies of the arrays.
+
+    Args:
+        filename (str): Name of the file written by :class:`MappedSerializer`.
+        mode (str): ``'r'`` to map the file read-only, or ``'c'`` to map it
+            copy-on-write, i.e. the arrays are writable and the assignments
+            to them are not written back to the file.
+
+    """
+
+    def __init__(self, filename, mode='r'):
+        if mode not in ('r', 'c'):
+            raise ValueError('mode must be either \'r\' or \'c\'')
+        self.filename = filename
+        self.mode = mode
+        self._map = None
+        with open(filename, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or \
+                    header[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(
+                    '{} is not a file of the memory-mappable format'.format(
+                        filename))
+            _, version, _, offset, length = _HEADER.unpack(header)
+            if version != _VERSION:
+                raise ValueError(
+                    'unsupported version {} of the memory-mappable '
+                    'format'.format(version))
+            f.seek(offset)
+            self.index = json.loads(f.read(length).decode('utf-8'))
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def __getitem__(self, key):
+        entry = self.index[key]
+        dtype = numpy.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        size = int(numpy.prod(shape)) * dtype.itemsize
+        if self._map is None:
+            self._map = numpy.memmap(self.filename, mode=self.mode)
+        offset = entry['offset']
+        return self._map[offset:offset + size].view(dtype).reshape(shape)
+
+    def close(self):
+        """Releases the mapping.
+
+        The arrays already returned keep the file mapped until they are
+        deleted.
+
+        """
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class MappedDeserializer(serializer.Deserializer):
+
+    """Deserializer for the memory-mappable format.
+
+    Unless ``copy`` is ``True``, NumPy arrays are not filled by the values
+    read from the file. Instead, the mapped arrays are returned, which
+    :class:`~chainer.Link` adopts as the data of its parameters and
+    persistent values. Arrays on GPU, arrays of other shapes or dtypes and
+    scalars are copied as :class:`NpzDeserializer` does.
+
+    Args:
+        mapped (MappedFile): The file to read from.
+        path (str): The base path that the deserialization starts from.
+        strict (bool): If ``True``, the deserializer raises an error when an
+            expected value is not found in the given file. Otherwise,
+            it ignores the value and skip deserialization.
+        copy (bool): If ``True``, NumPy arrays are filled by the values read
+            from the file.
+
+    """
+
+    def __init__(self, mapped, path='', strict=True, copy=False):
+        self.mapped = mapped
+        self.path = path
+        self.strict = strict
+        self.copy = copy
+
+    def __getitem__(self, key):
+        key = key.strip('/')
+        return MappedDeserializer(
+            self.mapped, self.path + key + '/', self.strict, self.copy)
+
+    def __call__(self, key, value):
+        key = self.path + key.lstrip('/')
+        if not self.strict and key not in self.mapped:
+            return value
+
+        dataset = self.mapped[key]
+        if value is None:
+            return dataset if not self.copy else numpy.array(dataset)
+        elif isinstance(value, numpy.ndarray):
+            if (not self.copy and value.shape == dataset.shape and
+                    value.dtype == dataset.dtype):
+                return dataset
+            numpy.copyto(value, dataset)
+        elif isinstance(value, cuda.ndarray):
+            value.set(numpy.asarray(dataset))
+        else:
+            value = type(value)(numpy.asarray(dataset))
+        return value
+
+
+def load_mapped(filename, obj, mmap_mode='r'):
+    """Loads an object from the file in the memory-mappable format.
+
+    This is a short-cut function to load from a file written by
+    :func:`save_mapped`. The parameters and persistent arrays of links on CPU
+    are replaced by read-only views of the file mapped to the memory, so that
+    loading does not read the file, and the processes serving the same model
+    share one copy of the parameters in the page cache::
+
+        model = L.VGG16Layers(pretrained_model=None)
+        serializers.load_mapped('vgg16.model', model)
+
+    The read-only parameters cannot be updated by optimizers. Use
+    ``mmap_mode='c'`` or ``None`` to train the loaded model.
+
+    Args:
+        filename (str): Name of the file to be loaded.
+        obj: Object to be deserialized. It must support serialization protocol.
+        mmap_mode (str): ``'r'`` to map the arrays read-only, ``'c'`` to map
+            them copy-on-write, or ``None`` to copy them into the arrays of
+            ``obj`` as :func:`load_npz` does.
+
+    """
+    mode = 'r' if mmap_mode is None else mmap_mode
+    with MappedFile(filename, mode) as f:
+        d = MappedDeserializer(f, copy=mmap_mode is None)
+        d.load(obj)
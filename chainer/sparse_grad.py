@@ -0,0 +1,108 @@
+import numpy
+
+from chainer.utils import array
+
+
+class SparseGrad(object):
+
+    """Gradient array that is nonzero only on some rows.
+
+    A function can return a sparse gradient for an input whose gradient is
+    zero except for a few rows along the first axis, e.g.
+    :class:`~chainer.functions.EmbedIDFunction` for the embedding matrix of a
+    large vocabulary. It holds the indices of the rows and the values of them
+    instead of the whole array, so that the gradient is computed and stored in
+    the size of the rows used in the minibatch.
+
+    Sparse gradients are accumulated by :meth:`Variable.backward` like
+    arrays: the sum of two sparse gradients is a sparse gradient holding the
+    rows of both, and the sum of a sparse gradient and an array is an array.
+    The update rules of :class:`~chainer.optimizers.MomentumSGD`,
+    :class:`~chainer.optimizers.Adam` and :class:`~chainer.optimizers.AdaGrad`
+    update only the given rows of a parameter on CPU (see
+    :meth:`UpdateRule.update_core_cpu_sparse`). The other update rules use the
+    dense array given by :meth:`to_dense`.
+
+    The indices may contain duplicates, whose rows are summed.
+    :meth:`coalesce` sums them up in place.
+
+    Args:
+        indices (numpy.ndarray): 1-D integer array of row indices.
+        values (numpy.ndarray): Values of the rows. Its shape is
+            ``(len(indices),) + shape[1:]``.
+        shape (tuple of ints): Shape of the dense gradient.
+
+    Attributes:
+        indices (numpy.ndarray): Row indices.
+        values (numpy.ndarray): Values of the rows.
+        shape (tuple of ints): Shape of the dense gradient.
+
+    """
+
+    # Lets NumPy arrays defer the binary operators to this class.
+    __array_ufunc__ = None
+
+    def __init__(self, indices, values, shape):
+        self.indices = indices
+        self.values = values
+        self.shape = tuple(shape)
+        self._coalesced = False
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def coalesce(self):
+        """Sums up the rows of duplicate indices in place.
+
+        The indices are sorted and made unique.
+
+        Returns:
+            SparseGrad: This object itself.
+
+        """
+        if not self._coalesced:
+            self.indices, self.values = array.sum_by_index(
+                self.indices, self.values)
+            self._coalesced = True
+        return self
+
+    def to_dense(self):
+        """Returns the gradient as an array.
+
+        Returns:
+            numpy.ndarray: Dense gradient array.
+
+        """
+        dense = numpy.zeros(self.shape, self.dtype)
+        array.scatter_add(dense, self.indices, self.values)
+        return dense
+
+    def copy(self):
+        grad = SparseGrad(self.indices.copy(), self.values.copy(), self.shape)
+        grad._coalesced = self._coalesced
+        return grad
+
+    def __add__(self, other):
+        if isinstance(other, SparseGrad):
+            return SparseGrad(
+                numpy.concatenate((self.indices, other.indices)),
+                numpy.concatenate((self.values, other.values)),
+                self.shape)
+        dense = numpy.array(other)
+        array.scatter_add(dense, self.indices, self.values)
+        return dense
+
+    __radd__ = __add__
+
+    def __imul__(self, other):
+        self.values *= other
+        return self
+
+    def __repr__(self):
+        return 'SparseGrad(shape=%s, dtype=%s, rows=%d)' % (
+            self.shape, self.dtype, len(self.indices))
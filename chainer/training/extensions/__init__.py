@@ -12,12 +12,16 @@ from chainer.training.extensions import value_observation  # NOQA
 
 
 # import class and function
+from chainer.training.extensions._snapshot import AsyncSnapshotWriter  # NOQA
+from chainer.training.extensions._snapshot import load_snapshot  # NOQA
 from chainer.training.extensions._snapshot import snapshot  # NOQA
 from chainer.training.extensions._snapshot import snapshot_object  # NOQA
 from chainer.training.extensions.computational_graph import dump_graph  # NOQA
 from chainer.training.extensions.evaluator import Evaluator  # NOQA
 from chainer.training.extensions.exponential_shift import ExponentialShift  # NOQA
 from chainer.training.extensions.linear_shift import LinearShift  # NOQA
+from chainer.training.extensions.log_report import JSONLinesWriter  # NOQA
+from chainer.training.extensions.log_report import load_json_lines  # NOQA
 from chainer.training.extensions.log_report import LogReport  # NOQA
 from chainer.training.extensions.micro_average import MicroAverage  # NOQA
 from chainer.training.extensions.plot_report import PlotReport  # NOQA
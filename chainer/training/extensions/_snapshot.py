@@ -1,12 +1,22 @@
+import collections
+import hashlib
+import json
 import os
 import shutil
 import tempfile
+import threading
+
+import numpy
+import six
 
 from chainer.serializers import npz
 from chainer.training import extension
 
 
-def snapshot_object(target, filename, savefun=npz.save_npz):
+_OBJECTS_KEY = '_snapshot_objects'
+
+
+def snapshot_object(target, filename, savefun=npz.save_npz, writer=None):
     """Returns a trainer extension to take snapshots of a given object.
 
     This extension serializes the given object and saves it to the output
@@ -29,20 +39,27 @@ def snapshot_object(target, filename, savefun=npz.save_npz):
             ``'snapshot_10000'`` at the 10,000th iteration.
         savefun: Function to save the object. It takes two arguments: the
             output file path and the object to serialize.
+        writer (AsyncSnapshotWriter): Writer to save the object in the
+            background. If it is given, ``savefun`` is not used.
 
     Returns:
         An extension function.
 
     """
-    @extension.make_extension(trigger=(1, 'epoch'), priority=-100)
+    @extension.make_extension(trigger=(1, 'epoch'), priority=-100,
+                              finalizer=_get_finalizer(writer))
     def snapshot_object(trainer):
-        _snapshot_object(trainer, target, filename.format(trainer), savefun)
+        if writer is None:
+            _snapshot_object(
+                trainer, target, filename.format(trainer), savefun)
+        else:
+            writer(trainer.out, filename.format(trainer), target)
 
     return snapshot_object
 
 
 def snapshot(savefun=npz.save_npz,
-             filename='snapshot_iter_{.updater.iteration}'):
+             filename='snapshot_iter_{.updater.iteration}', writer=None):
     """Returns a trainer extension to take snapshots of the trainer.
 
     This extension serializes the trainer object and saves it to the output
@@ -69,11 +86,18 @@ def snapshot(savefun=npz.save_npz,
         filename (str): Name of the file into which the trainer is serialized.
             It can be a format string, where the trainer object is passed to
             the :meth:`str.format` method.
+        writer (AsyncSnapshotWriter): Writer to save the trainer in the
+            background. If it is given, ``savefun`` is not used.
 
     """
-    @extension.make_extension(trigger=(1, 'epoch'), priority=-100)
+    @extension.make_extension(trigger=(1, 'epoch'), priority=-100,
+                              finalizer=_get_finalizer(writer))
     def snapshot(trainer):
-        _snapshot_object(trainer, trainer, filename.format(trainer), savefun)
+        if writer is None:
+            _snapshot_object(
+                trainer, trainer, filename.format(trainer), savefun)
+        else:
+            writer(trainer.out, filename.format(trainer), trainer)
 
     return snapshot
 
@@ -90,3 +114,177 @@ def _snapshot_object(trainer, target, filename, savefun):
         raise
     os.close(fd)
     shutil.move(tmppath, os.path.join(trainer.out, fn))
+
+
+def _get_finalizer(writer):
+    return None if writer is None else writer.finalize
+
+
+def _move_into(out, filename, save):
+    fd, tmppath = tempfile.mkstemp(prefix='tmp' + filename, dir=out)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            save(f)
+    except Exception:
+        os.remove(tmppath)
+        raise
+    shutil.move(tmppath, os.path.join(out, filename))
+
+
+def _hash(array):
+    h = hashlib.sha1()
+    h.update('{}{}'.format(array.dtype.str, array.shape).encode())
+    h.update(numpy.ascontiguousarray(array).view(numpy.uint8))
+    return h.hexdigest()
+
+
+class AsyncSnapshotWriter(object):
+
+    """Writer of snapshots working in a background thread.
+
+    The object is serialized into copies of its arrays on the calling
+    thread, which are then written by a background thread. Only one snapshot
+    is written at a time: a snapshot taken while the previous one is being
+    written waits for it.
+
+    By default, each snapshot is an NPZ file that can be loaded by
+    :func:`~chainer.serializers.load_npz`. In the incremental format, a
+    snapshot is an uncompressed NPZ file holding small arrays, while each
+    larger array is saved to a ``.npy`` file named after the hash of its
+    content under ``objects_dir``. Arrays whose contents are not changed
+    since the previous snapshots are not written again. Use
+    :func:`load_snapshot` to load snapshots of either format.
+
+    Args:
+        compression (bool): If ``True``, the NPZ files are compressed. The
+            ``.npy`` files of the incremental format are never compressed.
+        keep (int): Number of the latest snapshots to keep. Older snapshots
+            written by this writer are removed, together with the ``.npy``
+            files that only they refer to. If it is ``None``, all the
+            snapshots are kept.
+        incremental (bool): If ``True``, snapshots are written in the
+            incremental format.
+        objects_dir (str): Directory of the ``.npy`` files of the
+            incremental format, relative to the output directory.
+
+    """
+
+    inline_bytes = 4096
+
+    def __init__(self, compression=True, keep=None, incremental=False,
+                 objects_dir='snapshot_objects'):
+        self.compression = compression
+        self.keep = keep
+        self.incremental = incremental
+        self.objects_dir = objects_dir
+        self._thread = None
+        self._error = None
+        self._written = collections.deque()
+        self._created = set()
+
+    def __call__(self, out, filename, target):
+        """Takes a snapshot of ``target`` to ``filename`` under ``out``."""
+        self.wait()
+        s = npz.DictionarySerializer()
+        s.save(target)
+        arrays = dict((key, numpy.array(value))
+                      for key, value in six.iteritems(s.target))
+        self._thread = threading.Thread(
+            target=self._run, args=(out, filename, arrays))
+        self._thread.start()
+
+    def wait(self):
+        """Waits until the snapshot being written is completed."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def finalize(self):
+        self.wait()
+
+    def _run(self, out, filename, arrays):
+        try:
+            if self.incremental:
+                hashes = self._write_incremental(out, filename, arrays)
+            else:
+                hashes = set()
+                savez = (numpy.savez_compressed if self.compression
+                         else numpy.savez)
+                _move_into(out, filename, lambda f: savez(f, **arrays))
+            if self.keep is not None:
+                self._prune(os.path.join(out, filename), hashes)
+        except Exception as e:
+            self._error = e
+
+    def _write_incremental(self, out, filename, arrays):
+        objects_dir = os.path.join(out, self.objects_dir)
+        if not os.path.isdir(objects_dir):
+            os.makedirs(objects_dir)
+        refs = {}
+        for key in list(arrays):
+            array = arrays[key]
+            if array.nbytes < self.inline_bytes or array.dtype.hasobject:
+                continue
+            h = _hash(array)
+            name = h + '.npy'
+            if not os.path.exists(os.path.join(objects_dir, name)):
+                _move_into(objects_dir, name,
+                           lambda f: numpy.save(f, array))
+                self._created.add(h)
+            refs[key] = h
+            del arrays[key]
+        arrays[_OBJECTS_KEY] = numpy.array(json.dumps(
+            {'dir': self.objects_dir, 'objects': refs}))
+        _move_into(out, filename, lambda f: numpy.savez(f, **arrays))
+        return set(six.itervalues(refs))
+
+    def _prune(self, path, hashes):
+        # A snapshot overwritten by this one is dropped without removing it.
+        dropped = [entry for entry in self._written if entry[0] == path]
+        written = collections.deque(
+            entry for entry in self._written if entry[0] != path)
+        written.append((path, hashes))
+        while len(written) > self.keep:
+            entry = written.popleft()
+            if os.path.exists(entry[0]):
+                os.remove(entry[0])
+            dropped.append(entry)
+        self._written = written
+
+        in_use = set()
+        for _, entry_hashes in written:
+            in_use |= entry_hashes
+        objects_dir = os.path.join(os.path.dirname(path), self.objects_dir)
+        for _, entry_hashes in dropped:
+            for h in entry_hashes - in_use:
+                if h in self._created:
+                    os.remove(os.path.join(objects_dir, h + '.npy'))
+                    self._created.discard(h)
+
+
+def load_snapshot(filename, obj):
+    """Loads an object from a snapshot.
+
+    It loads snapshots written by :class:`AsyncSnapshotWriter` in either
+    format, as well as NPZ files saved by
+    :func:`~chainer.serializers.save_npz`.
+
+    Args:
+        filename (str): Name of the snapshot file.
+        obj: Object to be deserialized. It must support serialization
+            protocol.
+
+    """
+    with numpy.load(filename) as f:
+        if _OBJECTS_KEY not in f.files:
+            npz.NpzDeserializer(f).load(obj)
+            return
+        meta = json.loads(str(f[_OBJECTS_KEY]))
+        arrays = dict((key, f[key]) for key in f.files if key != _OBJECTS_KEY)
+    objects_dir = os.path.join(os.path.dirname(filename), meta['dir'])
+    for key, h in six.iteritems(meta['objects']):
+        arrays[key] = numpy.load(os.path.join(objects_dir, h + '.npy'))
+    npz.NpzDeserializer(arrays).load(obj)
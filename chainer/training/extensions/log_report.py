@@ -2,6 +2,8 @@ import json
 import os
 import shutil
 import tempfile
+import threading
+import time
 
 import six
 
@@ -51,16 +53,30 @@ class LogReport(extension.Extension):
             formatting. For example, users can use '{iteration}' to separate
             the log files for different iterations. If the log name is None, it
             does not output the log to any file.
+        writer: Log backend. By default, the whole log is rewritten to the
+            log file in JSON format at each output. Pass a
+            :class:`JSONLinesWriter` to append each result as a line from a
+            background thread instead. A writer is a callable taking the
+            path of the log file and the result dictionary, and may have
+            ``flush``, ``finalize`` and ``truncate`` methods. ``truncate`` is
+            called with the path and the number of entries restored by
+            :meth:`serialize` for the file (``0`` unless the training is
+            resumed) before the first output to each file, so that the
+            entries of an old run and those output after the snapshot are
+            dropped.
 
     """
 
     def __init__(self, keys=None, trigger=(1, 'epoch'), postprocess=None,
-                 log_name='log'):
+                 log_name='log', writer=None):
         self._keys = keys
         self._trigger = trigger_module.get_trigger(trigger)
         self._postprocess = postprocess
         self._log_name = log_name
+        self._writer = writer
         self._log = []
+        self._restored = 0
+        self._written = set()
 
         self._init_summary()
 
@@ -95,12 +111,18 @@ class LogReport(extension.Extension):
             # write to the log file
             if self._log_name is not None:
                 log_name = self._log_name.format(**stats_cpu)
-                fd, path = tempfile.mkstemp(prefix=log_name, dir=trainer.out)
-                with os.fdopen(fd, 'w') as f:
-                    json.dump(self._log, f, indent=4)
-
-                new_path = os.path.join(trainer.out, log_name)
-                shutil.move(path, new_path)
+                if self._writer is not None:
+                    path = os.path.join(trainer.out, log_name)
+                    if path not in self._written:
+                        self._written.add(path)
+                        truncate = getattr(self._writer, 'truncate', None)
+                        if truncate is not None:
+                            truncate(path, sum(
+                                1 for e in self._log[:self._restored]
+                                if self._log_name.format(**e) == log_name))
+                    self._writer(path, stats_cpu)
+                else:
+                    self._write(trainer.out, log_name)
 
             # reset the summary for the next output
             self._init_summary()
@@ -110,6 +132,11 @@ class LogReport(extension.Extension):
         """The current list of observation dictionaries."""
         return self._log
 
+    def finalize(self):
+        finalize = getattr(self._writer, 'finalize', None)
+        if finalize is not None:
+            finalize()
+
     def serialize(self, serializer):
         # Note that this serialization may lose some information of small
         # numerical differences.
@@ -119,6 +146,211 @@ class LogReport(extension.Extension):
         else:
             log = serializer('_log', '')
             self._log = json.loads(log)
+            self._restored = len(self._log)
 
     def _init_summary(self):
         self._summary = reporter.DictSummary()
+
+    def _write(self, out, log_name):
+        fd, path = tempfile.mkstemp(prefix=log_name, dir=out)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._log, f, indent=4)
+
+        new_path = os.path.join(out, log_name)
+        shutil.move(path, new_path)
+
+
+class JSONLinesWriter(object):
+
+    """Log backend appending each result of :class:`LogReport` as a line.
+
+    Each result dictionary is written as one line of JSON at the end of the
+    log file, so the cost of an output does not grow with the length of the
+    log. The lines are written by a background thread, which also calls
+    :func:`os.fsync` at most once every ``fsync_interval`` seconds. When a
+    file exceeds ``max_bytes``, it is renamed with the suffix ``.1`` (older
+    files with the suffixes ``.1``, ``.2``, ... are shifted by one) and a new
+    file is started. :class:`LogReport` truncates the files of a log to the
+    entries restored from a snapshot before its first output, so that a new
+    or resumed training does not append to the entries of another run.
+
+    The log can be read with :func:`load_json_lines`, or followed while the
+    training runs with ``tail -f``.
+
+    Args:
+        max_bytes (int): Size of the log file to rotate it. If it is ``None``,
+            the file is never rotated.
+        backup_count (int): Number of rotated files to keep. If it is
+            ``None``, all of them are kept.
+        fsync_interval (float): Interval in seconds to synchronize the file
+            with the storage. If it is ``None``, the file is only flushed.
+
+    """
+
+    def __init__(self, max_bytes=None, backup_count=None, fsync_interval=60):
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fsync_interval = fsync_interval
+        self._queue = six.moves.queue.Queue()
+        self._thread = None
+        self._error = None
+        self._files = {}
+        self._last_sync = {}
+
+    def __call__(self, path, entry):
+        """Appends a result dictionary to the file at ``path``."""
+        self._put(self._write, path, json.dumps(entry) + '\n')
+
+    def truncate(self, path, n):
+        """Keeps only the first ``n`` entries of the log at ``path``.
+
+        The entries are counted from the oldest rotated file. The files
+        holding no entry to keep are removed, and the remaining rotated files
+        are renumbered. It is done in order with the queued lines.
+
+        """
+        self._put(self._truncate, path, n)
+
+    def flush(self):
+        """Waits until the queued lines are written and synchronized."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._queue.join()
+        self._raise_error()
+
+    def finalize(self):
+        """Writes the queued lines and closes the files."""
+        if self._thread is not None:
+            self._queue.put(False)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+    def _put(self, method, *args):
+        self._raise_error()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+        self._queue.put((method, args))
+
+    def _raise_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None or item is False:
+                    for path in list(self._files):
+                        self._sync(path)
+                    if item is False:
+                        for f in six.itervalues(self._files):
+                            f.close()
+                        self._files.clear()
+                        return
+                else:
+                    method, args = item
+                    method(*args)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, line):
+        f = self._files.get(path)
+        if f is None:
+            f = self._files[path] = open(path, 'a')
+            self._last_sync[path] = time.time()
+        f.write(line)
+        f.flush()
+        if self.max_bytes is not None and f.tell() >= self.max_bytes:
+            self._rotate(path)
+        elif (self.fsync_interval is not None and
+              time.time() - self._last_sync[path] >= self.fsync_interval):
+            self._sync(path)
+
+    def _truncate(self, path, n):
+        f = self._files.pop(path, None)
+        if f is not None:
+            f.close()
+        rotated = 0
+        while os.path.exists('{}.{}'.format(path, rotated + 1)):
+            rotated += 1
+        paths = ['{}.{}'.format(path, i)
+                 for i in six.moves.range(rotated, 0, -1)]
+        if os.path.exists(path):
+            paths.append(path)
+
+        # Finds the first file holding an entry to drop
+        for cut, p in enumerate(paths):
+            with open(p) as f:
+                lines = [line for line in f if line.strip()]
+            if len(lines) > n:
+                lines = lines[:n]
+                break
+            n -= len(lines)
+        else:
+            return
+
+        for p in paths[cut:]:
+            os.remove(p)
+        # The files before the cut are renamed from path.(rotated - cut + i)
+        # to path.i
+        for i in six.moves.range(1, cut + 1):
+            os.rename('{}.{}'.format(path, rotated - cut + i),
+                      '{}.{}'.format(path, i))
+        with open(path, 'w') as f:
+            f.writelines(lines)
+
+    def _sync(self, path):
+        f = self._files[path]
+        f.flush()
+        os.fsync(f.fileno())
+        self._last_sync[path] = time.time()
+
+    def _rotate(self, path):
+        self._sync(path)
+        self._files.pop(path).close()
+        n = 1
+        while os.path.exists('{}.{}'.format(path, n)):
+            n += 1
+        for i in six.moves.range(n - 1, 0, -1):
+            src = '{}.{}'.format(path, i)
+            if self.backup_count is not None and i >= self.backup_count:
+                os.remove(src)
+            else:
+                os.rename(src, '{}.{}'.format(path, i + 1))
+        if self.backup_count == 0:
+            os.remove(path)
+        else:
+            os.rename(path, path + '.1')
+
+
+def load_json_lines(path):
+    """Loads the log written by :class:`JSONLinesWriter`.
+
+    The rotated files ``path.N``, ..., ``path.1`` are read before ``path``.
+
+    Args:
+        path (str): Path of the log file.
+
+    Returns:
+        list: The result dictionaries in the order of the output.
+
+    """
+    paths = []
+    n = 1
+    while os.path.exists('{}.{}'.format(path, n)):
+        paths.append('{}.{}'.format(path, n))
+        n += 1
+    paths.reverse()
+    if os.path.exists(path):
+        paths.append(path)
+    log = []
+    for p in paths:
+        with open(p) as f:
+            log.extend(json.loads(line) for line in f if line.strip())
+    return log
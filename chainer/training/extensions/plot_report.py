@@ -8,6 +8,7 @@ import six
 from chainer import reporter
 import chainer.serializer as serializer_module
 from chainer.training import extension
+from chainer.training.extensions import log_report as log_report_module
 import chainer.training.trigger as trigger_module
 
 try:
@@ -83,12 +84,19 @@ class PlotReport(extension.Extension):
         marker (str): The marker used to plot the graph. Default is ``'x'``. If
             ``None`` is given, it draws with no markers.
         grid (bool): Set the axis grid on if True. Default is True.
+        log_report (str or LogReport): Log report to plot the results of. If
+            it is given, the results output by the :class:`LogReport` since
+            the last plot are appended to the plot data at each call, instead
+            of accumulating the observations in this extension, and the
+            figure is redrawn if there are any. This is either the name of a
+            LogReport extension registered to the trainer, or a LogReport
+            instance to use internally.
 
     """
 
     def __init__(self, y_keys, x_key='iteration', trigger=(1, 'epoch'),
                  postprocess=None, file_name='plot.png', marker='x',
-                 grid=True):
+                 grid=True, log_report=None):
 
         _check_available()
 
@@ -102,6 +110,8 @@ class PlotReport(extension.Extension):
         self._marker = marker
         self._grid = grid
         self._postprocess = postprocess
+        self._log_report = log_report
+        self._log_len = 0  # number of results of the log report plotted
         self._init_summary()
         self._data = {k: [] for k in y_keys}
 
@@ -114,6 +124,10 @@ class PlotReport(extension.Extension):
         if not _available:
             return
 
+        if self._log_report is not None:
+            self._tail_log(trainer)
+            return
+
         keys = self._y_keys
         observation = trainer.observation
         summary = self._summary
@@ -132,37 +146,61 @@ class PlotReport(extension.Extension):
             updater = trainer.updater
             stats_cpu['epoch'] = updater.epoch
             stats_cpu['iteration'] = updater.iteration
-            x = stats_cpu[self._x_key]
-            data = self._data
-
-            for k in keys:
-                if k in stats_cpu:
-                    data[k].append((x, stats_cpu[k]))
-
-            f = plot.figure()
-            a = f.add_subplot(111)
-            a.set_xlabel(self._x_key)
-            if self._grid:
-                a.grid()
-
-            for k in keys:
-                xy = data[k]
-                if len(xy) == 0:
-                    continue
-
-                xy = numpy.array(xy)
-                a.plot(xy[:, 0], xy[:, 1], marker=self._marker, label=k)
-
-            if a.has_data():
-                if self._postprocess is not None:
-                    self._postprocess(f, a, summary)
-                l = a.legend(bbox_to_anchor=(1.05, 1), loc=2, borderaxespad=0.)
-                f.savefig(path.join(trainer.out, self._file_name),
-                          bbox_extra_artists=(l,), bbox_inches='tight')
-
-            plot.close()
+            self._append(stats_cpu)
+            self._plot(trainer, summary)
             self._init_summary()
 
+    def _tail_log(self, trainer):
+        log_report = self._log_report
+        if isinstance(log_report, str):
+            log_report = trainer.get_extension(log_report)
+        elif isinstance(log_report, log_report_module.LogReport):
+            log_report(trainer)  # update the log report
+        else:
+            raise TypeError('log report has a wrong type %s' %
+                            type(log_report))
+
+        log = log_report.log
+        if len(log) == self._log_len:
+            return
+        for stats in log[self._log_len:]:
+            self._append(stats)
+        self._log_len = len(log)
+        self._plot(trainer, self._summary)
+
+    def _append(self, stats):
+        x = stats[self._x_key]
+        for k in self._y_keys:
+            if k in stats:
+                self._data[k].append((x, stats[k]))
+
+    def _plot(self, trainer, summary):
+        keys = self._y_keys
+        data = self._data
+
+        f = plot.figure()
+        a = f.add_subplot(111)
+        a.set_xlabel(self._x_key)
+        if self._grid:
+            a.grid()
+
+        for k in keys:
+            xy = data[k]
+            if len(xy) == 0:
+                continue
+
+            xy = numpy.array(xy)
+            a.plot(xy[:, 0], xy[:, 1], marker=self._marker, label=k)
+
+        if a.has_data():
+            if self._postprocess is not None:
+                self._postprocess(f, a, summary)
+            l = a.legend(bbox_to_anchor=(1.05, 1), loc=2, borderaxespad=0.)
+            f.savefig(path.join(trainer.out, self._file_name),
+                      bbox_extra_artists=(l,), bbox_inches='tight')
+
+        plot.close()
+
     def serialize(self, serializer):
         if isinstance(serializer, serializer_module.Serializer):
             serializer('_plot_{}'.format(self._file_name),
@@ -172,5 +210,10 @@ class PlotReport(extension.Extension):
             self._data = json.loads(
                 serializer('_plot_{}'.format(self._file_name), ''))
 
+        if self._log_report is not None:
+            self._log_len = serializer('_log_len', self._log_len)
+            if isinstance(self._log_report, log_report_module.LogReport):
+                self._log_report.serialize(serializer['_log_report'])
+
     def _init_summary(self):
         self._summary = reporter.DictSummary()
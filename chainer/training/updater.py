@@ -1,10 +1,24 @@
+import collections
 import copy
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+
+import numpy
 import six
+from six.moves import queue
 
 from chainer.dataset import convert
 from chainer.dataset import iterator as iterator_module
 from chainer import function
 from chainer import optimizer as optimizer_module
+from chainer import reporter as reporter_module
+from chainer import serializer as serializer_module
+from chainer.serializers import npz
+from chainer import sparse_grad
 
 
 class Updater(object):
@@ -80,6 +94,95 @@ class Updater(object):
         raise NotImplementedError
 
 
+class _Prefetcher(object):
+
+    # Fetches and converts batches in a background thread, ``depth`` batches
+    # ahead of the one in use. Iterator attributes and the serialized state of
+    # the iterator before the fetch are recorded with each batch, since the
+    # iterator itself is ahead of the batch in use.
+
+    def __init__(self, iterator, converter, device, depth):
+        self.iterator = iterator
+        self.converter = converter
+        self.device = device
+        self.depth = depth
+        self.state = None
+        self._arrays = {}
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._ready = collections.deque()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while self._requests.get():
+            try:
+                resume_state = self._resume_state()
+                batch = self.iterator.next()
+                it = self.iterator
+                state = it.epoch, it.epoch_detail, it.is_new_epoch
+                if it.is_new_epoch:
+                    # Arrays such as the order of examples may be updated in
+                    # place at the end of an epoch.
+                    self._arrays.clear()
+                result = (self.converter(batch, self.device), state,
+                          resume_state, None)
+            except Exception:
+                result = None, None, None, sys.exc_info()
+            self._results.put(result)
+
+    def _resume_state(self):
+        # Serializes the iterator. Its arrays are copied only once per epoch
+        # and shared by the states recorded until the end of the epoch.
+        s = npz.DictionarySerializer()
+        self.iterator.serialize(s)
+        state = {}
+        for key, value in six.iteritems(s.target):
+            if value.ndim == 0:
+                state[key] = value.copy()
+                continue
+            copied = self._arrays.get(key)
+            if copied is None:
+                copied = self._arrays[key] = value.copy()
+            state[key] = copied
+        return state
+
+    def next(self):
+        while self._pending <= self.depth:
+            self._requests.put(True)
+            self._pending += 1
+        if self._ready:
+            in_arrays, state, _, exc_info = self._ready.popleft()
+        else:
+            in_arrays, state, _, exc_info = self._results.get()
+        self._pending -= 1
+        if exc_info is not None:
+            six.reraise(*exc_info)
+        self.state = state
+        return in_arrays
+
+    def wait(self):
+        # Waits for the batches being prepared, so that the iterator is not
+        # used by the thread.
+        while len(self._ready) < self._pending:
+            self._ready.append(self._results.get())
+
+    def resume_state(self):
+        # Returns the serialized state of the iterator before the fetch of
+        # the first batch not used yet, or None if all the fetched batches
+        # are used. It must be called after wait().
+        for _, _, resume_state, _ in self._ready:
+            if resume_state is not None:
+                return resume_state
+        return None
+
+    def finalize(self):
+        self._requests.put(False)
+        self._thread.join()
+
+
 class StandardUpdater(Updater):
 
     """Standard implementation of Updater.
@@ -107,6 +210,18 @@ class StandardUpdater(Updater):
             indicates the host memory (CPU).
         loss_func: Loss function. The target link of the main optimizer is used
             by default.
+        prefetch (int): Number of batches fetched from the main iterator and
+            converted ahead in a background thread while the current batch is
+            computed. ``0`` (default) disables prefetching. If the converter is
+            :func:`~chainer.dataset.concat_examples`, batches are built in
+            ``prefetch + 1`` reused sets of arrays by
+            :class:`~chainer.dataset.ConcatWithBuffers`, so the arrays of a
+            batch must not be used after its update. With prefetching, the
+            time spent waiting for the batch and the rest of the update time
+            are reported as ``wait_time`` and ``compute_time`` in seconds.
+            When the updater is serialized, the state of the main iterator
+            before the batches prefetched but not used yet is saved, so that
+            they are fetched again after resuming.
 
     Attributes:
         converter: Converter function.
@@ -118,7 +233,7 @@ class StandardUpdater(Updater):
     """
 
     def __init__(self, iterator, optimizer, converter=convert.concat_examples,
-                 device=None, loss_func=None):
+                 device=None, loss_func=None, prefetch=0):
         if isinstance(iterator, iterator_module.Iterator):
             iterator = {'main': iterator}
         self._iterators = iterator
@@ -135,20 +250,42 @@ class StandardUpdater(Updater):
         self.loss_func = loss_func
         self.device = device
         self.iteration = 0
+        self.prefetch = prefetch
+        self._prefetcher = None
+
+    def _prefetched_state(self):
+        if self._prefetcher is None:
+            return None
+        return self._prefetcher.state
 
     @property
     def epoch(self):
+        state = self._prefetched_state()
+        if state is not None:
+            return state[0]
         return self._iterators['main'].epoch
 
     @property
     def epoch_detail(self):
+        state = self._prefetched_state()
+        if state is not None:
+            return state[1]
         return self._iterators['main'].epoch_detail
 
     @property
     def is_new_epoch(self):
+        state = self._prefetched_state()
+        if state is not None:
+            return state[2]
         return self._iterators['main'].is_new_epoch
 
+    def _stop_prefetch(self):
+        if self._prefetcher is not None:
+            self._prefetcher.finalize()
+            self._prefetcher = None
+
     def finalize(self):
+        self._stop_prefetch()
         for iterator in six.itervalues(self._iterators):
             iterator.finalize()
 
@@ -175,8 +312,20 @@ class StandardUpdater(Updater):
         self.iteration += 1
 
     def update_core(self):
-        batch = self._iterators['main'].next()
-        in_arrays = self.converter(batch, self.device)
+        if self.prefetch > 0:
+            if self._prefetcher is None:
+                converter = self.converter
+                if converter is convert.concat_examples:
+                    converter = convert.ConcatWithBuffers(self.prefetch + 1)
+                self._prefetcher = _Prefetcher(
+                    self._iterators['main'], converter, self.device,
+                    self.prefetch)
+            start = time.time()
+            in_arrays = self._prefetcher.next()
+            wait_time = time.time() - start
+        else:
+            batch = self._iterators['main'].next()
+            in_arrays = self.converter(batch, self.device)
 
         optimizer = self._optimizers['main']
         loss_func = self.loss_func or optimizer.target
@@ -188,9 +337,28 @@ class StandardUpdater(Updater):
         else:
             optimizer.update(loss_func, in_arrays)
 
+        if self.prefetch > 0:
+            reporter_module.report({
+                'wait_time': wait_time,
+                'compute_time': time.time() - start - wait_time,
+            })
+
     def serialize(self, serializer):
+        resume_state = None
+        if self._prefetcher is not None:
+            if isinstance(serializer, serializer_module.Deserializer):
+                # The prefetched batches belong to the old iterator state.
+                self._stop_prefetch()
+            else:
+                self._prefetcher.wait()
+                resume_state = self._prefetcher.resume_state()
         for name, iterator in six.iteritems(self._iterators):
-            iterator.serialize(serializer['iterator:' + name])
+            s = serializer['iterator:' + name]
+            if name == 'main' and resume_state is not None:
+                for key, value in six.iteritems(resume_state):
+                    s(key, value)
+            else:
+                iterator.serialize(s)
 
         for name, optimizer in six.iteritems(self._optimizers):
             optimizer.serialize(serializer['optimizer:' + name])
@@ -321,3 +489,282 @@ class ParallelUpdater(StandardUpdater):
 
         for model in six.itervalues(models_others):
             model.copyparams(model_main)
+
+
+def _flat_layout(params):
+    layout = []
+    offset = 0
+    for param in params:
+        layout.append((offset, param.data.shape))
+        offset += param.data.size
+    return layout, offset
+
+
+def _to_numpy(array):
+    if isinstance(array, numpy.ndarray):
+        return array
+    if isinstance(array, sparse_grad.SparseGrad):
+        return array.to_dense()
+    # mkldnn arrays
+    return numpy.array(array)
+
+
+def _load_params(params, layout, buf):
+    for param, (offset, shape) in six.moves.zip(params, layout):
+        src = buf[offset:offset + param.data.size].reshape(shape)
+        if isinstance(param.data, numpy.ndarray):
+            param.data[...] = src
+        else:
+            param.data = src.astype(param.dtype)
+
+
+def _store(arrays, layout, buf):
+    for array, (offset, shape) in six.moves.zip(arrays, layout):
+        dst = buf[offset:offset + int(numpy.prod(shape))]
+        if array is None:
+            dst.fill(0)
+        else:
+            dst[...] = _to_numpy(array).ravel()
+
+
+def _reduce_chunk(grads, rank, n_chunks):
+    # Sums and averages a chunk of the gradients of all processes into the
+    # first row. Processes reduce different chunks at the same time.
+    size = grads.shape[1]
+    start = size * rank // n_chunks
+    end = size * (rank + 1) // n_chunks
+    chunk = grads[0, start:end]
+    for row in grads[1:]:
+        chunk += row[start:end]
+    chunk *= 1.0 / len(grads)
+
+
+def _compute_grads(model, loss_func, in_arrays):
+    model.cleargrads()
+    with function.force_backprop_mode():
+        if isinstance(in_arrays, tuple):
+            loss = loss_func(*in_arrays)
+        elif isinstance(in_arrays, dict):
+            loss = loss_func(**in_arrays)
+        else:
+            loss = loss_func(in_arrays)
+    loss.backward()
+
+
+def _default_cpu_sets(n_processes):
+    if not hasattr(os, 'sched_getaffinity'):
+        return [None] * n_processes
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < n_processes:
+        return [None] * n_processes
+    # Contiguous CPU numbers usually belong to the same socket.
+    return [cpus[len(cpus) * i // n_processes:
+                 len(cpus) * (i + 1) // n_processes]
+            for i in six.moves.range(n_processes)]
+
+
+def _pin(cpu_set, n_threads):
+    if cpu_set is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpu_set)
+    if n_threads is None and cpu_set is not None:
+        n_threads = len(cpu_set)
+    if n_threads is not None:
+        # Read by OpenMP runtimes initialized in this process.
+        for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+            os.environ[name] = str(n_threads)
+
+
+def _worker_main(rank, pipe, model, loss_func, iterator, converter, grads,
+                 params_buf, cpu_set, n_threads):
+    _pin(cpu_set, n_threads)
+    params = [param for _, param in sorted(model.namedparams())]
+    layout, _ = _flat_layout(params)
+    try:
+        while pipe.recv() == 'update':
+            _load_params(params, layout, params_buf)
+            in_arrays = converter(iterator.next(), None)
+            _compute_grads(model, loss_func or model, in_arrays)
+            _store([param.grad for param in params], layout, grads[rank])
+            pipe.send('ready')
+            if pipe.recv() != 'reduce':
+                break
+            _reduce_chunk(grads, rank, len(grads))
+            pipe.send('done')
+    except Exception:
+        pipe.send(('error', traceback.format_exc()))
+    finally:
+        iterator.finalize()
+        pipe.close()
+
+
+class MultiprocessParallelUpdater(StandardUpdater):
+
+    """Implementation of a data-parallel updater with CPU processes.
+
+    It is the CPU counterpart of :class:`ParallelUpdater`. Each model copy is
+    run by its own process, so the forward and backward computations of the
+    copies run at the same time. The gradients are averaged in shared memory:
+    every process writes its gradients to its row of a shared buffer, and
+    then each process sums a different chunk of the rows, so that the
+    reduction is spread over all processes without copying arrays through
+    pipes. The main process then updates the parameters with its optimizer
+    and writes them to another shared buffer, which the other processes read
+    at the beginning of the next iteration.
+
+    Each process draws the minibatch from its own iterator, which typically
+    iterates over a different part of the dataset (see
+    :class:`~chainer.datasets.SubDataset`). The iterator of the
+    first process is the ``'main'`` iterator of the updater, which defines
+    the epoch and is serialized. The values reported by the model in the
+    other processes are not reported to the trainer.
+
+    The processes are forked at the first update, after the main process
+    has run the model once to initialize its parameters. Each process works
+    on its own copy of the main process made by the fork, so ``loss_func``
+    may refer to the model. Processes are pinned to disjoint sets of CPUs,
+    and ``OMP_NUM_THREADS`` and ``MKL_NUM_THREADS`` are set to the number of
+    threads in each process. The environment variables only affect OpenMP
+    runtimes initialized after they are set, so set them before starting
+    the script if the thread pools must be sized exactly.
+
+    Args:
+        iterators: List of dataset iterators, one for each process.
+        optimizer: Optimizer to update parameters. The main process runs the
+            target link of the optimizer; the other processes run copies of
+            it.
+        converter: Converter function to build input arrays.
+            :func:`~chainer.dataset.concat_examples` is used by default.
+        loss_func: Loss function. The model is used as a loss function by
+            default.
+        cpu_sets (list): List of CPU sets the processes are pinned to. By
+            default the CPUs available to the main process are split
+            evenly. ``None`` in the list disables pinning of the process.
+        n_threads (int): Number of threads of each process. By default, it
+            is the number of CPUs in the set of the process.
+
+    """
+
+    def __init__(self, iterators, optimizer, converter=convert.concat_examples,
+                 loss_func=None, cpu_sets=None, n_threads=None):
+        if not iterators:
+            raise ValueError('at least one iterator is required')
+        super(MultiprocessParallelUpdater, self).__init__(
+            iterator=iterators[0],
+            optimizer=optimizer,
+            converter=converter,
+            loss_func=loss_func,
+        )
+        if cpu_sets is None:
+            cpu_sets = _default_cpu_sets(len(iterators))
+        elif len(cpu_sets) != len(iterators):
+            raise ValueError('cpu_sets must have one entry per iterator')
+        self._worker_iterators = iterators[1:]
+        self._cpu_sets = cpu_sets
+        self._n_threads = n_threads
+        self._pipes = []
+        self._workers = []
+        self._params = None
+        self._affinity = None
+
+    def _setup_workers(self):
+        model = self.get_optimizer('main').target
+        params = [param for _, param in sorted(model.namedparams())]
+        for name, param in sorted(model.namedparams()):
+            if param.data is None:
+                raise RuntimeError(
+                    'parameter {} is not initialized'.format(name))
+        self._layout, size = _flat_layout(params)
+        dtype = numpy.result_type(*[param.dtype for param in params])
+        n = len(self._worker_iterators) + 1
+
+        def shared(shape):
+            nbytes = int(numpy.prod(shape)) * dtype.itemsize
+            raw = multiprocessing.RawArray('b', nbytes)
+            return numpy.frombuffer(raw, dtype=dtype).reshape(shape)
+
+        self._grads = shared((n, size))
+        self._params_buf = shared((size,))
+        _store([param.data for param in params], self._layout,
+               self._params_buf)
+        self._params = params
+
+        if hasattr(multiprocessing, 'get_context'):
+            context = multiprocessing.get_context('fork')
+        else:
+            context = multiprocessing
+        for rank, iterator in enumerate(self._worker_iterators, 1):
+            pipe, worker_pipe = context.Pipe()
+            worker = context.Process(
+                target=_worker_main,
+                args=(rank, worker_pipe, model,
+                      self.loss_func, iterator, self.converter, self._grads,
+                      self._params_buf, self._cpu_sets[rank],
+                      self._n_threads))
+            worker.daemon = True
+            worker.start()
+            worker_pipe.close()
+            self._pipes.append(pipe)
+            self._workers.append(worker)
+        if hasattr(os, 'sched_getaffinity'):
+            self._affinity = os.sched_getaffinity(0)
+        _pin(self._cpu_sets[0], self._n_threads)
+
+    def _receive(self, expected):
+        for pipe in self._pipes:
+            try:
+                message = pipe.recv()
+            except EOFError:
+                message = 'error', 'the process exited unexpectedly'
+            if message != expected:
+                self.finalize()
+                raise RuntimeError(
+                    'a worker process failed:\n{}'.format(message[1]))
+
+    def update_core(self):
+        optimizer = self.get_optimizer('main')
+        model = optimizer.target
+        loss_func = self.loss_func or model
+        in_arrays = self.converter(
+            self.get_iterator('main').next(), self.device)
+        if self._params is None:
+            # The first computation initializes the parameters before the
+            # model is copied to the workers.
+            _compute_grads(model, loss_func, in_arrays)
+            self._setup_workers()
+            for pipe in self._pipes:
+                pipe.send('update')
+        else:
+            for pipe in self._pipes:
+                pipe.send('update')
+            _compute_grads(model, loss_func, in_arrays)
+        params = self._params
+        _store([param.grad for param in params], self._layout,
+               self._grads[0])
+
+        self._receive('ready')
+        for pipe in self._pipes:
+            pipe.send('reduce')
+        _reduce_chunk(self._grads, 0, len(self._grads))
+        self._receive('done')
+
+        for param, (offset, shape) in six.moves.zip(params, self._layout):
+            grad = self._grads[0, offset:offset + param.data.size]
+            param.grad = grad.reshape(shape).astype(param.dtype, copy=False)
+        optimizer.update()
+        _store([param.data for param in params], self._layout,
+               self._params_buf)
+
+    def finalize(self):
+        for pipe in self._pipes:
+            try:
+                pipe.send('finalize')
+            except (IOError, OSError):
+                pass
+        for worker in self._workers:
+            worker.join()
+        self._pipes = []
+        self._workers = []
+        if self._affinity is not None:
+            os.sched_setaffinity(0, self._affinity)
+            self._affinity = None
+        super(MultiprocessParallelUpdater, self).finalize()
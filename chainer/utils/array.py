@@ -16,3 +16,26 @@ def empty_like(x):
         return cuda.cupy.empty_like(x)
     else:
         return numpy.empty_like(x)
+
+
+def sum_by_index(indices, values):
+    # Sums the rows of `values` sharing an index of the 1-D array `indices`.
+    # Returns the sorted unique indices and the sums of their rows.
+    if len(indices) == 0:
+        return indices, values
+    order = numpy.argsort(indices, kind='mergesort')
+    indices = indices[order]
+    starts = numpy.flatnonzero(
+        numpy.concatenate(([True], indices[1:] != indices[:-1])))
+    return indices[starts], numpy.add.reduceat(values[order], starts)
+
+
+def scatter_add(a, indices, values):
+    # Equivalent to `numpy.add.at(a, indices, values)` for a CPU array `a`
+    # indexed along the first axis. ufunc.at is too slow, so the rows of
+    # `values` sharing an index are summed by one reduceat over the sorted
+    # indices and added at once.
+    if len(indices) == 0:
+        return
+    indices, values = sum_by_index(indices, values)
+    a[indices] += values
@@ -1,9 +1,15 @@
+import threading
+
 import numpy
 import six
 
+from chainer import configuration
 from chainer import cuda
 
 
+_workspace = threading.local()
+
+
 def get_conv_outsize(size, k, s, p, cover_all=False, d=1):
     dk = k + (k - 1) * (d - 1)
     if cover_all:
@@ -19,27 +25,126 @@ def get_deconv_outsize(size, k, s, p, cover_all=False):
         return s * (size - 1) + k - 2 * p
 
 
+def channels_last():
+    # Returns whether the images are in the NHWC layout rather than in the
+    # NCHW layout, following chainer.config.image_layout.
+    layout = configuration.config.image_layout
+    if layout not in ('NCHW', 'NHWC'):
+        raise ValueError(
+            'image_layout must be \'NCHW\' or \'NHWC\': {}'.format(layout))
+    return layout == 'NHWC'
+
+
+def to_nchw(x):
+    # Views the NHWC image as an NCHW one. The arrays on GPU are made
+    # contiguous for cuDNN and the kernels.
+    x = x.transpose(0, 3, 1, 2)
+    if isinstance(x, cuda.ndarray):
+        x = cuda.cupy.ascontiguousarray(x)
+    return x
+
+
+def to_nhwc(x):
+    # Inverse of to_nchw.
+    x = x.transpose(0, 2, 3, 1)
+    if isinstance(x, cuda.ndarray):
+        x = cuda.cupy.ascontiguousarray(x)
+    return x
+
+
+def get_workspace(shape, dtype):
+    # Returns a temporary array on the buffer shared by the CPU convolutions
+    # of the current thread. The array is only valid until the next call, so
+    # it must not be kept beyond the computation it is taken for. The buffer
+    # grows to the largest array requested.
+    dtype = numpy.dtype(dtype)
+    nbytes = int(numpy.prod(shape)) * dtype.itemsize
+    buf = getattr(_workspace, 'buffer', None)
+    if buf is None or buf.size < nbytes:
+        buf = numpy.empty(nbytes, dtype=numpy.uint8)
+        _workspace.buffer = buf
+    return buf[:nbytes].view(dtype).reshape(shape)
+
+
+def tensordot_col_cpu(W, x):
+    # Computes rollaxis(tensordot(W, x, (0, 1)), 3), i.e. the patches
+    # scattered by col2im in the backward computation of the convolution and
+    # the forward computation of the deconvolution, on the workspace.
+    c = W.shape[0]
+    n = x.shape[0]
+    dtype = numpy.result_type(W, x)
+    if dtype != x.dtype:
+        gcol = numpy.tensordot(W, x, (0, 1)).astype(x.dtype, copy=False)
+        return numpy.rollaxis(gcol, 3)
+    gcol = get_workspace(W.shape[1:] + (n,) + x.shape[2:], dtype)
+    numpy.dot(W.reshape(c, -1).T, x.transpose(1, 0, 2, 3).reshape(c, -1),
+              out=gcol.reshape(-1, x.size // c))
+    return numpy.rollaxis(gcol, 3)
+
+
+def _window_ranges(size, out_size, k, s, p, d):
+    # Yields, for each offset in the filter, the range [lo, hi) of the
+    # outputs whose input at the offset is in the image, i.e. not in the
+    # padding, and the index of the input of the output lo.
+    for j in six.moves.range(k):
+        offset = j * d - p
+        lo = min(out_size, max(0, -(offset // s)))
+        hi = max(lo, min(out_size, (size - 1 - offset) // s + 1))
+        yield j, lo, hi, lo * s + offset
+
+
 def im2col_cpu(
-        img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False, dy=1, dx=1):
+        img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False, dy=1, dx=1,
+        out=None):
     n, c, h, w = img.shape
     out_h = get_conv_outsize(h, kh, sy, ph, cover_all, dy)
     assert out_h > 0, 'Height in the output should be positive.'
     out_w = get_conv_outsize(w, kw, sx, pw, cover_all, dx)
     assert out_w > 0, 'Width in the output should be positive.'
 
-    img = numpy.pad(img,
-                    ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)),
-                    mode='constant', constant_values=(pval,))
-    col = numpy.ndarray((n, c, kh, kw, out_h, out_w), dtype=img.dtype)
+    if out is None:
+        col = numpy.empty((n, c, kh, kw, out_h, out_w), dtype=img.dtype)
+    else:
+        assert out.shape == (n, c, kh, kw, out_h, out_w)
+        col = out
+
+    # The input is not padded; the patches over the padding are filled with
+    # pval instead.
+    x_ranges = list(_window_ranges(w, out_w, kw, sx, pw, dx))
+    for j, y0, y1, iy in _window_ranges(h, out_h, kh, sy, ph, dy):
+        for i, x0, x1, ix in x_ranges:
+            c_ji = col[:, :, j, i]
+            if y0 < y1 and x0 < x1:
+                c_ji[:, :, y0:y1, x0:x1] = img[
+                    :, :, iy:iy + (y1 - y0 - 1) * sy + 1:sy,
+                    ix:ix + (x1 - x0 - 1) * sx + 1:sx]
+            c_ji[:, :, :y0] = pval
+            c_ji[:, :, y1:] = pval
+            c_ji[:, :, y0:y1, :x0] = pval
+            c_ji[:, :, y0:y1, x1:] = pval
+    return col
 
-    for j in six.moves.range(kh):
-        jdy = j * dy
-        j_lim = jdy + sy * out_h
-        for i in six.moves.range(kw):
-            idx = i * dx
-            i_lim = idx + sx * out_w
-            col[:, :, j, i, :, :] = img[:, :, jdy:j_lim:sy, idx:i_lim:sx]
 
+def im2col_nhwc_cpu(
+        img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False, dy=1, dx=1,
+        out=None):
+    # Returns the patches of the NHWC image in the shape of
+    # (n, out_h, out_w, kh, kw, c), so that the patch of each output is
+    # contiguous and the convolution is one matrix product without copying
+    # the patches. im2col_cpu fills the transposed views.
+    n, h, w, c = img.shape
+    out_h = get_conv_outsize(h, kh, sy, ph, cover_all, dy)
+    assert out_h > 0, 'Height in the output should be positive.'
+    out_w = get_conv_outsize(w, kw, sx, pw, cover_all, dx)
+    assert out_w > 0, 'Width in the output should be positive.'
+
+    if out is None:
+        col = numpy.empty((n, out_h, out_w, kh, kw, c), dtype=img.dtype)
+    else:
+        assert out.shape == (n, out_h, out_w, kh, kw, c)
+        col = out
+    im2col_cpu(img.transpose(0, 3, 1, 2), kh, kw, sy, sx, ph, pw, pval,
+               cover_all, dy, dx, out=col.transpose(0, 5, 3, 4, 1, 2))
     return col
 
 
@@ -75,18 +180,38 @@ def im2col_gpu(img, kh, kw, sy, sx, ph, pw, cover_all=False, dy=1, dx=1):
     return col
 
 
-def col2im_cpu(col, sy, sx, ph, pw, h, w, dy=1, dx=1):
+def col2im_cpu(col, sy, sx, ph, pw, h, w, dy=1, dx=1, out=None):
     n, c, kh, kw, out_h, out_w = col.shape
-    img = numpy.zeros((n, c, h + 2 * ph + sy - 1, w + 2 * pw + sx - 1),
-                      dtype=col.dtype)
-    for j in six.moves.range(kh):
-        jdy = j * dy
-        j_lim = jdy + sy * out_h
-        for i in six.moves.range(kw):
-            idx = i * dx
-            i_lim = idx + sx * out_w
-            img[:, :, jdy:j_lim:sy, idx:i_lim:sx] += col[:, :, j, i]
-    return img[:, :, ph:h + ph, pw:w + pw]
+    if out is None:
+        img = numpy.zeros((n, c, h, w), dtype=col.dtype)
+    else:
+        assert out.shape == (n, c, h, w)
+        img = out
+        img.fill(0)
+
+    # The patches over the padding are skipped instead of being added to a
+    # padded image.
+    x_ranges = list(_window_ranges(w, out_w, kw, sx, pw, dx))
+    for j, y0, y1, iy in _window_ranges(h, out_h, kh, sy, ph, dy):
+        for i, x0, x1, ix in x_ranges:
+            if y0 < y1 and x0 < x1:
+                img[:, :, iy:iy + (y1 - y0 - 1) * sy + 1:sy,
+                    ix:ix + (x1 - x0 - 1) * sx + 1:sx] += \
+                    col[:, :, j, i, y0:y1, x0:x1]
+    return img
+
+
+def col2im_nhwc_cpu(col, sy, sx, ph, pw, h, w, dy=1, dx=1, out=None):
+    # Inverse of im2col_nhwc_cpu, returning the NHWC image.
+    n, _, _, _, _, c = col.shape
+    if out is None:
+        img = numpy.empty((n, h, w, c), dtype=col.dtype)
+    else:
+        assert out.shape == (n, h, w, c)
+        img = out
+    col2im_cpu(col.transpose(0, 5, 3, 4, 1, 2), sy, sx, ph, pw, h, w, dy, dx,
+               out=img.transpose(0, 3, 1, 2))
+    return img
 
 
 def col2im_gpu(col, sy, sx, ph, pw, h, w, dy=1, dx=1):
@@ -0,0 +1,377 @@
+import timeit
+
+import numpy
+import six
+
+import chainer
+from chainer.utils import conv
+
+
+def _im2col_correlate(xp, W, dy, dx):
+    kh, kw = W.shape[2:]
+    col = conv.im2col_cpu(xp, kh, kw, 1, 1, 0, 0, dy=dy, dx=dx)
+    y = numpy.tensordot(col, W, ((1, 2, 3), (1, 2, 3)))
+    return numpy.rollaxis(y, 3, 1)
+
+
+def _im2col_filter_grad(xp, gy, kh, kw, dy, dx):
+    col = conv.im2col_cpu(xp, kh, kw, 1, 1, 0, 0, dy=dy, dx=dx)
+    return numpy.tensordot(gy, col, ((0, 2, 3), (0, 4, 5)))
+
+
+def _winograd_filter(W):
+    # Applies G g G^T to the 3x3 filters g, where
+    # G = [[1, 0, 0], [1/2, 1/2, 1/2], [1/2, -1/2, 1/2], [0, 0, 1]].
+    out_c, c = W.shape[:2]
+    r = [W[:, :, i] for i in six.moves.range(3)]
+    rows = (r[0], (r[0] + r[1] + r[2]) * 0.5, (r[0] - r[1] + r[2]) * 0.5,
+            r[2])
+    u = numpy.empty((4, 4, out_c, c), dtype=W.dtype)
+    for a, row in enumerate(rows):
+        s = [row[..., j] for j in six.moves.range(3)]
+        u[a, 0] = s[0]
+        u[a, 1] = (s[0] + s[1] + s[2]) * 0.5
+        u[a, 2] = (s[0] - s[1] + s[2]) * 0.5
+        u[a, 3] = s[2]
+    return u.reshape(16, out_c, c)
+
+
+def _winograd_filter_transpose(gu):
+    # Applies G^T u G to the 4x4 tiles u, i.e. the transpose of the filter
+    # transform.
+    out_c, c = gu.shape[2:]
+    r = gu
+    rows = (r[0] + (r[1] + r[2]) * 0.5, (r[1] - r[2]) * 0.5,
+            (r[1] + r[2]) * 0.5 + r[3])
+    gW = numpy.empty((out_c, c, 3, 3), dtype=gu.dtype)
+    for i, s in enumerate(rows):
+        gW[:, :, i, 0] = s[0] + (s[1] + s[2]) * 0.5
+        gW[:, :, i, 1] = (s[1] - s[2]) * 0.5
+        gW[:, :, i, 2] = (s[1] + s[2]) * 0.5 + s[3]
+    return gW
+
+
+def _winograd_tiles(xp, th, tw):
+    # Applies B^T d B to the overlapping 4x4 tiles d of xp whose top-left
+    # corners are at even positions. The result is laid out as
+    # (16, c, n * th * tw) for the batched matrix products.
+    n, c = xp.shape[:2]
+    # An odd output size needs one more row or column of zeros.
+    eh, ew = th * 2 + 2 - xp.shape[2], tw * 2 + 2 - xp.shape[3]
+    if eh or ew:
+        xp = numpy.pad(xp, ((0, 0), (0, 0), (0, eh), (0, ew)),
+                       mode='constant')
+    r = [xp[:, :, i:i + th * 2:2] for i in six.moves.range(4)]
+    rows = (r[0] - r[2], r[1] + r[2], r[2] - r[1], r[1] - r[3])
+    v = numpy.empty((4, 4, c, n, th, tw), dtype=xp.dtype)
+    for a, row in enumerate(rows):
+        s = [row[:, :, :, j:j + tw * 2:2] for j in six.moves.range(4)]
+        v[a, 0] = (s[0] - s[2]).transpose(1, 0, 2, 3)
+        v[a, 1] = (s[1] + s[2]).transpose(1, 0, 2, 3)
+        v[a, 2] = (s[2] - s[1]).transpose(1, 0, 2, 3)
+        v[a, 3] = (s[1] - s[3]).transpose(1, 0, 2, 3)
+    return v.reshape(16, c, n * th * tw)
+
+
+def _winograd_correlate_core(xp, W):
+    n = xp.shape[0]
+    out_c = W.shape[0]
+    out_h, out_w = xp.shape[2] - 2, xp.shape[3] - 2
+    th, tw = (out_h + 1) // 2, (out_w + 1) // 2
+
+    u = _winograd_filter(W.astype(xp.dtype, copy=False))
+    m = numpy.matmul(u, _winograd_tiles(xp, th, tw))
+    m = m.reshape(4, 4, out_c, n, th, tw)
+
+    # Applies A^T m A, where A^T = [[1, 1, 1, 0], [0, 1, -1, -1]].
+    y = numpy.empty((n, out_c, th * 2, tw * 2), dtype=xp.dtype)
+    for i, r in enumerate((m[0] + m[1] + m[2], m[1] - m[2] - m[3])):
+        y[:, :, i::2, 0::2] = (r[0] + r[1] + r[2]).transpose(1, 0, 2, 3)
+        y[:, :, i::2, 1::2] = (r[1] - r[2] - r[3]).transpose(1, 0, 2, 3)
+    return y[:, :, :out_h, :out_w]
+
+
+def _winograd_filter_grad_core(xp, gy):
+    n, out_c, out_h, out_w = gy.shape
+    th, tw = (out_h + 1) // 2, (out_w + 1) // 2
+    gy = numpy.pad(gy, ((0, 0), (0, 0), (0, th * 2 - out_h),
+                        (0, tw * 2 - out_w)), mode='constant')
+
+    # Applies A g A^T to the 2x2 tiles g of gy, i.e. the transpose of the
+    # output transform.
+    gm = numpy.empty((4, 4, out_c, n, th, tw), dtype=gy.dtype)
+    g = [gy[:, :, i::2].transpose(1, 0, 2, 3) for i in six.moves.range(2)]
+    for a, r in enumerate((g[0], g[0] + g[1], g[0] - g[1], -g[1])):
+        gm[a, 0] = r[..., 0::2]
+        gm[a, 1] = r[..., 0::2] + r[..., 1::2]
+        gm[a, 2] = r[..., 0::2] - r[..., 1::2]
+        gm[a, 3] = -r[..., 1::2]
+    gm = gm.reshape(16, out_c, n * th * tw)
+
+    v = _winograd_tiles(xp, th, tw)
+    gu = numpy.matmul(gm, v.transpose(0, 2, 1)).reshape(4, 4, out_c, -1)
+    return _winograd_filter_transpose(gu)
+
+
+def _winograd_correlate(xp, W, dy, dx):
+    if dy == dx == 1:
+        return _winograd_correlate_core(xp, W)
+    # A dilated convolution is a dense convolution of each phase of the
+    # input modulo the dilation.
+    n, _, h, w = xp.shape
+    y = numpy.empty((n, W.shape[0], h - 2 * dy, w - 2 * dx), dtype=xp.dtype)
+    for i in six.moves.range(min(dy, y.shape[2])):
+        for j in six.moves.range(min(dx, y.shape[3])):
+            y[:, :, i::dy, j::dx] = _winograd_correlate_core(
+                xp[:, :, i::dy, j::dx], W)
+    return y
+
+
+def _winograd_filter_grad(xp, gy, kh, kw, dy, dx):
+    gW = 0
+    for i in six.moves.range(min(dy, gy.shape[2])):
+        for j in six.moves.range(min(dx, gy.shape[3])):
+            gW = gW + _winograd_filter_grad_core(
+                xp[:, :, i::dy, j::dx], gy[:, :, i::dy, j::dx])
+    return gW
+
+
+# Upper bound of the bytes of the spectra computed at once by the FFT.
+_fft_workspace_size = 1 << 27
+
+
+def _fft_spectrum(x, size):
+    dtype = numpy.result_type(x.dtype, numpy.complex64)
+    f = numpy.fft.rfft2(x, s=size).astype(dtype, copy=False)
+    return f.reshape(x.shape[:2] + (-1,)).transpose(2, 0, 1)
+
+
+def _fft_chunks(n, c, h, w, out_c):
+    # The output channels are processed in chunks to bound the size of the
+    # spectra of the filters and the outputs.
+    size = max(1, _fft_workspace_size // ((n + c) * h * w * 16))
+    return six.moves.range(0, out_c, size), size
+
+
+def _fft_correlate(xp, W, dy, dx):
+    n, c, h, w = xp.shape
+    out_c, _, kh, kw = W.shape
+    dkh, dkw = (kh - 1) * dy + 1, (kw - 1) * dx + 1
+    y = numpy.empty((n, out_c, h - dkh + 1, w - dkw + 1), dtype=xp.dtype)
+
+    fx = _fft_spectrum(xp, (h, w))
+    chunks, size = _fft_chunks(n, c, h, w, out_c)
+    for i in chunks:
+        k = numpy.zeros((min(size, out_c - i), c, dkh, dkw), dtype=W.dtype)
+        k[:, :, ::dy, ::dx] = W[i:i + size]
+        # The products are summed over the input channels for each
+        # frequency.
+        fk = _fft_spectrum(k, (h, w)).conj().transpose(0, 2, 1)
+        fy = numpy.matmul(fx, fk).transpose(1, 2, 0)
+        fy = fy.reshape(n, len(k), h, -1)
+        y[:, i:i + size] = numpy.fft.irfft2(fy, s=(h, w))[
+            :, :, :y.shape[2], :y.shape[3]]
+    return y
+
+
+def _fft_filter_grad(xp, gy, kh, kw, dy, dx):
+    n, c, h, w = xp.shape
+    out_c = gy.shape[1]
+    gW = numpy.empty((out_c, c, kh, kw), dtype=xp.dtype)
+
+    fx = _fft_spectrum(xp, (h, w))
+    chunks, size = _fft_chunks(n, c, h, w, out_c)
+    for i in chunks:
+        fg = _fft_spectrum(gy[:, i:i + size], (h, w)).conj()
+        fW = numpy.matmul(fg.transpose(0, 2, 1), fx).transpose(1, 2, 0)
+        fW = fW.reshape(fg.shape[2], c, h, -1)
+        gW[i:i + size] = numpy.fft.irfft2(fW, s=(h, w))[
+            :, :, :(kh - 1) * dy + 1:dy, :(kw - 1) * dx + 1:dx]
+    return gW
+
+
+# Each algorithm computes the correlation of a padded input and a filter and
+# the gradient of the filter for stride 1.
+_algorithms = {
+    'im2col': (_im2col_correlate, _im2col_filter_grad),
+    'winograd': (_winograd_correlate, _winograd_filter_grad),
+    'fft': (_fft_correlate, _fft_filter_grad),
+}
+
+_autotune_cache = {}
+
+
+def _pad(x, ph, pw):
+    if ph == pw == 0:
+        return x
+    return numpy.pad(x, ((0, 0), (0, 0), (ph, ph), (pw, pw)),
+                     mode='constant')
+
+
+def forward(algorithm, x, W, pad, dilate=(1, 1)):
+    """Computes a convolution of stride 1 on CPU.
+
+    Args:
+        algorithm (str): Name of the algorithm.
+        x (numpy.ndarray): Input array of shape :math:`(n, c_I, h, w)`.
+        W (numpy.ndarray): Filter of shape :math:`(c_O, c_I, k_H, k_W)`.
+        pad (pair of ints): Spatial padding width.
+        dilate (pair of ints): Dilation factor of the filter.
+
+    Returns:
+        numpy.ndarray: Output array of shape :math:`(n, c_O, h_O, w_O)`.
+
+    """
+    correlate = _algorithms[algorithm][0]
+    y = correlate(_pad(x, *pad), W, *dilate)
+    return y.astype(x.dtype, copy=False)
+
+
+def backward_data(algorithm, gy, W, size, pad, dilate=(1, 1)):
+    """Computes the gradient of the input of a convolution of stride 1.
+
+    This is also the forward computation of a deconvolution of stride 1.
+
+    Args:
+        algorithm (str): Name of the algorithm.
+        gy (numpy.ndarray): Gradient of the output.
+        W (numpy.ndarray): Filter of shape :math:`(c_O, c_I, k_H, k_W)`.
+        size (pair of ints): Spatial size of the input.
+        pad (pair of ints): Spatial padding width.
+        dilate (pair of ints): Dilation factor of the filter.
+
+    Returns:
+        numpy.ndarray: Gradient of the input.
+
+    """
+    kh, kw = W.shape[2:]
+    dy, dx = dilate
+    ph, pw = pad
+    if algorithm == 'im2col':
+        # Scattering the patches is cheaper than the im2col of the padded
+        # gradient.
+        gcol = numpy.rollaxis(numpy.tensordot(W, gy, (0, 1)), 3)
+        gx = conv.col2im_cpu(gcol, 1, 1, ph, pw, size[0], size[1], dy, dx)
+    else:
+        # The full convolution by the filter is the correlation by the
+        # flipped filter whose input and output channels are swapped.
+        correlate = _algorithms[algorithm][0]
+        gx = correlate(_pad(gy, (kh - 1) * dy, (kw - 1) * dx),
+                       W.transpose(1, 0, 2, 3)[:, :, ::-1, ::-1], dy, dx)
+        gx = gx[:, :, ph:ph + size[0], pw:pw + size[1]]
+    return gx.astype(gy.dtype, copy=False)
+
+
+def backward_filter(algorithm, x, gy, ksize, pad, dilate=(1, 1)):
+    """Computes the gradient of the filter of a convolution of stride 1.
+
+    Args:
+        algorithm (str): Name of the algorithm.
+        x (numpy.ndarray): Input array.
+        gy (numpy.ndarray): Gradient of the output.
+        ksize (pair of ints): Size of the filter.
+        pad (pair of ints): Spatial padding width.
+        dilate (pair of ints): Dilation factor of the filter.
+
+    Returns:
+        numpy.ndarray: Gradient of the filter.
+
+    """
+    filter_grad = _algorithms[algorithm][1]
+    gW = filter_grad(_pad(x, *pad), gy, ksize[0], ksize[1], *dilate)
+    return gW.astype(x.dtype, copy=False)
+
+
+def get_candidates(ksize, stride, dilate=(1, 1)):
+    """Lists the CPU algorithms available for a convolution.
+
+    ``'im2col'`` supports any convolution. ``'winograd'`` supports the
+    :math:`3 \\times 3` filters of stride 1, and ``'fft'`` supports the
+    filters of stride 1 that span five or more pixels in either dimension
+    after dilation.
+
+    Args:
+        ksize (pair of ints): Size of the filter.
+        stride (pair of ints): Stride of filter applications.
+        dilate (pair of ints): Dilation factor of the filter.
+
+    Returns:
+        list of str: Names of the algorithms.
+
+    """
+    candidates = ['im2col']
+    if tuple(stride) != (1, 1):
+        return candidates
+    if tuple(ksize) == (3, 3):
+        candidates.append('winograd')
+    if max((k - 1) * d + 1 for k, d in zip(ksize, dilate)) >= 5:
+        candidates.append('fft')
+    return candidates
+
+
+def _run(algorithm, transposed, x, W, pad, dilate, backward):
+    ksize = W.shape[2:]
+    if transposed:
+        size = [s + (k - 1) * d - 2 * p
+                for s, k, p, d in zip(x.shape[2:], ksize, pad, dilate)]
+        y = backward_data(algorithm, x, W, size, pad, dilate)
+        if backward:
+            forward(algorithm, y, W, pad, dilate)
+            backward_filter(algorithm, y, x, ksize, pad, dilate)
+    else:
+        y = forward(algorithm, x, W, pad, dilate)
+        if backward:
+            backward_data(algorithm, y, W, x.shape[2:], pad, dilate)
+            backward_filter(algorithm, x, y, ksize, pad, dilate)
+
+
+def select(x, W, stride, pad, dilate=(1, 1), transposed=False):
+    """Chooses the CPU algorithm of a convolution.
+
+    The choice follows ``chainer.config.cpu_conv_algorithm``. If it names an
+    algorithm that does not support the convolution, ``'im2col'`` is used
+    instead. If it is ``'auto'``, every candidate is run twice on the given
+    arrays, and the fastest one is cached for the signature of the
+    convolution, i.e. the shapes and the dtype of the arrays, the stride,
+    the padding, the dilation, whether it is transposed, and whether the
+    backward computation is timed as well (in the training mode).
+
+    Args:
+        x (numpy.ndarray): Input array.
+        W (numpy.ndarray): Filter.
+        stride (pair of ints): Stride of filter applications.
+        pad (pair of ints): Spatial padding width.
+        dilate (pair of ints): Dilation factor of the filter.
+        transposed (bool): If ``True``, the convolution is a deconvolution
+            and ``W`` is of shape :math:`(c_I, c_O, k_H, k_W)`.
+
+    Returns:
+        str: Name of the algorithm.
+
+    """
+    name = chainer.config.cpu_conv_algorithm
+    if name != 'auto' and name not in _algorithms:
+        raise ValueError('invalid cpu_conv_algorithm configuration: %s '
+                         '(must be either of "auto", "fft", "im2col" or '
+                         '"winograd")' % repr(name))
+    candidates = get_candidates(W.shape[2:], stride, dilate)
+    if name != 'auto':
+        return name if name in candidates else 'im2col'
+    if len(candidates) == 1:
+        return candidates[0]
+
+    backward = chainer.config.train
+    key = (x.shape, W.shape, x.dtype.str, tuple(stride), tuple(pad),
+           tuple(dilate), transposed, backward)
+    algorithm = _autotune_cache.get(key)
+    if algorithm is None:
+        times = []
+        for candidate in candidates:
+            # The first run of each candidate also warms up the allocator.
+            for _ in six.moves.range(2):
+                start = timeit.default_timer()
+                _run(candidate, transposed, x, W, pad, dilate, backward)
+                times.append((timeit.default_timer() - start, candidate))
+        algorithm = min(times)[1]
+        _autotune_cache[key] = algorithm
+    return algorithm
@@ -100,6 +100,120 @@ def col2im_nd_cpu(col, stride, pad, dims):
     return img[img_index]
 
 
+def _pooling_windows(dims, outs, ksize, stride, pad):
+    # Yields the flat index of each offset in the pooling window in C order
+    # and the slices of the output and of the input array related by it.
+    # Only the outputs whose inputs at the offset are not in the padding are
+    # covered, so that the input needs not to be padded.
+    colon = slice(None)
+    ranges = [six.moves.range(k) for k in ksize]
+    for i, kxs in enumerate(itertools.product(*ranges)):
+        out_index = [colon, colon]
+        img_index = [colon, colon]
+        for kx, d, out, s, p in zip(kxs, dims, outs, stride, pad):
+            # Outputs o reading the input o * s + kx - p in [0, d).
+            lo = max(0, -((kx - p) // s))
+            hi = min(out, (d - 1 + p - kx) // s + 1)
+            if lo >= hi:
+                break
+            start = lo * s + kx - p
+            out_index.append(slice(lo, hi))
+            img_index.append(slice(start, start + (hi - lo - 1) * s + 1, s))
+        else:
+            yield i, tuple(out_index), tuple(img_index)
+
+
+def _zeros_like(a, shape, dtype):
+    # Returns zeros of the shape whose axes are in the same order in memory as
+    # those of a, e.g. an NHWC array for the NCHW view of an NHWC image.
+    order = sorted(six.moves.range(a.ndim), key=lambda i: -a.strides[i])
+    z = numpy.zeros([shape[i] for i in order], dtype=dtype)
+    return z.transpose(numpy.argsort(order))
+
+
+def max_pooling_nd_cpu(img, ksize, stride, pad, cover_all=False):
+    # Computes the max pooling and the argmax over the flattened window in
+    # one pass over the offsets of the window, reading strided views of the
+    # input instead of the patches of im2col. The padding is regarded as
+    # -inf and the first of equal values is selected as im2col and argmax do.
+    # NaN is selected over any other value, keeping the first NaN, so that it
+    # propagates to the output as max does.
+    n, c = img.shape[:2]
+    dims = img.shape[2:]
+    outs = tuple(get_conv_outsize(d, k, s, p, cover_all)
+                 for (d, k, s, p) in zip(dims, ksize, stride, pad))
+    assert all(out > 0 for out in outs), 'Output sizes should be positive.'
+
+    y = None
+    indexes = _zeros_like(img, (n, c) + outs, numpy.int32)
+    mask = numpy.empty_like(indexes, dtype=bool)
+    for i, out_index, img_index in _pooling_windows(
+            dims, outs, ksize, stride, pad):
+        x = img[img_index]
+        if y is None:
+            # The first offset is copied if it covers all outputs.
+            if i == 0 and x.shape == mask.shape:
+                y = x.copy(order='K')
+                continue
+            y = _zeros_like(img, (n, c) + outs, img.dtype)
+            y.fill(-numpy.inf)
+        y_i = y[out_index]
+        m = mask[out_index]
+        numpy.greater(x, y_i, out=m)
+        m |= numpy.isnan(x) & ~numpy.isnan(y_i)
+        numpy.copyto(y_i, x, where=m)
+        numpy.copyto(indexes[out_index], i, where=m)
+    return y, indexes
+
+
+def max_pooling_nd_grad_cpu(gy, indexes, dims, ksize, stride, pad):
+    # Scatters gy to the inputs selected by the indexes of
+    # max_pooling_nd_cpu.
+    n, c = gy.shape[:2]
+    outs = gy.shape[2:]
+    gx = _zeros_like(gy, (n, c) + tuple(dims), gy.dtype)
+    g = numpy.empty_like(gy)
+    for i, out_index, img_index in _pooling_windows(
+            dims, outs, ksize, stride, pad):
+        # The other inputs get exact zeros even if gy is inf or NaN.
+        g_i = g[out_index]
+        g_i.fill(0)
+        numpy.copyto(g_i, gy[out_index], where=indexes[out_index] == i)
+        gx_i = gx[img_index]
+        gx_i += g_i
+    return gx
+
+
+def average_pooling_nd_cpu(img, ksize, stride, pad, cover_all=False):
+    # Computes the average pooling by summing the strided views of the input
+    # at the offsets of the window. The padding is regarded as zero.
+    n, c = img.shape[:2]
+    dims = img.shape[2:]
+    outs = tuple(get_conv_outsize(d, k, s, p, cover_all)
+                 for (d, k, s, p) in zip(dims, ksize, stride, pad))
+    assert all(out > 0 for out in outs), 'Output sizes should be positive.'
+
+    y = _zeros_like(img, (n, c) + outs, img.dtype)
+    for _, out_index, img_index in _pooling_windows(
+            dims, outs, ksize, stride, pad):
+        y_i = y[out_index]
+        y_i += img[img_index]
+    y *= 1. / numpy.prod(ksize)
+    return y
+
+
+def average_pooling_nd_grad_cpu(gy, dims, ksize, stride, pad):
+    n, c = gy.shape[:2]
+    outs = gy.shape[2:]
+    gx = _zeros_like(gy, (n, c) + tuple(dims), gy.dtype)
+    g = gy * (1. / numpy.prod(ksize))
+    for _, out_index, img_index in _pooling_windows(
+            dims, outs, ksize, stride, pad):
+        gx_i = gx[img_index]
+        gx_i += g[out_index]
+    return gx
+
+
 def col2im_nd_gpu(col, stride, pad, dims):
     n, c = col.shape[:2]        # (n, c, k_1, ..., k_N, out_1, ..., out_N)
     mid = (len(col.shape) - 2) // 2 + 2
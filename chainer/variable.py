@@ -10,7 +10,9 @@ import six
 
 import chainer
 from chainer import cuda
+from chainer import gradient_pool
 from chainer import initializers
+from chainer import sparse_grad
 from chainer import utils
 
 from chainer.cuda import iscompatible
@@ -47,9 +49,12 @@ https://github.com/pfnet/chainer/issues/new.
     if x.data is None or gx is None:
         # ``x.data is None`` implies that the data array is not retained
         return
-    if not iscompatible(gx, type(x.data)):
+    gx_array = gx
+    if isinstance(gx, sparse_grad.SparseGrad):
+        gx_array = gx.values
+    if not iscompatible(gx_array, type(x.data)):
         msg = ('Type of data and grad mismatch\n%s != %s' %
-               (type(x.data), type(gx)))
+               (type(x.data), type(gx_array)))
         raise TypeError(make_message(msg))
     if gx.dtype != x.data.dtype:
         msg = ('Dtype of data and grad mismatch\n%s != %s' %
@@ -492,7 +497,8 @@ Actual: {0}'''.format(type(data))
 
         with cuda.get_device(self.data) as dev:
             node = self._node
-            if node._grad is None:
+            if node._grad is None or \
+                    isinstance(node._grad, sparse_grad.SparseGrad):
                 xp = numpy if int(dev) == -1 else cuda.cupy
                 node._grad = xp.zeros_like(self.data)
             else:
@@ -560,8 +566,14 @@ Actual: {0}'''.format(type(data))
         if src_dev.id == dst_dev.id:
             with dst_dev:
                 if dst is None:
-                    xp = cuda.get_array_module(src)
-                    self._node.grad = xp.copy(src)
+                    if isinstance(src, sparse_grad.SparseGrad):
+                        self._node.grad = src.copy()
+                    else:
+                        xp = cuda.get_array_module(src)
+                        self._node.grad = xp.copy(src)
+                elif isinstance(src, sparse_grad.SparseGrad) or \
+                        isinstance(dst, sparse_grad.SparseGrad):
+                    self._node.grad = dst + src
                 else:
                     dst += src
             return
@@ -623,7 +635,28 @@ Actual: {0}'''.format(type(data))
                 is to compute gradients of parameters, not of all variables,
                 and therefore it is recommended to set this flag ``False``.
 
+        .. note::
+           When ``chainer.config.mkldnn_batch_stream`` is ``True``, the
+           mkldnn primitives of the whole backward computation share one
+           stream (see :func:`chainer.mkld.batched_stream`).
+
         """
+        pool = None
+        if chainer.config.use_gradient_pool:
+            pool = gradient_pool.get_default_pool()
+            pool.begin_step()
+        try:
+            if chainer.mkld.available and \
+                    chainer.config.mkldnn_batch_stream:
+                with chainer.mkld.batched_stream():
+                    self._backward_main(retain_grad, pool)
+            else:
+                self._backward_main(retain_grad, pool)
+        finally:
+            if pool is not None:
+                pool.end_step()
+
+    def _backward_main(self, retain_grad, pool):
         if chainer.mkld.available:
             chainer.mkld.fanout.FanoutRecorder.clear()
         if self.creator is None:
@@ -642,6 +675,7 @@ Actual: {0}'''.format(type(data))
         seen_set = set()
         seen_vars = set()
         need_copy = set()
+        released = []
 
         # Initialize error by 1, if this is a loss variable
         if self.data.size == 1 and self.grad is None:
@@ -650,6 +684,8 @@ Actual: {0}'''.format(type(data))
                     self.grad = numpy.ones_like(self.data)
                 else:
                     self.grad = cuda.cupy.ones_like(self.data)
+        if pool is not None:
+            pool.track(self.node, self.grad)
 
         def add_cand(cand):
             if cand not in seen_set:
@@ -664,7 +700,8 @@ Actual: {0}'''.format(type(data))
             outputs = [y() for y in func.outputs]  # access via weak ref
 
             in_data = tuple([x.data for x in func.inputs])
-            outputs_data = tuple([y.grad for y in outputs])
+            outputs_data = tuple([None if y is None else y.grad
+                                  for y in outputs])
 
             out_grad = ()
             if chainer.mkld.available and \
@@ -691,6 +728,9 @@ Actual: {0}'''.format(type(data))
                 hooks.update(func.local_function_hooks)
 
             cuda.get_device(*(in_data + out_grad)).use()
+            if chainer.mkld.available:
+                chainer.mkld.prepare_function(
+                    func, in_data + out_grad, hooks, 'backward')
             for hook in six.itervalues(hooks):
                 hook.backward_preprocess(func, in_data, out_grad)
             gxs = func.backward(in_data, out_grad)
@@ -699,12 +739,15 @@ Actual: {0}'''.format(type(data))
                 numpy_result = func.backward_cpu_cosim(in_data, out_grad)
                 func.cpu_cosim_verify_result(gxs, numpy_result, in_data, out_grad)
             for hook in six.itervalues(hooks):
+                hook.backward_outputs(func, in_data, out_grad, gxs)
                 hook.backward_postprocess(func, in_data, out_grad)
 
             if is_debug:
                 for gx in gxs:
                     if gx is None:
                         continue
+                    if isinstance(gx, sparse_grad.SparseGrad):
+                        gx = gx.values
                     cuda.get_device(gx).use()
                     if cuda.get_array_module(gx).isnan(gx).any():
                         msg = 'NaN is detected on backward computation'
@@ -713,6 +756,9 @@ Actual: {0}'''.format(type(data))
             if not retain_grad:
                 for y in outputs:
                     if y is not None and y is not self.node:
+                        if pool is not None:
+                            released.append(y._grad)
+                            pool.track(y, None)
                         y.grad = None
             for x, gx in zip(func.inputs, gxs):
                 if gx is None:
@@ -727,11 +773,19 @@ Actual: {0}'''.format(type(data))
                     if x._grad is None:
                         x.grad = gx
                         need_copy.add(id_x)
+                        if pool is not None:
+                            pool.track(x, gx)
                     else:
+                        if chainer.mkld.available:
+                            chainer.mkld.flush_stream()
                         cuda.get_device(gx).use()
                         if id_x in need_copy:
-                            x.grad = utils.force_array(x.grad + gx)  # copy
+                            # In place or into a pooled buffer if possible
+                            if pool is None or not pool.accumulate(x, gx):
+                                x.grad = utils.force_array(x.grad + gx)  # copy
                             need_copy.remove(id_x)  # remove from list in 2nd visit
+                        elif isinstance(gx, sparse_grad.SparseGrad):
+                            x._grad = x._grad + gx
                         else:
                             x._grad += gx
                 else:  # not a leaf
@@ -740,6 +794,8 @@ Actual: {0}'''.format(type(data))
                         x.grad = gx
                         seen_vars.add(id_x)
                         need_copy.add(id_x)
+                        if pool is not None:
+                            pool.track(x, gx)
                     else:
                         cuda.get_device(gx).use()
                         if id_x in need_copy:  # 2nd visit
@@ -748,7 +804,11 @@ Actual: {0}'''.format(type(data))
                                 # if enable_acc_grad, will deply to do grad accumulate, only record grad
                                 x.acc_grad += (gx,)
                             else:
-                                x._grad = utils.force_array(gx + x._grad)  # copied
+                                if chainer.mkld.available:
+                                    chainer.mkld.flush_stream()
+                                if pool is None or \
+                                        not pool.accumulate(x, gx):
+                                    x._grad = utils.force_array(gx + x._grad)  # copied
                             need_copy.remove(id_x)
                         else:  # 3rd or later visit
                             if chainer.mkld.available and \
@@ -756,8 +816,18 @@ Actual: {0}'''.format(type(data))
                                 # if enable_acc_grad, will deply to do grad accumulate, only record grad
                                 x.acc_grad += (gx,)
                             else:
-                                x._grad += gx
+                                if chainer.mkld.available:
+                                    chainer.mkld.flush_stream()
+                                if isinstance(gx, sparse_grad.SparseGrad):
+                                    x._grad = x._grad + gx
+                                else:
+                                    x._grad += gx
             del gxs  # to reduce memory usage
+            if pool is not None and released:
+                # Drop the references held here so that the pool can tell
+                # whether the gradients are still used elsewhere.
+                out_grad = outputs_data = gx = None
+                pool.release(released)
             if initial_device is not None:
                 initial_device.use()
 
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Measures the time and the peak memory of the CIFAR model on CPU.
+
+It runs training iterations (forward, backward and update) and inference
+(forward without backpropagation in the test mode) of the VGG-style model of
+this example on random images. The peak memory is the peak of the arrays
+allocated by NumPy during one iteration, as traced by :mod:`tracemalloc`.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+
+import models.VGG
+
+
+def measure(step, iterations):
+    step()
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.time()
+    for _ in range(iterations):
+        step()
+    return (time.time() - start) / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time and peak memory of the CIFAR model on CPU')
+    parser.add_argument('--batchsize', '-b', type=int, default=64,
+                        help='Number of images in each mini-batch')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    model = L.Classifier(models.VGG.VGG(10))
+    optimizer = chainer.optimizers.MomentumSGD(0.05)
+    optimizer.setup(model)
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, 32, 32)).astype(np.float32)
+    t = np.random.randint(0, 10, args.batchsize).astype(np.int32)
+
+    def train():
+        optimizer.update(model, x, t)
+
+    def infer():
+        with chainer.no_backprop_mode(), chainer.using_config('train', False):
+            model.predictor(x)
+
+    print('batchsize: {}'.format(args.batchsize))
+    print('{:<10}{:>16}{:>16}{:>16}'.format(
+        'step', 'time (ms)', 'images/sec', 'peak (MiB)'))
+    for name, step in (('train', train), ('inference', infer)):
+        elapsed, peak = measure(step, args.iteration)
+        print('{:<10}{:>16.1f}{:>16.1f}{:>16.1f}'.format(
+            name, elapsed * 1e3, args.batchsize / elapsed, peak / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Measures the CPU step time of the ImageNet example models.
+
+It runs forward and backward computation on random data, so no dataset is
+required. Each configuration is run with a few warm-up iterations first, which
+are excluded from the timing.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+
+import alex
+import googlenet
+import googlenetbn
+import nin
+
+
+archs = {
+    'alex': alex.Alex,
+    'googlenet': googlenet.GoogLeNet,
+    'googlenetbn': googlenetbn.GoogLeNetBN,
+    'nin': nin.NIN,
+}
+
+
+def count_functions(loss):
+    seen = set()
+    stack = [loss.creator]
+    while stack:
+        func = stack.pop()
+        if func is None or func in seen:
+            continue
+        seen.add(func)
+        stack.extend(x.creator for x in func.inputs)
+    return len(seen)
+
+
+def run(model, forward, iterations, warmup):
+    elapsed = []
+    n_funcs = 0
+    for i in range(warmup + iterations):
+        start = time.time()
+        model.cleargrads()
+        loss = forward()
+        n_funcs = count_functions(loss)
+        loss.backward()
+        if i >= warmup:
+            elapsed.append(time.time() - start)
+        del loss
+    return np.mean(elapsed), n_funcs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of the ImageNet example models on CPU')
+    parser.add_argument('--arch', '-a', choices=archs.keys(), default='alex',
+                        help='Convnet architecture')
+    parser.add_argument('--batchsize', '-B', type=int, default=32,
+                        help='Minibatch size')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=2,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    model = archs[args.arch]()
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, model.insize, model.insize)
+    ).astype(np.float32)
+    t = np.random.randint(0, 1000, args.batchsize).astype(np.int32)
+
+    print('arch: {}  batchsize: {}  mkldnn: {}'.format(
+        args.arch, args.batchsize, chainer.mkld.available))
+    print('{:<24}{:>16}{:>20}'.format('mode', 'step (ms)', 'per-op (us)'))
+
+    def forward():
+        return model(x, t)
+
+    def forward_batched():
+        # One stream for the forward pass; backward gets its own through
+        # chainer.config.mkldnn_batch_stream.
+        with chainer.mkld.batched_stream():
+            return model(x, t)
+
+    modes = [
+        ('per-op stream', False, forward),
+        ('batched stream', True, forward_batched),
+    ]
+    for name, batch_stream, f in modes:
+        with chainer.using_config('mkldnn_batch_stream', batch_stream):
+            step, n_funcs = run(model, f, args.iteration, args.warmup)
+        print('{:<24}{:>16.2f}{:>20.2f}'.format(
+            name, step * 1e3, step * 1e6 / (2 * n_funcs)))
+
+
+if __name__ == '__main__':
+    main()
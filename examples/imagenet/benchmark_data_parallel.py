@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Measures the scaling of data-parallel training on CPU.
+
+It trains the ImageNet example models (or the MNIST MLP) on random data with
+:class:`chainer.training.MultiprocessParallelUpdater` for increasing numbers
+of processes and reports the throughput and the speedup over one process.
+The minibatch size is the total over all processes, so every configuration
+does the same work per iteration.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+from chainer import training
+
+import alex
+import googlenet
+import googlenetbn
+import nin
+
+
+class MLP(chainer.Chain):
+
+    insize = 28
+
+    def __init__(self):
+        super(MLP, self).__init__(
+            l1=L.Linear(784, 1000),
+            l2=L.Linear(1000, 1000),
+            l3=L.Linear(1000, 10),
+        )
+
+    def __call__(self, x, t):
+        h = chainer.functions.relu(self.l1(x))
+        h = chainer.functions.relu(self.l2(h))
+        return chainer.functions.softmax_cross_entropy(self.l3(h), t)
+
+
+archs = {
+    'alex': alex.Alex,
+    'googlenet': googlenet.GoogLeNet,
+    'googlenetbn': googlenetbn.GoogLeNetBN,
+    'mlp': MLP,
+    'nin': nin.NIN,
+}
+
+
+def make_dataset(arch, size):
+    if arch is MLP:
+        x = np.random.uniform(-1, 1, (size, 784)).astype(np.float32)
+        t = np.random.randint(0, 10, size).astype(np.int32)
+    else:
+        x = np.random.uniform(
+            -1, 1, (size, 3, arch.insize, arch.insize)).astype(np.float32)
+        t = np.random.randint(0, 1000, size).astype(np.int32)
+    return chainer.datasets.TupleDataset(x, t)
+
+
+def run(arch, n_processes, batchsize, iterations, warmup):
+    model = arch()
+    optimizer = chainer.optimizers.MomentumSGD(lr=0.01)
+    optimizer.setup(model)
+    local_batchsize = batchsize // n_processes
+    iterators = [
+        chainer.iterators.SerialIterator(
+            make_dataset(arch, local_batchsize), local_batchsize)
+        for _ in range(n_processes)]
+    updater = training.MultiprocessParallelUpdater(iterators, optimizer)
+    try:
+        for _ in range(warmup):
+            updater.update()
+        start = time.time()
+        for _ in range(iterations):
+            updater.update()
+        elapsed = time.time() - start
+    finally:
+        updater.finalize()
+    return batchsize * iterations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Scaling of data-parallel training on CPU')
+    parser.add_argument('--arch', '-a', choices=archs.keys(), default='alex',
+                        help='Model architecture')
+    parser.add_argument('--batchsize', '-B', type=int, default=64,
+                        help='Total minibatch size')
+    parser.add_argument('--processes', '-p', type=int, nargs='+',
+                        default=[1, 2, 4], help='Numbers of processes')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=2,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    print('arch: {}  batchsize: {}  mkldnn: {}'.format(
+        args.arch, args.batchsize, chainer.mkld.available))
+    print('{:<12}{:>20}{:>12}'.format('processes', 'samples/sec', 'speedup'))
+    base = None
+    for n in args.processes:
+        throughput = run(archs[args.arch], n, args.batchsize,
+                         args.iteration, args.warmup)
+        if base is None:
+            base = throughput
+        print('{:<12}{:>20.1f}{:>12.2f}'.format(n, throughput,
+                                                throughput / base))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Measures the gradient memory of backward computation on CPU.
+
+It runs forward and backward computation of a stack of inception blocks, whose
+inputs fan out to four branches each, on random data. Peak RSS only grows
+within a process, so run each mode separately to compare them::
+
+    $ python benchmark_gradient_pool.py --mode off
+    $ python benchmark_gradient_pool.py --mode in-place
+    $ python benchmark_gradient_pool.py --mode pool
+
+``in-place`` accumulates gradients in place but does not keep free buffers.
+The gradient memory statistics are only available if the pool is used.
+
+"""
+from __future__ import print_function
+import argparse
+import resource
+import time
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import gradient_pool
+import chainer.links as L
+
+
+class InceptionStack(chainer.Chain):
+
+    def __init__(self, n_blocks):
+        super(InceptionStack, self).__init__(
+            conv=L.Convolution2D(3, 64, 3, pad=1))
+        for i in range(n_blocks):
+            self.add_link('inc{}'.format(i),
+                          L.Inception(64, 16, 16, 24, 8, 16, 8))
+        self.n_blocks = n_blocks
+
+    def __call__(self, x):
+        h = F.relu(self.conv(x))
+        for i in range(self.n_blocks):
+            h = self['inc{}'.format(i)](h)
+        return F.sum(h * h)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Gradient memory of backward computation')
+    parser.add_argument('--mode', choices=('off', 'in-place', 'pool'),
+                        default='pool', help='How gradients are allocated')
+    parser.add_argument('--blocks', type=int, default=8,
+                        help='Number of inception blocks')
+    parser.add_argument('--batchsize', '-B', type=int, default=16,
+                        help='Minibatch size')
+    parser.add_argument('--insize', type=int, default=28,
+                        help='Height and width of the input images')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=2,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    pool = gradient_pool.get_default_pool()
+    if args.mode == 'in-place':
+        pool.capacity = 0
+    model = InceptionStack(args.blocks)
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, args.insize, args.insize)
+    ).astype(np.float32)
+
+    elapsed = []
+    with chainer.using_config('use_gradient_pool', args.mode != 'off'):
+        for i in range(args.warmup + args.iteration):
+            start = time.time()
+            model.cleargrads()
+            loss = model(x)
+            loss.backward()
+            del loss
+            if i >= args.warmup:
+                elapsed.append(time.time() - start)
+
+    # ru_maxrss is in kilobytes on Linux.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print('mode: {}  blocks: {}  batchsize: {}  mkldnn: {}'.format(
+        args.mode, args.blocks, args.batchsize, chainer.mkld.available))
+    print('step:           {:10.2f} ms'.format(np.mean(elapsed) * 1e3))
+    print('peak RSS:       {:10.1f} MiB'.format(rss))
+    if args.mode != 'off':
+        stats = pool.stats()
+        print('peak grads:     {:10.1f} MiB'.format(
+            stats['peak_bytes'] / 2.0 ** 20))
+        print('steady grads:   {:10.1f} MiB'.format(
+            stats['steady_bytes'] / 2.0 ** 20))
+        print('in-place adds:  {:10d}'.format(stats['in_place']))
+        print('pool hits:      {:10d}'.format(stats['hits']))
+        print('pool misses:    {:10d}'.format(stats['misses']))
+
+
+if __name__ == '__main__':
+    main()
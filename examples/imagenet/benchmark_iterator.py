@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Measures the throughput of MultiprocessIterator on ImageNet-style data.
+
+It compares the two ways :class:`chainer.iterators.MultiprocessIterator`
+transfers batches from the worker processes:
+
+- ``per-example``: each example is copied through its own shared memory
+  buffer, unpacked by the main process, and concatenated by
+  :func:`chainer.dataset.concat_examples`.
+- ``batch``: the workers write the examples into shared memory buffers of
+  whole concatenated batches, which the main process uses without copying.
+
+The examples are read by :class:`chainer.datasets.LabeledImageDataset` and
+preprocessed as in ``train_imagenet.py`` if an image-label list file is
+given. Otherwise random images of the same shape are generated, so that no
+dataset is required::
+
+    $ python benchmark_iterator.py train.txt --root /path/to/images
+    $ python benchmark_iterator.py --loaderjob 4
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+
+from train_imagenet import PreprocessedDataset
+
+
+class RandomImageDataset(chainer.dataset.DatasetMixin):
+
+    """Random images cropped and scaled like ``PreprocessedDataset``."""
+
+    def __init__(self, size, insize, crop_size):
+        self.size = size
+        self.image = np.random.randint(
+            0, 256, (3, insize, insize)).astype(np.float32)
+        self.crop_size = crop_size
+
+    def __len__(self):
+        return self.size
+
+    def get_example(self, i):
+        _, h, w = self.image.shape
+        top = np.random.randint(0, h - self.crop_size)
+        left = np.random.randint(0, w - self.crop_size)
+        image = self.image[:, top:top + self.crop_size,
+                           left:left + self.crop_size].copy()
+        image *= (1.0 / 255.0)
+        return image, np.array(i % 1000, np.int32)
+
+
+def run(dataset, mode, args):
+    shared_mem = None
+    if mode == 'per-example':
+        shared_mem = sum(x.nbytes for x in dataset[0])
+    it = chainer.iterators.MultiprocessIterator(
+        dataset, args.batchsize, n_processes=args.loaderjob,
+        n_prefetch=args.prefetch, shared_mem=shared_mem)
+    try:
+        for _ in range(args.warmup):
+            chainer.dataset.concat_examples(it.next())
+        start = time.time()
+        for _ in range(args.iteration):
+            x, t = chainer.dataset.concat_examples(it.next())
+            del x, t
+        elapsed = time.time() - start
+    finally:
+        it.finalize()
+    return args.batchsize * args.iteration / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Throughput of MultiprocessIterator')
+    parser.add_argument('train', nargs='?',
+                        help='Path to training image-label list file')
+    parser.add_argument('--root', '-R', default='.',
+                        help='Root directory path of image files')
+    parser.add_argument('--mean', '-m', default='mean.npy',
+                        help='Mean file (computed by compute_mean.py)')
+    parser.add_argument('--batchsize', '-B', type=int, default=32,
+                        help='Minibatch size')
+    parser.add_argument('--insize', type=int, default=256,
+                        help='Size of the random images')
+    parser.add_argument('--cropsize', type=int, default=227,
+                        help='Size of the cropped images')
+    parser.add_argument('--loaderjob', '-j', type=int,
+                        help='Number of parallel data loading processes')
+    parser.add_argument('--prefetch', type=int, default=2,
+                        help='Number of prefetched batches')
+    parser.add_argument('--iteration', '-i', type=int, default=50,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=5,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    if args.train:
+        mean = np.load(args.mean)
+        dataset = PreprocessedDataset(
+            args.train, args.root, mean, args.cropsize)
+    else:
+        size = args.batchsize * (args.warmup + args.iteration + 1)
+        dataset = RandomImageDataset(size, args.insize, args.cropsize)
+
+    print('dataset: {}  batchsize: {}  loaderjob: {}'.format(
+        args.train or 'random', args.batchsize, args.loaderjob))
+    print('{:<16}{:>20}'.format('mode', 'samples/sec'))
+    for mode in ('per-example', 'batch'):
+        throughput = run(dataset, mode, args)
+        print('{:<16}{:>20.1f}'.format(mode, throughput))
+
+
+if __name__ == '__main__':
+    main()
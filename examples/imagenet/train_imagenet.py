@@ -95,6 +95,9 @@ def main():
                         help='Mean file (computed by compute_mean.py)')
     parser.add_argument('--resume', '-r', default='',
                         help='Initialize the trainer from given file')
+    parser.add_argument('--processes', '-p', type=int, default=1,
+                        help='Number of data-parallel training processes '
+                        'on CPU')
     parser.add_argument('--out', '-o', default='result',
                         help='Output directory')
     parser.add_argument('--root', '-R', default='.',
@@ -120,8 +123,21 @@ def main():
     val = PreprocessedDataset(args.val, args.root, mean, model.insize, False)
     # These iterators load the images with subprocesses running in parallel to
     # the training/validation.
-    train_iter = chainer.iterators.MultiprocessIterator(
-        train, args.batchsize, n_processes=args.loaderjob)
+    if args.processes > 1:
+        # Each training process iterates over its own part of the dataset.
+        order = np.random.permutation(len(train))
+        train_iters = [
+            chainer.iterators.MultiprocessIterator(
+                chainer.datasets.SubDataset(
+                    train, len(train) * i // args.processes,
+                    len(train) * (i + 1) // args.processes, order),
+                args.batchsize // args.processes,
+                n_processes=args.loaderjob)
+            for i in range(args.processes)]
+        train_iter = train_iters[0]
+    else:
+        train_iter = chainer.iterators.MultiprocessIterator(
+            train, args.batchsize, n_processes=args.loaderjob)
     val_iter = chainer.iterators.MultiprocessIterator(
         val, args.val_batchsize, repeat=False, n_processes=args.loaderjob)
 
@@ -130,7 +146,12 @@ def main():
     optimizer.setup(model)
 
     # Set up a trainer
-    updater = training.StandardUpdater(train_iter, optimizer, device=args.gpu)
+    if args.processes > 1 and args.gpu < 0:
+        # The minibatch is split between processes pinned to disjoint CPUs.
+        updater = training.MultiprocessParallelUpdater(train_iters, optimizer)
+    else:
+        updater = training.StandardUpdater(
+            train_iter, optimizer, device=args.gpu)
     trainer = training.Trainer(updater, (args.epoch, 'epoch'), args.out)
 
     val_interval = (10 if args.test else 100000), 'iteration'
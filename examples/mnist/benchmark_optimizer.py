@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Measures the optimizer update of a model with many small parameters.
+
+It updates a deep MLP with random gradients, with weight decay and gradient
+clipping, once for each parameter as usual and by the fused update of
+:meth:`chainer.GradientMethod.use_fused_update`. Only the update is timed.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+
+
+optimizers = {
+    'adagrad': chainer.optimizers.AdaGrad,
+    'adam': chainer.optimizers.Adam,
+    'momentum': chainer.optimizers.MomentumSGD,
+    'rmsprop': chainer.optimizers.RMSprop,
+    'sgd': chainer.optimizers.SGD,
+}
+
+
+def run(args, fused):
+    model = chainer.ChainList(
+        *[L.Linear(args.unit, args.unit) for _ in range(args.layer)])
+    optimizer = optimizers[args.optimizer]()
+    optimizer.setup(model)
+    optimizer.add_hook(chainer.optimizer.WeightDecay(1e-4))
+    optimizer.add_hook(chainer.optimizer.GradientClipping(1.0))
+    if fused:
+        optimizer.use_fused_update()
+    for param in model.params():
+        param.grad = np.random.uniform(
+            -1, 1, param.shape).astype(np.float32)
+
+    optimizer.update()
+    start = time.time()
+    for _ in range(args.iteration):
+        optimizer.update()
+    return (time.time() - start) / args.iteration
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Optimizer update of many small parameters')
+    parser.add_argument('--optimizer', '-o', choices=sorted(optimizers),
+                        default='adam', help='Optimizer')
+    parser.add_argument('--layer', '-l', type=int, default=100,
+                        help='Number of layers')
+    parser.add_argument('--unit', '-u', type=int, default=32,
+                        help='Number of units')
+    parser.add_argument('--iteration', '-i', type=int, default=100,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    print('optimizer: {}  parameters: {}'.format(
+        args.optimizer, args.layer * 2))
+    print('{:<16}{:>16}'.format('update', 'time (ms)'))
+    for name, fused in (('per-parameter', False), ('fused', True)):
+        elapsed = run(args, fused)
+        print('{:<16}{:>16.2f}'.format(name, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Measures the training step time of the MNIST MLP with a static graph.
+
+It compares the usual define-by-run step with the step replayed by
+:func:`chainer.graph_optimizations.static_graph` on random data, so no
+dataset is required. The per-function overhead is measured on the forward and
+backward computation with a minibatch of one example, where the time is
+dominated by Python.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+from chainer import graph_optimizations
+import chainer.links as L
+
+import train_mnist
+
+
+class StaticMLP(train_mnist.MLP):
+
+    @graph_optimizations.static_graph
+    def __call__(self, x):
+        return super(StaticMLP, self).__call__(x)
+
+
+def count_functions(loss):
+    seen = set()
+    stack = [loss.creator]
+    while stack:
+        func = stack.pop()
+        if func is None or func in seen:
+            continue
+        seen.add(func)
+        stack.extend(x.creator for x in func.inputs)
+    return len(seen)
+
+
+def run(model, optimizer, x, t, iterations, warmup):
+    elapsed = []
+    for i in range(warmup + iterations):
+        start = time.time()
+        model.cleargrads()
+        loss = model(x, t)
+        loss.backward()
+        if optimizer is not None:
+            optimizer.update()
+        if i >= warmup:
+            elapsed.append(time.time() - start)
+    return np.mean(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of the static graph on the MNIST MLP')
+    parser.add_argument('--batchsize', '-b', type=int, default=100,
+                        help='Number of images in each mini-batch')
+    parser.add_argument('--unit', '-u', type=int, default=1000,
+                        help='Number of units')
+    parser.add_argument('--iteration', '-i', type=int, default=100,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=5,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    model = L.Classifier(StaticMLP(args.unit, 10))
+    optimizer = chainer.optimizers.Adam()
+    optimizer.setup(model)
+
+    print('batchsize: {}  unit: {}'.format(args.batchsize, args.unit))
+    print('{:<16}{:>16}{:>28}'.format(
+        'mode', 'step (ms)', 'overhead (us/function)'))
+    with chainer.using_config('use_static_graph', False):
+        x = np.zeros((1, 784), np.float32)
+        t = np.zeros(1, np.int32)
+        n_funcs = count_functions(model(x, t))
+
+    for name, static in (('dynamic', False), ('static', True)):
+        with chainer.using_config('use_static_graph', static):
+            x = np.random.uniform(
+                0, 1, (args.batchsize, 784)).astype(np.float32)
+            t = np.random.randint(0, 10, args.batchsize).astype(np.int32)
+            step = run(model, optimizer, x, t, args.iteration, args.warmup)
+            overhead = run(model, None, x[:1], t[:1], args.iteration,
+                           args.warmup)
+        print('{:<16}{:>16.3f}{:>28.2f}'.format(
+            name, step * 1e3, overhead * 1e6 / (2 * n_funcs)))
+
+
+if __name__ == '__main__':
+    main()
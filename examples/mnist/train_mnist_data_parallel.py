@@ -12,7 +12,8 @@ import train_mnist
 
 def main():
     # This script is almost identical to train_mnist.py. The only difference is
-    # that this script uses data-parallel computation on two GPUs.
+    # that this script uses data-parallel computation on two GPUs, or on
+    # several CPU processes if a negative GPU ID is given.
     # See train_mnist.py for more details.
     parser = argparse.ArgumentParser(description='Chainer example: MNIST')
     parser.add_argument('--batchsize', '-b', type=int, default=400,
@@ -23,6 +24,8 @@ def main():
                         help='First GPU ID')
     parser.add_argument('--gpu1', '-G', type=int, default=1,
                         help='Second GPU ID')
+    parser.add_argument('--processes', '-p', type=int, default=2,
+                        help='Number of processes used without GPU')
     parser.add_argument('--out', '-o', default='result_parallel',
                         help='Directory to output the result')
     parser.add_argument('--resume', '-r', default='',
@@ -31,13 +34,17 @@ def main():
                         help='Number of units')
     args = parser.parse_args()
 
-    print('GPU: {}, {}'.format(args.gpu0, args.gpu1))
+    if args.gpu0 >= 0:
+        print('GPU: {}, {}'.format(args.gpu0, args.gpu1))
+    else:
+        print('# processes: {}'.format(args.processes))
     print('# unit: {}'.format(args.unit))
     print('# Minibatch-size: {}'.format(args.batchsize))
     print('# epoch: {}'.format(args.epoch))
     print('')
 
-    chainer.cuda.get_device(args.gpu0).use()
+    if args.gpu0 >= 0:
+        chainer.cuda.get_device(args.gpu0).use()
 
     model = L.Classifier(train_mnist.MLP(args.unit, 10))
     optimizer = chainer.optimizers.Adam()
@@ -48,16 +55,30 @@ def main():
     test_iter = chainer.iterators.SerialIterator(test, args.batchsize,
                                                  repeat=False, shuffle=False)
 
-    # ParallelUpdater implements the data-parallel gradient computation on
-    # multiple GPUs. It accepts "devices" argument that specifies which GPU to
-    # use.
-    updater = training.ParallelUpdater(
-        train_iter,
-        optimizer,
-        # The device of the name 'main' is used as a "master", while others are
-        # used as slaves. Names other than 'main' are arbitrary.
-        devices={'main': args.gpu0, 'second': args.gpu1},
-    )
+    if args.gpu0 >= 0:
+        # ParallelUpdater implements the data-parallel gradient computation on
+        # multiple GPUs. It accepts "devices" argument that specifies which
+        # GPU to use.
+        updater = training.ParallelUpdater(
+            train_iter,
+            optimizer,
+            # The device of the name 'main' is used as a "master", while
+            # others are used as slaves. Names other than 'main' are
+            # arbitrary.
+            devices={'main': args.gpu0, 'second': args.gpu1},
+        )
+    else:
+        # MultiprocessParallelUpdater runs a copy of the model in each CPU
+        # process. Each process reads its own part of the dataset with a
+        # share of the minibatch.
+        n = args.processes
+        train_iters = [
+            chainer.iterators.SerialIterator(
+                chainer.datasets.SubDataset(
+                    train, len(train) * i // n, len(train) * (i + 1) // n),
+                args.batchsize // n)
+            for i in range(n)]
+        updater = training.MultiprocessParallelUpdater(train_iters, optimizer)
     trainer = training.Trainer(updater, (args.epoch, 'epoch'), out=args.out)
 
     trainer.extend(extensions.Evaluator(test_iter, model, device=args.gpu0))
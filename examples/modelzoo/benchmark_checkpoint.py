@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""Measures peak memory and step time of checkpointed models on CPU.
+
+For ResNet-50 it compares the model as is, every bottleneck block
+checkpointed, and segments chosen by
+:func:`chainer.graph_optimizations.checkpoint_sequence` for a memory budget.
+For an LSTM language model unrolled over time it compares no checkpointing
+with segments of one and of ``sqrt(length)`` time steps.
+
+The peak memory is the peak of the arrays allocated by NumPy during one
+training step, as traced by :mod:`tracemalloc`. The data are random, so no
+dataset or pre-trained model is required.
+
+"""
+from __future__ import print_function
+import argparse
+import math
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import graph_optimizations
+import chainer.links as L
+
+
+def measure(step, iterations):
+    elapsed = []
+    peaks = []
+    for _ in range(iterations):
+        tracemalloc.start()
+        start = time.time()
+        step()
+        elapsed.append(time.time() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return np.mean(elapsed), max(peaks)
+
+
+def resnet50_modes(args):
+    model = L.ResNet50Layers(pretrained_model=None)
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, 224, 224)).astype(np.float32)
+    t = np.random.randint(0, 1000, args.batchsize).astype(np.int32)
+
+    layers = [model.conv1, model.bn1, F.relu,
+              lambda h: F.max_pooling_2d(h, ksize=3, stride=2)]
+    for block in (model.res2, model.res3, model.res4, model.res5):
+        layers += [f for _, f in block.forward]
+    head = [lambda h: F.average_pooling_2d(h, 7, stride=1), model.fc6]
+
+    def step(body):
+        def run():
+            model.cleargrads()
+            h = body(x)
+            for f in head:
+                h = f(h)
+            F.softmax_cross_entropy(h, t).backward()
+        return run
+
+    per_block = graph_optimizations.Sequence(
+        layers[:4] + [graph_optimizations.Checkpointed(f)
+                      for f in layers[4:]])
+    budget = int(args.budget * 2 ** 20)
+    auto = graph_optimizations.checkpoint_sequence(layers, x, budget)
+    return [
+        ('none', step(graph_optimizations.Sequence(layers))),
+        ('every block', step(per_block)),
+        ('budget {} MiB'.format(args.budget), step(auto)),
+    ]
+
+
+class LSTMLanguageModel(chainer.Chain):
+
+    def __init__(self, n_vocab, n_units):
+        super(LSTMLanguageModel, self).__init__(
+            embed=L.EmbedID(n_vocab, n_units),
+            lstm=L.StatelessLSTM(n_units, n_units),
+            out=L.Linear(n_units, n_vocab),
+        )
+
+    def steps(self, c, h, xs, ts):
+        # Runs a segment of time steps and returns the state and the loss.
+        loss = 0
+        for x, t in zip(xs, ts):
+            c, h = self.lstm(c, h, self.embed(x))
+            loss += F.softmax_cross_entropy(self.out(h), t)
+        return c, h, loss
+
+
+def lstm_modes(args):
+    n_vocab = 10000
+    model = LSTMLanguageModel(n_vocab, args.unit)
+    length = args.bproplen
+    words = np.random.randint(
+        0, n_vocab, (length + 1, args.batchsize)).astype(np.int32)
+
+    def step(seg_len):
+        def run():
+            model.cleargrads()
+            c = h = chainer.Variable(
+                np.zeros((args.batchsize, args.unit), np.float32))
+            loss = 0
+            for i in range(0, length, seg_len):
+                n = min(seg_len, length - i)
+
+                def segment(c, h, *xs):
+                    # xs holds the inputs followed by the targets.
+                    m = len(xs) // 2
+                    return model.steps(c, h, xs[:m], xs[m:])
+
+                xs = [words[i + j] for j in range(n)]
+                ts = [words[i + j + 1] for j in range(n)]
+                if seg_len == length:
+                    c, h, seg_loss = segment(c, h, *(xs + ts))
+                else:
+                    c, h, seg_loss = graph_optimizations.checkpoint(
+                        segment, c, h, *(xs + ts))
+                loss += seg_loss
+            loss.backward()
+        return run
+
+    sqrt = max(1, int(math.sqrt(length)))
+    return [
+        ('none', step(length)),
+        ('every step', step(1)),
+        ('every {} steps'.format(sqrt), step(sqrt)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Peak memory and step time with checkpointing')
+    parser.add_argument('--model', choices=('resnet50', 'lstm'),
+                        default='resnet50', help='Model to run')
+    parser.add_argument('--batchsize', '-B', type=int, default=8,
+                        help='Minibatch size')
+    parser.add_argument('--budget', type=float, default=256,
+                        help='Activation memory budget of ResNet-50 in MiB')
+    parser.add_argument('--unit', '-u', type=int, default=650,
+                        help='Number of LSTM units')
+    parser.add_argument('--bproplen', '-l', type=int, default=35,
+                        help='Number of unrolled time steps')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    if args.model == 'resnet50':
+        modes = resnet50_modes(args)
+    else:
+        modes = lstm_modes(args)
+
+    print('model: {}  batchsize: {}  mkldnn: {}'.format(
+        args.model, args.batchsize, chainer.mkld.available))
+    print('{:<24}{:>16}{:>20}'.format('mode', 'step (ms)', 'peak (MiB)'))
+    for name, step in modes:
+        # The first step allocates the parameter gradients and warms up.
+        step()
+        elapsed, peak = measure(step, args.iteration)
+        print('{:<24}{:>16.1f}{:>20.1f}'.format(
+            name, elapsed * 1e3, peak / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
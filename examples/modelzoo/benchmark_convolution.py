@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Measures the CPU algorithms of the convolution with the shapes of VGG16.
+
+It runs the forward and backward computation of the convolution layers of
+:class:`chainer.links.VGG16Layers` on random inputs with each algorithm of
+``chainer.config.cpu_conv_algorithm`` that supports them, and shows the
+algorithm that the autotuner chooses. The FFT is applicable to larger
+filters, given by ``--ksize`` or ``--dilate``. The peak memory is the peak
+of the arrays allocated by NumPy during one run, as traced by
+:mod:`tracemalloc`.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer.utils import conv_algorithm
+
+
+# (name, in_channels, out_channels, size)
+layers = [
+    ('conv1_1', 3, 64, 224),
+    ('conv1_2', 64, 64, 224),
+    ('conv2_1', 64, 128, 112),
+    ('conv2_2', 128, 128, 112),
+    ('conv3_1', 128, 256, 56),
+    ('conv3_2', 256, 256, 56),
+    ('conv4_1', 256, 512, 28),
+    ('conv4_2', 512, 512, 28),
+    ('conv5_1', 512, 512, 14),
+    ('conv5_2', 512, 512, 14),
+]
+
+algorithms = ['im2col', 'winograd', 'fft']
+
+
+def run(x, W, b, pad, dilate):
+    xv = chainer.Variable(x)
+    y = F.dilated_convolution_2d(xv, W, b, pad=pad, dilate=dilate)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+
+
+def measure(algorithm, iterations, *args):
+    with chainer.using_config('cpu_conv_algorithm', algorithm):
+        tracemalloc.start()
+        run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        start = time.time()
+        for _ in range(iterations):
+            run(*args)
+    return (time.time() - start) / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convolution algorithms on CPU')
+    parser.add_argument('--batchsize', '-B', type=int, default=2,
+                        help='Minibatch size')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of timed iterations')
+    parser.add_argument('--ksize', '-k', type=int, default=3,
+                        help='Size of the filters')
+    parser.add_argument('--dilate', '-d', type=int, default=1,
+                        help='Dilation factor of the filters')
+    parser.add_argument('--layer', '-l', nargs='*',
+                        help='Names of the layers to run')
+    args = parser.parse_args()
+
+    print('batchsize: {}  ksize: {}  dilate: {}'.format(
+        args.batchsize, args.ksize, args.dilate))
+    print('{:<10}'.format('layer') + ''.join(
+        '{:>18}'.format(a + ' (ms/MiB)') for a in algorithms) +
+        '{:>10}'.format('auto'))
+    for name, in_c, out_c, size in layers:
+        if args.layer and name not in args.layer:
+            continue
+        x = np.random.uniform(
+            -1, 1, (args.batchsize, in_c, size, size)).astype(np.float32)
+        k = args.ksize
+        W = np.random.normal(
+            0, np.sqrt(1. / (k * k * in_c)), (out_c, in_c, k, k)).astype(
+                np.float32)
+        b = np.zeros(out_c, dtype=np.float32)
+        pad = (k // 2 * args.dilate,) * 2
+        dilate = (args.dilate, args.dilate)
+        candidates = conv_algorithm.get_candidates((k, k), (1, 1), dilate)
+
+        line = '{:<10}'.format(name)
+        for algorithm in algorithms:
+            if algorithm not in candidates:
+                line += '{:>18}'.format('-')
+                continue
+            t, m = measure(algorithm, args.iteration, x, W, b, pad, dilate)
+            line += '{:>18}'.format(
+                '{:.1f}/{:.1f}'.format(t * 1e3, m / 2.0 ** 20))
+        with chainer.using_config('cpu_conv_algorithm', 'auto'):
+            auto = conv_algorithm.select(x, W, (1, 1), pad, dilate)
+        print(line + '{:>10}'.format(auto))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Measures the CPU inference latency of ResNet-50 and VGG-16.
+
+It compares the model called as is with the model replayed through
+:class:`chainer.graph_optimizations.InferenceGraph`, with and without the
+convolution, batch normalization and ReLU fusion. The parameters are randomly
+initialized, so no pre-trained model is required.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+from chainer import graph_optimizations
+import chainer.links as L
+
+
+# The model and its last layer before softmax, which is compared between the
+# modes.
+archs = {
+    'resnet50': (L.ResNet50Layers, 'fc6'),
+    'vgg16': (L.VGG16Layers, 'fc8'),
+}
+
+
+def run(forward, x, iterations, warmup):
+    elapsed = []
+    for i in range(warmup + iterations):
+        start = time.time()
+        y = forward(x)
+        if i >= warmup:
+            elapsed.append(time.time() - start)
+    return np.mean(elapsed), y
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Inference latency with fused convolution layers')
+    parser.add_argument('--arch', '-a', choices=archs.keys(),
+                        default='resnet50', help='Model architecture')
+    parser.add_argument('--batchsize', '-B', type=int, default=1,
+                        help='Minibatch size')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=2,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    arch, layer = archs[args.arch]
+    model = arch(pretrained_model=None)
+    for link in model.links():
+        if isinstance(link, L.BatchNormalization):
+            link.avg_mean[...] = np.random.uniform(
+                -0.1, 0.1, link.avg_mean.shape)
+            link.avg_var[...] = np.random.uniform(
+                0.5, 1.5, link.avg_var.shape)
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, 224, 224)).astype(np.float32)
+
+    print('arch: {}  batchsize: {}  mkldnn: {}'.format(
+        args.arch, args.batchsize, chainer.mkld.available))
+    print('{:<24}{:>16}{:>16}'.format('mode', 'latency (ms)', 'max abs diff'))
+
+    modes = [
+        ('dynamic', lambda x: model(x, layers=[layer])),
+        ('replay', graph_optimizations.InferenceGraph(
+            model, fuse=False, layers=[layer])),
+        ('replay + fusion', graph_optimizations.InferenceGraph(
+            model, layers=[layer])),
+    ]
+    expect = None
+    with chainer.using_config('train', False):
+        for name, forward in modes:
+            latency, y = run(forward, x, args.iteration, args.warmup)
+            y = np.asarray(y[layer].data)
+            if expect is None:
+                expect = y
+            print('{:<24}{:>16.2f}{:>16.2e}'.format(
+                name, latency * 1e3, float(np.abs(y - expect).max())))
+
+
+if __name__ == '__main__':
+    main()
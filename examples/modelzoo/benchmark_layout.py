@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Measures the inference of ResNet50 on CPU in the NCHW and NHWC layouts.
+
+It runs the forward computation of :class:`chainer.links.ResNet50Layers`
+without backpropagation in the test mode on random images, with
+``chainer.config.image_layout`` set to each layout. The model is not
+pretrained, since the layout does not change the shapes of the parameters.
+The peak memory is the peak of the arrays allocated by NumPy during one run,
+as traced by :mod:`tracemalloc`.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+
+
+def measure(step, iterations):
+    step()
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.time()
+    for _ in range(iterations):
+        step()
+    return (time.time() - start) / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='ResNet50 inference in the NCHW and NHWC layouts')
+    parser.add_argument('--batchsize', '-B', type=int, default=4,
+                        help='Minibatch size')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of timed iterations')
+    parser.add_argument('--insize', type=int, default=224,
+                        help='Size of the input images')
+    args = parser.parse_args()
+
+    model = L.ResNet50Layers(pretrained_model=None)
+    for link in model.links():
+        if isinstance(link, L.BatchNormalization):
+            # The population statistics are all zero before training.
+            link.avg_var[...] = 1
+    x = np.random.uniform(
+        -1, 1, (args.batchsize, 3, args.insize, args.insize)).astype(
+            np.float32)
+    inputs = {'NCHW': x,
+              'NHWC': np.ascontiguousarray(x.transpose(0, 2, 3, 1))}
+
+    print('batchsize: {}  insize: {}  mkldnn: {}'.format(
+        args.batchsize, args.insize, chainer.mkld.available))
+    print('{:<10}{:>16}{:>16}{:>16}'.format(
+        'layout', 'time (ms)', 'images/sec', 'peak (MiB)'))
+    results = {}
+    for layout in ('NCHW', 'NHWC'):
+        def infer():
+            with chainer.no_backprop_mode(), \
+                    chainer.using_config('train', False), \
+                    chainer.using_config('image_layout', layout):
+                return model(
+                    inputs[layout], layers=['pool5', 'prob'])['pool5'].data
+
+        results[layout] = infer()
+        elapsed, peak = measure(infer, args.iteration)
+        print('{:<10}{:>16.1f}{:>16.1f}{:>16.1f}'.format(
+            layout, elapsed * 1e3, args.batchsize / elapsed,
+            peak / 2.0 ** 20))
+    print('max difference of pool5: {:.3g}'.format(
+        float(np.abs(results['NCHW'] - results['NHWC']).max())))
+
+
+if __name__ == '__main__':
+    main()
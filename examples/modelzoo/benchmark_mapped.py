@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Compares the cold start of a VGG16 serving process by checkpoint format.
+
+It saves :class:`chainer.links.VGG16Layers` by
+:func:`chainer.serializers.save_npz` with and without compression and by
+:func:`chainer.serializers.save_mapped`. Then, for each format, it starts a
+fresh process that builds the model, loads the parameters and classifies one
+image, as a serving process does. The resident set size (RSS) includes the
+pages of a mapped file, which are shared with the other processes mapping it
+and with the page cache, while the anonymous memory only counts the memory
+not backed by files, i.e. the memory each additional serving process
+takes. Both are read from ``/proc``, so that this script runs on Linux. The
+file is in the page cache when it is loaded, as it has just been written.
+
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+from chainer import serializers
+
+
+formats = [
+    ('npz', lambda path, model: serializers.save_npz(path, model),
+     serializers.load_npz),
+    ('npz (raw)',
+     lambda path, model: serializers.save_npz(path, model, False),
+     serializers.load_npz),
+    ('mapped', serializers.save_mapped, serializers.load_mapped),
+]
+
+
+def memory():
+    """Returns the RSS and the anonymous memory of this process in bytes."""
+    rss = anonymous = 0
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            if line.startswith('Rss:'):
+                rss += int(line.split()[1]) * 1024
+            elif line.startswith('Anonymous:'):
+                anonymous += int(line.split()[1]) * 1024
+    return rss, anonymous
+
+
+def serve(index, path):
+    _, _, load = formats[index]
+    model = L.VGG16Layers(pretrained_model=None)
+    start = time.time()
+    load(path, model)
+    loaded = time.time() - start
+    rss_loaded, _ = memory()
+    x = np.random.uniform(0, 255, (1, 3, 224, 224)).astype(np.float32)
+    start = time.time()
+    with chainer.using_config('train', False):
+        model(x, layers=['prob'])
+    inferred = time.time() - start
+    rss, anonymous = memory()
+    print(json.dumps({'load': loaded, 'inference': inferred,
+                      'rss_loaded': rss_loaded, 'rss': rss,
+                      'anonymous': anonymous}))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Cold start of VGG16 by checkpoint format')
+    parser.add_argument('--serve', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(int(args.serve[0]), args.serve[1])
+        return
+
+    model = L.VGG16Layers(pretrained_model=None)
+    out = tempfile.mkdtemp()
+    try:
+        print('{:<12}{:>10}{:>10}{:>10}{:>12}{:>10}{:>10}{:>12}'.format(
+            'format', 'save (s)', 'MiB', 'load (s)', 'infer (s)',
+            'RSS (1)', 'RSS (2)', 'anonymous'))
+        for index, (name, save, _) in enumerate(formats):
+            path = os.path.join(out, 'vgg16_{}'.format(index))
+            start = time.time()
+            save(path, model)
+            saved = time.time() - start
+            result = json.loads(subprocess.check_output(
+                [sys.executable, __file__, '--serve', str(index), path]
+            ).decode('utf-8').splitlines()[-1])
+            print('{:<12}{:>10.2f}{:>10.1f}{:>10.2f}{:>12.2f}{:>10.1f}'
+                  '{:>10.1f}{:>12.1f}'.format(
+                      name, saved, os.path.getsize(path) / 2.0 ** 20,
+                      result['load'], result['inference'],
+                      result['rss_loaded'] / 2.0 ** 20,
+                      result['rss'] / 2.0 ** 20,
+                      result['anonymous'] / 2.0 ** 20))
+            os.remove(path)
+        print('RSS (1) after loading, RSS (2) and anonymous memory (MiB) '
+              'after the inference')
+    finally:
+        shutil.rmtree(out)
+
+
+if __name__ == '__main__':
+    main()
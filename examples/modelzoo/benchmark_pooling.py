@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Measures the pooling functions on CPU with the shapes of the model zoo.
+
+It runs the forward and backward computation of the max and average pooling
+layers of :class:`chainer.links.VGG16Layers` and
+:class:`chainer.links.ResNet50Layers` on random inputs. For reference, it
+also runs the same computation through the patches of ``im2col``, as the
+functions used to do on CPU. The peak memory is the peak of the arrays
+allocated by NumPy during one run, as traced by :mod:`tracemalloc`.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer.utils import conv
+
+
+# (name, function, channels, size, ksize, stride)
+layers = [
+    ('vgg16 pool1', 'max', 64, 224, 2, 2),
+    ('vgg16 pool2', 'max', 128, 112, 2, 2),
+    ('vgg16 pool3', 'max', 256, 56, 2, 2),
+    ('vgg16 pool4', 'max', 512, 28, 2, 2),
+    ('vgg16 pool5', 'max', 512, 14, 2, 2),
+    ('resnet50 pool1', 'max', 64, 112, 3, 2),
+    ('resnet50 pool5', 'average', 2048, 7, 7, 1),
+]
+
+
+def im2col_max(x, gy, k, s):
+    n, c, h, w = x.shape
+    col = conv.im2col_cpu(x, k, k, s, s, 0, 0, pval=-float('inf'),
+                          cover_all=True)
+    _, _, _, _, out_h, out_w = col.shape
+    col = col.reshape(n, c, k * k, out_h, out_w)
+    indexes = col.argmax(axis=2)
+    col.max(axis=2)
+
+    gcol = np.zeros(n * c * out_h * out_w * k * k, dtype=x.dtype)
+    indexes = indexes.flatten()
+    indexes += np.arange(0, indexes.size * k * k, k * k)
+    gcol[indexes] = gy.ravel()
+    gcol = gcol.reshape(n, c, out_h, out_w, k, k)
+    gcol = np.swapaxes(gcol, 2, 4)
+    gcol = np.swapaxes(gcol, 3, 5)
+    conv.col2im_cpu(gcol, s, s, 0, 0, h, w)
+
+
+def im2col_average(x, gy, k, s):
+    h, w = x.shape[2:]
+    conv.im2col_cpu(x, k, k, s, s, 0, 0).mean(axis=(2, 3))
+    gcol = np.tile(gy[:, :, None, None], (1, 1, k, k, 1, 1))
+    gx = conv.col2im_cpu(gcol, s, s, 0, 0, h, w)
+    gx /= k * k
+
+
+def direct(func):
+    def run(x, gy, k, s):
+        xv = chainer.Variable(x)
+        y = func(xv, k, stride=s)
+        y.grad = gy
+        y.backward()
+    return run
+
+
+functions = {
+    'max': (direct(F.max_pooling_2d), im2col_max),
+    'average': (direct(F.average_pooling_2d), im2col_average),
+}
+
+
+def measure(run, iterations):
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.time()
+    for _ in range(iterations):
+        run()
+    return (time.time() - start) / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pooling functions on CPU')
+    parser.add_argument('--batchsize', '-B', type=int, default=8,
+                        help='Minibatch size')
+    parser.add_argument('--iteration', '-i', type=int, default=5,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    print('batchsize: {}  mkldnn: {}'.format(
+        args.batchsize, chainer.mkld.available))
+    print('{:<16}{:>14}{:>14}{:>14}{:>14}'.format(
+        'layer', 'direct (ms)', 'im2col (ms)', 'direct (MiB)',
+        'im2col (MiB)'))
+    for name, func, c, size, k, s in layers:
+        x = np.random.uniform(
+            -1, 1, (args.batchsize, c, size, size)).astype(np.float32)
+        out = conv.get_conv_outsize(size, k, s, 0, cover_all=True)
+        gy = np.random.uniform(
+            -1, 1, (args.batchsize, c, out, out)).astype(np.float32)
+        (t1, m1), (t2, m2) = [
+            measure(lambda: f(x, gy, k, s), args.iteration)
+            for f in functions[func]]
+        print('{:<16}{:>14.1f}{:>14.1f}{:>14.1f}{:>14.1f}'.format(
+            name, t1 * 1e3, t2 * 1e3, m1 / 2.0 ** 20, m2 / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""Measures the stall of the training loop taking snapshots of ResNet50.
+
+It trains :class:`chainer.links.ResNet50Layers` with the momentum SGD on
+random images, taking a snapshot of the trainer at every iteration,
+synchronously by :func:`chainer.serializers.save_npz` and in the background
+by :class:`chainer.training.extensions.AsyncSnapshotWriter`. The stall is
+the average time the training loop is blocked by the snapshot extension.
+The wait is the time to complete writing the last snapshot after the
+training. The incremental format is also measured in fine-tuning, where
+only the final layer is updated.
+
+"""
+from __future__ import print_function
+import argparse
+import functools
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+import chainer.links as L
+from chainer import serializers
+from chainer import training
+from chainer.training import extensions
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Stall of snapshots of a ResNet50 trainer')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of iterations of each mode')
+    parser.add_argument('--insize', type=int, default=64,
+                        help='Size of the input images')
+    args = parser.parse_args()
+
+    model = L.ResNet50Layers(pretrained_model=None)
+    optimizer = chainer.optimizers.MomentumSGD()
+    optimizer.setup(model)
+    dataset = [(np.random.uniform(
+        -1, 1, (3, args.insize, args.insize)).astype(np.float32),
+        np.int32(0)) for _ in range(2)]
+
+    def lossfun(x, t):
+        return F.softmax_cross_entropy(model(x, layers=['fc6'])['fc6'], t)
+
+    modes = [
+        ('save_npz', functools.partial(
+            serializers.save_npz, compression=True), None, False),
+        ('save_npz (raw)', functools.partial(
+            serializers.save_npz, compression=False), None, False),
+        ('async', None, extensions.AsyncSnapshotWriter(), False),
+        ('async (raw)', None,
+         extensions.AsyncSnapshotWriter(compression=False), False),
+        ('incremental', None,
+         extensions.AsyncSnapshotWriter(incremental=True), False),
+        ('incremental', None,
+         extensions.AsyncSnapshotWriter(incremental=True), True),
+    ]
+
+    print('{:<16}{:<12}{:>12}{:>12}{:>12}'.format(
+        'mode', 'fine-tune', 'stall (ms)', 'wait (ms)', 'disk (MiB)'))
+    for name, savefun, writer, finetune in modes:
+        if finetune:
+            model.disable_update()
+            model.fc6.enable_update()
+        else:
+            model.enable_update()
+        iterator = chainer.iterators.SerialIterator(dataset, 2)
+        updater = training.StandardUpdater(
+            iterator, optimizer, loss_func=lossfun)
+        out = tempfile.mkdtemp()
+        try:
+            trainer = training.Trainer(
+                updater, (args.iteration, 'iteration'), out=out)
+            kwargs = {'writer': writer}
+            if savefun is not None:
+                kwargs['savefun'] = savefun
+            snapshot = extensions.snapshot(**kwargs)
+            stalls = []
+
+            def timed_snapshot(trainer):
+                start = time.time()
+                snapshot(trainer)
+                stalls.append(time.time() - start)
+
+            trainer.extend(timed_snapshot, trigger=(1, 'iteration'),
+                           priority=snapshot.priority)
+            trainer.run()
+            start = time.time()
+            if writer is not None:
+                writer.wait()
+            wait = time.time() - start
+            print('{:<16}{:<12}{:>12.1f}{:>12.1f}{:>12.1f}'.format(
+                name, str(finetune), np.mean(stalls) * 1e3, wait * 1e3,
+                directory_size(out) / 2.0 ** 20))
+        finally:
+            shutil.rmtree(out)
+
+
+if __name__ == '__main__':
+    main()
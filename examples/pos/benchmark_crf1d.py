@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Compares the CRF1d function with its composition of per-step functions.
+
+It runs the forward and backward computation of the negative log-likelihood
+of :func:`chainer.functions.crf1d` and the Viterbi decoding of
+:func:`chainer.functions.argmax_crf1d` on random sequences of various lengths
+sorted in descending order, as a tagger does. The composition is the former
+implementation of :func:`~chainer.functions.crf1d` that builds the forward
+algorithm from ``logsumexp`` and others at each step. The peak memory is the
+peak of the arrays allocated by NumPy during one run, as traced by
+:mod:`tracemalloc`.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+
+
+def composed_crf1d(cost, xs, ys):
+    n_label = cost.shape[0]
+    n_batch = xs[0].shape[0]
+
+    alpha = xs[0]
+    alphas = []
+    for x in xs[1:]:
+        batch = x.shape[0]
+        if alpha.shape[0] > batch:
+            alpha, alpha_rest = F.split_axis(alpha, [batch], axis=0)
+            alphas.append(alpha_rest)
+        b_alpha, b_cost = F.broadcast(alpha[..., None], cost)
+        alpha = F.logsumexp(b_alpha + b_cost, axis=1) + x
+    if len(alphas) > 0:
+        alphas.append(alpha)
+        alpha = F.concat(alphas[::-1], axis=0)
+    logz = F.logsumexp(alpha, axis=1)
+
+    cost = F.reshape(cost, (cost.size, 1))
+    score = F.select_item(xs[0], ys[0])
+    scores = []
+    for x, y, y_prev in zip(xs[1:], ys[1:], ys[:-1]):
+        batch = x.shape[0]
+        if score.shape[0] > batch:
+            y_prev, _ = F.split_axis(y_prev, [batch], axis=0)
+            score, score_rest = F.split_axis(score, [batch], axis=0)
+            scores.append(score_rest)
+        score += (F.select_item(x, y) + F.reshape(
+            F.embed_id(y_prev * n_label + y, cost), (batch,)))
+    if len(scores) > 0:
+        scores.append(score)
+        score = F.concat(scores[::-1], axis=0)
+    return F.sum(logz - score) / n_batch
+
+
+def count_functions(y):
+    funcs = set()
+    candidates = [y.creator]
+    while candidates:
+        f = candidates.pop()
+        if f is None or f in funcs:
+            continue
+        funcs.add(f)
+        candidates.extend(x.creator for x in f.inputs)
+    return len(funcs)
+
+
+def measure(step, iterations):
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.time()
+    for _ in range(iterations):
+        step()
+    return (time.time() - start) / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='CRF1d against its composition of per-step functions')
+    parser.add_argument('--batchsize', '-b', type=int, default=32,
+                        help='Number of sentences in each mini-batch')
+    parser.add_argument('--length', '-l', type=int, default=200,
+                        help='Length of the longest sentence')
+    parser.add_argument('--n-label', '-n', type=int, default=20,
+                        help='Number of labels')
+    parser.add_argument('--iteration', '-i', type=int, default=3,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    lengths = sorted(np.random.randint(1, args.length + 1, args.batchsize),
+                     reverse=True)
+    lengths[0] = args.length
+    batches = [sum(1 for n in lengths if n > t) for t in range(args.length)]
+    cost = chainer.Variable(np.random.uniform(
+        -1, 1, (args.n_label, args.n_label)).astype(np.float32))
+    xs = [chainer.Variable(np.random.uniform(
+        -1, 1, (b, args.n_label)).astype(np.float32)) for b in batches]
+    ys = [np.random.randint(0, args.n_label, b).astype(np.int32)
+          for b in batches]
+
+    print('batchsize: {}  length: {}  n_label: {}'.format(
+        args.batchsize, args.length, args.n_label))
+    print('{:<16}{:>12}{:>16}{:>16}'.format(
+        'method', 'functions', 'time (ms)', 'peak (MiB)'))
+    results = {}
+    for name, crf in (('composition', composed_crf1d), ('CRF1d', F.crf1d)):
+        def train():
+            cost.cleargrad()
+            for x in xs:
+                x.cleargrad()
+            loss = crf(cost, xs, ys)
+            loss.backward()
+            return loss
+
+        loss = train()
+        results[name] = (loss.data, cost.grad.copy())
+        elapsed, peak = measure(train, args.iteration)
+        print('{:<16}{:>12}{:>16.1f}{:>16.1f}'.format(
+            name, count_functions(loss), elapsed * 1e3, peak / 2.0 ** 20))
+
+    def decode():
+        with chainer.no_backprop_mode():
+            F.argmax_crf1d(cost, xs)
+
+    elapsed, peak = measure(decode, args.iteration)
+    print('{:<16}{:>12}{:>16.1f}{:>16.1f}'.format(
+        'argmax_crf1d', 1, elapsed * 1e3, peak / 2.0 ** 20))
+
+    print('difference of loss: {:.3g}  of gradient: {:.3g}'.format(
+        float(abs(results['composition'][0] - results['CRF1d'][0])),
+        float(np.abs(results['composition'][1] -
+                     results['CRF1d'][1]).max())))
+
+
+if __name__ == '__main__':
+    main()
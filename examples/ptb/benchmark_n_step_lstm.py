@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Measures the throughput of NStepLSTM on CPU.
+
+It runs forward and backward computation of a stacked LSTM on random
+variable-length sequences, once with :class:`chainer.links.NStepLSTM` and once
+with a Python loop of :class:`chainer.links.LSTM` over the time steps, which
+shrinks the mini-batch as the shorter sequences end.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+import chainer.links as L
+
+
+class LoopLSTM(chainer.ChainList):
+
+    def __init__(self, n_layers, in_size, out_size):
+        super(LoopLSTM, self).__init__(
+            *[L.LSTM(in_size if i == 0 else out_size, out_size)
+              for i in range(n_layers)])
+
+    def __call__(self, xs):
+        # xs are sorted by descending lengths.
+        for lstm in self:
+            lstm.reset_state()
+        xs = F.transpose_sequence(xs)
+        ys = []
+        for x in xs:
+            for lstm in self:
+                x = lstm(x)
+            ys.append(x)
+        return F.transpose_sequence(ys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of NStepLSTM')
+    parser.add_argument('--batchsize', '-B', type=int, default=32,
+                        help='Number of sequences in a mini-batch')
+    parser.add_argument('--length', '-l', type=int, default=50,
+                        help='Maximum length of the sequences')
+    parser.add_argument('--layer', type=int, default=2,
+                        help='Number of layers')
+    parser.add_argument('--unit', '-u', type=int, default=256,
+                        help='Number of LSTM units')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    lengths = sorted(np.random.randint(1, args.length + 1, args.batchsize),
+                     reverse=True)
+    xs = [np.random.uniform(-1, 1, (n, args.unit)).astype(np.float32)
+          for n in lengths]
+    n_step = L.NStepLSTM(args.layer, args.unit, args.unit, 0.0)
+    loop = LoopLSTM(args.layer, args.unit, args.unit)
+
+    def run_n_step():
+        _, _, ys = n_step(None, None, xs)
+        return ys
+
+    modes = [('NStepLSTM', n_step, run_n_step),
+             ('LSTM loop', loop, lambda: loop(xs))]
+    print('batchsize: {}  length: {}  layers: {}  units: {}'.format(
+        args.batchsize, args.length, args.layer, args.unit))
+    print('{:<16}{:>16}{:>16}'.format('mode', 'step (ms)', 'tokens/sec'))
+    for name, model, forward in modes:
+        elapsed = []
+        for i in range(args.iteration + 1):
+            start = time.time()
+            model.cleargrads()
+            ys = forward()
+            F.sum(F.concat(ys, axis=0)).backward()
+            if i > 0:
+                elapsed.append(time.time() - start)
+        step = np.mean(elapsed)
+        print('{:<16}{:>16.1f}{:>16.1f}'.format(
+            name, step * 1e3, sum(lengths) / step))
+
+
+if __name__ == '__main__':
+    main()
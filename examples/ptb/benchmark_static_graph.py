@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Measures the training step time of an LSTM language model.
+
+It runs truncated BPTT on random word IDs with the network of train_ptb.py,
+once with the usual define-by-run graph and once replaying each time step
+with :func:`chainer.graph_optimizations.static_graph`. The LSTM state is
+passed explicitly between the steps, as the static graph requires.
+
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import graph_optimizations
+import chainer.links as L
+
+
+class StatelessRNNForLM(chainer.Chain):
+
+    def __init__(self, n_vocab, n_units):
+        super(StatelessRNNForLM, self).__init__(
+            embed=L.EmbedID(n_vocab, n_units),
+            l1=L.StatelessLSTM(n_units, n_units),
+            l2=L.StatelessLSTM(n_units, n_units),
+            l3=L.Linear(n_units, n_vocab),
+        )
+        for param in self.params():
+            param.data[...] = np.random.uniform(-0.1, 0.1, param.data.shape)
+
+    @graph_optimizations.static_graph
+    def __call__(self, c1, h1, c2, h2, x):
+        h0 = self.embed(x)
+        c1, h1 = self.l1(c1, h1, F.dropout(h0))
+        c2, h2 = self.l2(c2, h2, F.dropout(h1))
+        y = self.l3(F.dropout(h2))
+        return c1, h1, c2, h2, y
+
+
+def run(model, optimizer, words, args):
+    state = [np.zeros((args.batchsize, args.unit), np.float32)
+             for _ in range(4)]
+    elapsed = []
+    for i in range(args.warmup + args.iteration):
+        start = time.time()
+        loss = 0
+        for x, t in zip(words[i], words[i + 1]):
+            out = model(*(state + [x]))
+            state = list(out[:4])
+            loss += F.softmax_cross_entropy(out[4], t)
+        model.cleargrads()
+        loss.backward()
+        loss.unchain_backward()
+        optimizer.update()
+        if i >= args.warmup:
+            elapsed.append(time.time() - start)
+    return np.mean(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark of the static graph on the PTB LSTM')
+    parser.add_argument('--batchsize', '-b', type=int, default=20,
+                        help='Number of examples in each mini-batch')
+    parser.add_argument('--bproplen', '-l', type=int, default=35,
+                        help='Number of words in each mini-batch '
+                             '(= length of truncated BPTT)')
+    parser.add_argument('--unit', '-u', type=int, default=650,
+                        help='Number of LSTM units in each layer')
+    parser.add_argument('--vocab', '-v', type=int, default=10000,
+                        help='Size of the vocabulary')
+    parser.add_argument('--iteration', '-i', type=int, default=10,
+                        help='Number of timed iterations')
+    parser.add_argument('--warmup', '-w', type=int, default=2,
+                        help='Number of warm-up iterations')
+    args = parser.parse_args()
+
+    model = StatelessRNNForLM(args.vocab, args.unit)
+    optimizer = chainer.optimizers.SGD(lr=1.0)
+    optimizer.setup(model)
+    words = np.random.randint(
+        0, args.vocab,
+        (args.warmup + args.iteration + 1, args.bproplen, args.batchsize)
+    ).astype(np.int32)
+
+    print('batchsize: {}  bproplen: {}  unit: {}'.format(
+        args.batchsize, args.bproplen, args.unit))
+    print('{:<16}{:>16}{:>20}'.format('mode', 'step (ms)', 'per word (us)'))
+    for name, static in (('dynamic', False), ('static', True)):
+        with chainer.using_config('use_static_graph', static):
+            step = run(model, optimizer, words, args)
+        print('{:<16}{:>16.2f}{:>20.2f}'.format(
+            name, step * 1e3, step * 1e6 / args.bproplen))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Measures the output layers of word2vec on CPU.
+
+It runs forward and backward computation of the loss on random inputs of a
+skip-gram minibatch, i.e. ``batchsize * 2 * window`` rows, and word counts
+following Zipf's law, so that no dataset is required. For reference, it also
+runs the same computation looping over the examples in Python, as the
+layers used to do on CPU. The throughput is in center words per second.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.links as L
+
+
+def loop_hsm(link, x, t):
+    # Computes the loss and the gradients one example at a time.
+    func = link._func
+    W = link.W.data
+    gW = np.zeros_like(W)
+    gx = np.empty_like(x)
+    loss = 0
+    for i, (ix, it) in enumerate(zip(x, t)):
+        begin, end = func.begins[it], func.begins[it + 1]
+        path = func.paths[begin:end]
+        code = func.codes[begin:end]
+        w = W[path]
+        wxy = w.dot(ix) * code
+        loss += np.logaddexp(0.0, -wxy).sum()
+        g = -code / (1.0 + np.exp(wxy))
+        gx[i] = g.dot(w)
+        gW[path] += np.outer(g, ix)
+    return loss, gx, gW
+
+
+def loop_ns(link, x, t):
+    # Computes the loss and the gradients one example at a time with the
+    # same negative samples as the last call of the link.
+    samples = link._last_samples
+    W = link.W.data
+    gW = np.zeros_like(W)
+    gx = np.empty_like(x)
+    loss = 0
+    for i, (ix, k) in enumerate(zip(x, samples)):
+        w = W[k]
+        f = w.dot(ix)
+        f[0] *= -1
+        loss += np.logaddexp(f, 0).sum()
+        g = 1 / (1 + np.exp(-f))
+        g[0] *= -1
+        gx[i] = g.dot(w)
+        for ik, ig in zip(k, g):
+            gW[ik] += ig * ix
+    return loss, gx, gW
+
+
+class RecordingNegativeSampling(L.NegativeSampling):
+
+    def __call__(self, x, t):
+        y = super(RecordingNegativeSampling, self).__call__(x, t)
+        self._last_samples = y.creator.samples
+        return y
+
+
+def make_ns(counts, n_units):
+    return RecordingNegativeSampling(n_units, counts, 5)
+
+
+def make_hsm(counts, n_units):
+    tree = L.BinaryHierarchicalSoftmax.create_huffman_tree(
+        dict(enumerate(counts)))
+    return L.BinaryHierarchicalSoftmax(n_units, tree)
+
+
+losses = {
+    'hsm': (make_hsm, loop_hsm),
+    'ns': (make_ns, loop_ns),
+}
+
+
+def measure(step, iterations):
+    step()
+    start = time.time()
+    for _ in range(iterations):
+        step()
+    return (time.time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Output layers of word2vec on CPU')
+    parser.add_argument('--out-type', '-o', choices=sorted(losses),
+                        default='hsm', help='Output layer')
+    parser.add_argument('--vocab', type=int, default=100000,
+                        help='Vocabulary size')
+    parser.add_argument('--unit', '-u', type=int, default=100,
+                        help='Number of units')
+    parser.add_argument('--batchsize', '-b', type=int, default=1000,
+                        help='Learning minibatch size')
+    parser.add_argument('--window', '-w', type=int, default=5,
+                        help='Window size')
+    parser.add_argument('--iteration', '-i', type=int, default=5,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    counts = (1e7 / np.arange(1, args.vocab + 1)).astype(np.int64) + 1
+    make, loop = losses[args.out_type]
+    link = make(counts, args.unit)
+    n = args.batchsize * 2 * args.window
+    x = np.random.uniform(-1, 1, (n, args.unit)).astype(np.float32)
+    p = counts / float(counts.sum())
+    t = np.random.choice(args.vocab, n, p=p).astype(np.int32)
+
+    def step():
+        link.cleargrads()
+        xv = chainer.Variable(x)
+        link(xv, t).backward()
+
+    print('out-type: {}  vocab: {}  rows: {}'.format(
+        args.out_type, args.vocab, n))
+    print('{:<16}{:>16}{:>16}'.format('mode', 'step (ms)', 'words/sec'))
+    for name, f in (('vectorized', step),
+                    ('loop', lambda: loop(link, x, t))):
+        elapsed = measure(f, args.iteration)
+        print('{:<16}{:>16.1f}{:>16.1f}'.format(
+            name, elapsed * 1e3, args.batchsize / elapsed))
+
+
+if __name__ == '__main__':
+    main()
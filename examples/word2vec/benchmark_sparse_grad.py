@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Measures the update of a large embedding matrix with sparse gradients.
+
+It computes the gradient of an :class:`chainer.links.EmbedID` link for a
+minibatch of random word IDs following Zipf's law and updates the embedding
+matrix, either with the dense gradient of the whole matrix or with the sparse
+gradient of the rows used in the minibatch (``sparse_grad=True``), which the
+optimizers apply lazily on CPU.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+import chainer.links as L
+
+
+optimizers = {
+    'adagrad': chainer.optimizers.AdaGrad,
+    'adam': chainer.optimizers.Adam,
+    'momentum': chainer.optimizers.MomentumSGD,
+}
+
+
+def run(args, sparse, words):
+    embed = L.EmbedID(args.vocab, args.unit, sparse_grad=sparse)
+    optimizer = optimizers[args.optimizer]()
+    optimizer.setup(embed)
+    optimizer.add_hook(chainer.optimizer.WeightDecay(1e-4))
+
+    def step(x):
+        embed.cleargrads()
+        F.sum(embed(x)).backward()
+        optimizer.update()
+
+    step(words[0])
+    start = time.time()
+    for x in words[1:]:
+        step(x)
+    return (time.time() - start) / (len(words) - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Embedding updates with sparse gradients')
+    parser.add_argument('--optimizer', '-o', choices=sorted(optimizers),
+                        default='adam', help='Optimizer')
+    parser.add_argument('--vocab', type=int, default=1000000,
+                        help='Vocabulary size')
+    parser.add_argument('--unit', '-u', type=int, default=100,
+                        help='Number of units')
+    parser.add_argument('--batchsize', '-b', type=int, default=1000,
+                        help='Number of words in a minibatch')
+    parser.add_argument('--iteration', '-i', type=int, default=5,
+                        help='Number of timed iterations')
+    args = parser.parse_args()
+
+    p = 1.0 / np.arange(1, args.vocab + 1)
+    p /= p.sum()
+    words = np.random.choice(
+        args.vocab, (args.iteration + 1, args.batchsize),
+        p=p).astype(np.int32)
+
+    print('optimizer: {}  vocab: {}  batchsize: {}'.format(
+        args.optimizer, args.vocab, args.batchsize))
+    print('{:<16}{:>16}'.format('gradient', 'step (ms)'))
+    for name, sparse in (('dense', False), ('sparse', True)):
+        elapsed = run(args, sparse, words)
+        print('{:<16}{:>16.1f}'.format(name, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+    main()
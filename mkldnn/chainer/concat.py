@@ -120,6 +120,8 @@ class ConcatMKLDNN(function.Function):
 
     """Concatenate multiple tensors towards specified axis."""
 
+    mkldnn_deferrable = True
+
     # concat along the channel dimension by default
     def __init__(self, axis=1):
         if not isinstance(axis, int):
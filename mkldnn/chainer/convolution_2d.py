@@ -190,7 +190,7 @@ class ConvolutionForward(ComputeComplex):
         else:
             if self.weight_reorder_opt is not None and \
                self.weight_reorder_opt.optimized is False:
-                self.dag_.erase(self.dag_.begin() + self.weight_reorder_opt.reorder)
+                self.drop_reorder(self.weight_reorder_opt.reorder)
                 self.weight_reorder_opt.optimized = True
 
         if b is not None:
@@ -302,6 +302,8 @@ class ConvolutionBackwardWeighs(ComputeComplex):
 
 class Convolution2DFunctionMKLDNN(function.Function):
 
+    mkldnn_deferrable = True
+
     def __init__(self, stride=1, pad=0, cover_all=False, deterministic=False):
         self.sy, self.sx = _pair(stride)
         self.ph, self.pw = _pair(pad)
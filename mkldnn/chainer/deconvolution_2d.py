@@ -256,6 +256,8 @@ class DeconvolutionBackwardWeights(ComputeComplex):
 
 class Deconvolution2DFunctionMKLDNN(function.Function):
 
+    mkldnn_deferrable = True
+
     def __init__(self, stride=1, pad=0, outsize=None, deterministic=False):
         self.sy, self.sx = _pair(stride)
         self.ph, self.pw = _pair(pad)
@@ -0,0 +1,181 @@
+from __future__ import print_function
+import collections
+import contextlib
+import sys
+
+import numpy
+
+import mkldnn.api.memory as m
+from mkldnn.mdarray import mdarray
+
+
+_FORMAT_NAMES = (
+    'format_undef', 'any', 'blocked', 'x', 'nc', 'nchw', 'nhwc', 'chwn',
+    'nChw8c', 'nChw16c', 'oi', 'io', 'oihw', 'ihwo', 'oIhw8i', 'oIhw16i',
+    'OIhw8i8o', 'OIhw16i16o', 'OIhw8o8i', 'OIhw16o16i', 'Ohwi8o', 'Ohwi16o',
+    'goihw', 'gOIhw8i8o', 'gOIhw16i16o', 'gOIhw8o8i', 'gOIhw16o16i',
+)
+_formats = dict((getattr(m.memory, name), name) for name in _FORMAT_NAMES
+                if hasattr(m.memory, name))
+_plain_formats = set(getattr(m.memory, name)
+                     for name in ('x', 'nc', 'nchw', 'oi', 'oihw'))
+
+
+def memory_format(x):
+    """Returns the name of the memory format of an array.
+
+    Args:
+        x: :class:`numpy.ndarray` or :class:`mdarray`.
+
+    Returns:
+        str: ``'plain'`` for numpy arrays, otherwise the mkldnn format name
+        (e.g. ``'nChw8c'``).
+
+    """
+    if isinstance(x, mdarray):
+        fmt = m.get_fmt(x.memory.get_primitive_desc())
+        return _formats.get(fmt, str(fmt))
+    return 'plain'
+
+
+def is_plain(x):
+    """Returns ``True`` if numpy can read ``x`` without a reorder."""
+    if isinstance(x, mdarray):
+        return m.get_fmt(x.memory.get_primitive_desc()) in _plain_formats
+    return True
+
+
+def _nbytes(x):
+    return x.size * numpy.dtype(x.dtype).itemsize
+
+
+class LayoutCounter(object):
+
+    """Counts memory format conversions and attributes them to functions.
+
+    Two kinds of conversions are counted:
+
+    - *reorders*: mkldnn reorder primitives executed between layers that
+      expect different formats.
+    - *conversions*: blocked-format :class:`mdarray` inputs handed to a
+      function that reads them as plain numpy arrays.
+
+    Counters are kept per ``(function label, direction)`` pair. Use
+    :func:`count_layouts` to install a counter.
+
+    """
+
+    def __init__(self):
+        self._stats = collections.OrderedDict()
+        self._current = None
+
+    def _entry(self):
+        key = self._current
+        if key is None:
+            key = ('(none)', 'forward')
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = self._stats[key] = [0, 0, 0, 0]
+        return entry
+
+    def begin(self, func, direction):
+        self._current = (func.label, direction)
+
+    def record_reorder(self, nbytes):
+        entry = self._entry()
+        entry[0] += 1
+        entry[1] += nbytes
+
+    def record_conversion(self, nbytes):
+        entry = self._entry()
+        entry[2] += 1
+        entry[3] += nbytes
+
+    def _total(self, i):
+        return sum(entry[i] for entry in self._stats.values())
+
+    @property
+    def reorders(self):
+        return self._total(0)
+
+    @property
+    def reorder_bytes(self):
+        return self._total(1)
+
+    @property
+    def conversions(self):
+        return self._total(2)
+
+    @property
+    def conversion_bytes(self):
+        return self._total(3)
+
+    def stats(self):
+        """Returns the counters per function.
+
+        Returns:
+            dict: Maps ``(label, direction)`` to a dict with ``reorders``,
+            ``reorder_bytes``, ``conversions`` and ``conversion_bytes``.
+
+        """
+        return dict(
+            (key, {'reorders': e[0], 'reorder_bytes': e[1],
+                   'conversions': e[2], 'conversion_bytes': e[3]})
+            for key, e in self._stats.items())
+
+    def clear(self):
+        self._stats.clear()
+
+    def report(self, file=sys.stdout):
+        """Prints the functions that caused conversions, most bytes first."""
+        print('{:<32}{:<10}{:>10}{:>14}{:>12}{:>14}'.format(
+            'function', 'direction', 'reorders', 'reorder bytes',
+            'to plain', 'plain bytes'), file=file)
+        entries = sorted(self._stats.items(),
+                         key=lambda item: -(item[1][1] + item[1][3]))
+        for (label, direction), e in entries:
+            if e[0] == 0 and e[2] == 0:
+                continue
+            print('{:<32}{:<10}{:>10}{:>14}{:>12}{:>14}'.format(
+                label, direction, e[0], e[1], e[2], e[3]), file=file)
+
+
+_current_counter = [None]
+
+
+def current_counter():
+    return _current_counter[0]
+
+
+@contextlib.contextmanager
+def count_layouts(counter=None):
+    """Counts memory format conversions made in this context.
+
+    Args:
+        counter (LayoutCounter): Counter to accumulate into. A new one is
+            created if omitted.
+
+    Returns:
+        A context manager yielding the :class:`LayoutCounter`.
+
+    """
+    if counter is None:
+        counter = LayoutCounter()
+    outer = _current_counter[0]
+    _current_counter[0] = counter
+    try:
+        yield counter
+    finally:
+        _current_counter[0] = outer
+
+
+def observe_function(counter, func, arrays, direction):
+    """Attributes following conversions to ``func`` and counts the blocked
+    arrays it will read as numpy arrays."""
+    counter.begin(func, direction)
+    if getattr(func, 'mkldnn_deferrable', False) or \
+       getattr(func, 'mkldnn_native', False):
+        return
+    for x in arrays:
+        if x is not None and not is_plain(x):
+            counter.record_conversion(_nbytes(x))
@@ -103,6 +103,8 @@ class LrnMKLDNN(function.Function):
 
     """Cross-channel normalization function used in AlexNet."""
 
+    mkldnn_deferrable = True
+
     def __init__(self, n=5, k=2, alpha=1e-4, beta=.75):
         self.n = n
         self.k = k
@@ -165,6 +165,8 @@ class Pooling2DMKLDNN(function.Function):
 
     """ pooling over a set of 2d planes."""
 
+    mkldnn_deferrable = True
+
     def __init__(self, ksize, stride=None, pad=0, cover_all=True):
         if stride is None:
             stride = ksize
@@ -117,6 +117,8 @@ class ReLUBackward(ComputeComplex):
 
 class ReLUMKLDNN(function.Function):
 
+    mkldnn_deferrable = True
+
     def check_type_forward(self, in_types):
         type_check.expect(
             in_types.size() == 1,
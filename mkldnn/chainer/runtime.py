@@ -1,3 +1,5 @@
+import contextlib
+
 from mkldnn.api.support import engine
 from mkldnn.api.support import stream
 
@@ -35,3 +37,110 @@ class Engine(object):
 
 def Stream():
     return stream(stream.eager)
+
+
+class StreamBatch(object):
+    """Queues primitives of consecutive mkldnn ops on one lazy stream.
+
+    Instead of creating a stream, submitting and waiting for every single
+    op, primitives are submitted to a shared lazy stream and executed when
+    :meth:`flush` is called. The batch is flushed when a result is needed by
+    a consumer that does not go through mkldnn, and when the enclosing
+    :func:`batched_stream` scope exits.
+
+    Attributes:
+        deferring (bool): If ``True``, :func:`execute` queues primitives on
+            this batch. Otherwise pending primitives are flushed and new ones
+            are executed eagerly.
+        submits (int): Number of primitive lists queued on the batch.
+        waits (int): Number of times the batch was flushed.
+
+    """
+
+    def __init__(self):
+        self._stream = None
+        self._keep = []
+        self.deferring = True
+        self.submits = 0
+        self.waits = 0
+
+    @property
+    def pending(self):
+        return self._stream is not None
+
+    def submit(self, dag, keep=()):
+        """Queues ``dag``.
+
+        ``dag`` and the objects in ``keep`` (arrays and compute complexes
+        owning the memory used by the primitives) are kept alive until the
+        batch is flushed.
+        """
+        if self._stream is None:
+            self._stream = stream(stream.lazy)
+        self._stream.submit(dag)
+        self._keep.append((dag, keep))
+        self.submits += 1
+
+    def flush(self):
+        if self._stream is not None:
+            s = self._stream
+            self._stream = None
+            s.wait()
+            self._keep = []
+            self.waits += 1
+
+
+_current_batch = [None]
+
+
+def current_batch():
+    return _current_batch[0]
+
+
+@contextlib.contextmanager
+def batched_stream():
+    """Shares one lazy stream among the mkldnn ops run in this context.
+
+    Nested scopes share the outermost batch. Pending primitives are executed
+    when the outermost scope exits.
+    """
+    outer = _current_batch[0]
+    if outer is not None:
+        yield outer
+        return
+
+    batch = StreamBatch()
+    _current_batch[0] = batch
+    try:
+        yield batch
+    finally:
+        _current_batch[0] = None
+        batch.flush()
+
+
+def flush_stream():
+    """Executes the primitives queued on the current batch, if any."""
+    batch = _current_batch[0]
+    if batch is not None:
+        batch.flush()
+
+
+def execute(dag, *keep):
+    """Executes a primitive list on the current batch or eagerly.
+
+    Args:
+        dag: Primitive list to execute.
+        keep: Objects that must outlive the execution of ``dag`` when it is
+            queued on a batch.
+
+    """
+    batch = _current_batch[0]
+    if batch is not None:
+        if batch.deferring:
+            batch.submit(dag, keep)
+            return
+        batch.flush()
+
+    s = Stream()
+    s.submit(dag)
+    s.wait()
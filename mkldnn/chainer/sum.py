@@ -7,7 +7,7 @@ from mkldnn.api.support import primitive_list, at
 import mkldnn.api.memory as m
 import mkldnn.api.sum as sum
 from mkldnn.mdarray import mdarray
-from mkldnn.chainer.runtime import Stream
+from mkldnn.chainer import runtime
 from mkldnn.compute_complex import ComputeComplex
 
 
@@ -70,8 +70,6 @@ def mkl_sum(xs, func=None):
     else:
         y = mdarray(cc_pd.dst_primitive_desc())
     pl.push_back(sum.sum(cc_pd, xs_pl, y.memory))
-    s = Stream()
-    s.submit(pl)
-    s.wait()
+    runtime.execute(pl, xs_arrays, xarrays, itm_arr, y)
 
     return y
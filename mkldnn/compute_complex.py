@@ -1,13 +1,24 @@
+import collections
+import contextlib
+import numbers
+import os
+import weakref
+
 from mkldnn.api.support import at, primitive_list
 from mkldnn.api import reorder as r
-# from mkldnn.api import memory as m
-from mkldnn.chainer.runtime import Stream
+from mkldnn.api import memory as m
+from mkldnn.chainer import layout
+from mkldnn.chainer import runtime
 
 import mkldnn
 import numpy
 from mkldnn.mdarray import mdarray
 
 
+# Compute complex whose primitives are being created
+_building = [None]
+
+
 def reorder_if_must(x, expect, e, net_):
     usr_m = x.memory
     if (usr_m.get_primitive_desc() != expect):
@@ -16,6 +27,15 @@ def reorder_if_must(x, expect, e, net_):
         reorder = r.reorder(at(usr_m), reorded)
         net_.push_back(reorder)
 
+        # Reorders of a compute complex are counted on each execution
+        cc = _building[0] and _building[0]()
+        if cc is not None and cc.dag_ is net_:
+            cc.reorders.append([net_.size() - 1, expect.get_size()])
+        else:
+            counter = layout.current_counter()
+            if counter is not None:
+                counter.record_reorder(expect.get_size())
+
         return reorded_array,
     else:
         return x,
@@ -62,13 +82,202 @@ def array(obj, *args):
         raise NotImplementedError
 
 
+_ALL = object()
+
+
+def _signature(obj):
+    """Returns a hashable summary of a compute complex argument.
+
+    Arrays are summarized by their shape and dtype (numpy) or memory format
+    (mdarray). Engines, primitive hints and other opaque handles map to
+    ``None``; they are checked by :meth:`ComputeComplex.match` instead.
+    """
+    if isinstance(obj, mdarray):
+        fmt = m.get_fmt(obj.memory.get_primitive_desc())
+        return ('mdarray', tuple(obj.shape), int(fmt))
+    elif isinstance(obj, numpy.ndarray):
+        return ('ndarray', obj.shape, obj.dtype.str)
+    elif isinstance(obj, (tuple, list)):
+        return tuple([_signature(o) for o in obj])
+    elif obj is None or isinstance(obj, (numbers.Number, str)):
+        return obj
+    else:
+        return None
+
+
+class PrimitiveCache(object):
+    """LRU cache of compute complexes.
+
+    Entries are keyed by compute complex type, cache scope, position in the
+    graph and a signature of the input shapes, formats and hyperparameters,
+    so that alternating shapes (or models) at the same position reuse their
+    primitives instead of rebuilding them on every step.
+
+    Args:
+        capacity (int): Maximum number of entries. The least recently used
+            entry is evicted when it is exceeded. ``0`` or a negative value
+            means unbounded.
+
+    Attributes:
+        hits (int): Number of lookups that found a reusable entry.
+        misses (int): Number of lookups that had to create a new entry.
+        evictions (int): Number of entries dropped by the LRU policy.
+
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._entries = collections.OrderedDict()
+        # (scope, pos) -> OrderedDict of the keys at the position, least
+        # recently used first, so that find() only visits those keys.
+        self._pos_index = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        cc = self._entries.pop(key, None)
+        if cc is not None:
+            self._entries[key] = cc
+            self._touch(key)
+        return cc
+
+    def put(self, key, cc):
+        self._entries.pop(key, None)
+        self._entries[key] = cc
+        self._touch(key)
+        self._shrink()
+
+    def _touch(self, key):
+        keys = self._pos_index.setdefault(
+            key[1:3], collections.OrderedDict())
+        keys.pop(key, None)
+        keys[key] = None
+
+    def find(self, scope, pos, predicate):
+        """Returns the most recently used entry at ``pos`` for which
+        ``predicate`` holds, or ``None``."""
+        keys = self._pos_index.get((scope, pos))
+        if not keys:
+            return None
+        for key in reversed(keys):
+            cc = self._entries[key]
+            if predicate(cc):
+                return cc
+        return None
+
+    def _shrink(self):
+        if self.capacity <= 0:
+            return
+        while len(self._entries) > self.capacity:
+            key, _ = self._entries.popitem(last=False)
+            self._forget(key)
+            self.evictions += 1
+
+    def _forget(self, key):
+        keys = self._pos_index.get(key[1:3])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._pos_index[key[1:3]]
+
+    def set_capacity(self, capacity):
+        self.capacity = capacity
+        self._shrink()
+
+    def clear(self, scope=_ALL):
+        """Drops cached entries.
+
+        Args:
+            scope: If given, only the entries created under
+                :func:`cache_scope` with this scope are dropped.
+
+        """
+        if scope is _ALL:
+            self._entries.clear()
+            self._pos_index.clear()
+            return
+        scope = _scope_key(scope)
+        for key in [k for k in self._entries if k[1] == scope]:
+            del self._entries[key]
+            self._forget(key)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self._entries),
+                'capacity': self.capacity}
+
+
+_DEFAULT_CAPACITY = int(
+    os.environ.get('CHAINER_MKLDNN_CACHE_CAPACITY', '1024'))
+_scopes = [None]
+
+
+def _scope_key(scope):
+    if scope is None or isinstance(scope, (numbers.Number, str)):
+        return scope
+    return id(scope)
+
+
+@contextlib.contextmanager
+def cache_scope(scope):
+    """Tags compute complexes created in this context with ``scope``.
+
+    Entries of different scopes never collide, and they can be dropped
+    together with :func:`clear_cache`. ``scope`` is typically the model
+    (e.g. a :class:`~chainer.Chain`) or a string naming it.
+    """
+    _scopes.append(_scope_key(scope))
+    try:
+        yield
+    finally:
+        _scopes.pop()
+
+
+def set_cache_capacity(capacity):
+    """Sets the capacity of each of the forward/backward caches."""
+    for cache in ComputeComplex.cache.values():
+        cache.set_capacity(capacity)
+
+
+def clear_cache(scope=_ALL):
+    """Drops cached compute complexes, optionally only those of ``scope``."""
+    for cache in ComputeComplex.cache.values():
+        cache.clear(scope)
+
+
+def cache_stats():
+    """Returns hit/miss/eviction counters of each cache type."""
+    return {k: cache.stats() for k, cache in ComputeComplex.cache.items()}
+
+
+def reset_cache_stats():
+    for cache in ComputeComplex.cache.values():
+        cache.reset_stats()
+
+
 class ComputeComplex(object):
     """MKLDNN Compute Complex.
 
+    Compute complexes are cached in :class:`PrimitiveCache` instances, one per
+    ``cc_type``. A cached compute complex is reused when its key matches and
+    its :meth:`match` method accepts the new arguments.
+
     """
-    cache_f = {}
-    cache_bd = {}
-    cache_bw = {}
+    cache_f = PrimitiveCache(_DEFAULT_CAPACITY)
+    cache_bd = PrimitiveCache(_DEFAULT_CAPACITY)
+    cache_bw = PrimitiveCache(_DEFAULT_CAPACITY)
 
     cache = {'f': cache_f, 'bd': cache_bd, 'bw': cache_bw}
 
@@ -77,15 +286,20 @@ class ComputeComplex(object):
         assert isinstance(pos, tuple)
 
         cache = cls.cache[cls.cc_type]
-        ret = cache.get(pos)
+        key = (cls, _scopes[-1], pos, _signature(args),
+               _signature(sorted((k, v) for k, v in kwargs.items()
+                                 if k != 'e')))
+        ret = cache.get(key)
 
-        if ret and isinstance(ret, cls) and ret.match(*args, **kwargs):
+        if ret is not None and ret.match(*args, **kwargs):
             ret.new = False
+            cache.hits += 1
         else:
             ret = super(ComputeComplex, cls).__new__(cls)
             # print("Create new CC: ", ret)
             ret.new = True
-            cache[pos] = ret
+            cache.put(key, ret)
+            cache.misses += 1
             ret.pos = pos
 
         return ret
@@ -96,27 +310,37 @@ class ComputeComplex(object):
             self.fanout = -1
             self.dag_ = primitive_list()
             self._hint = None
+            self.reorders = []
+            _building[0] = weakref.ref(self)
 
     def execute_on(self, s=None):
+        counter = layout.current_counter()
+        if counter is not None:
+            for _, nbytes in self.reorders:
+                counter.record_reorder(nbytes)
+
         if s is None:
-            # XXX: Refresh everytime
-            s = Stream()
+            # Queued on the current stream batch, if any
+            runtime.execute(self.dag_, self)
+            return self.outputs
 
         s.submit(self.dag_)
         s.wait()
         return self.outputs
 
+    def drop_reorder(self, index):
+        """Removes the reorder primitive at ``index`` from the dag."""
+        self.dag_.erase(self.dag_.begin() + index)
+        self.reorders = [[i - (i > index), nbytes]
+                         for i, nbytes in self.reorders if i != index]
+
     def matching(self, inputs):
         raise NotImplementedError
 
     @staticmethod
     def get_bd_cc(hint, pos=(0, 0)):
-        cc = ComputeComplex.cache_bd.get(pos)
-        if cc and (hint is cc._hint):
-            ret = cc
-        else:
-            ret = None
-        return ret
+        return ComputeComplex.cache_bd.find(
+            _scopes[-1], pos, lambda cc: hint is cc._hint)
 
     @property
     def hint(self):
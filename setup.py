@@ -60,6 +60,7 @@ packages = [
           'chainer.functions.theano',
           'chainer.functions.util',
           'chainer.function_hooks',
+          'chainer.graph_optimizations',
           'chainer.iterators',
           'chainer.initializers',
           'chainer.links',
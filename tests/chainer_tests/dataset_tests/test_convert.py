@@ -267,6 +267,78 @@ def get_xp(gpu):
         return numpy
 
 
+@testing.parameterize(
+    {'n_buffers': 1},
+    {'n_buffers': 3},
+)
+class TestConcatWithBuffers(unittest.TestCase):
+
+    def setUp(self):
+        self.converter = dataset.ConcatWithBuffers(self.n_buffers)
+
+    def test_concat_arrays(self):
+        arrays = [numpy.random.rand(2, 3) for _ in range(4)]
+        result = self.converter(arrays)
+        numpy.testing.assert_array_equal(
+            result, dataset.concat_examples(arrays))
+
+    def test_concat_tuples(self):
+        tuples = [(numpy.random.rand(2, 3), numpy.int32(i))
+                  for i in range(4)]
+        result = self.converter(tuples)
+        expect = dataset.concat_examples(tuples)
+        self.assertEqual(len(result), 2)
+        for x, y in zip(result, expect):
+            self.assertEqual(x.dtype, y.dtype)
+            numpy.testing.assert_array_equal(x, y)
+
+    def test_concat_dicts(self):
+        dicts = [{'x': numpy.random.rand(2), 'y': numpy.random.rand(3)}
+                 for _ in range(4)]
+        result = self.converter(dicts)
+        expect = dataset.concat_examples(dicts)
+        self.assertEqual(set(result.keys()), {'x', 'y'})
+        for key in result:
+            numpy.testing.assert_array_equal(result[key], expect[key])
+
+    def test_padding(self):
+        arrays = [numpy.ones((i + 1, 2)) for i in range(3)]
+        result = self.converter(arrays, padding=-1)
+        numpy.testing.assert_array_equal(
+            result, dataset.concat_examples(arrays, padding=-1))
+        # The buffer is filled again for the next batch.
+        for _ in range(self.n_buffers):
+            result = self.converter(arrays[::-1], padding=0)
+        numpy.testing.assert_array_equal(
+            result, dataset.concat_examples(arrays[::-1], padding=0))
+
+    def test_reuse(self):
+        arrays = [numpy.random.rand(2, 3) for _ in range(4)]
+        results = [self.converter(arrays)
+                   for _ in range(self.n_buffers + 1)]
+        self.assertIs(results[0], results[-1])
+        for x in results[1:-1]:
+            self.assertIsNot(x, results[0])
+
+    def test_shape_change(self):
+        arrays = [numpy.random.rand(2, 3) for _ in range(4)]
+        for _ in range(self.n_buffers):
+            self.converter(arrays)
+        result = self.converter(arrays[:3])
+        self.assertEqual(result.shape, (3, 2, 3))
+        numpy.testing.assert_array_equal(
+            result, dataset.concat_examples(arrays[:3]))
+
+    def test_shape_mismatch(self):
+        arrays = [numpy.zeros((2, 3)), numpy.zeros((3, 3))]
+        with self.assertRaises(ValueError):
+            self.converter(arrays)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            self.converter([])
+
+
 @testing.parameterize(
     {'device': None, 'src_gpu': False, 'dst_gpu': False},
     {'device': -1, 'src_gpu': False, 'dst_gpu': False},
@@ -3,6 +3,7 @@ import unittest
 
 import numpy
 
+import chainer
 from chainer import datasets
 from chainer.datasets import image_dataset
 from chainer import testing
@@ -32,6 +33,13 @@ class TestImageDataset(unittest.TestCase):
         self.assertEqual(img.dtype, self.dtype)
         self.assertEqual(img.shape, (1, 300, 300))
 
+    def test_get_nhwc(self):
+        expect = self.dataset.get_example(0)
+        with chainer.using_config('image_layout', 'NHWC'):
+            img = self.dataset.get_example(0)
+        self.assertEqual(img.shape, (300, 300, 4))
+        numpy.testing.assert_array_equal(expect.transpose(1, 2, 0), img)
+
 
 @testing.parameterize(*testing.product({
     'dtype': [numpy.float32, numpy.int32],
@@ -65,6 +73,12 @@ class TestLabeledImageDataset(unittest.TestCase):
         self.assertEqual(label.dtype, self.label_dtype)
         self.assertEqual(label, 1)
 
+    def test_get_grey_nhwc(self):
+        with chainer.using_config('image_layout', 'NHWC'):
+            img, label = self.dataset.get_example(1)
+        self.assertEqual(img.shape, (300, 300, 1))
+        self.assertEqual(label, 1)
+
 
 @unittest.skipUnless(image_dataset.available, 'image_dataset is not available')
 class TestLabeledImageDatasetInvalidFormat(unittest.TestCase):
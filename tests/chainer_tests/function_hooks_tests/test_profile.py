@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy
+import six
+
+import chainer
+from chainer import cuda
+from chainer import function_hooks
+from chainer import functions
+from chainer import links
+from chainer import testing
+from chainer.testing import attr
+
+
+class TestProfileHook(unittest.TestCase):
+
+    def setUp(self):
+        self.h = function_hooks.ProfileHook()
+        self.l = links.Linear(5, 4)
+        self.x = numpy.random.uniform(-1, 1, (3, 5)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1, (3, 4)).astype(numpy.float32)
+
+    def test_name(self):
+        self.assertEqual(self.h.name, 'ProfileHook')
+
+    def check_forward(self, x):
+        with self.h:
+            self.l(chainer.Variable(x))
+        stats = self.h.stats()
+        self.assertEqual(list(stats), [('LinearFunction', 'forward')])
+        entry = stats['LinearFunction', 'forward']
+        self.assertEqual(entry['calls'], 1)
+        self.assertGreaterEqual(entry['time'], 0)
+        self.assertEqual(entry['bytes'], 3 * 4 * 4)
+        self.assertEqual(entry['flops'], 2 * 3 * 4 * 5)
+        self.assertEqual(entry['reorders'], 0)
+        return entry
+
+    def test_forward_cpu(self):
+        entry = self.check_forward(self.x)
+        self.assertEqual(entry['backend'], 'numpy')
+
+    @attr.gpu
+    def test_forward_gpu(self):
+        self.l.to_gpu()
+        entry = self.check_forward(cuda.to_gpu(self.x))
+        self.assertEqual(entry['backend'], 'cupy')
+
+    def test_backward(self):
+        with self.h:
+            y = self.l(chainer.Variable(self.x))
+            y.grad = self.gy
+            y.backward()
+        entry = self.h.stats()['LinearFunction', 'backward']
+        self.assertEqual(entry['calls'], 1)
+        # gx, gW and gb
+        self.assertEqual(entry['bytes'], (3 * 5 + 4 * 5 + 4) * 4)
+        self.assertEqual(entry['flops'], 2 * 2 * 3 * 4 * 5)
+
+    def test_call_site(self):
+        with self.h:
+            y = functions.relu(chainer.Variable(self.x))
+            y.grad = self.x
+            y.backward()
+        (site, label, direction), _ = sorted(six.iteritems(
+            self.h.stats(by='site')))[0]
+        self.assertEqual(label, 'ReLU')
+        self.assertIn(__file__.rstrip('c'), site)
+        self.assertIn('test_call_site', site)
+        self.assertEqual(len(self.h.stats(by='site')), 2)
+
+    def test_matmul_flops(self):
+        a = numpy.ones((2, 3, 4), numpy.float32)
+        b = numpy.ones((2, 5, 4), numpy.float32)
+        with self.h:
+            functions.batch_matmul(a, b, transb=True)
+        entry = self.h.stats()['BatchMatMul', 'forward']
+        self.assertEqual(entry['flops'], 2 * 2 * 3 * 5 * 4)
+
+    def test_sampling(self):
+        h = function_hooks.ProfileHook(sampling_interval=3)
+        with h:
+            for _ in six.moves.range(7):
+                functions.exp(self.x)
+        self.assertEqual(h.stats()['exp', 'forward']['calls'], 3)
+
+    def test_sampling_per_function(self):
+        # The global count of calls would only sample the forward calls of
+        # the linear functions and the backward calls of the others.
+        h = function_hooks.ProfileHook(sampling_interval=2)
+        l2 = links.Linear(4, 3)
+        with h:
+            for _ in six.moves.range(10):
+                y = functions.sum(l2(functions.relu(self.l(self.x))))
+                y.backward()
+        stats = h.stats()
+        for label, calls in (('LinearFunction', 10), ('ReLU', 5),
+                             ('Sum', 5)):
+            for direction in ('forward', 'backward'):
+                self.assertEqual(stats[label, direction]['calls'], calls)
+
+    def test_invalid_sampling_interval(self):
+        with self.assertRaises(ValueError):
+            function_hooks.ProfileHook(sampling_interval=0)
+
+    def test_invalid_by(self):
+        with self.assertRaises(ValueError):
+            self.h.stats(by='line')
+
+    def test_print_report(self):
+        with self.h:
+            y = self.l(chainer.Variable(self.x))
+            functions.exp(y)
+        for by in ('function', 'site'):
+            out = six.StringIO()
+            self.h.print_report(by=by, file=out)
+            lines = out.getvalue().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertIn('GFLOP/s', lines[0])
+
+    def test_export_chrome_trace(self):
+        with self.h:
+            y = self.l(chainer.Variable(self.x))
+            functions.exp(y)
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            self.h.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        finally:
+            os.remove(path)
+        events = trace['traceEvents']
+        self.assertEqual([e['name'] for e in events],
+                         ['LinearFunction', 'exp'])
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['cat'], 'forward')
+        self.assertEqual(events[0]['args']['flops'], 2 * 3 * 4 * 5)
+        self.assertLessEqual(events[0]['ts'], events[1]['ts'])
+
+    def test_clear(self):
+        with self.h:
+            functions.exp(self.x)
+        self.h.clear()
+        self.assertEqual(self.h.stats(), {})
+        self.assertEqual(self.h.total_time(), 0)
+
+
+class TestProfileHookToFunction(unittest.TestCase):
+
+    def test_add_hook(self):
+        h = function_hooks.ProfileHook()
+        f = functions.Exp()
+        f.add_hook(h)
+        x = numpy.ones((2, 3), numpy.float32)
+        y = f(chainer.Variable(x))
+        y.grad = x
+        y.backward()
+        stats = h.stats()
+        self.assertEqual(stats['exp', 'forward']['calls'], 1)
+        self.assertEqual(stats['exp', 'backward']['calls'], 1)
+        self.assertEqual(stats['exp', 'backward']['bytes'], 2 * 3 * 4)
+
+
+testing.run_module(__name__, __file__)
@@ -390,4 +390,133 @@ class TestConvolution2DFunctionDeterministic(unittest.TestCase):
             cover_all=False, deterministic=True)
         return x, W, b, y
 
+
+@testing.parameterize(*testing.product_dict(
+    [{'algorithm': 'winograd', 'ksize': (3, 3)},
+     {'algorithm': 'fft', 'ksize': (3, 5)}],
+    testing.product({
+        'nobias': [True, False],
+        'dtype': [numpy.float32, numpy.float64],
+    })))
+class TestConvolution2DCPUAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        kh, kw = self.ksize
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 6, 5)).astype(self.dtype)
+        self.W = numpy.random.uniform(
+            -1, 1, (2, 3, kh, kw)).astype(self.dtype)
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype(self.dtype)
+        self.gy = numpy.random.uniform(
+            -1, 1, (2, 2, 9 - kh, 8 - kw)).astype(self.dtype)
+        self.check_forward_options = {}
+        if self.dtype == numpy.float32:
+            self.check_forward_options = {'atol': 1e-4, 'rtol': 1e-4}
+
+    def forward(self, x, W, b):
+        return functions.convolution_2d(x, W, b, pad=1)
+
+    def test_forward(self):
+        args = (self.x, self.W, self.b)
+        expect = self.forward(*args).data
+        with chainer.using_config('cpu_conv_algorithm', self.algorithm):
+            y = self.forward(*args)
+        testing.assert_allclose(expect, y.data, **self.check_forward_options)
+
+    @condition.retry(3)
+    def test_backward(self):
+        args = (self.x, self.W)
+        if self.b is not None:
+            args = args + (self.b,)
+
+        def f(*args):
+            return self.forward(*(args + (None,))[:3])
+
+        with chainer.using_config('cpu_conv_algorithm', self.algorithm):
+            gradient_check.check_backward(
+                f, args, self.gy, dtype=numpy.float64)
+
+
+class TestConvolution2DNoBackprop(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 2, 3, 4, 3)).astype('f')
+        self.W = numpy.random.uniform(-1, 1, (2, 3, 3, 2)).astype('f')
+
+    def test_forward_cpu(self):
+        # The patches are taken on the workspace, which is reused by the
+        # following calls.
+        expect = [functions.convolution_2d(x, self.W, pad=1).data
+                  for x in self.x]
+        with chainer.no_backprop_mode():
+            ys = [functions.convolution_2d(x, self.W, pad=1)
+                  for x in self.x]
+        for e, y in zip(expect, ys):
+            self.assertIsNone(y.creator)
+            testing.assert_allclose(e, y.data)
+
+
+@testing.parameterize(*testing.product({
+    'nobias': [True, False],
+    'ksize': [(3, 2), (1, 1)],
+    'stride': [1, 2],
+    'cover_all': [True, False],
+    'x_dtype': [numpy.float32, numpy.float64],
+    'W_dtype': [numpy.float32, numpy.float64],
+}))
+class TestConvolution2DNHWC(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3, 5, 4)).astype(self.x_dtype)
+        self.W = numpy.random.uniform(
+            -1, 1, (2, 3) + self.ksize).astype(self.W_dtype)
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype(self.x_dtype)
+        self.pad = 1 if self.ksize[0] > 1 else 0
+        self.check_forward_options = {}
+        if numpy.float32 in (self.x_dtype, self.W_dtype):
+            self.check_forward_options = {'atol': 1e-5, 'rtol': 1e-4}
+
+    def forward(self, x, W, b):
+        return functions.convolution_2d(
+            x, W, b, stride=self.stride, pad=self.pad,
+            cover_all=self.cover_all)
+
+    def test_forward(self):
+        expect = self.forward(self.x, self.W, self.b).data
+        with chainer.using_config('image_layout', 'NHWC'):
+            y = self.forward(
+                self.x.transpose(0, 2, 3, 1), self.W, self.b).data
+        self.assertEqual(y.dtype, self.x_dtype)
+        self.assertTrue(y.flags.c_contiguous)
+        testing.assert_allclose(
+            expect.transpose(0, 2, 3, 1), y, **self.check_forward_options)
+
+    @condition.retry(3)
+    def test_backward(self):
+        x = numpy.ascontiguousarray(self.x.transpose(0, 2, 3, 1))
+        args = (x, self.W)
+        if self.b is not None:
+            args = args + (self.b,)
+
+        def f(*args):
+            return self.forward(*(args + (None,))[:3])
+
+        with chainer.using_config('image_layout', 'NHWC'):
+            y = f(*args)
+            gy = numpy.random.uniform(-1, 1, y.shape).astype(self.x_dtype)
+            gradient_check.check_backward(
+                f, args, gy, dtype=numpy.float64)
+
+    def test_no_backprop(self):
+        expect = self.forward(self.x, self.W, self.b).data
+        with chainer.using_config('image_layout', 'NHWC'), \
+                chainer.no_backprop_mode():
+            y = self.forward(
+                self.x.transpose(0, 2, 3, 1), self.W, self.b).data
+        testing.assert_allclose(
+            expect.transpose(0, 2, 3, 1), y, **self.check_forward_options)
+
+
 testing.run_module(__name__, __file__)
@@ -291,4 +291,45 @@ class TestDeconvolution2DFunctionDeterministic(unittest.TestCase):
         return x, W, b, y
 
 
+@testing.parameterize(*testing.product({
+    'algorithm': ['winograd'],
+    'nobias': [True, False],
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestDeconvolution2DCPUAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 4, 5)).astype(self.dtype)
+        self.W = numpy.random.uniform(-1, 1, (3, 2, 3, 3)).astype(self.dtype)
+        self.b = None if self.nobias else numpy.random.uniform(
+            -1, 1, 2).astype(self.dtype)
+        self.gy = numpy.random.uniform(-1, 1, (2, 2, 4, 5)).astype(self.dtype)
+        self.check_forward_options = {}
+        if self.dtype == numpy.float32:
+            self.check_forward_options = {'atol': 1e-4, 'rtol': 1e-4}
+
+    def forward(self, x, W, b):
+        return F.deconvolution_2d(x, W, b, pad=1)
+
+    def test_forward(self):
+        args = (self.x, self.W, self.b)
+        expect = self.forward(*args).data
+        with chainer.using_config('cpu_conv_algorithm', self.algorithm):
+            y = self.forward(*args)
+        testing.assert_allclose(expect, y.data, **self.check_forward_options)
+
+    @condition.retry(3)
+    def test_backward(self):
+        args = (self.x, self.W)
+        if self.b is not None:
+            args = args + (self.b,)
+
+        def f(*args):
+            return self.forward(*(args + (None,))[:3])
+
+        with chainer.using_config('cpu_conv_algorithm', self.algorithm):
+            gradient_check.check_backward(
+                f, args, self.gy, dtype=numpy.float64)
+
+
 testing.run_module(__name__, __file__)
@@ -153,6 +153,65 @@ class TestNStepLSTM(unittest.TestCase):
                             [cuda.to_gpu(dy) for dy in self.dys])
 
 
+class TestNStepLSTMDropout(unittest.TestCase):
+
+    batches = [3, 3, 2]
+    in_size = 3
+    out_size = 2
+    n_layers = 2
+    dropout = 0.5
+
+    def setUp(self):
+        h_shape = (self.n_layers, self.batches[0], self.out_size)
+        self.hx = numpy.random.uniform(-1, 1, h_shape).astype('f')
+        self.cx = numpy.random.uniform(-1, 1, h_shape).astype('f')
+        self.xs = [numpy.random.uniform(-1, 1, (b, self.in_size)).astype('f')
+                   for b in self.batches]
+        self.ws = []
+        for i in range(self.n_layers):
+            weights = []
+            for j in range(8):
+                w_in = self.in_size if i == 0 and j < 4 else self.out_size
+                weights.append(numpy.random.uniform(
+                    -1, 1, (self.out_size, w_in)).astype('f'))
+            self.ws.append(weights)
+        self.bs = [[numpy.random.uniform(-1, 1, (self.out_size,)).astype('f')
+                    for _ in range(8)] for _ in range(self.n_layers)]
+        self.dhy = numpy.random.uniform(-1, 1, h_shape).astype('f')
+        self.dys = [numpy.random.uniform(-1, 1, (b, self.out_size)).astype('f')
+                    for b in self.batches]
+
+    def forward(self, *inputs):
+        (hx, cx), inputs = _split(inputs, 2)
+        ws, inputs = _split(inputs, self.n_layers * 8)
+        bs, xs = _split(inputs, self.n_layers * 8)
+        ws = [ws[i * 8:i * 8 + 8] for i in range(self.n_layers)]
+        bs = [bs[i * 8:i * 8 + 8] for i in range(self.n_layers)]
+        # The same masks are drawn by every call.
+        numpy.random.seed(0)
+        hy, cy, ys = functions.n_step_lstm(
+            self.n_layers, self.dropout, hx, cx, ws, bs, xs)
+        return (hy, cy) + ys
+
+    def args(self):
+        return tuple([self.hx, self.cx] + sum(self.ws, []) +
+                     sum(self.bs, []) + self.xs)
+
+    def test_test_mode(self):
+        with chainer.using_config('train', False):
+            y = self.forward(*self.args())
+        self.dropout = 0.0
+        y_expect = self.forward(*self.args())
+        for a, b in zip(y, y_expect):
+            testing.assert_allclose(a.data, b.data)
+
+    def test_backward(self):
+        gradient_check.check_backward(
+            self.forward, self.args(),
+            tuple([self.dhy, None] + self.dys),
+            eps=1e-2, rtol=1e-3, atol=1e-3)
+
+
 @testing.parameterize(*testing.product({
     'use_cudnn': ['always', 'auto', 'never'],
 }))
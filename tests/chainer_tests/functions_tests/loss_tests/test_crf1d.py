@@ -9,6 +9,7 @@ from chainer import functions
 from chainer import gradient_check
 from chainer import testing
 from chainer.testing import attr
+from chainer.utils import type_check
 
 
 @testing.parameterize(
@@ -16,6 +17,7 @@ from chainer.testing import attr
     {'lengths': [3, 2, 1], 'batches': [3, 2, 1]},
     {'lengths': [3, 1, 1], 'batches': [3, 1, 1]},
     {'lengths': [1, 1], 'batches': [2]},
+    {'lengths': [4, 2, 1], 'batches': [3, 2, 1, 1]},
 )
 class TestCRF1d(unittest.TestCase):
 
@@ -131,5 +133,48 @@ class TestCRF1d(unittest.TestCase):
         self.check_argmax(cuda.to_gpu(self.cost),
                           [cuda.to_gpu(x) for x in self.xs])
 
+    def check_argmax_backward(self, cost_data, xs_data):
+        def f(cost, *xs):
+            return functions.argmax_crf1d(cost, xs)[0]
+
+        gy = numpy.random.uniform(-1, 1, self.batches[0]).astype(
+            numpy.float32)
+        gy = cuda.get_array_module(cost_data).asarray(gy)
+        no_grads = None
+        if len(self.batches) == 1:
+            no_grads = [True] + [False] * len(xs_data)
+        gradient_check.check_backward(
+            f, [cost_data] + xs_data, gy, no_grads=no_grads, eps=1e-4,
+            rtol=1e-3, atol=1e-3)
+
+    def test_argmax_backward_cpu(self):
+        self.check_argmax_backward(self.cost, self.xs)
+
+    @attr.gpu
+    def test_argmax_backward_gpu(self):
+        self.check_argmax_backward(cuda.to_gpu(self.cost),
+                                   [cuda.to_gpu(x) for x in self.xs])
+
+
+class TestCRF1dFunction(unittest.TestCase):
+
+    def test_invalid_batches(self):
+        # Sequences must be sorted in descending order of lengths.
+        cost = numpy.zeros((3, 3), numpy.float32)
+        xs = [numpy.zeros((b, 3), numpy.float32) for b in (1, 2)]
+        ys = [numpy.zeros((b,), numpy.int32) for b in (1, 2)]
+        with self.assertRaises(type_check.InvalidType):
+            functions.crf1d(cost, xs, ys)
+
+    def test_single_node(self):
+        cost = chainer.Variable(numpy.zeros((3, 3), numpy.float32))
+        xs = [numpy.zeros((b, 3), numpy.float32) for b in (2, 2, 1)]
+        ys = [numpy.zeros((b,), numpy.int32) for b in (2, 2, 1)]
+        loss = functions.crf1d(cost, xs, ys)
+        self.assertIsInstance(loss.creator, functions.loss.crf1d.CRF1d)
+        self.assertIs(loss.creator.inputs[0], cost.node)
+        s, _ = functions.argmax_crf1d(cost, xs)
+        self.assertIsInstance(s.creator, functions.loss.crf1d.ArgmaxCRF1d)
+
 
 testing.run_module(__name__, __file__)
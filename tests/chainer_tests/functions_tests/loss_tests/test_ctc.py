@@ -141,6 +141,15 @@ class TestCTCBlankSymbol(TestCTC):
         self.blank_symbol = 3
 
 
+class TestCTCRepeatedLabels(TestCTC):
+
+    def setUp(self):
+        super(TestCTCRepeatedLabels, self).setUp()
+        self.t = numpy.array([[0, 0], [1, 1]]).astype(numpy.int32)
+        self.l = numpy.array([[2, 0, 2, 0, 2],
+                              [2, 1, 2, 1, 2]]).astype(numpy.int32)
+
+
 class TestCTCUseNoBackpropMode(unittest.TestCase):
 
     def test_no_backprop_mode(self):
@@ -172,6 +172,57 @@ class TestFixedBatchNormalization(unittest.TestCase):
             [cuda.to_gpu(i) for i in self.args], cuda.to_gpu(self.gy))
 
 
+@testing.parameterize(*testing.product({
+    'train': [True, False],
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestBatchNormalizationNHWC(unittest.TestCase):
+
+    def setUp(self):
+        self.gamma = numpy.random.uniform(.5, 1, (3,)).astype(self.dtype)
+        self.beta = numpy.random.uniform(-1, 1, (3,)).astype(self.dtype)
+        self.x = numpy.random.uniform(-1, 1, (5, 2, 4, 3)).astype(self.dtype)
+        self.gy = numpy.random.uniform(-1, 1, self.x.shape).astype(self.dtype)
+        self.args = [self.x, self.gamma, self.beta]
+        if not self.train:
+            self.mean = numpy.random.uniform(-1, 1, (3,)).astype(self.dtype)
+            self.var = numpy.random.uniform(0.5, 1, (3,)).astype(self.dtype)
+            self.args += [self.mean, self.var]
+
+    def forward(self, x):
+        if self.train:
+            return functions.batch_normalization(x, *self.args[1:])
+        return functions.fixed_batch_normalization(x, *self.args[1:])
+
+    def test_forward(self):
+        expect = self.forward(self.x.transpose(0, 3, 1, 2)).data
+        with chainer.using_config('image_layout', 'NHWC'):
+            y = self.forward(self.x).data
+        self.assertEqual(y.shape, self.x.shape)
+        testing.assert_allclose(
+            expect.transpose(0, 2, 3, 1), y, atol=1e-4, rtol=1e-3)
+
+    def test_running_statistics(self):
+        if not self.train:
+            return
+        mean = numpy.zeros(3, self.dtype)
+        var = numpy.zeros(3, self.dtype)
+        with chainer.using_config('image_layout', 'NHWC'):
+            func = batch_normalization.BatchNormalizationFunction(
+                mean=mean, var=var, decay=0.)
+            func(*self.args)
+        testing.assert_allclose(self.x.mean(axis=(0, 1, 2)),
+                                func.running_mean)
+
+    @condition.retry(3)
+    def test_backward(self):
+        with chainer.using_config('train', self.train), \
+                chainer.using_config('image_layout', 'NHWC'):
+            gradient_check.check_backward(
+                batch_normalization.BatchNormalizationFunction(),
+                self.args, self.gy, dtype=numpy.float64)
+
+
 @testing.parameterize(*testing.product({
     'use_cudnn': ['always', 'auto', 'never'],
     # TODO(bkvogel): Check float16 support again in next cuDNN version.
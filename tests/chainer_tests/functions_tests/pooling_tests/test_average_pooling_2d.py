@@ -123,4 +123,35 @@ class TestAveragePooling2DCudnnCall(unittest.TestCase):
             self.assertEqual(func.called, expect)
 
 
+@testing.parameterize(*testing.product({
+    'dtype': [numpy.float32, numpy.float64],
+}))
+class TestAveragePooling2DNHWC(unittest.TestCase):
+
+    def setUp(self):
+        # Avoid unstability of numerical gradient
+        self.x = numpy.arange(
+            2 * 3 * 5 * 4, dtype=self.dtype).reshape(2, 5, 4, 3)
+        numpy.random.shuffle(self.x)
+        self.x = 2 * self.x / self.x.size - 1
+        self.gy = numpy.random.uniform(
+            -1, 1, (2, 3, 2, 3)).astype(self.dtype)
+
+    def test_forward(self):
+        expect = functions.average_pooling_2d(
+            self.x.transpose(0, 3, 1, 2), 3, stride=2, pad=1).data
+        with chainer.using_config('image_layout', 'NHWC'):
+            y = functions.average_pooling_2d(self.x, 3, stride=2, pad=1).data
+        self.assertEqual(y.shape, (2, 3, 2, 3))
+        self.assertTrue(y.flags.c_contiguous)
+        testing.assert_allclose(expect.transpose(0, 2, 3, 1), y)
+
+    @condition.retry(3)
+    def test_backward(self):
+        with chainer.using_config('image_layout', 'NHWC'):
+            gradient_check.check_backward(
+                functions.AveragePooling2D(3, stride=2, pad=1),
+                self.x, self.gy, eps=2.0 ** -8)
+
+
 testing.run_module(__name__, __file__)
@@ -0,0 +1,127 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import graph_optimizations
+from chainer import links
+from chainer import testing
+
+
+class Block(chainer.Chain):
+
+    def __init__(self):
+        super(Block, self).__init__(
+            l1=links.Linear(4, 4),
+            bn=links.BatchNormalization(4),
+            l2=links.Linear(4, 4),
+        )
+
+    def __call__(self, x):
+        h = functions.relu(self.bn(self.l1(x)))
+        h = functions.dropout(h, 0.5)
+        return self.l2(h) + x
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.block = Block()
+        self.x = numpy.random.uniform(-1, 1, (5, 4)).astype(numpy.float32)
+
+    def run_block(self, f):
+        self.block.cleargrads()
+        x = chainer.Variable(self.x)
+        numpy.random.seed(0)
+        y = f(x)
+        functions.sum(y * y).backward()
+        grads = [numpy.copy(p.grad) for p in self.block.params()]
+        return y.data, x.grad, grads, numpy.copy(self.block.bn.avg_mean)
+
+    def check(self, f):
+        avg_mean = numpy.copy(self.block.bn.avg_mean)
+        y_expect, gx_expect, grads_expect, mean_expect = self.run_block(
+            self.block)
+        self.block.bn.avg_mean[...] = avg_mean
+        self.block.bn.N = 0
+
+        y, gx, grads, mean = self.run_block(f)
+        testing.assert_allclose(y_expect, y)
+        testing.assert_allclose(gx_expect, gx)
+        for g_expect, g in zip(grads_expect, grads):
+            testing.assert_allclose(g_expect, g)
+        # The running statistics are updated once.
+        testing.assert_allclose(mean_expect, mean)
+
+    def test_checkpoint(self):
+        self.check(lambda x: graph_optimizations.checkpoint(self.block, x))
+
+    def test_checkpointed(self):
+        self.check(graph_optimizations.Checkpointed(self.block))
+
+    def test_graph(self):
+        y = graph_optimizations.checkpoint(self.block, self.x)
+        self.assertIsInstance(y.creator, graph_optimizations.Checkpoint)
+        # Only the checkpoint function is recorded.
+        self.assertIsNone(y.creator.inputs[0].creator)
+
+    def test_no_backprop(self):
+        with chainer.no_backprop_mode():
+            y = graph_optimizations.checkpoint(self.block, self.x)
+        self.assertIsNone(y.creator)
+
+
+class TestPlanCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.layers = [links.Linear(16, 16) for _ in range(8)]
+        self.x = numpy.random.uniform(-1, 1, (32, 16)).astype(numpy.float32)
+        # Each layer keeps its input of 2048 bytes.
+        self.nbytes = self.x.nbytes
+
+    def test_fits(self):
+        segments = graph_optimizations.plan_checkpoints(
+            self.layers, self.x, self.nbytes * 8)
+        self.assertEqual(segments, [(0, 8, False)])
+
+    def test_budget(self):
+        budget = self.nbytes * 7
+        segments = graph_optimizations.plan_checkpoints(
+            self.layers, self.x, budget)
+        self.assertEqual(segments[0][0], 0)
+        self.assertEqual(segments[-1][1], 8)
+        for s, t in zip(segments, segments[1:]):
+            self.assertEqual(s[1], t[0])
+        self.assertTrue(any(c for _, _, c in segments))
+        self.assertLessEqual(
+            graph_optimizations.checkpointing._estimate_peak(
+                [self.nbytes] * 8, [self.nbytes] * 8,
+                [list(s) for s in segments]),
+            budget)
+
+    def test_infeasible(self):
+        segments = graph_optimizations.plan_checkpoints(
+            self.layers, self.x, 1)
+        self.assertTrue(all(c for _, _, c in segments))
+
+    def test_checkpoint_sequence(self):
+        forward = graph_optimizations.checkpoint_sequence(
+            self.layers, self.x, self.nbytes * 7)
+        for layer in self.layers:
+            layer.cleargrads()
+        y = forward(self.x)
+        functions.sum(y).backward()
+        grads = [numpy.copy(layer.W.grad) for layer in self.layers]
+
+        h = self.x
+        for layer in self.layers:
+            layer.cleargrads()
+            h = layer(h)
+        functions.sum(h).backward()
+        testing.assert_allclose(h.data, y.data)
+        for g, layer in zip(grads, self.layers):
+            testing.assert_allclose(layer.W.grad, g)
+
+
+testing.run_module(__name__, __file__)
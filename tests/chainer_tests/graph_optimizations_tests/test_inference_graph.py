@@ -0,0 +1,111 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import graph_optimizations
+from chainer import links
+from chainer.links.model.vision import resnet
+from chainer import testing
+from chainer.testing import attr
+
+
+class ConvBNBlock(chainer.Chain):
+
+    def __init__(self):
+        super(ConvBNBlock, self).__init__(
+            conv1=links.Convolution2D(3, 4, 3, pad=1),
+            bn1=links.BatchNormalization(4),
+            conv2=links.Convolution2D(4, 4, 1, nobias=True),
+            bn2=links.BatchNormalization(4),
+            conv3=links.Convolution2D(4, 5, 3, stride=2),
+        )
+        for bn in (self.bn1, self.bn2):
+            bn.gamma.data[...] = numpy.random.uniform(0.5, 1.5, 4)
+            bn.beta.data[...] = numpy.random.uniform(-1, 1, 4)
+            bn.avg_mean[...] = numpy.random.uniform(-1, 1, 4)
+            bn.avg_var[...] = numpy.random.uniform(0.5, 1.5, 4)
+
+    def __call__(self, x):
+        h1 = functions.relu(self.bn1(self.conv1(x)))
+        h2 = self.bn2(self.conv2(h1))
+        # conv3 feeds two functions, so its ReLU must not be fused.
+        h3 = self.conv3(h2 + h1)
+        return {'h2': h2, 'out': functions.relu(h3) + h3}
+
+
+class TestInferenceGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.model = ConvBNBlock()
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3, 7, 7)).astype(numpy.float32)
+
+    def check_outputs(self, graph, x):
+        with chainer.using_config('train', False):
+            expect = self.model(x)
+            actual = graph(x)
+        self.assertEqual(sorted(actual.keys()), ['h2', 'out'])
+        for key in expect:
+            self.assertIsNone(actual[key].creator)
+            testing.assert_allclose(
+                expect[key].data, actual[key].data, atol=1e-5, rtol=1e-4)
+
+    def test_fused(self):
+        graph = graph_optimizations.InferenceGraph(self.model)
+        self.check_outputs(graph, self.x)
+        self.check_outputs(graph, self.x * 2)
+
+        schedule, = graph._schedules.values()
+        labels = [step.func.label for step in schedule.steps]
+        self.assertEqual(labels.count('FusedConvolution2DReLU'), 1)
+        self.assertEqual(labels.count('FusedConvolution2D'), 1)
+        self.assertNotIn('BatchNormalizationFunction', labels)
+        self.assertEqual(labels.count('ReLU'), 1)
+
+    def test_unfused(self):
+        graph = graph_optimizations.InferenceGraph(self.model, fuse=False)
+        self.check_outputs(graph, self.x)
+
+    def test_shape_change(self):
+        graph = graph_optimizations.InferenceGraph(self.model)
+        self.check_outputs(graph, self.x)
+        self.check_outputs(graph, self.x[:1])
+        self.assertEqual(len(graph._schedules), 2)
+
+    def test_clear(self):
+        graph = graph_optimizations.InferenceGraph(self.model)
+        self.check_outputs(graph, self.x)
+        self.model.bn1.gamma.data *= 2
+        graph.clear()
+        self.check_outputs(graph, self.x)
+
+    def test_train_mode(self):
+        graph = graph_optimizations.InferenceGraph(self.model)
+        with chainer.using_config('train', True):
+            y = graph(self.x)
+        self.assertIsNotNone(y['out'].creator)
+        self.assertEqual(len(graph._schedules), 0)
+
+
+@unittest.skipUnless(resnet.available, 'Pillow is required')
+@attr.slow
+class TestInferenceGraphResNet50(unittest.TestCase):
+
+    def test_resnet50(self):
+        model = resnet.ResNet50Layers(pretrained_model=None)
+        for bn in model.links():
+            if isinstance(bn, links.BatchNormalization):
+                bn.avg_var[...] = 1
+        graph = graph_optimizations.InferenceGraph(model, layers=['pool5'])
+        x = numpy.random.uniform(-1, 1, (1, 3, 64, 64)).astype(numpy.float32)
+        with chainer.using_config('train', False):
+            expect = model(x, layers=['pool5'])['pool5']
+            actual = graph(x)['pool5']
+        scale = abs(expect.data).max()
+        testing.assert_allclose(
+            expect.data / scale, actual.data / scale, atol=1e-5, rtol=1e-4)
+
+
+testing.run_module(__name__, __file__)
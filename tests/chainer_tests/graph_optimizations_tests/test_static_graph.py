@@ -0,0 +1,183 @@
+import copy
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import graph_optimizations
+from chainer import links
+from chainer import testing
+
+
+class MLP(chainer.Chain):
+
+    def __init__(self):
+        super(MLP, self).__init__(
+            l1=links.Linear(3, 4),
+            l2=links.Linear(4, 4),
+        )
+
+    def forward(self, x):
+        h = functions.relu(self.l1(x))
+        # h is read by three functions.
+        return functions.sum(self.l2(h) * h + h)
+
+    @graph_optimizations.static_graph
+    def __call__(self, x):
+        return self.forward(x)
+
+
+class RNN(chainer.Chain):
+
+    def __init__(self):
+        super(RNN, self).__init__(
+            embed=links.Linear(3, 4),
+            lstm=links.StatelessLSTM(4, 4),
+        )
+
+    @graph_optimizations.static_graph
+    def __call__(self, c, h, x):
+        return self.lstm(c, h, self.embed(x))
+
+
+class BNModel(chainer.Chain):
+
+    def __init__(self):
+        super(BNModel, self).__init__(
+            l1=links.Linear(3, 4),
+            bn=links.BatchNormalization(4),
+        )
+
+    @graph_optimizations.static_graph
+    def __call__(self, x):
+        return functions.sum(self.bn(self.l1(x)) ** 2)
+
+
+class TestStaticGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.model = MLP()
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+
+    def check_backward(self, y, x):
+        self.model.cleargrads()
+        y.backward()
+        grads = [numpy.copy(p.grad) for p in self.model.params()]
+        self.model.cleargrads()
+        y_expect = self.model.forward(x)
+        y_expect.backward()
+        testing.assert_allclose(y_expect.data, y.data)
+        for g, p in zip(grads, self.model.params()):
+            testing.assert_allclose(p.grad, g)
+
+    def test_replay(self):
+        y = self.model(self.x)
+        self.assertNotIsInstance(
+            y.creator, graph_optimizations.StaticGraphFunction)
+        self.check_backward(y, self.x)
+
+        for _ in range(2):
+            y = self.model(self.x)
+            self.assertIsInstance(
+                y.creator, graph_optimizations.StaticGraphFunction)
+            self.check_backward(y, self.x)
+
+    def test_shape_change(self):
+        self.model(self.x)
+        y = self.model(self.x[:2])
+        self.assertNotIsInstance(
+            y.creator, graph_optimizations.StaticGraphFunction)
+        y = self.model(self.x[:2])
+        self.assertIsInstance(
+            y.creator, graph_optimizations.StaticGraphFunction)
+        self.check_backward(y, self.x[:2])
+
+    def test_input_grad(self):
+        self.model(self.x)
+        x = chainer.Variable(self.x)
+        self.model(x).backward()
+        gx = x.grad
+        x = chainer.Variable(self.x)
+        self.model.forward(x).backward()
+        testing.assert_allclose(x.grad, gx)
+
+    def test_disabled(self):
+        self.model(self.x)
+        with chainer.using_config('use_static_graph', False):
+            y = self.model(self.x)
+        self.assertNotIsInstance(
+            y.creator, graph_optimizations.StaticGraphFunction)
+
+    def test_no_backprop(self):
+        self.model(self.x)
+        with chainer.no_backprop_mode():
+            y = self.model(self.x)
+        self.assertIsNone(y.creator)
+        testing.assert_allclose(self.model.forward(self.x).data, y.data)
+
+
+class TestStaticGraphBatchNormalization(unittest.TestCase):
+
+    def setUp(self):
+        self.model = BNModel()
+        self.xs = numpy.random.uniform(
+            -1, 1, (4, 5, 3)).astype(numpy.float32)
+
+    def test_running_statistics(self):
+        model_expect = copy.deepcopy(self.model)
+        for x in self.xs:
+            with chainer.using_config('use_static_graph', False):
+                model_expect(x).backward()
+            self.model(x).backward()
+            testing.assert_allclose(
+                model_expect.bn.avg_mean, self.model.bn.avg_mean)
+            testing.assert_allclose(
+                model_expect.bn.avg_var, self.model.bn.avg_var)
+
+    def test_running_statistics_replaced(self):
+        self.model(self.xs[0])
+        self.model.bn.avg_mean = numpy.ones(4, numpy.float32)
+        self.model(self.xs[1])
+        model_expect = BNModel()
+        model_expect.bn.avg_mean[:] = 1
+        with chainer.using_config('use_static_graph', False):
+            model_expect.l1.copyparams(self.model.l1)
+            model_expect(self.xs[1])
+        testing.assert_allclose(
+            model_expect.bn.avg_mean, self.model.bn.avg_mean)
+
+
+class TestStaticGraphRecurrent(unittest.TestCase):
+
+    def setUp(self):
+        self.model = RNN()
+        self.xs = numpy.random.uniform(
+            -1, 1, (4, 2, 3)).astype(numpy.float32)
+
+    def unroll(self):
+        c = h = chainer.Variable(numpy.zeros((2, 4), numpy.float32))
+        loss = 0
+        for x in self.xs:
+            c, h = self.model(c, h, x)
+            loss += functions.sum(h * h)
+        return loss
+
+    def test_unrolled(self):
+        with chainer.using_config('use_static_graph', False):
+            self.model.cleargrads()
+            loss_expect = self.unroll()
+            loss_expect.backward()
+            grads = [numpy.copy(p.grad) for p in self.model.params()]
+
+        self.model.cleargrads()
+        # The first step records the graph; the others replay it before any
+        # backward computation.
+        loss = self.unroll()
+        loss.backward()
+        testing.assert_allclose(loss_expect.data, loss.data)
+        for g, p in zip(grads, self.model.params()):
+            testing.assert_allclose(g, p.grad)
+
+
+testing.run_module(__name__, __file__)
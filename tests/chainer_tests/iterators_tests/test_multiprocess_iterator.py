@@ -5,6 +5,7 @@ import unittest
 import numpy
 import six
 
+from chainer import dataset
 from chainer import iterators
 from chainer import serializer
 from chainer import testing
@@ -261,4 +262,98 @@ class TestMultiprocessIteratorSerialize(unittest.TestCase):
         self.assertAlmostEqual(it.epoch_detail, 6 / 6)
 
 
+@testing.parameterize(*testing.product({
+    'n_prefetch': [1, 2],
+    'repeat': [True, False],
+}))
+class TestMultiprocessIteratorSharedBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.options = {'n_processes': 2, 'n_prefetch': self.n_prefetch,
+                        'repeat': self.repeat, 'shuffle': False}
+
+    def check_batches(self, it, expect):
+        for i in six.moves.range(0, len(expect), 3):
+            batch = it.next()
+            expect_batch = expect[i:i + 3]
+            self.assertEqual(len(batch), len(expect_batch))
+            for x, y in zip(batch, expect_batch):
+                self.assertIsInstance(x, tuple)
+                numpy.testing.assert_array_equal(x[0], y[0])
+                self.assertEqual(x[1], y[1])
+            yield batch
+
+    def test_tuple(self):
+        xs = numpy.random.uniform(size=(7, 2, 3)).astype(numpy.float32)
+        ts = numpy.arange(7, dtype=numpy.int32)
+        data = [(x, t) for x, t in zip(xs, ts)]
+        expect = (data * 2)[:12] if self.repeat else data
+        it = iterators.MultiprocessIterator(data, 3, **self.options)
+        for i, batch in enumerate(self.check_batches(it, expect)):
+            if i == 0:
+                # The first batch is loaded to measure the examples.
+                self.assertIsNone(getattr(batch, 'concatenated', None))
+                continue
+            x, t = dataset.concat_examples(batch)
+            self.assertIs(x, batch.concatenated[0])
+            self.assertIs(t, batch.concatenated[1])
+            numpy.testing.assert_array_equal(
+                x, numpy.stack([e[0] for e in batch]))
+            numpy.testing.assert_array_equal(
+                t, numpy.array([e[1] for e in batch]))
+            # The examples are views of the concatenated arrays.
+            self.assertTrue(numpy.may_share_memory(batch[0][0], x))
+        it.finalize()
+
+    def test_dict(self):
+        data = [{'x': numpy.full((2,), i, numpy.float32),
+                 'y': numpy.array(i, numpy.int32)} for i in range(6)]
+        it = iterators.MultiprocessIterator(data, 3, **self.options)
+        it.next()
+        batch = it.next()
+        for i, example in enumerate(batch):
+            self.assertIsInstance(example, dict)
+            numpy.testing.assert_array_equal(example['x'], data[3 + i]['x'])
+            self.assertIsInstance(example['y'], numpy.ndarray)
+            self.assertEqual(example['y'].shape, ())
+        converted = dataset.ConcatWithBuffers()(batch)
+        self.assertIs(converted['x'], batch.concatenated['x'])
+        numpy.testing.assert_array_equal(converted['y'], [3, 4, 5])
+        it.finalize()
+
+    def test_mismatch(self):
+        data = [(numpy.full((2,), i, numpy.float32), numpy.int32(i))
+                for i in range(9)]
+        data[4] = (numpy.full((3,), 4, numpy.float32), numpy.int32(4))
+        it = iterators.MultiprocessIterator(data, 3, **self.options)
+        batches = list(self.check_batches(it, data))
+        # The batch that has the mismatched example is sent as is.
+        self.assertIsNone(batches[1].concatenated)
+        self.assertIsNotNone(batches[2].concatenated)
+        it.finalize()
+
+    def test_not_arrays(self):
+        data = [(numpy.zeros(2, numpy.float32), i) for i in range(6)]
+        it = iterators.MultiprocessIterator(data, 3, **self.options)
+        for _ in range(2):
+            batch = it.next()
+            self.assertIsNone(getattr(batch, 'concatenated', None))
+        it.finalize()
+
+    def test_release(self):
+        data = [numpy.full((4,), i, numpy.float32) for i in range(6)]
+        it = iterators.MultiprocessIterator(data, 3, **self.options)
+        it.next()
+        n_free = len(it._slots) - self.n_prefetch
+        x = it.next().concatenated
+        if self.repeat:
+            it.next()
+            numpy.testing.assert_array_equal(x[:, 0], [3, 4, 5])
+            # The slots of x and of the batches being loaded are in use.
+            self.assertEqual(len(it._free_slots), n_free - 1)
+            del x
+            self.assertEqual(len(it._free_slots), n_free)
+        it.finalize()
+
+
 testing.run_module(__name__, __file__)
@@ -68,6 +68,44 @@ class TestEmbedID(unittest.TestCase):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
 
 
+@testing.parameterize(
+    {'x_data': [0, 1, 0], 'ignore_label': None},
+    {'x_data': [[0, 1, 0], [1, 0, 1]], 'ignore_label': None},
+    {'x_data': [[0, 1, -1], [-1, 0, 1]], 'ignore_label': -1},
+    {'x_data': [-1, -1], 'ignore_label': -1},
+)
+class TestEmbedIDSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.link = links.EmbedID(5, 2, ignore_label=self.ignore_label)
+        self.x = numpy.array(self.x_data, dtype=numpy.int32)
+        y_shape = self.x.shape + (2,)
+        self.gy = numpy.random.uniform(-1, 1, y_shape).astype(numpy.float32)
+
+    def backward(self):
+        # The link is applied twice to accumulate the gradients.
+        self.link.cleargrads()
+        y1 = self.link(self.x)
+        y2 = self.link(self.x[::-1])
+        y1.grad = self.gy
+        y2.grad = self.gy
+        y1.backward()
+        y2.backward()
+        return self.link.W.grad
+
+    def test_sparse_grad(self):
+        expect = self.backward()
+        self.link.sparse_grad = True
+        g = self.backward()
+        self.assertIsInstance(g, chainer.SparseGrad)
+        self.assertEqual(g.shape, self.link.W.shape)
+        self.assertEqual(g.dtype, numpy.float32)
+        # Only the rows of the IDs are held.
+        valid = self.x[self.x != -1]
+        self.assertLessEqual(set(g.indices), set(valid))
+        testing.assert_allclose(expect, g.to_dense())
+
+
 @testing.parameterize(
     {'t_value': -1, 'valid': False, 'ignore_label': None},
     {'t_value': 3,  'valid': False, 'ignore_label': None},
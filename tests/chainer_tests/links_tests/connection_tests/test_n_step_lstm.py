@@ -4,6 +4,7 @@ import numpy
 
 import chainer
 from chainer import cuda
+from chainer import functions
 from chainer import gradient_check
 from chainer import links
 from chainer import testing
@@ -154,4 +155,68 @@ class TestNStepLSTM(unittest.TestCase):
             [cuda.to_gpu(gy) for gy in self.gys])
 
 
+class TestNStepLSTMMatchesLSTM(unittest.TestCase):
+
+    lengths = [4, 2, 3]
+    in_size = 3
+    out_size = 5
+
+    def setUp(self):
+        self.rnn = links.NStepLSTM(1, self.in_size, self.out_size, 0.0)
+        for p in self.rnn.params():
+            p.data[...] = numpy.random.uniform(-1, 1, p.data.shape)
+        self.lstm = links.LSTM(self.in_size, self.out_size)
+        # links.LSTM interleaves the gates (a, i, f, o) unit by unit.
+        p = self.rnn[0]
+        order = [2, 0, 1, 3]
+        self.lstm.upward.W.data[...] = numpy.stack(
+            [getattr(p, 'w%d' % j).data for j in order], axis=1).reshape(
+                4 * self.out_size, self.in_size)
+        self.lstm.upward.b.data[...] = numpy.stack(
+            [getattr(p, 'b%d' % j).data + getattr(p, 'b%d' % (j + 4)).data
+             for j in order], axis=1).ravel()
+        self.lstm.lateral.W.data[...] = numpy.stack(
+            [getattr(p, 'w%d' % (j + 4)).data for j in order],
+            axis=1).reshape(4 * self.out_size, self.out_size)
+        self.xs = [
+            numpy.random.uniform(-1, 1, (n, self.in_size)).astype('f')
+            for n in self.lengths]
+        self.gys = [
+            numpy.random.uniform(-1, 1, (n, self.out_size)).astype('f')
+            for n in self.lengths]
+
+    def test_forward_backward(self):
+        self.rnn.cleargrads()
+        xs = [chainer.Variable(x) for x in self.xs]
+        _, _, ys = self.rnn(None, None, xs)
+        loss = sum(functions.sum(y * gy) for y, gy in zip(ys, self.gys))
+        loss.backward()
+
+        self.lstm.cleargrads()
+        loss = 0
+        for x, gy, y in zip(self.xs, self.gys, ys):
+            self.lstm.reset_state()
+            for t in range(len(x)):
+                h = self.lstm(x[t:t + 1])
+                testing.assert_allclose(h.data[0], y.data[t], atol=1e-5)
+                loss += functions.sum(h * gy[t:t + 1])
+        loss.backward()
+
+        p = self.rnn[0]
+        for k, j in enumerate([2, 0, 1, 3]):
+            testing.assert_allclose(
+                self.lstm.upward.W.grad.reshape(
+                    self.out_size, 4, self.in_size)[:, k],
+                getattr(p, 'w%d' % j).grad, atol=1e-4)
+            testing.assert_allclose(
+                self.lstm.lateral.W.grad.reshape(
+                    self.out_size, 4, self.out_size)[:, k],
+                getattr(p, 'w%d' % (j + 4)).grad, atol=1e-4)
+            testing.assert_allclose(
+                self.lstm.upward.b.grad.reshape(self.out_size, 4)[:, k],
+                getattr(p, 'b%d' % j).grad, atol=1e-4)
+        for x, gx in zip(xs, [x.grad for x in xs]):
+            self.assertEqual(gx.shape, x.shape)
+
+
 testing.run_module(__name__, __file__)
@@ -108,4 +108,45 @@ class TestBinaryHierarchicalSoftmax(unittest.TestCase):
         self.assertTrue((f.codes == g.codes).all())
 
 
+class TestBinaryHierarchicalSoftmaxBatch(unittest.TestCase):
+
+    def setUp(self):
+        tree = links.BinaryHierarchicalSoftmax.create_huffman_tree(
+            {i: i + 1 for i in range(10)})
+        self.link = links.BinaryHierarchicalSoftmax(4, tree)
+        self.link.cleargrads()
+        self.x = numpy.random.uniform(-1, 1, (20, 4)).astype(numpy.float32)
+        # Labels are repeated so that the paths share nodes.
+        self.t = numpy.random.randint(0, 10, 20).astype(numpy.int32)
+        self.gy = numpy.float32(0.7)
+
+        parser = links.loss.hierarchical_softmax.TreeParser()
+        parser.parse(tree)
+        self.paths = parser.get_paths()
+        self.codes = parser.get_codes()
+
+    def test_forward_backward(self):
+        x = chainer.Variable(self.x)
+        loss = self.link(x, chainer.Variable(self.t))
+        loss.grad = numpy.array(self.gy)
+        loss.backward()
+
+        W = self.link.W.data
+        expect_loss = 0
+        expect_gx = numpy.zeros_like(self.x)
+        expect_gW = numpy.zeros_like(W)
+        for i, (ix, it) in enumerate(zip(self.x, self.t)):
+            path = self.paths[it]
+            code = self.codes[it]
+            wxy = W[path].dot(ix) * code
+            expect_loss += numpy.logaddexp(0, -wxy).sum()
+            g = -self.gy * code / (1 + numpy.exp(wxy))
+            expect_gx[i] = g.dot(W[path])
+            expect_gW[path] += numpy.outer(g, ix)
+
+        testing.assert_allclose(loss.data, expect_loss, rtol=1e-5)
+        testing.assert_allclose(x.grad, expect_gx, atol=1e-5)
+        testing.assert_allclose(self.link.W.grad, expect_gW, atol=1e-5)
+
+
 testing.run_module(__name__, __file__)
@@ -156,6 +156,11 @@ class TestNegativeSamplingIgnoreMask(TestNegativeSampling):
             cuda.to_cpu(gx)[self.idx, :], gx0, atol=1.e-4)
         testing.assert_allclose(gw, gw0, atol=1.e-4)
 
+    def test_ignored_grad_cpu(self):
+        x = chainer.Variable(self.x)
+        self.link(x, chainer.Variable(self.t)).backward()
+        testing.assert_allclose(x.grad[~self.idx], 0)
+
     def test_ignore_backward_cpu(self):
         self.check_ignore_backward(
             self.x, self.t, self.gy, self.x0, self.t0, self.gy0)
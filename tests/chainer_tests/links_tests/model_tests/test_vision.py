@@ -2,6 +2,7 @@ import unittest
 
 import numpy
 
+import chainer
 from chainer import cuda
 from chainer.links.model.vision import resnet
 from chainer.links.model.vision import vgg
@@ -68,6 +69,29 @@ class TestResNet50Layers(unittest.TestCase):
         self.assertEqual(y5.shape, (3, 160, 120))
         self.assertEqual(y5.dtype, numpy.float32)
 
+    def test_prepare_nhwc(self):
+        x = numpy.random.uniform(0, 255, (160, 120, 3)).astype(numpy.uint8)
+        expect = resnet.prepare(x)
+        with chainer.using_config('image_layout', 'NHWC'):
+            y = resnet.prepare(x)
+        self.assertEqual(y.shape, (224, 224, 3))
+        testing.assert_allclose(expect.transpose(1, 2, 0), y)
+
+    def test_call_nhwc(self):
+        x = numpy.random.uniform(-1, 1, (1, 3, 64, 64)).astype(numpy.float32)
+        with numpy.errstate(divide='ignore', over='ignore',
+                            invalid='ignore'), \
+                chainer.using_config('train', False):
+            expect = self.link(x, layers=['res3', 'pool5'])
+            with chainer.using_config('image_layout', 'NHWC'):
+                y = self.link(
+                    x.transpose(0, 2, 3, 1), layers=['res3', 'pool5'])
+        testing.assert_allclose(
+            expect['res3'].data.transpose(0, 2, 3, 1), y['res3'].data,
+            atol=1e-4, rtol=1e-4)
+        testing.assert_allclose(
+            expect['pool5'].data, y['pool5'].data, atol=1e-4, rtol=1e-4)
+
     def check_extract(self):
         x1 = numpy.random.uniform(0, 255, (320, 240, 3)).astype(numpy.uint8)
         x2 = numpy.random.uniform(0, 255, (320, 240)).astype(numpy.uint8)
@@ -1,9 +1,13 @@
+import copy
 import unittest
 
+import numpy
 import six
 
 import chainer
+from chainer import optimizer
 from chainer import optimizers
+from chainer import serializers
 from chainer import testing
 
 
@@ -44,4 +48,148 @@ class TestOptimizerHyperparameter(unittest.TestCase):
             self.assertEqual(self.get_hyperparam(name), new_value)
 
 
+@testing.parameterize(*testing.product({
+    'impl': [
+        optimizers.AdaGrad,
+        optimizers.Adam,
+        optimizers.MomentumSGD,
+    ]
+}))
+class TestOptimizerSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        w = numpy.random.uniform(-1, 1, (6, 3)).astype(numpy.float32)
+        self.sparse = chainer.Link(w=w.shape)
+        self.sparse.w.data[...] = w
+        self.dense = chainer.Link(w=w.shape)
+        self.dense.w.data[...] = w
+        self.sparse_opt = self.impl()
+        self.sparse_opt.setup(self.sparse)
+        self.dense_opt = self.impl()
+        self.dense_opt.setup(self.dense)
+
+    def update(self, indices):
+        indices = numpy.array(indices, numpy.int32)
+        values = numpy.random.uniform(
+            -1, 1, (len(indices), 3)).astype(numpy.float32)
+        grad = chainer.SparseGrad(indices, values, (6, 3))
+        self.dense.w.grad = grad.to_dense()
+        self.sparse.w.grad = grad
+        self.dense_opt.update()
+        self.sparse_opt.update()
+
+    def test_update(self):
+        self.update([0, 3, 0])
+        # The rows of the gradient are updated as the dense update does.
+        testing.assert_allclose(self.dense.w.data, self.sparse.w.data)
+        before = self.sparse.w.data.copy()
+        self.update([3, 4])
+        rows = [3, 4]
+        testing.assert_allclose(
+            self.dense.w.data[rows], self.sparse.w.data[rows])
+        # The other rows are not updated.
+        rows = [0, 1, 2, 5]
+        testing.assert_allclose(before[rows], self.sparse.w.data[rows],
+                                atol=0, rtol=0)
+        if self.impl is optimizers.AdaGrad:
+            testing.assert_allclose(self.dense.w.data, self.sparse.w.data)
+
+
+class FusedModel(chainer.Chain):
+
+    def __init__(self):
+        super(FusedModel, self).__init__(
+            l1=chainer.links.Linear(3, 4),
+            l2=chainer.links.Linear(4, 2),
+        )
+        self.add_param('s', (), dtype=numpy.float64)
+
+
+@testing.parameterize(*testing.product({
+    'impl': [
+        optimizers.AdaDelta,
+        optimizers.AdaGrad,
+        optimizers.Adam,
+        optimizers.MomentumSGD,
+        optimizers.NesterovAG,
+        optimizers.RMSprop,
+        optimizers.RMSpropGraves,
+        optimizers.SGD,
+        optimizers.SMORMS3,
+    ]
+}))
+class TestOptimizerFusedUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.model = FusedModel()
+        self.model.s.data[...] = 1
+        self.fused_model = copy.deepcopy(self.model)
+        self.opt = self.create(self.model)
+        self.fused = self.create(self.fused_model)
+        self.fused.use_fused_update()
+
+    def create(self, model):
+        opt = self.impl()
+        opt.setup(model)
+        opt.add_hook(optimizer.WeightDecay(0.01))
+        opt.add_hook(optimizer.GradientClipping(1))
+        # A parameter with its own hook is updated separately.
+        model.l2.b.update_rule.add_hook(optimizer.Lasso(0.1))
+        return opt
+
+    def update(self):
+        for model, opt in ((self.model, self.opt),
+                           (self.fused_model, self.fused)):
+            model.cleargrads()
+            for param in model.params():
+                param.grad = numpy.random.RandomState(param.size).uniform(
+                    -1, 1, param.shape).astype(param.dtype)
+            opt.update()
+
+    def check_params(self):
+        for p, q in six.moves.zip(self.model.params(),
+                                  self.fused_model.params()):
+            testing.assert_allclose(p.data, q.data)
+
+    def test_update(self):
+        for _ in range(3):
+            self.update()
+            self.check_params()
+        groups = self.fused._fused.groups
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(sum(len(g.params) for g in groups), 4)
+        for group in groups:
+            for param in group.params:
+                self.assertTrue(
+                    numpy.shares_memory(param.data, group.var.data))
+
+    def test_rebuild(self):
+        self.update()
+        fused = self.fused._fused
+        self.fused_model.l1.W.data = self.fused_model.l1.W.data.copy()
+        self.update()
+        self.assertIsNot(self.fused._fused, fused)
+        self.check_params()
+
+    def test_serialize(self):
+        self.update()
+        # The states are saved for each parameter.
+        state = {}
+        serializers.DictionarySerializer(state).save(self.fused)
+        expect = {}
+        serializers.DictionarySerializer(expect).save(self.opt)
+        self.assertEqual(sorted(state), sorted(expect))
+        for key in expect:
+            testing.assert_allclose(expect[key], state[key])
+
+        # The states are loaded regardless of the mode.
+        self.opt = self.create(self.model)
+        self.fused = self.create(self.fused_model)
+        self.fused.use_fused_update()
+        serializers.NpzDeserializer(state).load(self.opt)
+        serializers.NpzDeserializer(expect).load(self.fused)
+        self.update()
+        self.check_params()
+
+
 testing.run_module(__name__, __file__)
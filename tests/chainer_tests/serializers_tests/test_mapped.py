@@ -0,0 +1,338 @@
+import os
+import tempfile
+import unittest
+
+import mock
+import numpy
+
+from chainer import cuda
+from chainer import link
+from chainer import links
+from chainer import optimizers
+from chainer.serializers import mapped
+from chainer import testing
+from chainer.testing import attr
+
+
+class TestMappedSerializer(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.temp_file_path = path
+        self.file = open(path, 'w+b')
+        self.serializer = mapped.MappedSerializer(self.file)
+
+        self.data = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+
+    def tearDown(self):
+        self.file.close()
+        os.remove(self.temp_file_path)
+
+    def load(self):
+        self.serializer.finalize()
+        self.file.flush()
+        return mapped.MappedFile(self.temp_file_path)
+
+    def test_get_item(self):
+        child = self.serializer['x']
+        self.assertIsInstance(child, mapped.MappedSerializer)
+        self.assertEqual(child.path, 'x/')
+        self.assertIs(child.index, self.serializer.index)
+
+    def test_get_item_strip_slashes(self):
+        child = self.serializer['/x/']
+        self.assertEqual(child.path, 'x/')
+
+    def check_serialize(self, data, query):
+        ret = self.serializer(query, data)
+        dset = self.load()['w']
+
+        self.assertIsInstance(dset, numpy.memmap)
+        self.assertEqual(dset.shape, data.shape)
+        self.assertEqual(dset.dtype, data.dtype)
+        numpy.testing.assert_array_equal(dset, cuda.to_cpu(data))
+
+        self.assertIs(ret, data)
+
+    def test_serialize_cpu(self):
+        self.check_serialize(self.data, 'w')
+
+    @attr.gpu
+    def test_serialize_gpu(self):
+        self.check_serialize(cuda.to_gpu(self.data), 'w')
+
+    def test_serialize_cpu_strip_slashes(self):
+        self.check_serialize(self.data, '/w')
+
+    def test_serialize_non_contiguous(self):
+        self.check_serialize(self.data.T, 'w')
+
+    def test_serialize_scalar(self):
+        ret = self.serializer('x', 10)
+        dset = self.load()['x']
+
+        self.assertEqual(dset.shape, ())
+        self.assertEqual(dset.dtype, int)
+        self.assertEqual(dset[()], 10)
+
+        self.assertIs(ret, 10)
+
+    def test_serialize_hierarchy(self):
+        self.serializer['a']('x', numpy.arange(3, dtype=numpy.int8))
+        self.serializer['a']['b']('y', self.data)
+        self.serializer('z', numpy.empty((0, 2), numpy.float64))
+        f = self.load()
+        self.assertEqual(list(f.keys()), ['a/x', 'a/b/y', 'z'])
+        for key in f:
+            self.assertEqual(f.index[key]['offset'] % 64, 0)
+        numpy.testing.assert_array_equal(f['a/x'], [0, 1, 2])
+        numpy.testing.assert_array_equal(f['a/b/y'], self.data)
+        self.assertEqual(f['z'].shape, (0, 2))
+
+    def test_serialize_object(self):
+        with self.assertRaises(ValueError):
+            self.serializer('x', numpy.array([None]))
+
+
+class TestMappedFile(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.temp_file_path = path
+        self.data = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+        with open(path, 'wb') as f:
+            s = mapped.MappedSerializer(f)
+            s('y', self.data)
+            s.finalize()
+
+    def tearDown(self):
+        os.remove(self.temp_file_path)
+
+    def test_lazy(self):
+        f = mapped.MappedFile(self.temp_file_path)
+        self.assertIsNone(f._map)
+        self.assertIn('y', f)
+        self.assertEqual(len(f), 1)
+        self.assertIsNone(f._map)
+        f['y']
+        self.assertIsNotNone(f._map)
+
+    def test_read_only(self):
+        y = mapped.MappedFile(self.temp_file_path)['y']
+        self.assertFalse(y.flags.writeable)
+
+    def test_copy_on_write(self):
+        y = mapped.MappedFile(self.temp_file_path, mode='c')['y']
+        y[...] = 0
+        numpy.testing.assert_array_equal(
+            mapped.MappedFile(self.temp_file_path)['y'], self.data)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            mapped.MappedFile(self.temp_file_path, mode='r+')
+
+    def test_invalid_file(self):
+        with open(self.temp_file_path, 'wb') as f:
+            numpy.savez(f, y=self.data)
+        with self.assertRaises(ValueError):
+            mapped.MappedFile(self.temp_file_path)
+
+
+@testing.parameterize(*testing.product({'copy': [False, True]}))
+class TestMappedDeserializer(unittest.TestCase):
+
+    def setUp(self):
+        self.data = numpy.random.uniform(-1, 1, (2, 3)).astype(numpy.float32)
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.temp_file_path = path
+        with open(path, 'wb') as f:
+            s = mapped.MappedSerializer(f)
+            s('y', self.data)
+            s('z', numpy.asarray(10))
+            s.finalize()
+
+        self.file = mapped.MappedFile(path)
+        self.deserializer = mapped.MappedDeserializer(
+            self.file, copy=self.copy)
+
+    def tearDown(self):
+        self.file.close()
+        os.remove(self.temp_file_path)
+
+    def test_get_item(self):
+        child = self.deserializer['x']
+        self.assertIsInstance(child, mapped.MappedDeserializer)
+        self.assertEqual(child.path, 'x/')
+        self.assertEqual(child.copy, self.copy)
+
+    def test_get_item_strip_slashes(self):
+        child = self.deserializer['/x/']
+        self.assertEqual(child.path, 'x/')
+
+    def check_deserialize(self, y, query):
+        ret = self.deserializer(query, y)
+        numpy.testing.assert_array_equal(cuda.to_cpu(ret), self.data)
+        return ret
+
+    def test_deserialize_cpu(self):
+        y = numpy.empty((2, 3), dtype=numpy.float32)
+        ret = self.check_deserialize(y, 'y')
+        if self.copy:
+            self.assertIs(ret, y)
+            numpy.testing.assert_array_equal(y, self.data)
+        else:
+            self.assertIsInstance(ret, numpy.memmap)
+
+    def test_deserialize_cpu_other_dtype(self):
+        y = numpy.empty((2, 3), dtype=numpy.float64)
+        ret = self.check_deserialize(y, 'y')
+        self.assertIs(ret, y)
+
+    def test_deserialize_none_value_cpu(self):
+        ret = self.check_deserialize(None, 'y')
+        self.assertEqual(isinstance(ret, numpy.memmap), not self.copy)
+
+    @attr.gpu
+    def test_deserialize_gpu(self):
+        y = cuda.cupy.empty((2, 3), dtype=numpy.float32)
+        ret = self.check_deserialize(y, 'y')
+        self.assertIs(ret, y)
+
+    def test_deserialize_cpu_strip_slashes(self):
+        y = numpy.empty((2, 3), dtype=numpy.float32)
+        self.check_deserialize(y, '/y')
+
+    def test_deserialize_scalar(self):
+        ret = self.deserializer('z', 5)
+        self.assertEqual(ret, 10)
+        self.assertIsInstance(ret, int)
+
+    def test_deserialize_missing(self):
+        with self.assertRaises(KeyError):
+            self.deserializer('x', 5)
+
+    def test_deserialize_non_strict(self):
+        deserializer = mapped.MappedDeserializer(self.file, strict=False)
+        self.assertEqual(deserializer['a']('x', 5), 5)
+
+
+class TestSaveMapped(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.temp_file_path = path
+
+    def tearDown(self):
+        os.remove(self.temp_file_path)
+
+    def test_save(self):
+        obj = mock.MagicMock()
+        mapped.save_mapped(self.temp_file_path, obj)
+
+        self.assertEqual(obj.serialize.call_count, 1)
+        (serializer,), _ = obj.serialize.call_args
+        self.assertIsInstance(serializer, mapped.MappedSerializer)
+
+    def test_load(self):
+        mapped.save_mapped(self.temp_file_path, mock.MagicMock())
+        obj = mock.MagicMock()
+        mapped.load_mapped(self.temp_file_path, obj)
+
+        self.assertEqual(obj.serialize.call_count, 1)
+        (serializer,), _ = obj.serialize.call_args
+        self.assertIsInstance(serializer, mapped.MappedDeserializer)
+
+
+@testing.parameterize(*testing.product({'mmap_mode': ['r', 'c', None]}))
+class TestLoadMappedLink(unittest.TestCase):
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.temp_file_path = path
+
+        child = link.Chain(linear=links.Linear(2, 3),
+                           bn=links.BatchNormalization(3))
+        child.add_param('Wc', (2, 3))
+        self.parent = link.Chain(child=child)
+        self.parent.add_param('Wp', (2, 3))
+        for param in self.parent.params():
+            param.data[...] = numpy.random.uniform(-1, 1, param.shape)
+        child.bn.avg_mean[...] = 1
+        child.bn.N = 5
+
+        self.optimizer = optimizers.AdaDelta()
+        self.optimizer.setup(self.parent)
+        self.parent.zerograds()
+        self.optimizer.update()  # init all states
+
+    def tearDown(self):
+        os.remove(self.temp_file_path)
+
+    def check_params(self, expected, link):
+        for name, param in link.namedparams():
+            numpy.testing.assert_array_equal(param.data, expected[name])
+            self.assertEqual(
+                isinstance(param.data, numpy.memmap),
+                self.mmap_mode is not None)
+            self.assertEqual(param.data.flags.writeable,
+                             self.mmap_mode != 'r')
+
+    def test_load_link(self):
+        mapped.save_mapped(self.temp_file_path, self.parent)
+        expected = dict((name, param.data.copy())
+                        for name, param in self.parent.namedparams())
+        target = link.Chain(
+            child=link.Chain(linear=links.Linear(2, 3),
+                             bn=links.BatchNormalization(3)))
+        target.child.add_param('Wc', (2, 3))
+        target.add_param('Wp', (2, 3))
+
+        mapped.load_mapped(self.temp_file_path, target, self.mmap_mode)
+        self.check_params(expected, target)
+        numpy.testing.assert_array_equal(target.child.bn.avg_mean, 1)
+        self.assertEqual(target.child.bn.N, 5)
+
+    def test_load_uninitialized_link(self):
+        mapped.save_mapped(self.temp_file_path, self.parent.child.linear)
+        expected = dict((name, param.data.copy()) for name, param
+                        in self.parent.child.linear.namedparams())
+        target = links.Linear(None, 3)
+
+        mapped.load_mapped(self.temp_file_path, target, self.mmap_mode)
+        self.check_params(expected, target)
+
+    def test_load_optimizer(self):
+        for param in self.parent.params():
+            param.update_rule.state['msg'][...] = 1
+        mapped.save_mapped(self.temp_file_path, self.optimizer)
+        for param in self.parent.params():
+            param.update_rule.state['msg'][...] = 0
+        self.optimizer.t = 0
+
+        mapped.load_mapped(self.temp_file_path, self.optimizer,
+                           self.mmap_mode)
+        self.assertEqual(self.optimizer.t, 1)
+        for param in self.parent.params():
+            numpy.testing.assert_array_equal(
+                param.update_rule.state['msg'], 1)
+
+    @attr.gpu
+    def test_load_gpu(self):
+        mapped.save_mapped(self.temp_file_path, self.parent)
+        expected = self.parent.child.linear.W.data.copy()
+        self.parent.to_gpu()
+        self.parent.child.linear.W.data.fill(0)
+
+        mapped.load_mapped(self.temp_file_path, self.parent, self.mmap_mode)
+        W = self.parent.child.linear.W.data
+        self.assertIsInstance(W, cuda.ndarray)
+        numpy.testing.assert_array_equal(cuda.to_cpu(W), expected)
+
+
+testing.run_module(__name__, __file__)
@@ -18,11 +18,17 @@ class TestFunctionHook(unittest.TestCase):
     def test_forward_postprocess(self):
         self.assertTrue(hasattr(self.h, 'forward_postprocess'))
 
+    def test_forward_outputs(self):
+        self.assertTrue(hasattr(self.h, 'forward_outputs'))
+
     def test_backward_preprocess(self):
         self.assertTrue(hasattr(self.h, 'backward_preprocess'))
 
     def test_backward_postprocess(self):
         self.assertTrue(hasattr(self.h, 'backward_postprocess'))
 
+    def test_backward_outputs(self):
+        self.assertTrue(hasattr(self.h, 'backward_outputs'))
+
 
 testing.run_module(__name__, __file__)
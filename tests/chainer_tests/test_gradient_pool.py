@@ -0,0 +1,180 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import gradient_pool
+from chainer import testing
+
+
+class TestGradientPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = gradient_pool.GradientPool()
+
+    def test_acquire(self):
+        a = self.pool.acquire((3, 5), numpy.float32)
+        self.assertEqual(a.shape, (3, 5))
+        self.assertEqual(a.dtype, numpy.float32)
+        self.assertTrue(a.flags.c_contiguous)
+        self.assertEqual(self.pool.misses, 1)
+
+    def test_release_and_reuse(self):
+        self.pool.begin_step()
+        # The list holds the only reference to the array.
+        self.pool.release([self.pool.acquire((3, 5), numpy.float32)])
+        self.assertEqual(self.pool.free_bytes, 64)
+
+        a = self.pool.acquire((2, 7), numpy.float32)
+        self.assertEqual(a.shape, (2, 7))
+        self.assertEqual(self.pool.hits, 1)
+        self.assertEqual(self.pool.free_bytes, 0)
+
+    def test_release_referenced(self):
+        self.pool.begin_step()
+        self.pool.acquire((3, 5), numpy.float32)
+        a = numpy.empty((3, 5), numpy.float32)
+        b = a
+        self.pool.release([a])
+        self.assertEqual(self.pool.free_bytes, 0)
+        self.assertIs(a, b)
+
+    def test_release_view(self):
+        self.pool.begin_step()
+        self.pool.acquire((3, 5), numpy.float32)
+        a = numpy.empty((3, 5), numpy.float32)
+        view = a[1:]
+        self.pool.release([a])
+        self.assertEqual(self.pool.free_bytes, 0)
+        self.assertEqual(view.shape, (2, 5))
+
+    def test_release_unrequested(self):
+        # Buffers of sizes not requested in a step are not kept.
+        self.pool.begin_step()
+        self.pool.release([numpy.empty((3, 5), numpy.float32)])
+        self.assertEqual(self.pool.free_bytes, 0)
+
+    def test_capacity(self):
+        pool = gradient_pool.GradientPool(capacity=0)
+        a = pool.acquire((3, 5), numpy.float32)
+        pool.release([a])
+        self.assertEqual(pool.free_bytes, 0)
+
+    def test_accumulate_in_place(self):
+        node = chainer.Variable(numpy.ones((2, 3), numpy.float32)).node
+        node.grad = numpy.ones((2, 3), numpy.float32)
+        self.assertTrue(self.pool.accumulate(
+            node, numpy.full((2, 3), 2, numpy.float32)))
+        self.assertEqual(self.pool.in_place, 1)
+        numpy.testing.assert_array_equal(node.grad, numpy.full((2, 3), 3))
+
+    def test_accumulate_shared(self):
+        node = chainer.Variable(numpy.ones((2, 3), numpy.float32)).node
+        g = numpy.ones((2, 3), numpy.float32)
+        node.grad = g
+        self.assertTrue(self.pool.accumulate(
+            node, numpy.full((2, 3), 2, numpy.float32)))
+        self.assertEqual(self.pool.in_place, 0)
+        self.assertIsNot(node.grad, g)
+        numpy.testing.assert_array_equal(g, numpy.ones((2, 3)))
+        numpy.testing.assert_array_equal(node.grad, numpy.full((2, 3), 3))
+
+    def test_accumulate_unsupported(self):
+        node = chainer.Variable(numpy.ones((2, 3), numpy.float32)).node
+        node.grad = numpy.ones((2, 3), numpy.float32)
+        self.assertFalse(self.pool.accumulate(
+            node, numpy.ones((2, 3), numpy.float64)))
+
+    def test_track(self):
+        self.pool.begin_step()
+        self.pool.track(1, numpy.empty(4, numpy.float32))
+        self.pool.track(2, numpy.empty(2, numpy.float32))
+        self.pool.track(1, None)
+        self.pool.end_step()
+        self.assertEqual(self.pool.peak_bytes, 24)
+        self.assertEqual(self.pool.steady_bytes, 8)
+
+    def test_nested_step(self):
+        self.pool.begin_step()
+        self.pool.track('a', numpy.empty(2, numpy.float32))
+        # A nested step, e.g. of forget, belongs to the outer step.
+        self.pool.begin_step()
+        self.pool.track('b', numpy.empty(4, numpy.float32))
+        self.pool.end_step()
+        self.pool.track('b', None)
+        self.pool.end_step()
+        self.assertEqual(self.pool.peak_bytes, 24)
+        self.assertEqual(self.pool.steady_bytes, 8)
+
+
+class TestBackwardWithGradientPool(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (3, 4)).astype(numpy.float32)
+        self.w = numpy.random.uniform(-1, 1, (4, 4)).astype(numpy.float32)
+
+    def forward(self, x, w):
+        h = functions.tanh(functions.matmul(x, w))
+        # h, x and w are read by several functions, so that their
+        # gradients are accumulated.
+        h = functions.matmul(h, w) + h * h + functions.sin(h)
+        return functions.sum(h * h + x)
+
+    def check_backward(self, retain_grad):
+        grads = []
+        for use_pool in (False, True):
+            with chainer.using_config('use_gradient_pool', use_pool):
+                x = chainer.Variable(self.x)
+                w = chainer.Variable(self.w)
+                # Run twice so that buffers released in the first step are
+                # reused in the second one.
+                for _ in range(2):
+                    x.cleargrad()
+                    w.cleargrad()
+                    self.forward(x, w).backward(retain_grad=retain_grad)
+                grads.append((x.grad, w.grad))
+        testing.assert_allclose(grads[0][0], grads[1][0])
+        testing.assert_allclose(grads[0][1], grads[1][1])
+
+    def test_backward(self):
+        self.check_backward(False)
+
+    def test_backward_retain_grad(self):
+        self.check_backward(True)
+
+    def test_stats(self):
+        pool = gradient_pool.get_default_pool()
+        with chainer.using_config('use_gradient_pool', True):
+            for _ in range(2):
+                x = chainer.Variable(self.x)
+                w = chainer.Variable(self.w)
+                self.forward(x, w).backward()
+        self.assertGreater(pool.peak_bytes, 0)
+        self.assertGreaterEqual(pool.peak_bytes, pool.steady_bytes)
+        self.assertGreaterEqual(
+            pool.steady_bytes, self.x.nbytes + self.w.nbytes)
+
+    def test_backward_error(self):
+        pool = gradient_pool.get_default_pool()
+        x = chainer.Variable(self.x)
+        y = functions.sum(functions.exp(x))
+        y.creator.backward = lambda inputs, grad_outputs: 1 / 0
+        with chainer.using_config('use_gradient_pool', True):
+            with self.assertRaises(ZeroDivisionError):
+                y.backward()
+        self.assertEqual(pool._depth, 0)
+
+    def test_backward_forget(self):
+        pool = gradient_pool.get_default_pool()
+        with chainer.using_config('use_gradient_pool', True):
+            x = chainer.Variable(self.x)
+            w = chainer.Variable(self.w)
+            functions.sum(functions.forget(
+                lambda x, w: self.forward(x, w), x, w)).backward()
+        self.assertEqual(pool._depth, 0)
+        self.assertGreaterEqual(
+            pool.steady_bytes, self.x.nbytes + self.w.nbytes)
+
+
+testing.run_module(__name__, __file__)
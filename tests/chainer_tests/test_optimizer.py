@@ -308,6 +308,45 @@ class TestOptimizerWeightDecay(unittest.TestCase):
         self.check_weight_decay()
 
 
+class TestOptimizerHookSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.w = np.arange(12, dtype=np.float32).reshape(4, 3) - 6
+        indices = np.array([2, 0, 2], np.int32)
+        values = np.arange(9, dtype=np.float32).reshape(3, 3) - 4
+        self.grad = chainer.SparseGrad(indices, values, self.w.shape)
+        self.target = SimpleLink(self.w.copy(), self.grad)
+
+    def check_hook(self, hook, expect):
+        opt = optimizers.SGD(lr=1)
+        opt.setup(self.target)
+        opt.add_hook(hook)
+        opt.update()
+        testing.assert_allclose(expect, self.target.param.data)
+
+    def test_weight_decay(self):
+        decay = 0.2
+        expect = self.w - self.grad.to_dense()
+        expect[[0, 2]] -= decay * self.w[[0, 2]]
+        self.check_hook(optimizer.WeightDecay(decay), expect)
+
+    def test_lasso(self):
+        decay = 0.2
+        expect = self.w - self.grad.to_dense()
+        expect[[0, 2]] -= decay * np.sign(self.w[[0, 2]])
+        self.check_hook(optimizer.Lasso(decay), expect)
+
+    def test_gradient_clipping(self):
+        g = self.grad.to_dense()
+        threshold = np.linalg.norm(g) / 2
+        self.check_hook(optimizer.GradientClipping(threshold),
+                        self.w - g / 2)
+
+    def test_gradient_hard_clipping(self):
+        g = np.clip(self.grad.to_dense(), -1, 2)
+        self.check_hook(optimizer.GradientHardClipping(-1, 2), self.w - g)
+
+
 class TestOptimizerLasso(unittest.TestCase):
 
     def setUp(self):
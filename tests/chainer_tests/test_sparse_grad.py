@@ -0,0 +1,65 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import testing
+
+
+class TestSparseGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.indices = numpy.array([3, 0, 3, 1], numpy.int32)
+        self.values = numpy.random.uniform(-1, 1, (4, 2)).astype(
+            numpy.float32)
+        self.grad = chainer.SparseGrad(self.indices, self.values, (5, 2))
+        self.dense = numpy.zeros((5, 2), numpy.float32)
+        numpy.add.at(self.dense, self.indices, self.values)
+
+    def test_to_dense(self):
+        testing.assert_allclose(self.dense, self.grad.to_dense())
+
+    def test_coalesce(self):
+        self.assertIs(self.grad.coalesce(), self.grad)
+        numpy.testing.assert_array_equal(self.grad.indices, [0, 1, 3])
+        testing.assert_allclose(self.dense[[0, 1, 3]], self.grad.values)
+
+    def test_add_sparse(self):
+        other = chainer.SparseGrad(
+            numpy.array([4], numpy.int32),
+            numpy.ones((1, 2), numpy.float32), (5, 2))
+        y = self.grad + other
+        self.assertIsInstance(y, chainer.SparseGrad)
+        self.dense[4] += 1
+        testing.assert_allclose(self.dense, y.to_dense())
+
+    def test_add_dense(self):
+        x = numpy.ones((5, 2), numpy.float32)
+        for y in (self.grad + x, x + self.grad):
+            self.assertIsInstance(y, numpy.ndarray)
+            testing.assert_allclose(self.dense + 1, y)
+        # The dense array is not modified.
+        testing.assert_allclose(numpy.ones((5, 2)), x)
+
+    def test_imul(self):
+        self.grad *= 2
+        testing.assert_allclose(self.dense * 2, self.grad.to_dense())
+
+    def test_backward_dense_and_sparse(self):
+        # The sparse and the dense gradients of a shared matrix are summed.
+        W = chainer.Variable(self.dense + 1)
+        x = numpy.array([1, 2, 1], numpy.int32)
+        h = numpy.ones((3, 2), numpy.float32)
+        y = functions.sum(functions.embed_id(x, W, sparse_grad=True))
+        y += functions.sum(functions.matmul(h, W, transb=True))
+        y += functions.sum(functions.embed_id(x, W, sparse_grad=True))
+        y.backward()
+        self.assertIsInstance(W.grad, numpy.ndarray)
+        expect = numpy.full((5, 2), 3, numpy.float32)
+        expect[1] += 4
+        expect[2] += 2
+        testing.assert_allclose(expect, W.grad)
+
+
+testing.run_module(__name__, __file__)
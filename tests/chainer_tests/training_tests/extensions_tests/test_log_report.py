@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from chainer import serializers
+from chainer import testing
+from chainer.training import extensions
+
+
+class TestLogReport(unittest.TestCase):
+
+    def setUp(self):
+        self.out = tempfile.mkdtemp()
+        self.trainer = mock.MagicMock()
+        self.trainer.out = self.out
+        self.trainer.elapsed_time = 1.5
+        self.trainer.updater.epoch = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def run_report(self, report, n):
+        for i in range(n):
+            self.trainer.updater.iteration = i + 1
+            self.trainer.observation = {'loss': float(i)}
+            report(self.trainer)
+
+    def test_json(self):
+        report = extensions.LogReport(trigger=(1, 'iteration'))
+        self.run_report(report, 3)
+        with open(os.path.join(self.out, 'log')) as f:
+            self.assertEqual(json.load(f), report.log)
+        self.assertEqual([e['loss'] for e in report.log], [0, 1, 2])
+
+    def test_json_lines(self):
+        writer = extensions.JSONLinesWriter()
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        self.run_report(report, 3)
+        writer.flush()
+        path = os.path.join(self.out, 'log')
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 3)
+        self.run_report(report, 2)
+        report.finalize()
+        log = extensions.load_json_lines(path)
+        self.assertEqual(log, report.log)
+        self.assertEqual(len(log), 5)
+
+    def test_json_lines_log_name(self):
+        writer = extensions.JSONLinesWriter()
+        report = extensions.LogReport(
+            trigger=(1, 'iteration'), log_name='log_{iteration}',
+            writer=writer)
+        self.run_report(report, 2)
+        report.finalize()
+        for i, entry in enumerate(report.log):
+            self.assertEqual(extensions.load_json_lines(
+                os.path.join(self.out, 'log_{}'.format(i + 1))), [entry])
+
+    def test_rotate(self):
+        writer = extensions.JSONLinesWriter(max_bytes=1)
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        self.run_report(report, 3)
+        report.finalize()
+        path = os.path.join(self.out, 'log')
+        self.assertEqual(sorted(os.listdir(self.out)),
+                         ['log.1', 'log.2', 'log.3'])
+        with open(path + '.3') as f:
+            self.assertEqual(json.loads(f.read()), report.log[0])
+        self.assertEqual(extensions.load_json_lines(path), report.log)
+
+    def test_rotate_backup_count(self):
+        writer = extensions.JSONLinesWriter(max_bytes=1, backup_count=2)
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        self.run_report(report, 4)
+        report.finalize()
+        self.assertEqual(sorted(os.listdir(self.out)), ['log.1', 'log.2'])
+        self.assertEqual(
+            extensions.load_json_lines(os.path.join(self.out, 'log')),
+            report.log[2:])
+
+    def test_json_lines_overwrite(self):
+        path = os.path.join(self.out, 'log')
+        for p in (path, path + '.1'):
+            with open(p, 'w') as f:
+                f.write(json.dumps({'loss': -1.0}) + '\n')
+        writer = extensions.JSONLinesWriter()
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        self.run_report(report, 2)
+        report.finalize()
+        self.assertEqual(os.listdir(self.out), ['log'])
+        self.assertEqual(extensions.load_json_lines(path), report.log)
+
+    def check_resume(self, max_bytes, expected_files):
+        writer = extensions.JSONLinesWriter(max_bytes=max_bytes)
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        self.run_report(report, 3)
+        snapshot = serializers.DictionarySerializer()
+        report.serialize(snapshot)
+        self.run_report(report, 2)
+        report.finalize()
+
+        writer = extensions.JSONLinesWriter(max_bytes=max_bytes)
+        report = extensions.LogReport(trigger=(1, 'iteration'), writer=writer)
+        report.serialize(serializers.NpzDeserializer(snapshot.target))
+        self.run_report(report, 2)
+        report.finalize()
+        log = extensions.load_json_lines(os.path.join(self.out, 'log'))
+        self.assertEqual(log, report.log)
+        self.assertEqual([e['iteration'] for e in log], [1, 2, 3, 1, 2])
+        self.assertEqual(sorted(os.listdir(self.out)), expected_files)
+
+    def test_resume(self):
+        self.check_resume(None, ['log'])
+
+    def test_resume_rotated(self):
+        self.check_resume(1, ['log.1', 'log.2', 'log.3', 'log.4', 'log.5'])
+
+    def test_truncate(self):
+        path = os.path.join(self.out, 'log')
+        writer = extensions.JSONLinesWriter(max_bytes=30)
+        for i in range(5):
+            writer(path, {'loss': float(i)})
+        writer.flush()
+        self.assertEqual(sorted(os.listdir(self.out)), ['log', 'log.1'])
+        writer.truncate(path, 3)
+        writer(path, {'loss': 5.0})
+        writer.finalize()
+        self.assertEqual(
+            [e['loss'] for e in extensions.load_json_lines(path)],
+            [0, 1, 2, 5])
+
+    def test_fsync(self):
+        writer = extensions.JSONLinesWriter(fsync_interval=0)
+        with mock.patch('os.fsync') as fsync:
+            writer(os.path.join(self.out, 'log'), {'loss': 1.0})
+            writer(os.path.join(self.out, 'log'), {'loss': 2.0})
+            writer.finalize()
+        self.assertEqual(fsync.call_count, 3)
+
+    def test_error(self):
+        writer = extensions.JSONLinesWriter()
+        writer(os.path.join(self.out, 'missing', 'log'), {'loss': 1.0})
+        with self.assertRaises(IOError):
+            writer.flush()
+        writer.finalize()
+
+
+testing.run_module(__name__, __file__)
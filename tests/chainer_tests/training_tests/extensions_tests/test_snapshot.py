@@ -1,7 +1,14 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
+import numpy
 
+import chainer
+from chainer import links
+from chainer import serializers
 from chainer import testing
 from chainer.training import extensions
 
@@ -21,4 +28,142 @@ class TestSnapshot(unittest.TestCase):
         self.assertEqual(snapshot.trigger, (1, 'epoch'))
 
 
+class Model(chainer.Chain):
+
+    def __init__(self):
+        super(Model, self).__init__(
+            l1=links.Linear(30, 40),
+            l2=links.Linear(40, 2))
+
+
+@testing.parameterize(*testing.product({
+    'compression': [True, False],
+    'incremental': [True, False],
+}))
+class TestAsyncSnapshotWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.out = tempfile.mkdtemp()
+        self.trainer = mock.MagicMock()
+        self.trainer.out = self.out
+        self.model = Model()
+        self.writer = extensions.AsyncSnapshotWriter(
+            compression=self.compression, incremental=self.incremental)
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def check_load(self, filename, model):
+        loaded = Model()
+        extensions.load_snapshot(os.path.join(self.out, filename), loaded)
+        for (_, p), (_, q) in zip(sorted(model.namedparams()),
+                                  sorted(loaded.namedparams())):
+            numpy.testing.assert_array_equal(p.data, q.data)
+
+    def test_snapshot_object(self):
+        ext = extensions.snapshot_object(
+            self.model, 'model', writer=self.writer)
+        ext(self.trainer)
+        # The arrays are copied before they are written.
+        expect = Model()
+        expect.copyparams(self.model)
+        self.model.l1.W.data[...] = 0
+        ext.finalize()
+        self.check_load('model', expect)
+
+    def test_load_npz(self):
+        if self.incremental:
+            return
+        self.writer(self.out, 'model', self.model)
+        self.writer.wait()
+        loaded = Model()
+        serializers.load_npz(os.path.join(self.out, 'model'), loaded)
+        numpy.testing.assert_array_equal(
+            loaded.l1.W.data, self.model.l1.W.data)
+
+    def test_error(self):
+        # The output directory is not a directory.
+        out = os.path.join(self.out, 'file')
+        open(out, 'w').close()
+        self.writer(out, 'model', self.model)
+        with self.assertRaises(EnvironmentError):
+            self.writer.wait()
+        self.writer.wait()
+
+
+class TestAsyncSnapshotWriterIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.out = tempfile.mkdtemp()
+        self.objects_dir = os.path.join(self.out, 'snapshot_objects')
+        self.model = Model()
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def test_deduplicate(self):
+        writer = extensions.AsyncSnapshotWriter(incremental=True)
+        writer(self.out, 'snapshot_1', self.model)
+        writer.wait()
+        # l1/W and l2/b are small enough to be held in the snapshot.
+        self.assertEqual(len(os.listdir(self.objects_dir)), 1)
+
+        self.model.l2.W.data[...] = 1
+        writer(self.out, 'snapshot_2', self.model)
+        writer.wait()
+        self.assertEqual(len(os.listdir(self.objects_dir)), 1)
+
+        self.model.l1.W.data[...] = 1
+        writer(self.out, 'snapshot_3', self.model)
+        writer.wait()
+        self.assertEqual(len(os.listdir(self.objects_dir)), 2)
+
+        loaded = Model()
+        extensions.load_snapshot(
+            os.path.join(self.out, 'snapshot_2'), loaded)
+        numpy.testing.assert_array_equal(loaded.l2.W.data, 1)
+        self.assertFalse((loaded.l1.W.data == 1).all())
+
+    def test_keep(self):
+        writer = extensions.AsyncSnapshotWriter(incremental=True, keep=2)
+        for i in range(4):
+            self.model.l1.W.data[...] = i
+            writer(self.out, 'snapshot_{}'.format(i), self.model)
+        writer.finalize()
+        self.assertEqual(
+            sorted(os.listdir(self.out)),
+            ['snapshot_2', 'snapshot_3', 'snapshot_objects'])
+        self.assertEqual(len(os.listdir(self.objects_dir)), 2)
+
+        loaded = Model()
+        extensions.load_snapshot(
+            os.path.join(self.out, 'snapshot_2'), loaded)
+        numpy.testing.assert_array_equal(loaded.l1.W.data, 2)
+
+    def test_keep_same_filename(self):
+        writer = extensions.AsyncSnapshotWriter(incremental=True, keep=1)
+        for i in range(3):
+            self.model.l1.W.data[...] = i
+            writer(self.out, 'snapshot', self.model)
+        writer.finalize()
+        self.assertEqual(len(os.listdir(self.objects_dir)), 1)
+        loaded = Model()
+        extensions.load_snapshot(os.path.join(self.out, 'snapshot'), loaded)
+        numpy.testing.assert_array_equal(loaded.l1.W.data, 2)
+
+    def test_keep_existing_objects(self):
+        # Objects written by a former run are not removed.
+        writer = extensions.AsyncSnapshotWriter(incremental=True)
+        writer(self.out, 'snapshot_0', self.model)
+        writer.wait()
+        writer = extensions.AsyncSnapshotWriter(incremental=True, keep=1)
+        writer(self.out, 'snapshot_1', self.model)
+        self.model.l1.W.data[...] = 1
+        writer(self.out, 'snapshot_2', self.model)
+        writer.finalize()
+        loaded = Model()
+        extensions.load_snapshot(
+            os.path.join(self.out, 'snapshot_0'), loaded)
+
+
 testing.run_module(__name__, __file__)
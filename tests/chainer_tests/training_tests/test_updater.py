@@ -176,4 +176,186 @@ class TestUpdaterUpdateArguments(unittest.TestCase):
         self.assertEqual(iterator.next_called, 1)
 
 
+@testing.parameterize(
+    {'iterator': 'serial', 'prefetch': 1},
+    {'iterator': 'serial', 'prefetch': 3},
+    {'iterator': 'multiprocess', 'prefetch': 2},
+)
+class TestStandardUpdaterPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = [numpy.array([i], numpy.float32) for i in range(10)]
+        self.target = chainer.Link()
+        self.optimizer = DummyOptimizer()
+        self.optimizer.setup(self.target)
+        self.optimizer.update = mock.MagicMock()
+
+    def make_iterator(self, shuffle=False):
+        if self.iterator == 'serial':
+            return chainer.iterators.SerialIterator(
+                self.dataset, 3, shuffle=shuffle)
+        return chainer.iterators.MultiprocessIterator(
+            self.dataset, 3, shuffle=shuffle, n_processes=1)
+
+    def test_update(self):
+        expect = []
+        iterator = self.make_iterator()
+        for _ in range(6):
+            expect.append((numpy.stack(iterator.next()),
+                           iterator.epoch, iterator.epoch_detail,
+                           iterator.is_new_epoch))
+        iterator.finalize()
+
+        updater = training.StandardUpdater(
+            self.make_iterator(), self.optimizer, prefetch=self.prefetch)
+        reporter = chainer.Reporter()
+        try:
+            for x, epoch, epoch_detail, is_new_epoch in expect:
+                observation = {}
+                with reporter.scope(observation):
+                    updater.update()
+                args, _ = self.optimizer.update.call_args
+                numpy.testing.assert_array_equal(args[1], x)
+                self.assertEqual(updater.epoch, epoch)
+                self.assertEqual(updater.epoch_detail, epoch_detail)
+                self.assertEqual(updater.is_new_epoch, is_new_epoch)
+                self.assertIn('wait_time', observation)
+                self.assertIn('compute_time', observation)
+        finally:
+            updater.finalize()
+
+    def test_serialize(self):
+        updater = training.StandardUpdater(
+            self.make_iterator(), self.optimizer, prefetch=self.prefetch)
+        try:
+            updater.update()
+            target = {}
+            updater.serialize(
+                chainer.serializers.DictionarySerializer(target))
+            self.assertEqual(target['iteration'], 1)
+            updater.update()
+            self.assertEqual(updater.iteration, 2)
+        finally:
+            updater.finalize()
+
+    def run_updates(self, updater, n):
+        batches = []
+        for _ in range(n):
+            updater.update()
+            args, _ = self.optimizer.update.call_args
+            batches.append(args[1].copy())
+        return batches
+
+    def check_resume(self, shuffle, saved, n):
+        updater = training.StandardUpdater(
+            self.make_iterator(shuffle), self.optimizer,
+            prefetch=self.prefetch)
+        try:
+            self.run_updates(updater, saved)
+            target = {}
+            updater.serialize(
+                chainer.serializers.DictionarySerializer(target))
+            expect = self.run_updates(updater, n)
+        finally:
+            updater.finalize()
+
+        updater = training.StandardUpdater(
+            self.make_iterator(shuffle), self.optimizer,
+            prefetch=self.prefetch)
+        try:
+            updater.serialize(chainer.serializers.NpzDeserializer(target))
+            actual = self.run_updates(updater, n)
+        finally:
+            updater.finalize()
+        for x, y in zip(expect, actual):
+            numpy.testing.assert_array_equal(x, y)
+
+    def test_resume(self):
+        self.check_resume(False, 2, 6)
+
+    def test_resume_shuffle(self):
+        # The order of the next epoch is drawn at random after resuming.
+        self.check_resume(True, 1, 2)
+
+    def test_resume_shuffle_next_epoch(self):
+        # The order is shuffled in place at the end of the first epoch.
+        self.check_resume(True, 4, 2)
+
+    def test_error(self):
+        updater = training.StandardUpdater(
+            self.make_iterator(), self.optimizer, prefetch=self.prefetch,
+            converter=mock.MagicMock(side_effect=ValueError))
+        try:
+            with self.assertRaises(ValueError):
+                updater.update()
+        finally:
+            updater.finalize()
+
+
+class TestMultiprocessParallelUpdater(unittest.TestCase):
+
+    def setUp(self):
+        self.model = chainer.links.Classifier(chainer.links.Linear(3, 2))
+        self.x = numpy.random.uniform(-1, 1, (8, 3)).astype(numpy.float32)
+        self.t = numpy.random.randint(0, 2, 8).astype(numpy.int32)
+        self.dataset = chainer.datasets.TupleDataset(self.x, self.t)
+
+    def make_updater(self, n, cpu_sets=None):
+        optimizer = chainer.optimizers.SGD(lr=0.5)
+        optimizer.setup(self.model)
+        iterators = [
+            chainer.iterators.SerialIterator(
+                chainer.datasets.SubDataset(self.dataset, 2 * i, 2 * i + 2),
+                2, shuffle=False)
+            for i in range(n)]
+        return training.MultiprocessParallelUpdater(
+            iterators, optimizer, cpu_sets=cpu_sets)
+
+    def expected_params(self, n, iterations):
+        model = self.model.copy()
+        params = [p for _, p in sorted(model.namedparams())]
+        for _ in range(iterations):
+            grads = [numpy.zeros_like(p.data) for p in params]
+            for i in range(n):
+                model.cleargrads()
+                model(self.x[2 * i:2 * i + 2],
+                      self.t[2 * i:2 * i + 2]).backward()
+                for g, p in zip(grads, params):
+                    g += p.grad / n
+            for g, p in zip(grads, params):
+                p.data -= 0.5 * g
+        return [p.data for p in params]
+
+    def check_update(self, n):
+        expected = self.expected_params(n, 3)
+        updater = self.make_updater(n, [None] * n)
+        try:
+            for _ in range(3):
+                updater.update()
+        finally:
+            updater.finalize()
+        self.assertEqual(updater.iteration, 3)
+        params = [p.data for _, p in sorted(self.model.namedparams())]
+        for e, p in zip(expected, params):
+            testing.assert_allclose(e, p)
+
+    def test_update_one_process(self):
+        self.check_update(1)
+
+    def test_update_three_processes(self):
+        self.check_update(3)
+
+    def test_invalid_cpu_sets(self):
+        with self.assertRaises(ValueError):
+            self.make_updater(2, [None])
+
+    def test_worker_error(self):
+        updater = self.make_updater(2, [None, None])
+        # The dataset of the worker is replaced by one with a wrong shape.
+        updater._worker_iterators[0].dataset = chainer.datasets.TupleDataset(
+            numpy.zeros((2, 4), numpy.float32), self.t[:2])
+        with self.assertRaises(RuntimeError):
+            updater.update()
+
+
 testing.run_module(__name__, __file__)
@@ -0,0 +1,27 @@
+import unittest
+
+import numpy
+
+from chainer import testing
+from chainer.utils import array
+
+
+@testing.parameterize(
+    {'indices': [3, 0, 3, 1, 3], 'shape': (4, 2)},
+    {'indices': [2], 'shape': (4,)},
+    {'indices': [], 'shape': (4, 3)},
+)
+class TestScatterAdd(unittest.TestCase):
+
+    def test_scatter_add(self):
+        indices = numpy.array(self.indices, numpy.int32)
+        a = numpy.random.uniform(-1, 1, self.shape).astype(numpy.float32)
+        values = numpy.random.uniform(
+            -1, 1, (len(indices),) + self.shape[1:]).astype(numpy.float32)
+        expect = a.copy()
+        numpy.add.at(expect, indices, values)
+        array.scatter_add(a, indices, values)
+        testing.assert_allclose(a, expect)
+
+
+testing.run_module(__name__, __file__)
@@ -3,6 +3,7 @@ import unittest
 import numpy
 from six import moves
 
+import chainer
 from chainer import cuda
 from chainer import testing
 from chainer.testing import attr
@@ -98,6 +99,42 @@ class TestIm2Col(unittest.TestCase):
     def test_im2col_cpu(self):
         self.check_im2col(*self.params, gpu=False)
 
+    def test_im2col_cpu_out(self):
+        kh, kw, sy, sx, ph, pw, dy, dx = self.params
+        expect = conv.im2col_cpu(
+            self.img, kh, kw, sy, sx, ph, pw, dy=dy, dx=dx)
+        out = numpy.full(expect.shape, numpy.nan, self.dtype)
+        col = conv.im2col_cpu(
+            self.img, kh, kw, sy, sx, ph, pw, dy=dy, dx=dx, out=out)
+        self.assertIs(col, out)
+        testing.assert_allclose(expect, col)
+
+    def test_im2col_cpu_pval_cover_all(self):
+        kh, kw, sy, sx, ph, pw, dy, dx = self.params
+        col = conv.im2col_cpu(self.img, kh, kw, sy, sx, ph, pw, pval=-5,
+                              cover_all=True, dy=dy, dx=dx)
+        # Compares with the patches of the padded image.
+        img = numpy.pad(
+            self.img, ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)),
+            mode='constant', constant_values=(-5,))
+        col_h, col_w = col.shape[4:]
+        for ky in moves.range(kh):
+            for kx in moves.range(kw):
+                testing.assert_allclose(
+                    col[:, :, ky, kx],
+                    img[:, :, ky * dy:ky * dy + col_h * sy:sy,
+                        kx * dx:kx * dx + col_w * sx:sx])
+
+    def test_im2col_nhwc_cpu(self):
+        kh, kw, sy, sx, ph, pw, dy, dx = self.params
+        expect = conv.im2col_cpu(
+            self.img, kh, kw, sy, sx, ph, pw, dy=dy, dx=dx)
+        col = conv.im2col_nhwc_cpu(
+            numpy.ascontiguousarray(self.img.transpose(0, 2, 3, 1)),
+            kh, kw, sy, sx, ph, pw, dy=dy, dx=dx)
+        self.assertTrue(col.flags.c_contiguous)
+        testing.assert_allclose(expect.transpose(0, 4, 5, 2, 3, 1), col)
+
     @attr.gpu
     def test_im2col_gpu(self):
         self.check_im2col(*self.params, gpu=True)
@@ -152,9 +189,89 @@ class TestCol2Im(unittest.TestCase):
     def test_col2im_cpu(self):
         self.check_col2im(*self.params, gpu=False)
 
+    def test_col2im_cpu_out(self):
+        kh, kw, sy, sx, ph, pw, dy, dx = self.params
+        col_h = conv.get_conv_outsize(self.h, kh, sy, ph, d=dy)
+        col_w = conv.get_conv_outsize(self.w, kw, sx, pw, d=dx)
+        col = numpy.random.uniform(
+            -1, 1, (2, 3, kh, kw, col_h, col_w)).astype(self.dtype)
+        expect = conv.col2im_cpu(col, sy, sx, ph, pw, self.h, self.w, dy, dx)
+        out = numpy.full(expect.shape, numpy.nan, self.dtype)
+        img = conv.col2im_cpu(
+            col, sy, sx, ph, pw, self.h, self.w, dy, dx, out=out)
+        self.assertIs(img, out)
+        testing.assert_allclose(expect, img)
+
+    def test_col2im_nhwc_cpu(self):
+        kh, kw, sy, sx, ph, pw, dy, dx = self.params
+        col_h = conv.get_conv_outsize(self.h, kh, sy, ph, d=dy)
+        col_w = conv.get_conv_outsize(self.w, kw, sx, pw, d=dx)
+        col = numpy.random.uniform(
+            -1, 1, (2, 3, kh, kw, col_h, col_w)).astype(self.dtype)
+        expect = conv.col2im_cpu(col, sy, sx, ph, pw, self.h, self.w, dy, dx)
+        img = conv.col2im_nhwc_cpu(
+            numpy.ascontiguousarray(col.transpose(0, 4, 5, 2, 3, 1)),
+            sy, sx, ph, pw, self.h, self.w, dy, dx)
+        self.assertTrue(img.flags.c_contiguous)
+        testing.assert_allclose(expect.transpose(0, 2, 3, 1), img)
+
     @attr.gpu
     def test_col2im_gpu(self):
         self.check_col2im(*self.params, gpu=True)
 
 
+class TestImageLayout(unittest.TestCase):
+
+    def test_channels_last(self):
+        self.assertFalse(conv.channels_last())
+        with chainer.using_config('image_layout', 'NHWC'):
+            self.assertTrue(conv.channels_last())
+
+    def test_invalid(self):
+        with chainer.using_config('image_layout', 'CHWN'):
+            with self.assertRaises(ValueError):
+                conv.channels_last()
+
+    def test_to_nchw(self):
+        x = numpy.random.uniform(-1, 1, (2, 4, 5, 3))
+        y = conv.to_nchw(x)
+        self.assertEqual(y.shape, (2, 3, 4, 5))
+        self.assertTrue(numpy.may_share_memory(x, y))
+        testing.assert_allclose(x, conv.to_nhwc(y))
+
+
+class TestWorkspace(unittest.TestCase):
+
+    def setUp(self):
+        # The buffer is shared with the other tests in this thread.
+        conv._workspace.buffer = None
+
+    def tearDown(self):
+        conv._workspace.buffer = None
+
+    def test_get_workspace(self):
+        a = conv.get_workspace((2, 3), numpy.float32)
+        self.assertEqual(a.shape, (2, 3))
+        self.assertEqual(a.dtype, numpy.float32)
+        self.assertTrue(a.flags.c_contiguous)
+        # Smaller arrays share the buffer.
+        b = conv.get_workspace((4,), numpy.float16)
+        self.assertTrue(numpy.may_share_memory(a, b))
+        # The buffer grows to a larger array.
+        c = conv.get_workspace((100,), numpy.float64)
+        self.assertEqual(c.shape, (100,))
+        self.assertFalse(numpy.may_share_memory(a, c))
+
+    def test_tensordot_col_cpu(self):
+        W = numpy.random.uniform(-1, 1, (4, 3, 2, 3)).astype(numpy.float32)
+        x = numpy.random.uniform(-1, 1, (2, 4, 5, 6)).astype(numpy.float32)
+        expect = numpy.rollaxis(numpy.tensordot(W, x, (0, 1)), 3)
+        testing.assert_allclose(expect, conv.tensordot_col_cpu(W, x))
+        # A non-contiguous filter of another dtype.
+        W = numpy.asfortranarray(W.astype(numpy.float64))
+        gcol = conv.tensordot_col_cpu(W, x)
+        self.assertEqual(gcol.dtype, numpy.float32)
+        testing.assert_allclose(expect, gcol)
+
+
 testing.run_module(__name__, __file__)
@@ -0,0 +1,171 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import testing
+from chainer.utils import conv_algorithm
+
+
+@testing.parameterize(*(testing.product({
+    'algorithm': ['winograd'],
+    'ksize': [(3, 3)],
+    'pad': [(0, 0), (1, 2), (3, 3)],
+    'dilate': [(1, 1), (2, 3)],
+    'size': [(7, 8), (10, 9)],
+    'dtype': [numpy.float32, numpy.float64],
+}) + testing.product({
+    'algorithm': ['fft'],
+    'ksize': [(5, 5), (7, 3)],
+    'pad': [(0, 0), (2, 1)],
+    'dilate': [(1, 1), (2, 1)],
+    'size': [(15, 12)],
+    'dtype': [numpy.float32, numpy.float64],
+})))
+class TestConvAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3) + self.size).astype(self.dtype)
+        self.W = numpy.random.uniform(
+            -1, 1, (4, 3) + self.ksize).astype(self.dtype)
+        y = conv_algorithm.forward(
+            'im2col', self.x, self.W, self.pad, self.dilate)
+        self.gy = numpy.random.uniform(-1, 1, y.shape).astype(self.dtype)
+        self.y = y
+        self.check_options = {}
+        if self.dtype == numpy.float32:
+            self.check_options = {'atol': 1e-4, 'rtol': 1e-4}
+
+    def test_candidates(self):
+        self.assertIn(self.algorithm, conv_algorithm.get_candidates(
+            self.ksize, (1, 1), self.dilate))
+
+    def test_forward(self):
+        y = conv_algorithm.forward(
+            self.algorithm, self.x, self.W, self.pad, self.dilate)
+        self.assertEqual(y.dtype, self.dtype)
+        testing.assert_allclose(self.y, y, **self.check_options)
+
+    def test_backward_data(self):
+        gx = conv_algorithm.backward_data(
+            self.algorithm, self.gy, self.W, self.size, self.pad,
+            self.dilate)
+        expect = conv_algorithm.backward_data(
+            'im2col', self.gy, self.W, self.size, self.pad, self.dilate)
+        self.assertEqual(gx.shape, self.x.shape)
+        testing.assert_allclose(expect, gx, **self.check_options)
+
+    def test_backward_filter(self):
+        gW = conv_algorithm.backward_filter(
+            self.algorithm, self.x, self.gy, self.ksize, self.pad,
+            self.dilate)
+        expect = conv_algorithm.backward_filter(
+            'im2col', self.x, self.gy, self.ksize, self.pad, self.dilate)
+        self.assertEqual(gW.shape, self.W.shape)
+        testing.assert_allclose(expect, gW, **self.check_options)
+
+
+class TestConvAlgorithmIm2col(unittest.TestCase):
+
+    def test_backward_data(self):
+        # backward_data is the transpose of forward.
+        x = numpy.random.uniform(-1, 1, (2, 3, 5, 6))
+        W = numpy.random.uniform(-1, 1, (4, 3, 3, 2))
+        y = conv_algorithm.forward('im2col', x, W, (1, 2), (2, 1))
+        gy = numpy.random.uniform(-1, 1, y.shape)
+        gx = conv_algorithm.backward_data(
+            'im2col', gy, W, (5, 6), (1, 2), (2, 1))
+        testing.assert_allclose(numpy.vdot(y, gy), numpy.vdot(x, gx))
+
+
+class TestConvAlgorithmFFTChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.workspace_size = conv_algorithm._fft_workspace_size
+        # Processes the output channels one by one.
+        conv_algorithm._fft_workspace_size = 1
+
+    def tearDown(self):
+        conv_algorithm._fft_workspace_size = self.workspace_size
+
+    def test_forward(self):
+        x = numpy.random.uniform(-1, 1, (2, 3, 9, 8))
+        W = numpy.random.uniform(-1, 1, (4, 3, 5, 5))
+        testing.assert_allclose(
+            conv_algorithm.forward('im2col', x, W, (1, 1)),
+            conv_algorithm.forward('fft', x, W, (1, 1)))
+
+    def test_backward_filter(self):
+        x = numpy.random.uniform(-1, 1, (2, 3, 9, 8))
+        gy = numpy.random.uniform(-1, 1, (2, 4, 7, 6))
+        testing.assert_allclose(
+            conv_algorithm.backward_filter('im2col', x, gy, (5, 5), (1, 1)),
+            conv_algorithm.backward_filter('fft', x, gy, (5, 5), (1, 1)))
+
+
+class TestSelect(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (2, 3, 8, 8)).astype('f')
+        self.W = numpy.random.uniform(-1, 1, (4, 3, 3, 3)).astype('f')
+        conv_algorithm._autotune_cache.clear()
+
+    def tearDown(self):
+        conv_algorithm._autotune_cache.clear()
+
+    def test_candidates(self):
+        self.assertEqual(conv_algorithm.get_candidates(
+            (3, 3), (2, 2)), ['im2col'])
+        self.assertEqual(conv_algorithm.get_candidates(
+            (3, 3), (1, 1)), ['im2col', 'winograd'])
+        self.assertEqual(conv_algorithm.get_candidates(
+            (3, 3), (1, 1), (2, 2)), ['im2col', 'winograd', 'fft'])
+        self.assertEqual(conv_algorithm.get_candidates(
+            (1, 5), (1, 1)), ['im2col', 'fft'])
+
+    def test_default(self):
+        self.assertEqual(conv_algorithm.select(
+            self.x, self.W, (1, 1), (1, 1)), 'im2col')
+
+    def test_explicit(self):
+        with chainer.using_config('cpu_conv_algorithm', 'winograd'):
+            self.assertEqual(conv_algorithm.select(
+                self.x, self.W, (1, 1), (1, 1)), 'winograd')
+            self.assertEqual(conv_algorithm.select(
+                self.x, self.W, (2, 2), (1, 1)), 'im2col')
+
+    def test_invalid(self):
+        with chainer.using_config('cpu_conv_algorithm', 'gemm'):
+            with self.assertRaises(ValueError):
+                conv_algorithm.select(self.x, self.W, (1, 1), (1, 1))
+
+    def test_autotune(self):
+        with chainer.using_config('cpu_conv_algorithm', 'auto'):
+            algorithm = conv_algorithm.select(
+                self.x, self.W, (1, 1), (1, 1))
+            self.assertIn(algorithm, ['im2col', 'winograd'])
+            self.assertEqual(len(conv_algorithm._autotune_cache), 1)
+
+            # The choice is cached.
+            key, = conv_algorithm._autotune_cache
+            conv_algorithm._autotune_cache[key] = 'fft'
+            self.assertEqual(conv_algorithm.select(
+                self.x, self.W, (1, 1), (1, 1)), 'fft')
+
+            # Another signature is tuned separately.
+            conv_algorithm.select(self.x, self.W, (1, 1), (0, 0))
+            with chainer.using_config('train', False):
+                conv_algorithm.select(self.x, self.W, (1, 1), (1, 1))
+            conv_algorithm.select(
+                self.x, self.W[:3], (1, 1), (1, 1), transposed=True)
+            self.assertEqual(len(conv_algorithm._autotune_cache), 4)
+
+    def test_autotune_single_candidate(self):
+        with chainer.using_config('cpu_conv_algorithm', 'auto'):
+            self.assertEqual(conv_algorithm.select(
+                self.x, self.W, (2, 2), (1, 1)), 'im2col')
+        self.assertEqual(len(conv_algorithm._autotune_cache), 0)
+
+
+testing.run_module(__name__, __file__)
@@ -306,4 +306,84 @@ class TestCol2ImNDParameterRanks(unittest.TestCase):
             conv_nd.col2im_nd_gpu(col_gpu, self.stride, self.pad, (4,))
 
 
+@testing.parameterize(*testing.product({
+    'dims': [(5,), (5, 4), (5, 4, 3)],
+    'ksize': [2, 3],
+    'stride': [1, 2],
+    'pad': [0, 1],
+    'cover_all': [True, False],
+}))
+class TestPoolingNDCPU(unittest.TestCase):
+
+    def setUp(self):
+        ndim = len(self.dims)
+        self.ksize = (self.ksize,) * ndim
+        self.stride = (self.stride,) * ndim
+        self.pad = (self.pad,) * ndim
+        # Integers to have equal values in the windows.
+        self.x = numpy.random.randint(
+            -2, 3, (2, 3) + self.dims).astype(numpy.float32)
+
+    def im2col(self, pval):
+        col = conv_nd.im2col_nd_cpu(
+            self.x, self.ksize, self.stride, self.pad, pval=pval,
+            cover_all=self.cover_all)
+        return col.reshape((2, 3, -1) + col.shape[2 + len(self.dims):])
+
+    def col2im(self, gcol):
+        outs = gcol.shape[3:]
+        gcol = gcol.reshape((2, 3) + self.ksize + outs)
+        return conv_nd.col2im_nd_cpu(gcol, self.stride, self.pad, self.dims)
+
+    def test_max_pooling(self):
+        col = self.im2col(-float('inf'))
+        y, indexes = conv_nd.max_pooling_nd_cpu(
+            self.x, self.ksize, self.stride, self.pad, self.cover_all)
+        testing.assert_allclose(col.max(axis=2), y, atol=0, rtol=0)
+        numpy.testing.assert_array_equal(col.argmax(axis=2), indexes)
+
+        gy = numpy.random.uniform(-1, 1, y.shape).astype(numpy.float32)
+        gcol = numpy.zeros(col.shape, numpy.float32)
+        for i in moves.range(col.shape[2]):
+            gcol[:, :, i] = gy * (indexes == i)
+        gx = conv_nd.max_pooling_nd_grad_cpu(
+            gy, indexes, self.dims, self.ksize, self.stride, self.pad)
+        testing.assert_allclose(self.col2im(gcol), gx)
+
+    def test_max_pooling_nan(self):
+        self.x.ravel()[::7] = numpy.nan
+        col = self.im2col(-float('inf'))
+        y, indexes = conv_nd.max_pooling_nd_cpu(
+            self.x, self.ksize, self.stride, self.pad, self.cover_all)
+        numpy.testing.assert_array_equal(col.max(axis=2), y)
+        numpy.testing.assert_array_equal(col.argmax(axis=2), indexes)
+
+    def test_max_pooling_grad_inf(self):
+        y, indexes = conv_nd.max_pooling_nd_cpu(
+            self.x, self.ksize, self.stride, self.pad, self.cover_all)
+        gy = numpy.random.uniform(-1, 1, y.shape).astype(numpy.float32)
+        gy.ravel()[::5] = numpy.inf
+        col = self.im2col(-float('inf'))
+        gcol = numpy.zeros(col.shape, numpy.float32)
+        for i in moves.range(col.shape[2]):
+            gcol[:, :, i] = numpy.where(indexes == i, gy, 0)
+        gx = conv_nd.max_pooling_nd_grad_cpu(
+            gy, indexes, self.dims, self.ksize, self.stride, self.pad)
+        self.assertFalse(numpy.isnan(gx).any())
+        numpy.testing.assert_array_equal(self.col2im(gcol), gx)
+
+    def test_average_pooling(self):
+        col = self.im2col(0)
+        y = conv_nd.average_pooling_nd_cpu(
+            self.x, self.ksize, self.stride, self.pad, self.cover_all)
+        testing.assert_allclose(col.mean(axis=2), y)
+
+        gy = numpy.random.uniform(-1, 1, y.shape).astype(numpy.float32)
+        gcol = numpy.broadcast_to(
+            gy[:, :, None] / col.shape[2], col.shape).copy()
+        gx = conv_nd.average_pooling_nd_grad_cpu(
+            gy, self.dims, self.ksize, self.stride, self.pad)
+        testing.assert_allclose(self.col2im(gcol), gx)
+
+
 testing.run_module(__name__, __file__)
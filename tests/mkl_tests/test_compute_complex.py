@@ -0,0 +1,126 @@
+import unittest
+
+import numpy
+
+from chainer import testing
+
+from mkldnn import compute_complex
+from mkldnn.compute_complex import ComputeComplex
+from mkldnn.compute_complex import PrimitiveCache
+
+
+class DummyForward(ComputeComplex):
+    cc_type = 'f'
+
+    def __init__(self, inputs, alpha=1, pos=None):
+        super(DummyForward, self).__init__()
+        if self.new:
+            self.x = inputs[0]
+
+    def match(self, inputs, alpha=1):
+        return self.x.shape == inputs[0].shape
+
+
+class TestPrimitiveCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = PrimitiveCache(capacity=2)
+
+    def test_lru_eviction(self):
+        self.cache.put(('t', None, (0, 0), 'a'), 1)
+        self.cache.put(('t', None, (0, 0), 'b'), 2)
+        self.assertEqual(self.cache.get(('t', None, (0, 0), 'a')), 1)
+        self.cache.put(('t', None, (0, 0), 'c'), 3)
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn(('t', None, (0, 0), 'b'), self.cache)
+        self.assertIn(('t', None, (0, 0), 'a'), self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_set_capacity(self):
+        self.cache.put(('t', None, (0, 0), 'a'), 1)
+        self.cache.put(('t', None, (0, 0), 'b'), 2)
+        self.cache.set_capacity(1)
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn(('t', None, (0, 0), 'b'), self.cache)
+
+    def test_unbounded(self):
+        self.cache.set_capacity(0)
+        for i in range(10):
+            self.cache.put(('t', None, (i, 0), None), i)
+        self.assertEqual(len(self.cache), 10)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_clear_scope(self):
+        self.cache.put(('t', 'model1', (0, 0), None), 1)
+        self.cache.put(('t', 'model2', (0, 0), None), 2)
+        self.cache.clear('model1')
+        self.assertEqual(len(self.cache), 1)
+        self.assertIsNone(self.cache.find('model1', (0, 0), lambda cc: True))
+        self.assertEqual(self.cache.find('model2', (0, 0), lambda cc: True), 2)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_find(self):
+        self.cache.put(('t', None, (1, 0), 'a'), 1)
+        self.cache.put(('t', None, (1, 0), 'b'), 2)
+        self.assertEqual(self.cache.find(None, (1, 0), lambda cc: True), 2)
+        self.assertEqual(
+            self.cache.find(None, (1, 0), lambda cc: cc == 1), 1)
+        self.assertIsNone(self.cache.find(None, (2, 0), lambda cc: True))
+
+    def test_find_most_recently_used(self):
+        self.cache.put(('t', None, (1, 0), 'a'), 1)
+        self.cache.put(('t', None, (1, 0), 'b'), 2)
+        self.cache.get(('t', None, (1, 0), 'a'))
+        self.assertEqual(self.cache.find(None, (1, 0), lambda cc: True), 1)
+
+    def test_find_visits_position_only(self):
+        self.cache.set_capacity(0)
+        for i in range(10):
+            self.cache.put(('t', None, (i, 0), None), i)
+        visited = []
+        self.cache.find(None, (3, 0), lambda cc: visited.append(cc))
+        self.assertEqual(visited, [3])
+
+
+class TestComputeComplexCache(unittest.TestCase):
+
+    def setUp(self):
+        compute_complex.clear_cache()
+        compute_complex.reset_cache_stats()
+        self.x1 = numpy.zeros((2, 3), dtype=numpy.float32)
+        self.x2 = numpy.zeros((4, 3), dtype=numpy.float32)
+
+    def tearDown(self):
+        compute_complex.clear_cache()
+        compute_complex.reset_cache_stats()
+
+    def test_alternating_shapes(self):
+        cc1 = DummyForward((self.x1,), pos=(0, 0))
+        cc2 = DummyForward((self.x2,), pos=(0, 0))
+        self.assertIsNot(cc1, cc2)
+        self.assertIs(DummyForward((self.x1,), pos=(0, 0)), cc1)
+        self.assertIs(DummyForward((self.x2,), pos=(0, 0)), cc2)
+        stats = compute_complex.cache_stats()['f']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_hyperparameter_in_key(self):
+        cc1 = DummyForward((self.x1,), alpha=1, pos=(0, 0))
+        cc2 = DummyForward((self.x1,), alpha=2, pos=(0, 0))
+        self.assertIsNot(cc1, cc2)
+
+    def test_scope(self):
+        with compute_complex.cache_scope('model1'):
+            cc1 = DummyForward((self.x1,), pos=(0, 0))
+        with compute_complex.cache_scope('model2'):
+            cc2 = DummyForward((self.x1,), pos=(0, 0))
+        self.assertIsNot(cc1, cc2)
+        compute_complex.clear_cache('model1')
+        with compute_complex.cache_scope('model1'):
+            self.assertIsNot(DummyForward((self.x1,), pos=(0, 0)), cc1)
+        with compute_complex.cache_scope('model2'):
+            self.assertIs(DummyForward((self.x1,), pos=(0, 0)), cc2)
+
+
+testing.run_module(__name__, __file__)
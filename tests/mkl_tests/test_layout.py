@@ -0,0 +1,51 @@
+import unittest
+
+import numpy
+
+from chainer import functions
+from chainer import links
+from chainer import mkld
+from chainer import testing
+
+import mkldnn.chainer.fanout
+from mkldnn.chainer import layout
+
+
+class TestLayoutCounter(unittest.TestCase):
+
+    def setUp(self):
+        mkldnn.chainer.fanout.FanoutRecorder.clear()
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 16, 8, 8)).astype(numpy.float32)
+        self.conv = links.Convolution2D(16, 16, 3, pad=1)
+
+    def test_memory_format(self):
+        self.assertEqual(mkld.memory_format(self.x), 'plain')
+        h = self.conv(self.x)
+        self.assertIsInstance(mkld.memory_format(h.data), str)
+
+    def test_count(self):
+        with mkld.count_layouts() as counter:
+            h = functions.relu(self.conv(self.x))
+            y = functions.sum(h)
+            y.backward()
+        stats = counter.stats()
+        if not layout.is_plain(h.data):
+            entry = stats[('Sum', 'forward')]
+            self.assertEqual(entry['conversions'], 1)
+            self.assertEqual(entry['conversion_bytes'], self.x.nbytes)
+        self.assertEqual(
+            counter.conversions,
+            sum(e['conversions'] for e in stats.values()))
+        self.assertEqual(
+            counter.reorders, sum(e['reorders'] for e in stats.values()))
+        for label, direction in stats:
+            self.assertIn(direction, ('forward', 'backward'))
+
+    def test_no_counter(self):
+        self.assertIsNone(layout.current_counter())
+        functions.relu(self.conv(self.x))
+        self.assertIsNone(layout.current_counter())
+
+
+testing.run_module(__name__, __file__)
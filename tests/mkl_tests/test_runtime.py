@@ -0,0 +1,62 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import links
+from chainer import testing
+
+import mkldnn.chainer.fanout
+from mkldnn.chainer import runtime
+
+
+class TestBatchedStream(unittest.TestCase):
+
+    def setUp(self):
+        mkldnn.chainer.fanout.FanoutRecorder.clear()
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3, 8, 8)).astype(numpy.float32)
+        self.conv = links.Convolution2D(3, 4, 3, pad=1)
+
+    def forward(self):
+        h = functions.relu(self.conv(self.x))
+        return functions.max_pooling_2d(h, 2)
+
+    def test_forward(self):
+        y_expect = numpy.array(self.forward().data)
+        with chainer.mkld.batched_stream() as batch:
+            y = self.forward()
+            self.assertTrue(batch.pending)
+        self.assertFalse(batch.pending)
+        self.assertGreater(batch.submits, 0)
+        self.assertEqual(batch.waits, 1)
+        testing.assert_allclose(y_expect, numpy.array(y.data))
+
+    def test_flush_before_numpy_function(self):
+        y_expect = numpy.array(functions.sum(self.forward()).data)
+        with chainer.mkld.batched_stream() as batch:
+            y = functions.sum(self.forward())
+            self.assertFalse(batch.pending)
+        testing.assert_allclose(y_expect, y.data)
+
+    def test_backward(self):
+        self.conv.cleargrads()
+        functions.sum(self.forward()).backward()
+        gW_expect = numpy.array(self.conv.W.grad)
+
+        self.conv.cleargrads()
+        with chainer.using_config('mkldnn_batch_stream', True):
+            functions.sum(self.forward()).backward()
+        self.assertIsNone(runtime.current_batch())
+        testing.assert_allclose(gW_expect, numpy.array(self.conv.W.grad))
+
+    def test_nested(self):
+        with chainer.mkld.batched_stream() as outer:
+            with chainer.mkld.batched_stream() as inner:
+                self.assertIs(inner, outer)
+            self.assertIs(runtime.current_batch(), outer)
+        self.assertIsNone(runtime.current_batch())
+
+
+testing.run_module(__name__, __file__)